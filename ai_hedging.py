@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+AI内容生成对冲模块
+豆包AI的回复耗时波动很大，偶尔还会卡在人机验证弹窗上，一直等到超时才失败。
+HedgedProvider 先向主提供者发出请求，如果超过历史耗时的P90仍未返回，再向备用提供者
+（另一个豆包页面、AI接口或本地生成）发出同样的请求，采用先返回且校验通过的结果并取消另一个请求。
+
+各提供者每种操作的耗时记录在 test-results/ai_latency_history.json 中，历史样本不足时使用默认的等待时间。
+只记录返回了可用结果的调用：很快出错或结果不可用的调用不代表正常耗时，计入历史会使P90偏低、对冲越来越早；
+被取消的请求已等待的时间只是实际耗时的下限，超过当前P90时才记录，使P90不会因为慢请求被取消而偏低，
+刚发出就被取消的请求也不会把P90拉低。
+
+用法：
+    provider = create_ai_provider("doubao", session, hedge="doubao")  # 对冲到第二个豆包页面
+"""
+
+import asyncio
+import json
+import math
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from ai_providers import AIContentProvider
+from doubao_ai_helpers import METADATA_FIELDS
+from run_timeline import span
+
+# 耗时历史保存路径
+LATENCY_HISTORY_FILE = os.path.join("test-results", "ai_latency_history.json")
+
+# 每种操作保留的历史样本数量
+MAX_LATENCY_SAMPLES = 50
+
+# 计算对冲等待时间所需的最少样本数量，不足时使用默认等待时间（秒）
+MIN_LATENCY_SAMPLES = 5
+DEFAULT_HEDGE_DELAY_S = 60.0
+
+# 对冲等待时间使用的历史耗时百分位
+HEDGE_PERCENTILE = 90
+
+# 短于该时间的调用（缓存命中、本地生成）没有实际询问AI，不计入历史（秒）
+MIN_RECORDED_LATENCY_S = 1.0
+
+
+class LatencyHistory:
+    """各提供者每种操作的历史耗时"""
+
+    def __init__(self, path: str = LATENCY_HISTORY_FILE, max_samples: int = MAX_LATENCY_SAMPLES):
+        """
+        Args:
+            path: 历史记录文件路径
+            max_samples: 每种操作保留的样本数量
+        """
+        self.path = path
+        self.max_samples = max_samples
+        self.samples: Dict[str, List[float]] = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.samples = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️  读取AI耗时历史失败，重新记录: {e}")
+
+    def record(self, key: str, seconds: float) -> None:
+        """记录一次耗时并保存"""
+        if seconds < MIN_RECORDED_LATENCY_S:
+            return
+        samples = self.samples.setdefault(key, [])
+        samples.append(round(seconds, 3))
+        del samples[:-self.max_samples]
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.samples, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"⚠️  保存AI耗时历史失败: {e}")
+
+    def percentile(self, key: str, pct: float, default: float) -> float:
+        """最近秩法计算历史耗时的百分位数，样本不足时返回默认值"""
+        samples = sorted(self.samples.get(key, []))
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return default
+        return samples[max(0, math.ceil(pct / 100 * len(samples)) - 1)]
+
+
+def _is_valid(operation: str, result: Any, args: Sequence[Any]) -> bool:
+    """结果是否可用：合并生成需要包含全部请求的字段，其他操作结果不为空即可"""
+    if not result:
+        return False
+    if operation == "generate_metadata":
+        fields = args[1] if len(args) > 1 else METADATA_FIELDS
+        return all(name in result for name in fields)
+    return True
+
+
+class HedgedProvider(AIContentProvider):
+    """主提供者超过历史P90仍未返回时，同时向备用提供者请求，采用先返回且校验通过的结果"""
+
+    def __init__(self, primary: AIContentProvider, secondary: AIContentProvider,
+                 history: Optional[LatencyHistory] = None, pct: float = HEDGE_PERCENTILE,
+                 default_delay_s: float = DEFAULT_HEDGE_DELAY_S):
+        """
+        Args:
+            primary: 主提供者
+            secondary: 备用提供者
+            history: 耗时历史，默认读取 test-results/ai_latency_history.json
+            pct: 对冲等待时间使用的百分位
+            default_delay_s: 历史样本不足时的对冲等待时间（秒）
+        """
+        self.primary = primary
+        self.secondary = secondary
+        self.history = history or LatencyHistory()
+        self.pct = pct
+        self.default_delay_s = default_delay_s
+        self.label = f"{primary.label}（对冲: {secondary.label}）"
+
+    async def _race(self, operation: str, *args: Any, **kwargs: Any) -> Any:
+        """先请求主提供者，超过对冲等待时间后再请求备用提供者，返回先校验通过的结果"""
+        primary_key = f"{self.primary.label}.{operation}"
+        delay = self.history.percentile(primary_key, self.pct, self.default_delay_s)
+        providers = {}
+        started = {}
+
+        def launch(provider: AIContentProvider) -> None:
+            task = asyncio.ensure_future(getattr(provider, operation)(*args, **kwargs))
+            providers[task] = provider
+            started[task] = time.perf_counter()
+
+        with span(f"AI对冲.{operation}", delay=round(delay, 1)) as current:
+            launch(self.primary)
+            pending = set(providers)
+            winner = None
+            fallback = None
+            hedged = False
+            try:
+                while pending and winner is None:
+                    done, pending = await asyncio.wait(pending, timeout=None if hedged else delay,
+                                                       return_when=asyncio.FIRST_COMPLETED)
+                    if not done and not hedged:
+                        # 主提供者超过对冲等待时间仍未返回，同时请求备用提供者
+                        hedged = True
+                        print(f"⏱️  {self.primary.label} {operation} 超过 {delay:.1f}秒未返回，同时请求 {self.secondary.label}")
+                        launch(self.secondary)
+                        pending = {task for task in providers if not task.done()}
+                        continue
+                    for task in done:
+                        provider = providers[task]
+                        result = None if task.exception() else task.result()
+                        if task.exception():
+                            print(f"⚠️  {provider.label} {operation} 出错: {task.exception()}")
+                        if _is_valid(operation, result, args):
+                            self.history.record(f"{provider.label}.{operation}", time.perf_counter() - started[task])
+                            winner = task
+                            break
+                        fallback = fallback or result
+                    if not pending and winner is None and not hedged:
+                        # 主提供者很快失败，直接请求备用提供者
+                        hedged = True
+                        launch(self.secondary)
+                        pending = {task for task in providers if not task.done()}
+            finally:
+                cancelled = [task for task in providers if not task.done()]
+                for task in cancelled:
+                    # 已等待的时间是实际耗时的下限，超过当前P90时按该时间计入历史
+                    key = f"{providers[task].label}.{operation}"
+                    elapsed = time.perf_counter() - started[task]
+                    if elapsed > self.history.percentile(key, self.pct, self.default_delay_s):
+                        self.history.record(key, elapsed)
+                    task.cancel()
+                # 等待被取消的请求退出，使其占用的豆包页面放回页面池
+                await asyncio.gather(*cancelled, return_exceptions=True)
+
+            current.attributes.update(hedged=hedged, winner=providers[winner].label if winner else None)
+        if winner is None:
+            return fallback
+        if hedged:
+            print(f"🏁 {operation} 采用 {providers[winner].label} 的结果")
+        return winner.result()
+
+    async def summarize(self, markdown_file: str) -> Optional[str]:
+        return await self._race("summarize", markdown_file)
+
+    async def generate_tags(self, markdown_file: str) -> Optional[List[str]]:
+        return await self._race("generate_tags", markdown_file)
+
+    async def shorten_title(self, markdown_file: str, title: str) -> Optional[str]:
+        return await self._race("shorten_title", markdown_file, title)
+
+    async def generate_image_prompt(self, markdown_file: str) -> Optional[str]:
+        return await self._race("generate_image_prompt", markdown_file)
+
+    async def generate_images(self, markdown_file: str, prompt: Optional[str] = None,
+                              aspect_ratio: str = "16:9") -> List[str]:
+        return await self._race("generate_images", markdown_file, prompt, aspect_ratio) or []
+
+    async def generate_metadata(self, markdown_file: str, fields: Sequence[str] = METADATA_FIELDS,
+                                title: str = "") -> Dict[str, Any]:
+        return await self._race("generate_metadata", markdown_file, fields, title) or {}
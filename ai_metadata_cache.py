@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+AI生成内容缓存模块
+按Markdown正文的哈希和提示词模板版本缓存豆包AI生成的summary、话题标签、短标题、文生图提示词和封面图路径
+
+同一篇文章重新运行（例如某个平台发布失败或修复选择器后）时，各生成函数先查询缓存，
+命中时不再打开豆包页面。计算哈希前会去掉Markdown中的图片引用，因此钉钉文档插入封面图后缓存仍然有效；
+修改提示词后应增加 PROMPT_TEMPLATE_VERSION，使旧的缓存失效。
+
+缓存保存在 test-results/ai_cache/ 目录，每篇文章一个JSON文件，超过有效期的条目读取时视为不存在，
+条目数量或总大小（条目JSON加上引用的封面图文件）超过上限时删除最久未使用的条目及其封面图。
+
+命令行用法：
+    python ai_metadata_cache.py stats    # 查看缓存条目
+    python ai_metadata_cache.py clear    # 清空缓存
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+# 缓存保存目录
+AI_CACHE_DIR = os.path.join("test-results", "ai_cache")
+
+# 提示词模板版本，修改豆包AI的提示词后需要增加版本号
+PROMPT_TEMPLATE_VERSION = "1"
+
+# 默认有效期（7天）、最大条目数和最大总大小（生成的封面图占主要部分）
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 200
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+# 文件类字段，读取时检查文件是否仍然存在
+FILE_LIST_FIELDS = ("image_files",)
+
+
+def markdown_cache_key(markdown_file: str, version: str = PROMPT_TEMPLATE_VERSION) -> str:
+    """
+    根据Markdown正文和提示词模板版本生成缓存键
+
+    正文去掉图片引用、行尾空白和首尾空行后再计算哈希。
+    """
+    with open(markdown_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+    body = re.sub(r'!\[[^\]]*\]\([^)]*\)', '', content)
+    body = "\n".join(line.rstrip() for line in body.splitlines()).strip()
+    return hashlib.sha256(f"{version}\n{body}".encode('utf-8')).hexdigest()
+
+
+def _file_size(path: str) -> int:
+    """文件大小，文件已不存在时返回0"""
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+def _remove_file(path: str) -> None:
+    """删除文件，文件已不存在时忽略"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class AIMetadataCache:
+    """豆包AI生成内容的持久化缓存"""
+
+    def __init__(self, cache_dir: str = AI_CACHE_DIR, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+            ttl_seconds: 条目有效期（秒）
+            max_entries: 最大条目数，超过时删除最久未使用的条目
+            max_bytes: 最大总字节数（条目JSON加上引用的文件），超过时删除最久未使用的条目及其文件
+        """
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    @staticmethod
+    def _read(path: str) -> Optional[Dict[str, Any]]:
+        """读取条目文件（不检查有效期），不存在或损坏时返回None"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️  读取AI缓存失败，忽略该条目: {e}")
+            return None
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取条目，不存在、损坏或已过期时返回None"""
+        entry = self._read(self._path(key))
+        if entry is None or time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+            return None
+        return entry
+
+    def get(self, markdown_file: str, field: str) -> Optional[Any]:
+        """
+        查询缓存的字段
+
+        Args:
+            markdown_file: Markdown文件路径
+            field: 字段名称（summary、short_title、tags、image_prompt、image_files）
+
+        Returns:
+            缓存的值，未命中（包括文件类字段中的文件已丢失）时返回None
+        """
+        try:
+            key = markdown_cache_key(markdown_file)
+        except OSError:
+            return None
+        entry = self._load(key)
+        if not entry:
+            return None
+        value = entry.get("fields", {}).get(field)
+        if not value:
+            return None
+        if field in FILE_LIST_FIELDS and not all(os.path.exists(path) for path in value):
+            print(f"⚠️  AI缓存中的文件已不存在，重新生成: {field}")
+            return None
+        # 更新修改时间，用于淘汰最久未使用的条目
+        os.utime(self._path(key))
+        print(f"♻️  使用AI缓存中的{field}（{os.path.basename(markdown_file)}）")
+        return value
+
+    def put(self, markdown_file: str, values: Dict[str, Any]) -> None:
+        """
+        写入字段（与条目中已有的字段合并）
+
+        Args:
+            markdown_file: Markdown文件路径
+            values: 字段名称 → 值，值为空的字段不写入
+        """
+        values = {k: v for k, v in values.items() if v}
+        if not values:
+            return
+        try:
+            key = markdown_cache_key(markdown_file)
+            entry = self._load(key) or {"markdown_file": markdown_file, "version": PROMPT_TEMPLATE_VERSION,
+                                        "created_at": time.time(), "fields": {}}
+            entry["fields"].update(values)
+            entry["updated_at"] = time.time()
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # 先写临时文件再替换，并发写入时不会留下损坏的条目
+            tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self._path(key))
+        except Exception as e:
+            print(f"⚠️  写入AI缓存失败: {e}")
+            return
+        try:
+            self.evict()
+        except Exception as e:
+            print(f"⚠️  清理AI缓存失败（已写入的条目不受影响）: {e}")
+
+    def entries(self) -> List[str]:
+        """按最近使用时间从新到旧排列的条目文件路径"""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        mtimes = {}
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                mtimes[path] = os.path.getmtime(path)
+            except FileNotFoundError:
+                # 列出目录后被另一个进程删除
+                continue
+        return sorted(mtimes, key=mtimes.get, reverse=True)
+
+    @staticmethod
+    def _entry_files(entry: Optional[Dict[str, Any]]) -> List[str]:
+        """条目中文件类字段引用的、仍然存在的文件"""
+        fields = (entry or {}).get("fields", {})
+        return [path for field in FILE_LIST_FIELDS for path in fields.get(field) or [] if os.path.isfile(path)]
+
+    def _entry_size(self, path: str, entry: Optional[Dict[str, Any]]) -> int:
+        """条目占用的字节数：条目JSON加上引用的文件"""
+        return _file_size(path) + sum(_file_size(file) for file in self._entry_files(entry))
+
+    def total_size(self) -> int:
+        """缓存占用的总字节数（多个条目引用同一文件时只计算一次）"""
+        files = set()
+        total = 0
+        for path in self.entries():
+            entry = self._read(path)
+            total += _file_size(path)
+            files.update(os.path.abspath(file) for file in self._entry_files(entry))
+        return total + sum(_file_size(file) for file in files)
+
+    def _remove(self, paths: List[str], keep_files: set) -> None:
+        """
+        删除条目文件及其引用的文件（仍被保留的条目引用的文件除外）
+
+        文件可能已被共用同一封面图的条目或另一个进程删除，不存在的文件直接跳过。
+        """
+        for path in paths:
+            for file in self._entry_files(self._read(path)):
+                if os.path.abspath(file) not in keep_files:
+                    _remove_file(file)
+            _remove_file(path)
+
+    def evict(self) -> int:
+        """
+        删除过期条目，以及超出数量上限或总大小上限的最久未使用条目
+
+        从最近使用的条目开始累计大小，超出上限后的条目连同其引用的封面图一起删除。
+
+        Returns:
+            删除的条目数量
+        """
+        kept = 0
+        used_bytes = 0
+        keep_files = set()
+        evicted = []
+        for path in self.entries():
+            entry = self._load(os.path.basename(path)[:-5])
+            if entry is None or kept >= self.max_entries:
+                evicted.append(path)
+                continue
+            files = [os.path.abspath(file) for file in self._entry_files(entry)]
+            size = _file_size(path) + sum(_file_size(file) for file in files if file not in keep_files)
+            if used_bytes + size > self.max_bytes:
+                evicted.append(path)
+                continue
+            kept += 1
+            used_bytes += size
+            keep_files.update(files)
+        self._remove(evicted, keep_files)
+        return len(evicted)
+
+    def clear(self) -> int:
+        """清空缓存（包括引用的封面图），返回删除的条目数量"""
+        paths = self.entries()
+        self._remove(paths, set())
+        return len(paths)
+
+
+# 各生成函数共享的缓存实例
+_default_cache: Optional[AIMetadataCache] = None
+
+
+def get_ai_cache() -> AIMetadataCache:
+    """获取共享的缓存实例"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = AIMetadataCache()
+    return _default_cache
+
+
+def set_ai_cache(cache: AIMetadataCache) -> None:
+    """替换共享的缓存实例（基准测试使用独立的缓存目录）"""
+    global _default_cache
+    _default_cache = cache
+
+
+def main(argv=None) -> int:
+    """缓存管理命令行入口"""
+    parser = argparse.ArgumentParser(description="管理豆包AI生成内容的缓存")
+    parser.add_argument("command", choices=["stats", "clear"], help="stats 查看缓存条目；clear 清空缓存")
+    args = parser.parse_args(argv)
+
+    cache = get_ai_cache()
+    if args.command == "clear":
+        print(f"🧹 已删除 {cache.clear()} 个AI缓存条目")
+        return 0
+
+    paths = cache.entries()
+    print(f"📦 AI缓存目录: {cache.cache_dir}，共 {len(paths)} 个条目，"
+          f"{cache.total_size() / 1024 / 1024:.1f}MB / {cache.max_bytes / 1024 / 1024:.0f}MB")
+    for path in paths:
+        entry = cache._read(path) or {}
+        age_hours = (time.time() - entry.get("created_at", 0)) / 3600
+        print(f"  - {os.path.basename(entry.get('markdown_file', path))}: "
+              f"{', '.join(entry.get('fields', {}))}（{age_hours:.1f}小时前生成，"
+              f"{cache._entry_size(path, entry) / 1024:.0f}KB）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
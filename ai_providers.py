@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+"""
+AI内容生成提供者模块
+发布流程需要的summary、话题标签、短标题、文生图提示词和封面图通过 AIContentProvider 接口生成，
+发布流程不再直接依赖豆包网页自动化：
+
+- doubao：豆包网页版（doubao_ai_helpers.py、doubao_ai_image_generator.py），需要浏览器和已登录的豆包账号
+- http：兼容OpenAI接口格式的大模型HTTP接口（默认火山方舟），通过环境变量 AI_API_KEY、AI_API_MODEL、
+  AI_API_IMAGE_MODEL、AI_API_BASE_URL 配置，不需要打开豆包页面
+- local：本地离线生成（抽取式summary、关键词话题标签、模板封面图），结果只由文章内容决定，
+  不访问网络，几毫秒内完成，用于基准测试和调试发布流程
+
+用法：
+    provider = create_ai_provider("local", session)
+    summary = await provider.summarize(markdown_file)
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import struct
+import time
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence
+
+import requests
+
+from ai_metadata_cache import get_ai_cache
+from browser_session import BrowserSession
+from doubao_ai_helpers import (
+    METADATA_FIELDS,
+    SHORT_TITLE_MAX_LENGTH,
+    SUMMARY_MAX_LENGTH,
+    TAG_COUNT,
+    _metadata_prompt,
+    clean_metadata,
+    generate_article_metadata_with_doubao,
+    generate_newspic_title_with_doubao,
+    generate_summary_with_doubao,
+    generate_tags_with_doubao,
+    parse_metadata_reply,
+)
+from doubao_session import get_doubao_session
+from run_timeline import timed
+from summarizer_sdk import summarize_markdown
+from tag_extractor_sdk import extract_tags
+
+# 可选的AI内容提供者
+AI_PROVIDERS = ("doubao", "http", "local")
+
+# AI接口和本地生成的图片保存目录
+AI_IMAGES_DIR = os.path.join("test-results", "ai_images")
+
+# 话题标签不足时补充的默认标签
+DEFAULT_TAGS = ['AI', 'LLM', '人工智能', '开发', '大模型', '技术分享', '自动化', '开源', '机器学习', '深度学习']
+
+
+class AIContentProvider(ABC):
+    """AI内容生成接口，各方法失败时返回None（图片为空列表），由发布流程决定如何处理"""
+
+    # 日志中显示的名称
+    label = "AI"
+
+    @abstractmethod
+    async def summarize(self, markdown_file: str) -> Optional[str]:
+        """生成不超过120字的文章summary"""
+
+    @abstractmethod
+    async def generate_tags(self, markdown_file: str) -> Optional[List[str]]:
+        """生成10个话题标签（不含空格和横杠）"""
+
+    @abstractmethod
+    async def shorten_title(self, markdown_file: str, title: str) -> Optional[str]:
+        """生成不超过20字的图文消息短标题"""
+
+    @abstractmethod
+    async def generate_image_prompt(self, markdown_file: str) -> Optional[str]:
+        """生成英文的文生图提示词"""
+
+    @abstractmethod
+    async def generate_images(self, markdown_file: str, prompt: Optional[str] = None,
+                              aspect_ratio: str = "16:9") -> List[str]:
+        """
+        生成封面图
+
+        Args:
+            markdown_file: Markdown文件路径
+            prompt: 文生图提示词，为None时先调用 generate_image_prompt 生成
+            aspect_ratio: 图片比例
+
+        Returns:
+            生成的图片文件路径列表，失败时返回空列表
+        """
+
+    async def generate_metadata(self, markdown_file: str, fields: Sequence[str] = METADATA_FIELDS,
+                                title: str = "") -> Dict[str, Any]:
+        """
+        一次生成多个字段（summary、short_title、tags、image_prompt），默认逐个调用对应的方法
+
+        Returns:
+            生成成功的字段，失败的字段不包含在内
+        """
+        operations = {
+            "summary": lambda: self.summarize(markdown_file),
+            "short_title": lambda: self.shorten_title(markdown_file, title),
+            "tags": lambda: self.generate_tags(markdown_file),
+            "image_prompt": lambda: self.generate_image_prompt(markdown_file),
+        }
+        metadata = {}
+        for name in fields:
+            value = await operations[name]()
+            if value:
+                metadata[name] = value
+        return metadata
+
+
+class DoubaoWebProvider(AIContentProvider):
+    """豆包网页版：在浏览器中操作豆包聊天页面生成内容"""
+
+    label = "豆包AI"
+
+    def __init__(self, session: BrowserSession):
+        """
+        Args:
+            session: 浏览器会话，豆包页面从其页面池中获取
+        """
+        self.session = session
+
+    async def summarize(self, markdown_file: str) -> Optional[str]:
+        return await generate_summary_with_doubao(self.session, markdown_file)
+
+    async def generate_tags(self, markdown_file: str) -> Optional[List[str]]:
+        return await generate_tags_with_doubao(self.session, markdown_file) or None
+
+    async def shorten_title(self, markdown_file: str, title: str) -> Optional[str]:
+        return await generate_newspic_title_with_doubao(self.session, markdown_file) or None
+
+    async def generate_image_prompt(self, markdown_file: str) -> Optional[str]:
+        metadata = await generate_article_metadata_with_doubao(self.session, markdown_file, ["image_prompt"])
+        return metadata.get("image_prompt")
+
+    async def generate_images(self, markdown_file: str, prompt: Optional[str] = None,
+                              aspect_ratio: str = "16:9") -> List[str]:
+        # 同一篇文章之前生成过封面图时直接使用缓存的图片，不再打开豆包页面
+        image_files = get_ai_cache().get(markdown_file, "image_files")
+        if image_files:
+            return image_files
+
+        from doubao_ai_image_generator import create_doubao_generator
+
+        # 从豆包页面池获取已加载的页面并开始新对话（连续发布多篇文章时复用已加载的页面）
+        async with get_doubao_session(self.session).tab("生成封面图") as page_doubao:
+            generator = create_doubao_generator(page_doubao, self.session.context)
+            if prompt:
+                print(f"♻️  使用已生成的文生图提示词: {prompt[:100]}...")
+                image_files = await generator.generate_images_with_prompt(prompt, aspect_ratio=aspect_ratio)
+            else:
+                # 在同一个对话中先生成提示词再生成图片
+                prompt, image_files = await generator.generate_images_from_markdown(markdown_file, aspect_ratio)
+        if image_files:
+            get_ai_cache().put(markdown_file, {"image_prompt": prompt, "image_files": image_files})
+        return image_files
+
+    async def generate_metadata(self, markdown_file: str, fields: Sequence[str] = METADATA_FIELDS,
+                                title: str = "") -> Dict[str, Any]:
+        return await generate_article_metadata_with_doubao(self.session, markdown_file, fields)
+
+
+class HTTPAPIProvider(AIContentProvider):
+    """兼容OpenAI接口格式的大模型HTTP接口（/chat/completions、/images/generations）"""
+
+    label = "AI接口"
+
+    DEFAULT_BASE_URL = "https://ark.cn-beijing.volces.com/api/v3"
+
+    # 图片比例对应的图片尺寸
+    IMAGE_SIZES = {"16:9": "1280x720", "1:1": "1024x1024", "4:3": "1152x864"}
+
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None,
+                 image_model: Optional[str] = None, base_url: Optional[str] = None, timeout: float = 120):
+        """
+        未指定的参数从环境变量 AI_API_KEY、AI_API_MODEL、AI_API_IMAGE_MODEL、AI_API_BASE_URL 读取
+
+        Args:
+            api_key: 接口密钥
+            model: 文本生成模型
+            image_model: 图片生成模型
+            base_url: 接口地址
+            timeout: 单次请求超时时间（秒）
+        """
+        self.api_key = api_key or os.getenv("AI_API_KEY")
+        self.model = model or os.getenv("AI_API_MODEL")
+        self.image_model = image_model or os.getenv("AI_API_IMAGE_MODEL")
+        self.base_url = (base_url or os.getenv("AI_API_BASE_URL") or self.DEFAULT_BASE_URL).rstrip("/")
+        self.timeout = timeout
+        if not self.api_key or not self.model:
+            raise ValueError("使用AI接口需要设置环境变量 AI_API_KEY 和 AI_API_MODEL")
+
+    def _post(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """发送POST请求并返回JSON响应"""
+        response = requests.post(f"{self.base_url}{endpoint}", json=payload, timeout=self.timeout,
+                                 headers={"Authorization": f"Bearer {self.api_key}"})
+        response.raise_for_status()
+        return response.json()
+
+    def _chat(self, markdown_file: str, prompt_text: str) -> str:
+        """将Markdown文档和提示词作为一条消息发送，返回回复正文"""
+        with open(markdown_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        message = f"{prompt_text}\n\nMarkdown文档（{os.path.basename(markdown_file)}）内容如下：\n\n{content}"
+        data = self._post("/chat/completions", {"model": self.model, "messages": [{"role": "user", "content": message}]})
+        return data["choices"][0]["message"]["content"]
+
+    @timed("AI接口.生成文章信息")
+    async def generate_metadata(self, markdown_file: str, fields: Sequence[str] = METADATA_FIELDS,
+                                title: str = "") -> Dict[str, Any]:
+        fields = [name for name in METADATA_FIELDS if name in fields]
+        metadata: Dict[str, Any] = {}
+        try:
+            reply = await asyncio.to_thread(self._chat, markdown_file, _metadata_prompt(fields))
+            metadata = clean_metadata(parse_metadata_reply(reply), fields)
+            # 不符合要求的字段重新询问一次
+            missing = [name for name in fields if name not in metadata]
+            if missing:
+                reply = await asyncio.to_thread(self._chat, markdown_file, _metadata_prompt(missing, retry=True))
+                metadata.update(clean_metadata(parse_metadata_reply(reply), missing))
+        except Exception as e:
+            print(f"❌ AI接口生成文章信息失败: {e}")
+        return metadata
+
+    async def summarize(self, markdown_file: str) -> Optional[str]:
+        return (await self.generate_metadata(markdown_file, ["summary"])).get("summary")
+
+    async def generate_tags(self, markdown_file: str) -> Optional[List[str]]:
+        return (await self.generate_metadata(markdown_file, ["tags"])).get("tags")
+
+    async def shorten_title(self, markdown_file: str, title: str) -> Optional[str]:
+        return (await self.generate_metadata(markdown_file, ["short_title"])).get("short_title")
+
+    async def generate_image_prompt(self, markdown_file: str) -> Optional[str]:
+        return (await self.generate_metadata(markdown_file, ["image_prompt"])).get("image_prompt")
+
+    def _generate_image_files(self, prompt: str, aspect_ratio: str) -> List[str]:
+        """调用图片生成接口并下载生成的图片"""
+        data = self._post("/images/generations", {
+            "model": self.image_model,
+            "prompt": prompt,
+            "size": self.IMAGE_SIZES.get(aspect_ratio, self.IMAGE_SIZES["16:9"]),
+            "response_format": "url",
+        })
+        os.makedirs(AI_IMAGES_DIR, exist_ok=True)
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        image_files = []
+        for index, item in enumerate(data.get("data", []), 1):
+            response = requests.get(item["url"], timeout=self.timeout)
+            response.raise_for_status()
+            file_path = os.path.join(AI_IMAGES_DIR, f"api_generated_image_{index}_{timestamp}.png")
+            with open(file_path, 'wb') as f:
+                f.write(response.content)
+            image_files.append(file_path)
+        return image_files
+
+    @timed("AI接口.生成图片")
+    async def generate_images(self, markdown_file: str, prompt: Optional[str] = None,
+                              aspect_ratio: str = "16:9") -> List[str]:
+        if not self.image_model:
+            print("❌ 使用AI接口生成图片需要设置环境变量 AI_API_IMAGE_MODEL")
+            return []
+        prompt = prompt or await self.generate_image_prompt(markdown_file)
+        if not prompt:
+            return []
+        try:
+            return await asyncio.to_thread(self._generate_image_files, prompt, aspect_ratio)
+        except Exception as e:
+            print(f"❌ AI接口生成图片失败: {e}")
+            return []
+
+
+def _png_bytes(width: int, height: int, colors: Sequence[Sequence[int]]) -> bytes:
+    """生成从上到下渐变的PNG图片（不依赖图片处理库）"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    (r1, g1, b1), (r2, g2, b2) = colors
+    rows = []
+    for y in range(height):
+        t = y / max(1, height - 1)
+        pixel = bytes((round(r1 + (r2 - r1) * t), round(g1 + (g2 - g1) * t), round(b1 + (b2 - b1) * t)))
+        rows.append(b"\x00" + pixel * width)
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(b"".join(rows), 6)) + chunk(b"IEND", b""))
+
+
+class LocalProvider(AIContentProvider):
+    """本地离线生成：结果只由文章内容决定，不访问网络"""
+
+    label = "本地生成"
+
+    # 图片比例对应的模板封面图尺寸
+    IMAGE_SIZES = {"16:9": (1280, 720), "1:1": (1024, 1024), "4:3": (1152, 864)}
+
+    async def summarize(self, markdown_file: str) -> Optional[str]:
+        """按关键词为正文句子打分，选取得分最高的句子组成不超过120字的summary（summarizer_sdk）"""
+        with open(markdown_file, 'r', encoding='utf-8') as f:
+            return summarize_markdown(f.read(), max_length=SUMMARY_MAX_LENGTH) or None
+
+    async def generate_tags(self, markdown_file: str) -> Optional[List[str]]:
+        """按TF-IDF提取关键词作为话题标签（tag_extractor_sdk），不足10个时用默认标签补足"""
+        with open(markdown_file, 'r', encoding='utf-8') as f:
+            tags = extract_tags(f.read(), TAG_COUNT)
+        tags += [tag for tag in DEFAULT_TAGS if tag not in tags][:TAG_COUNT - len(tags)]
+        return tags
+
+    async def shorten_title(self, markdown_file: str, title: str) -> Optional[str]:
+        """取标题中不超过20字的第一段（按标点分隔），没有合适的分段时截断"""
+        if len(title) <= SHORT_TITLE_MAX_LENGTH:
+            return title
+        for part in re.split(r"[，,：:｜|！!？?—\-\s]+", title):
+            if 4 <= len(part) <= SHORT_TITLE_MAX_LENGTH:
+                return part
+        return title[:SHORT_TITLE_MAX_LENGTH]
+
+    async def generate_image_prompt(self, markdown_file: str) -> Optional[str]:
+        name = os.path.splitext(os.path.basename(markdown_file))[0]
+        return (f"A clean, professional 16:9 cover illustration for a technology article titled \"{name}\", "
+                "soft gradient background, minimal flat shapes, no text, no logos, no watermarks")
+
+    async def generate_images(self, markdown_file: str, prompt: Optional[str] = None,
+                              aspect_ratio: str = "16:9") -> List[str]:
+        """生成渐变色的模板封面图，颜色由文章内容的哈希决定"""
+        with open(markdown_file, 'rb') as f:
+            digest = hashlib.sha256(f.read()).digest()
+        width, height = self.IMAGE_SIZES.get(aspect_ratio, self.IMAGE_SIZES["16:9"])
+        os.makedirs(AI_IMAGES_DIR, exist_ok=True)
+        file_path = os.path.join(AI_IMAGES_DIR, f"local_cover_{digest.hex()[:12]}_{width}x{height}.png")
+        if not os.path.exists(file_path):
+            png = _png_bytes(width, height, (digest[0:3], digest[3:6]))
+            with open(file_path, 'wb') as f:
+                f.write(png)
+        return [file_path]
+
+
+def create_ai_provider(name: str, session: Optional[BrowserSession] = None,
+                       hedge: Optional[str] = None) -> AIContentProvider:
+    """
+    根据名称创建AI内容提供者
+
+    Args:
+        name: doubao / http / local
+        session: 浏览器会话（doubao 需要）
+        hedge: 备用提供者名称，指定时主提供者超过历史P90仍未返回会同时请求备用提供者（ai_hedging.py）
+
+    Returns:
+        AIContentProvider 实例
+    """
+    if hedge:
+        from ai_hedging import HedgedProvider
+        return HedgedProvider(create_ai_provider(name, session), create_ai_provider(hedge, session))
+    if name == "doubao":
+        if session is None:
+            raise ValueError("豆包网页版需要浏览器会话")
+        return DoubaoWebProvider(session)
+    if name == "http":
+        return HTTPAPIProvider()
+    if name == "local":
+        return LocalProvider()
+    raise ValueError(f"未知的AI内容提供者: {name}（可选: {', '.join(AI_PROVIDERS)}）")
+
@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""
+批量发布脚本
+在同一个浏览器会话中依次发布多篇文章
+
+与逐篇运行 pytest 相比，浏览器（持久化用户数据目录）只启动一次、浏览器数据只备份一次，
+各平台的入口页面和豆包AI页面在文章之间复用，每篇文章结束后只关闭临时弹出的页面。
+
+使用方法：
+    # 按标题发布（Markdown文件从钉钉文档自动下载）
+    python batch_publish.py --titles "文章标题1" "文章标题2"
+
+    # 发布指定的Markdown文件（文件名即文章标题）
+    python batch_publish.py --markdown-files ./a.md ./b.md --platforms zhihu,csdn
+
+    # 发布目录下的所有Markdown文件
+    python batch_publish.py --markdown-dir ./markdown_files
+
+    # 使用清单文件（JSON列表，或每行一个标题/Markdown路径的文本文件）
+    python batch_publish.py --manifest articles.json
+
+    # 中断后重新运行，跳过已完成的阶段和已发布成功的平台
+    python batch_publish.py --manifest articles.json --resume
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import sys
+import time
+import traceback
+from dataclasses import asdict, dataclass, field, fields, replace
+from datetime import datetime
+from typing import List, Optional
+
+from playwright.async_api import async_playwright
+
+from publish_engine import DEFAULT_MAX_CONCURRENCY, PublishResult
+from publish_pipeline import PublishOptions, PublishPipelineError, open_browser_session, run_publish_pipeline
+
+# 批量发布记录保存目录
+BATCH_RUNS_DIR = os.path.join("test-results", "batch_runs")
+
+# 发布流程需要的环境变量
+REQUIRED_ENV_VARS = ["WECHAT_APP_ID", "WECHAT_APP_SECRET", "DINGTALK_APP_KEY", "DINGTALK_APP_SECRET", "DINGTALK_USER_ID"]
+
+
+@dataclass
+class ArticleRunResult:
+    """单篇文章的批量发布结果"""
+    title: Optional[str]
+    markdown_file: Optional[str]
+    started_at: float
+    finished_at: float
+    publish_results: List[PublishResult] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        """整篇文章的耗时（秒），包括发布前处理"""
+        return self.finished_at - self.started_at
+
+    @property
+    def success(self) -> bool:
+        """发布流程没有中断，且所有平台都发布成功"""
+        return self.error is None and all(r.success for r in self.publish_results)
+
+
+def options_for_markdown(markdown_file: str, defaults: PublishOptions) -> PublishOptions:
+    """
+    根据Markdown文件生成单篇文章的发布参数
+
+    博客园会将Markdown文件名作为文章标题，因此使用文件名（不含后缀）作为标题。
+    """
+    title = os.path.splitext(os.path.basename(markdown_file))[0]
+    return replace(defaults, title=title, markdown_file=os.path.abspath(markdown_file))
+
+
+def load_manifest(manifest_file: str, defaults: PublishOptions) -> List[PublishOptions]:
+    """
+    读取清单文件
+
+    JSON清单为列表（或包含 articles 列表的对象），每一项可以是：
+    - 字符串：以 .md 结尾时视为Markdown文件路径，否则视为文章标题
+    - 对象：字段与 PublishOptions 相同，未填写的字段使用命令行参数的值
+
+    其他格式的清单按行读取，每行一个标题或Markdown文件路径，# 开头的行为注释。
+
+    Args:
+        manifest_file: 清单文件路径
+        defaults: 命令行参数对应的默认发布参数
+
+    Returns:
+        每篇文章的发布参数列表
+    """
+    if manifest_file.lower().endswith('.json'):
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        entries = data.get('articles', []) if isinstance(data, dict) else data
+    else:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            entries = [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+
+    known_fields = {f.name for f in fields(PublishOptions)}
+    articles = []
+    for entry in entries:
+        if isinstance(entry, str):
+            if entry.lower().endswith('.md'):
+                articles.append(options_for_markdown(entry, defaults))
+            else:
+                articles.append(replace(defaults, title=entry))
+        elif isinstance(entry, dict):
+            unknown = set(entry) - known_fields
+            if unknown:
+                print(f"⚠️  清单中存在未知字段，已忽略: {', '.join(sorted(unknown))}")
+            overrides = {k: v for k, v in entry.items() if k in known_fields}
+            article = replace(defaults, **overrides)
+            if article.markdown_file and not article.title:
+                article = options_for_markdown(article.markdown_file, article)
+            articles.append(article)
+        else:
+            print(f"⚠️  无法识别的清单条目，已跳过: {entry!r}")
+    return articles
+
+
+def collect_articles(args: argparse.Namespace) -> List[PublishOptions]:
+    """根据命令行参数收集需要发布的文章"""
+    defaults = PublishOptions(
+        author=args.author,
+        platforms=args.platforms,
+        tags=args.tags,
+        user_data_dir=args.user_data_dir,
+        max_concurrency=args.max_concurrency,
+        resume=args.resume,
+        ai_mode=args.ai_mode,
+        ai_provider=args.ai_provider,
+        ai_hedge=args.ai_hedge,
+        image_host=args.image_host,
+    )
+    articles = [replace(defaults, title=title) for title in args.titles or []]
+    articles += [options_for_markdown(path, defaults) for path in args.markdown_files or []]
+    if args.markdown_dir:
+        for path in sorted(glob.glob(os.path.join(args.markdown_dir, "*.md"))):
+            # 跳过为51CTO生成的清理副本
+            if not os.path.basename(path).startswith("51CTO_"):
+                articles.append(options_for_markdown(path, defaults))
+    if args.manifest:
+        articles += load_manifest(args.manifest, defaults)
+    return articles
+
+
+async def run_batch(articles: List[PublishOptions], user_data_dir: str,
+                    browser_daemon: str = "auto") -> List[ArticleRunResult]:
+    """
+    在同一个浏览器会话中依次发布多篇文章，单篇文章失败不影响后续文章
+
+    Args:
+        articles: 每篇文章的发布参数
+        user_data_dir: 浏览器用户数据目录
+        browser_daemon: 浏览器守护进程模式（auto/require/off），见 open_browser_session
+
+    Returns:
+        每篇文章的发布结果列表
+    """
+    results = []
+    async with async_playwright() as playwright:
+        session = await open_browser_session(playwright, user_data_dir, browser_daemon)
+        try:
+            for index, options in enumerate(articles, 1):
+                print("#" * 80)
+                print(f"📰 [{index}/{len(articles)}] 开始发布: {options.title or options.markdown_file}")
+                print("#" * 80)
+                started_at = time.time()
+                try:
+                    publish_results = await run_publish_pipeline(session, options)
+                    result = ArticleRunResult(options.title, options.markdown_file, started_at, time.time(),
+                                              publish_results=publish_results)
+                except Exception as e:
+                    print(f"❌ [{index}/{len(articles)}] 发布流程中断: {e}")
+                    traceback.print_exc()
+                    result = ArticleRunResult(options.title, options.markdown_file, started_at, time.time(),
+                                              error=str(e))
+                results.append(result)
+
+                # 关闭本篇文章弹出的编辑器等临时页面，保留可复用的页面
+                closed = await session.close_transient_pages()
+                print(f"🧹 已关闭 {closed} 个临时页面，耗时 {result.duration:.1f}秒")
+        finally:
+            # 确保浏览器上下文被关闭，这样视频才会保存（连接守护进程时只断开连接）
+            await session.close()
+    return results
+
+
+def print_batch_summary(results: List[ArticleRunResult]) -> None:
+    """打印每篇文章的发布结果和耗时"""
+    if not results:
+        return
+    print("=" * 80)
+    print("📊 批量发布结果：")
+    print("=" * 80)
+    for result in results:
+        if result.error:
+            status = f"❌ 中断: {result.error}"
+        else:
+            failed = [r.platform for r in result.publish_results if not r.success]
+            status = f"❌ 失败平台: {', '.join(failed)}" if failed else "✅ 成功"
+        print(f"{result.duration:>8.1f}秒  {status}  {result.title}")
+    wall_clock = results[-1].finished_at - results[0].started_at
+    succeeded = sum(1 for r in results if r.success)
+    print("-" * 80)
+    print(f"⏱️  总耗时: {wall_clock:.1f}秒，成功 {succeeded}/{len(results)} 篇，平均每篇 {wall_clock / len(results):.1f}秒")
+    print("=" * 80)
+
+
+def save_batch_record(results: List[ArticleRunResult]) -> Optional[str]:
+    """
+    将批量发布结果保存为JSON文件
+
+    Returns:
+        保存的文件路径，失败时返回None
+    """
+    try:
+        os.makedirs(BATCH_RUNS_DIR, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        record_file = os.path.join(BATCH_RUNS_DIR, f"batch_{timestamp}.json")
+        data = [
+            dict(asdict(r), duration=r.duration, success=r.success,
+                 publish_results=[dict(asdict(p), duration=p.duration) for p in r.publish_results])
+            for r in results
+        ]
+        with open(record_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        print(f"📁 批量发布记录已保存到: {record_file}")
+        return record_file
+    except Exception as e:
+        print(f"⚠️  保存批量发布记录时出错: {e}")
+        return None
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """解析命令行参数"""
+    defaults = PublishOptions()
+    parser = argparse.ArgumentParser(description="在同一个浏览器会话中批量发布多篇文章")
+    parser.add_argument("--titles", nargs="+", help="文章标题列表（Markdown文件从钉钉文档自动下载）")
+    parser.add_argument("--markdown-files", nargs="+", help="Markdown文件列表（文件名即文章标题）")
+    parser.add_argument("--markdown-dir", help="Markdown文件目录，发布其中所有 .md 文件")
+    parser.add_argument("--manifest", help="清单文件（JSON列表，或每行一个标题/Markdown路径的文本文件）")
+    parser.add_argument("--author", default=defaults.author, help="作者名称")
+    parser.add_argument("--platforms", default=defaults.platforms, help="要发布到的平台，用逗号分隔，或 all")
+    parser.add_argument("--tags", default=defaults.tags, help="话题标签，用逗号分隔，auto 表示使用豆包AI生成，local 表示从文章内容本地提取")
+    parser.add_argument("--user-data-dir", default=defaults.user_data_dir, help="浏览器用户数据目录")
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY,
+                        help="同时发布的最大平台数量")
+    parser.add_argument("--resume", action="store_true",
+                        help="从各文章的运行日志继续执行，跳过已完成的阶段和已发布成功的平台")
+    parser.add_argument("--browser-daemon", default="auto", choices=["auto", "require", "off"],
+                        help="auto 守护进程运行时通过CDP连接，否则启动新浏览器；require 必须连接；off 总是启动新浏览器")
+    parser.add_argument("--ai-mode", default=defaults.ai_mode, choices=["combined", "separate"],
+                        help="combined 在同一个豆包对话中生成summary、短标题、话题标签和文生图提示词；separate 每项单独生成")
+    parser.add_argument("--ai-provider", default=defaults.ai_provider, choices=["doubao", "http", "local"],
+                        help="doubao 豆包网页版；http 大模型HTTP接口（需要设置AI_API_KEY、AI_API_MODEL等环境变量）；local 本地离线生成")
+    parser.add_argument("--ai-hedge", default=defaults.ai_hedge, choices=["off", "doubao", "http", "local"],
+                        help="主提供者超过历史耗时P90仍未返回时同时请求的备用提供者（doubao 第二个豆包页面），off 不对冲")
+    parser.add_argument("--image-host", default=defaults.image_host, choices=["wechat", "off"],
+                        help="wechat 超过平台限制的正文图片和本地图片压缩到1MB以内后上传到微信公众号图文消息图片接口并改写链接；off（默认）不预处理正文图片")
+    parser.add_argument("--backup-browser-data", default="true",
+                        help="是否在开始前备份一次浏览器数据，可选值：true/false")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """批量发布入口，全部文章发布成功时返回0"""
+    args = parse_args(argv)
+
+    missing_env = [name for name in REQUIRED_ENV_VARS if not os.getenv(name)]
+    if missing_env:
+        print(f"❌ 请设置环境变量: {', '.join(missing_env)}")
+        return 1
+
+    articles = collect_articles(args)
+    if not articles:
+        print("❌ 没有需要发布的文章，请使用 --titles、--markdown-files、--markdown-dir 或 --manifest 指定")
+        return 1
+    print(f"📚 共 {len(articles)} 篇文章待发布")
+
+    # 整个批次只备份一次浏览器数据
+    if args.backup_browser_data.lower() in ['true', '1', 'yes', 'on']:
+        from conftest import backup_browser_data
+        backup_browser_data()
+
+    try:
+        results = asyncio.run(run_batch(articles, args.user_data_dir, args.browser_daemon))
+    except PublishPipelineError as e:
+        print(f"❌ {e}")
+        return 1
+    print_batch_summary(results)
+    save_batch_record(results)
+    return 0 if all(r.success for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""
+发布流程基准测试
+本地模拟平台服务器（mock_server）和基准测试脚本（run_benchmark），在不访问真实网站的情况下测量发布流程的耗时
+"""
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""
+本地模拟平台服务器
+为豆包AI、钉钉文档、mdnice、微信公众号编辑器、知乎、CSDN、51CTO、博客园以及小红书/抖音/快手/哔哩哔哩
+图文创作中心提供最小化的替身页面，页面中包含发布脚本使用的 test-id、role 和文本，
+用于在不访问真实网站、不使用真实账号的情况下测量发布流程的耗时。
+
+页面按 "/<域名>/<路径>" 提供，对应文件 mock_sites/<域名>/<路径中的/替换为_>.html，找不到时使用该域名的 index.html。
+浏览器中的真实网址通过 install_mock_routes 拦截并转发到本服务器，发布脚本中的网址无需修改。
+
+各类响应的延迟（毫秒）可以配置，用于模拟真实网站的页面加载、文件上传、AI回复、图片生成等耗时：
+    page               页面加载
+    upload             文件上传（Markdown导入、封面图上传）
+    ai_reply           豆包AI文字回复
+    image_generation   豆包AI图片生成
+    download           文件下载（钉钉Markdown、豆包图片）
+    publish            保存草稿/发布
+    api                其他接口（含微信公众号接口）
+"""
+
+import ast
+import json
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+
+from playwright.async_api import BrowserContext, Route
+
+# 替身页面目录
+MOCK_SITES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_sites")
+
+# 默认延迟（毫秒）
+DEFAULT_DELAYS = {
+    "page": 200,
+    "upload": 800,
+    "ai_reply": 3000,
+    "image_generation": 8000,
+    "download": 300,
+    "publish": 1000,
+    "api": 100,
+}
+
+# 需要拦截并转发到本地服务器的域名
+MOCK_HOSTS = [
+    "www.doubao.com",
+    "alidocs.dingtalk.com",
+    "editor.mdnice.com",
+    "mp.weixin.qq.com",
+    "www.zhihu.com",
+    "zhuanlan.zhihu.com",
+    "www.csdn.net",
+    "mp.csdn.net",
+    "editor.csdn.net",
+    "blog.51cto.com",
+    "www.cnblogs.com",
+    "i.cnblogs.com",
+    "creator.xiaohongshu.com",
+    "creator.douyin.com",
+    "cp.kuaishou.com",
+    "member.bilibili.com",
+]
+
+# 豆包AI的模拟回复，按提示词中的关键字选择
+MOCK_SUMMARY = "本文介绍了如何使用Playwright自动将Markdown文章发布到多个社交媒体平台，包括获取文档、AI生成摘要与封面图以及并发发布等步骤。"
+MOCK_SHORT_TITLE = "一键多平台发布文章"
+MOCK_TAGS = "['自动化', 'Playwright', 'AI', '大模型', 'Python', '效率工具', '开源', '技术分享', '内容创作', 'LLM']"
+# 聊天接口每个SSE事件包含的正文字符数
+CHAT_STREAM_CHUNK_SIZE = 8
+
+MOCK_IMAGE_PROMPT = ("A clean, professional illustration of an automated publishing workflow, "
+                     "glowing documents flowing into multiple social media icons, soft blue tones, 16:9")
+
+
+def make_png(width: int = 320, height: int = 180, seed: int = 0) -> bytes:
+    """生成纯色渐变的PNG图片（不依赖第三方库），用作豆包生成的图片和钉钉文档中的封面图"""
+    rows = []
+    for y in range(height):
+        row = bytearray([0])
+        for x in range(width):
+            row += bytes(((x * 255 // width + seed * 60) % 256, y * 255 // height, (seed * 90) % 256))
+        rows.append(bytes(row))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(b"".join(rows), 6)) + chunk(b"IEND", b""))
+
+
+def mock_markdown(title: str, with_cover: bool) -> str:
+    """生成钉钉文档下载的Markdown内容"""
+    cover = "![封面图](https://alidocs.dingtalk.com/api/image/0.png)\n\n" if with_cover else ""
+    return (f"{cover}# {title}\n\n"
+            "这是用于本地基准测试的模拟文章。\n\n"
+            "## 背景\n\n每次发布都需要在十个平台上重复相同的操作。\n\n"
+            "## 实现\n\n```python\nprint('hello')\n```\n\n"
+            "关注微信公众号 DreamAI 获取更多内容。\n")
+
+
+class MockPlatformServer:
+    """在后台线程中运行的模拟平台HTTP服务器"""
+
+    def __init__(self, delays: Optional[Dict[str, float]] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        初始化模拟平台服务器
+
+        Args:
+            delays: 各类响应的延迟（毫秒），未指定的使用 DEFAULT_DELAYS
+            host: 监听地址
+            port: 监听端口，0 表示自动选择空闲端口
+        """
+        self.delays = dict(DEFAULT_DELAYS, **(delays or {}))
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """服务器地址，例如 http://127.0.0.1:8123"""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockPlatformServer":
+        """在后台线程中启动服务器"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-platform-server", daemon=True)
+        self._thread.start()
+        print(f"🧪 模拟平台服务器已启动: {self.url}")
+        return self
+
+    def stop(self) -> None:
+        """停止服务器"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "MockPlatformServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def delay(self, kind: str) -> None:
+        """按配置的延迟等待，并统计请求次数"""
+        with self._lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+        time.sleep(self.delays.get(kind, 0) / 1000)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_json(self, data, status: int = 200):
+                self._send(status, json.dumps(data, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+
+            def _read_body(self) -> bytes:
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def do_GET(self):
+                self._dispatch()
+
+            def do_POST(self):
+                self._dispatch()
+
+            def _dispatch(self):
+                parsed = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                parts = unquote(parsed.path).lstrip("/").split("/", 1)
+                site, path = parts[0], "/" + (parts[1] if len(parts) > 1 else "")
+
+                # 微信公众号接口（WeChatMPSDK.BASE_URL 指向本服务器根路径）
+                if site == "cgi-bin":
+                    self._handle_wechat_api(path, query)
+                elif path == "/mock.js":
+                    self._send_static(os.path.join(MOCK_SITES_DIR, "mock.js"), "application/javascript; charset=utf-8")
+                elif path.startswith("/api/"):
+                    self._handle_api(site, path, query)
+                elif path == "/samantha/chat/completion":
+                    self._handle_chat_stream()
+                else:
+                    self._handle_page(site, path)
+
+            def _send_static(self, file_path: str, content_type: str):
+                with open(file_path, "rb") as f:
+                    self._send(200, f.read(), content_type)
+
+            def _handle_page(self, site: str, path: str):
+                site_dir = os.path.join(MOCK_SITES_DIR, site)
+                if not os.path.isdir(site_dir):
+                    self._send(404, f"unknown mock site: {site}".encode("utf-8"), "text/plain; charset=utf-8")
+                    return
+                name = path.strip("/").replace("/", "_") or "index"
+                file_path = os.path.join(site_dir, f"{name}.html")
+                if not os.path.exists(file_path):
+                    file_path = os.path.join(site_dir, "index.html")
+                server.delay("page")
+                self._send_static(file_path, "text/html; charset=utf-8")
+
+            def _handle_api(self, site: str, path: str, query: Dict[str, str]):
+                self._read_body()
+                if path.startswith("/api/wait/"):
+                    # 页面脚本在执行耗时操作（上传、发布、导入等）前调用，延迟类型由路径指定
+                    server.delay(path.rsplit("/", 1)[-1])
+                    self._send_json({"ok": True})
+                elif re.match(r"^/api/image/\d+\.png$", path):
+                    server.delay("download")
+                    seed = int(re.findall(r"\d+", path)[0])
+                    self._send(200, make_png(seed=seed), "image/png")
+                elif path == "/api/dingtalk/markdown":
+                    server.delay("download")
+                    title = query.get("title") or "基准测试文章"
+                    markdown = mock_markdown(title, query.get("cover") == "1")
+                    self._send(200, markdown.encode("utf-8"), "text/markdown; charset=utf-8")
+                else:
+                    server.delay("api")
+                    self._send_json({"ok": True})
+
+            def _handle_chat_stream(self):
+                """
+                豆包聊天接口：以SSE事件返回回复，每个事件包含一小段正文，最后一个事件表示回复结束
+
+                图片生成请求（请求体中 image 为 true）返回4个图片事件，图片地址指向本服务器
+                （浏览器上下文的请求接口不经过页面路由，因此不能使用豆包的真实网址）。
+                """
+                request = json.loads(self._read_body() or b"{}")
+                if request.get("image"):
+                    server.delay("image_generation")
+                    events = []
+                    for i in range(1, 5):
+                        image_url = f"{server.url}/www.doubao.com/api/image/{i}.png"
+                        image = {"image_thumb": {"url": f"{image_url}?thumb=1"}, "image_ori": {"url": image_url}}
+                        content = json.dumps({"creations": [{"type": 1, "image": image}]})
+                        event_data = json.dumps({"message": {"content_type": 2074, "content": content}})
+                        events.append({"event_type": 2001, "event_data": event_data})
+                    events.append({"event_type": 2003, "event_data": "{}"})
+                    body = "".join(f"data: {json.dumps(event)}\n\n" for event in events)
+                    self._send(200, body.encode("utf-8"), "text/event-stream; charset=utf-8")
+                    return
+                reply = self._chat_reply(request.get("prompt", ""))
+                events = []
+                for start in range(0, len(reply), CHAT_STREAM_CHUNK_SIZE):
+                    content = json.dumps({"text": reply[start:start + CHAT_STREAM_CHUNK_SIZE]}, ensure_ascii=False)
+                    event_data = json.dumps({"message": {"content_type": 2001, "content": content}}, ensure_ascii=False)
+                    events.append({"event_type": 2001, "event_data": event_data})
+                events.append({"event_type": 2003, "event_data": "{}"})
+                body = "".join(f"data: {json.dumps(event, ensure_ascii=False)}\n\n" for event in events)
+                self._send(200, body.encode("utf-8"), "text/event-stream; charset=utf-8")
+
+            def _chat_reply(self, prompt: str) -> str:
+                server.delay("ai_reply")
+                if "JSON" in prompt:
+                    # 合并生成模式：只返回提示词中要求的字段
+                    values = {"summary": MOCK_SUMMARY, "short_title": MOCK_SHORT_TITLE,
+                              "tags": ast.literal_eval(MOCK_TAGS), "image_prompt": MOCK_IMAGE_PROMPT}
+                    return json.dumps({k: v for k, v in values.items() if f"- {k}:" in prompt}, ensure_ascii=False)
+                if "话题标签" in prompt:
+                    return MOCK_TAGS
+                if "标题" in prompt:
+                    return MOCK_SHORT_TITLE
+                if "总结" in prompt:
+                    return MOCK_SUMMARY
+                if "text-to-image" in prompt:
+                    return MOCK_IMAGE_PROMPT
+                return "好的。"
+
+            def _handle_wechat_api(self, path: str, query: Dict[str, str]):
+                self._read_body()
+                server.delay("api")
+                if path == "/token":
+                    self._send_json({"access_token": "mock_access_token", "expires_in": 7200})
+                elif path == "/material/add_material":
+                    media_id = f"mock_media_{int(time.time() * 1000)}"
+                    self._send_json({"media_id": media_id, "url": f"http://mmbiz.qpic.cn/mock/{media_id}"})
+                else:
+                    self._send_json({"errcode": 0, "errmsg": "ok"})
+
+        return Handler
+
+
+async def install_mock_routes(context: BrowserContext, server_url: str) -> None:
+    """
+    将浏览器上下文中对各平台真实网址的请求转发到模拟服务器
+
+    Args:
+        context: 浏览器上下文
+        server_url: 模拟服务器地址
+    """
+    async def forward(route: Route) -> None:
+        parsed = urlparse(route.request.url)
+        target = f"{server_url}/{parsed.netloc}{parsed.path}"
+        if parsed.query:
+            target += f"?{parsed.query}"
+        response = await route.fetch(url=target, timeout=0)
+        await route.fulfill(response=response)
+
+    for host in MOCK_HOSTS:
+        await context.route(f"https://{host}/**", forward)
@@ -0,0 +1,146 @@
+// 模拟平台页面的公共脚本
+// 页面通过 data-* 属性声明交互，避免为每个平台编写重复的脚本：
+//   data-show="模板id,..."       点击后实例化 <template>（模板中的 {{value}}、{{upload}}、{{title}} 会被替换）
+//   data-remove="选择器,..."     点击后删除匹配的元素
+//   data-wait="延迟类型"         执行上述操作前先请求 /api/wait/<延迟类型>，模拟服务器处理耗时
+//   data-popup / data-navigate   点击后在新窗口打开 / 跳转到指定网址
+//   data-file="选择器"           点击后打开指定的文件输入框
+//   data-download="名称|网址;…"  点击后下载文件
+//   data-copy                    点击后复制所在消息（[data-message]）中 [data-reply] 的文本
+// 输入框按回车时执行 data-enter-* 属性，文件输入框选择文件后执行 data-upload-* 属性（默认等待 upload 延迟）。
+(function () {
+  const site = location.hostname;
+  const state = { upload: "", title: new URLSearchParams(location.search).get("title") || "" };
+  window.mockState = state;
+
+  function apiUrl(path) {
+    return `/${path.replace(/^\//, "")}`;
+  }
+
+  function escapeHtml(text) {
+    return String(text).replace(/[&<>"']/g, (c) => ({ "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;" }[c]));
+  }
+
+  function instantiate(id, vars) {
+    const template = document.getElementById(id);
+    if (!template) {
+      console.warn(`mock template not found: ${id}`);
+      return;
+    }
+    const values = Object.assign({}, state, vars);
+    const html = template.innerHTML.replace(/\{\{(\w+)\}\}/g, (_, key) => escapeHtml(values[key] || ""));
+    const holder = document.createElement("div");
+    holder.innerHTML = html;
+    const target = template.dataset.target ? document.querySelector(template.dataset.target) : null;
+    for (const node of Array.from(holder.childNodes)) {
+      if (target) {
+        target.appendChild(node);
+      } else {
+        template.parentNode.insertBefore(node, template);
+      }
+    }
+  }
+
+  function list(value) {
+    return (value || "").split(",").map((s) => s.trim()).filter(Boolean);
+  }
+
+  function attr(el, prefix, name) {
+    const key = prefix ? prefix + name.charAt(0).toUpperCase() + name.slice(1) : name;
+    return el.dataset[key];
+  }
+
+  async function wait(kind) {
+    await fetch(apiUrl(`api/wait/${kind}`), { method: "POST" });
+  }
+
+  async function perform(el, prefix, vars) {
+    const waitKind = attr(el, prefix, "wait");
+    if (waitKind) {
+      await wait(waitKind);
+    }
+    list(attr(el, prefix, "remove")).forEach((selector) => document.querySelectorAll(selector).forEach((n) => n.remove()));
+    list(attr(el, prefix, "show")).forEach((id) => instantiate(id, vars));
+  }
+
+  async function download(spec) {
+    for (const item of spec.split(";").filter(Boolean)) {
+      const [name, url] = item.split("|");
+      const blob = await (await fetch(url)).blob();
+      const link = document.createElement("a");
+      link.href = URL.createObjectURL(blob);
+      link.download = name;
+      document.body.appendChild(link);
+      link.click();
+      link.remove();
+    }
+  }
+
+  async function copy(el) {
+    const message = el.closest("[data-message]");
+    const text = message ? message.querySelector("[data-reply]").innerText : "";
+    try {
+      await navigator.clipboard.writeText(text);
+    } catch (e) {
+      const area = document.createElement("textarea");
+      area.value = text;
+      document.body.appendChild(area);
+      area.select();
+      document.execCommand("copy");
+      area.remove();
+    }
+  }
+
+  const CLICK_SELECTOR = "[data-show],[data-remove],[data-wait],[data-popup],[data-navigate],[data-file],[data-download],[data-copy]";
+
+  document.addEventListener("click", async (event) => {
+    const el = event.target.closest(CLICK_SELECTOR);
+    if (!el) {
+      return;
+    }
+    // 打开窗口和文件选择框需要在用户点击的同步调用中执行
+    if (el.dataset.popup) {
+      window.open(el.dataset.popup, "_blank");
+    }
+    if (el.dataset.file) {
+      document.querySelector(el.dataset.file).click();
+    }
+    if (el.dataset.copy !== undefined) {
+      await copy(el);
+    }
+    await perform(el, "", {});
+    if (el.dataset.download) {
+      await download(el.dataset.download);
+    }
+    if (el.dataset.navigate) {
+      location.href = el.dataset.navigate;
+    }
+  });
+
+  document.addEventListener("keydown", async (event) => {
+    const el = event.target;
+    if (event.key !== "Enter" || !el.dataset || !Object.keys(el.dataset).some((k) => k.startsWith("enter"))) {
+      return;
+    }
+    const value = (el.value !== undefined ? el.value : el.innerText).trim();
+    await perform(el, "enter", { value });
+    if (el.dataset.enterClear !== undefined) {
+      el.value = "";
+    }
+  });
+
+  document.addEventListener("change", async (event) => {
+    const el = event.target;
+    if (el.type !== "file" || !el.files.length) {
+      return;
+    }
+    state.upload = el.files[0].name.replace(/\.[^.]+$/, "");
+    if (!el.dataset.uploadWait) {
+      el.dataset.uploadWait = "upload";
+    }
+    await perform(el, "upload", { value: state.upload });
+    document.dispatchEvent(new CustomEvent("mock-upload", { detail: { input: el, files: Array.from(el.files) } }));
+  });
+
+  window.mock = { instantiate, perform, wait, download, state, site };
+})();
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+发布流程基准测试
+启动本地模拟平台服务器，在拦截了各平台真实网址的浏览器中运行完整的发布流程
+（钉钉文档下载 → 豆包AI生成summary/短标题/话题标签/封面图 → 微信公众号素材上传 → 并发发布到各平台），
+输出端到端耗时和各步骤耗时的中位数/P95，用于在不访问真实网站、不使用真实账号的情况下发现性能回退。
+
+豆包AI的回复直接从页面读取，不依赖系统剪贴板，可以使用 --headless 以无界面模式运行。
+运行结果保存在 test-results/benchmarks/ 目录，各次运行的时间线同时保存在 test-results/timelines/ 目录。
+
+使用方法（在项目根目录运行）：
+    # 使用默认延迟运行一次
+    python -m benchmarks.run_benchmark
+
+    # 运行3次，只发布到部分平台，并调整模拟延迟（毫秒）
+    python -m benchmarks.run_benchmark --iterations 3 --platforms zhihu,csdn --delay ai_reply=500 --delay image_generation=2000
+
+    # 比较豆包AI合并生成与单独生成的耗时
+    python -m benchmarks.run_benchmark --ai-mode separate
+
+    # 使用本地离线生成代替豆包AI，只测量钉钉文档下载和各平台发布的耗时
+    python -m benchmarks.run_benchmark --ai-provider local
+
+    # 从JSON文件读取延迟配置，跳过钉钉文档下载，直接使用指定的Markdown文件
+    python -m benchmarks.run_benchmark --delays-file delays.json --markdown-file ./markdown_files/示例.md
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+from playwright.async_api import async_playwright
+
+from ai_metadata_cache import AIMetadataCache, set_ai_cache
+from benchmarks.mock_server import DEFAULT_DELAYS, MockPlatformServer, install_mock_routes
+from browser_session import PERSISTENT_CONTEXT_OPTIONS, BrowserSession
+from run_timeline import RunTimeline
+
+# 基准测试结果保存目录
+BENCHMARKS_DIR = os.path.join("test-results", "benchmarks")
+
+# 默认文章标题（超过20字，会触发豆包AI生成短标题）
+DEFAULT_TITLE = "使用Playwright将一篇Markdown文章自动发布到十个平台的基准测试"
+
+# 发布流程在导入时读取的环境变量，基准测试中使用模拟值（微信公众号接口由模拟服务器响应）
+MOCK_ENV_VARS = {
+    "WECHAT_APP_ID": "mock_app_id",
+    "WECHAT_APP_SECRET": "mock_app_secret",
+    "DINGTALK_APP_KEY": "mock_app_key",
+    "DINGTALK_APP_SECRET": "mock_app_secret",
+    "DINGTALK_USER_ID": "mock_user_id",
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """最近秩法计算百分位数"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize_iterations(iterations: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """
+    汇总各次运行中每个步骤的耗时
+
+    同名步骤（例如每个话题标签的等待）在一次运行中的耗时先求和，再计算各次运行之间的中位数和P95。
+
+    Returns:
+        步骤名称 → {median, p95, runs}，另含 "端到端" 项
+    """
+    per_name: Dict[str, List[float]] = {"端到端": [it["duration"] for it in iterations]}
+    for it in iterations:
+        for name, duration in it["steps"].items():
+            per_name.setdefault(name, []).append(duration)
+    return {
+        name: {"median": statistics.median(values), "p95": percentile(values, 95), "runs": len(values)}
+        for name, values in per_name.items()
+    }
+
+
+def step_durations(timeline: RunTimeline) -> Dict[str, float]:
+    """将时间线中的步骤按名称汇总耗时（秒），豆包AI回复另外汇总首字耗时（"<步骤名>.首字"）"""
+    durations: Dict[str, float] = {}
+    for s in timeline.spans:
+        durations[s.name] = durations.get(s.name, 0.0) + s.duration
+        if s.attributes.get("ttft") is not None:
+            durations[f"{s.name}.首字"] = durations.get(f"{s.name}.首字", 0.0) + s.attributes["ttft"]
+    return durations
+
+
+def print_benchmark_summary(summary: Dict[str, Dict[str, float]], limit: int = 30) -> None:
+    """打印端到端耗时和最慢的步骤"""
+    print("=" * 80)
+    print("📊 基准测试结果（秒）：")
+    print("=" * 80)
+    print(f"{'中位数':>10}{'P95':>10}{'次数':>6}  步骤")
+    print("-" * 80)
+    end_to_end = summary["端到端"]
+    print(f"{end_to_end['median']:>10.1f}{end_to_end['p95']:>10.1f}{end_to_end['runs']:>6}  端到端")
+    steps = sorted(((n, s) for n, s in summary.items() if n != "端到端"), key=lambda item: item[1]["median"], reverse=True)
+    for name, stats in steps[:limit]:
+        print(f"{stats['median']:>10.1f}{stats['p95']:>10.1f}{stats['runs']:>6}  {name}")
+    print("=" * 80)
+
+
+def save_benchmark_record(record: Dict[str, Any]) -> Optional[str]:
+    """
+    将基准测试结果保存为JSON文件
+
+    Returns:
+        保存的文件路径，失败时返回None
+    """
+    try:
+        os.makedirs(BENCHMARKS_DIR, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        record_file = os.path.join(BENCHMARKS_DIR, f"benchmark_{timestamp}.json")
+        with open(record_file, 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+        print(f"📁 基准测试结果已保存到: {record_file}")
+        return record_file
+    except Exception as e:
+        print(f"⚠️  保存基准测试结果时出错: {e}")
+        return None
+
+
+async def run_benchmark(args: argparse.Namespace, delays: Dict[str, float]) -> Dict[str, Any]:
+    """
+    启动模拟平台服务器并多次运行完整的发布流程
+
+    Args:
+        args: 命令行参数
+        delays: 模拟延迟配置（毫秒）
+
+    Returns:
+        基准测试记录（延迟配置、各次运行结果、汇总统计）
+    """
+    for name, value in MOCK_ENV_VARS.items():
+        os.environ.setdefault(name, value)
+    # 发布流程模块在导入时读取环境变量，因此在设置环境变量之后再导入
+    from publish_pipeline import PublishOptions, run_publish_pipeline
+    from wechat_mp_sdk import WeChatMPSDK
+
+    # 使用独立的AI缓存目录，默认每次运行前清空，使每次运行都实际询问豆包AI
+    ai_cache = AIMetadataCache(os.path.join(BENCHMARKS_DIR, "ai_cache"))
+    set_ai_cache(ai_cache)
+
+    iterations = []
+    with MockPlatformServer(delays) as server:
+        WeChatMPSDK.BASE_URL = server.url
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch(headless=args.headless)
+            context_options = {k: v for k, v in PERSISTENT_CONTEXT_OPTIONS.items() if k != "headless"}
+            context = await browser.new_context(**context_options)
+            # 页面读取失败时豆包AI的回复从剪贴板兜底读取，复制按钮需要写入剪贴板
+            await context.grant_permissions(["clipboard-read", "clipboard-write"])
+            await install_mock_routes(context, server.url)
+            session = BrowserSession(context)
+            try:
+                for index in range(1, args.iterations + 1):
+                    print("#" * 80)
+                    print(f"🧪 [{index}/{args.iterations}] 开始基准测试运行")
+                    print("#" * 80)
+                    options = PublishOptions(
+                        title=args.title,
+                        platforms=args.platforms,
+                        tags="auto",
+                        max_concurrency=args.max_concurrency,
+                        ai_mode=args.ai_mode,
+                        ai_provider=args.ai_provider,
+                        # 基准测试不访问外部图床
+                        image_host="off",
+                    )
+                    if args.markdown_file:
+                        # 提供了URL时不会调用钉钉SDK搜索文档
+                        options.markdown_file = os.path.abspath(args.markdown_file)
+                        options.url = f"https://alidocs.dingtalk.com/i/nodes/doc?title={quote(args.title)}"
+
+                    if not args.keep_ai_cache:
+                        ai_cache.clear()
+                    timeline = RunTimeline(args.title)
+                    started = time.perf_counter()
+                    error = None
+                    results = []
+                    try:
+                        results = await run_publish_pipeline(session, options, timeline=timeline)
+                    except Exception as e:
+                        error = str(e)
+                        print(f"❌ [{index}/{args.iterations}] 发布流程中断: {e}")
+                    duration = time.perf_counter() - started
+                    iterations.append({
+                        "duration": duration,
+                        "error": error,
+                        "platforms": {r.platform: r.success for r in results},
+                        "steps": step_durations(timeline),
+                    })
+                    closed = await session.close_transient_pages()
+                    print(f"🧹 已关闭 {closed} 个临时页面，本次运行耗时 {duration:.1f}秒")
+            finally:
+                await session.close()
+                await browser.close()
+
+    return {
+        "title": args.title,
+        "platforms": args.platforms,
+        "ai_mode": args.ai_mode,
+        "ai_provider": args.ai_provider,
+        "keep_ai_cache": args.keep_ai_cache,
+        "delays_ms": delays,
+        "requests": server.requests,
+        "iterations": iterations,
+        "summary": summarize_iterations(iterations),
+    }
+
+
+def load_delays(args: argparse.Namespace) -> Dict[str, float]:
+    """合并默认延迟、延迟配置文件和 --delay 参数"""
+    delays = dict(DEFAULT_DELAYS)
+    if args.delays_file:
+        with open(args.delays_file, 'r', encoding='utf-8') as f:
+            delays.update({k: float(v) for k, v in json.load(f).items()})
+    for item in args.delay or []:
+        name, _, value = item.partition("=")
+        if name not in DEFAULT_DELAYS or not value:
+            raise ValueError(f"无效的延迟配置: {item}（可选: {', '.join(DEFAULT_DELAYS)}）")
+        delays[name] = float(value)
+    return delays
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="在本地模拟平台上运行完整的发布流程，测量端到端和各步骤耗时")
+    parser.add_argument("--iterations", type=int, default=1, help="运行次数")
+    parser.add_argument("--title", default=DEFAULT_TITLE, help="文章标题")
+    parser.add_argument("--platforms", default="all", help="要发布到的平台，用逗号分隔，或 all")
+    parser.add_argument("--markdown-file", help="Markdown文件路径，指定后跳过钉钉文档下载和封面图插入")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="同时发布的最大平台数量")
+    parser.add_argument("--ai-mode", default="combined", choices=["combined", "separate"],
+                        help="豆包AI生成模式，用于比较合并生成与单独生成的耗时")
+    parser.add_argument("--ai-provider", default="doubao", choices=["doubao", "local"],
+                        help="AI内容提供者，local 不打开豆包页面，用于单独测量各平台发布的耗时")
+    parser.add_argument("--keep-ai-cache", action="store_true",
+                        help="各次运行之间保留AI缓存（第2次起测量缓存命中时的耗时）")
+    parser.add_argument("--delay", action="append", metavar="类型=毫秒",
+                        help=f"模拟延迟，可多次指定，类型: {', '.join(DEFAULT_DELAYS)}")
+    parser.add_argument("--delays-file", help="延迟配置JSON文件，例如 {\"ai_reply\": 500}")
+    parser.add_argument("--headless", action="store_true", help="无界面模式运行")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """基准测试入口，全部运行成功时返回0"""
+    args = parse_args(argv)
+    try:
+        delays = load_delays(args)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"⚙️  模拟延迟（毫秒）: {delays}")
+
+    record = asyncio.run(run_benchmark(args, delays))
+    print_benchmark_summary(record["summary"])
+    save_benchmark_record(record)
+    failed = [it for it in record["iterations"] if it["error"] or not all(it["platforms"].values())]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+"""
+浏览器守护进程
+长期保持持久化浏览器（含各平台登录状态）运行，发布流程通过CDP连接，省去每次冷启动浏览器的时间
+
+守护进程启动后把CDP地址写入 test-results/browser_daemon.json；pytest 发布流程和批量发布脚本
+检测到守护进程在运行时直接连接（通常不到1秒），否则退回到自行启动浏览器。
+守护进程定期通过 /json/version 检查浏览器健康状态，浏览器被关闭或无响应时自动重启。
+
+注意：连接到守护进程时不会录制视频（视频只能在启动上下文时开启），追踪（trace）仍然可用。
+安全：CDP端口没有任何认证，本机上的任何进程都可以连接并完全控制已登录各平台的浏览器（读取Cookie、以你的身份发布内容），
+只应在可信的单用户机器上运行，不用时及时停止，也不要把端口转发到其他机器。
+
+使用方法：
+    # 启动守护进程（前台运行，Ctrl+C 退出）
+    python browser_daemon.py serve --user-data-dir ./chromium-browser-data
+
+    # 查看守护进程状态
+    python browser_daemon.py status
+
+    # 停止守护进程（关闭浏览器后退出）
+    python browser_daemon.py stop
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional
+
+from playwright.async_api import BrowserContext, Playwright, async_playwright
+
+from browser_session import PERSISTENT_CONTEXT_OPTIONS, BrowserSession
+
+# 守护进程状态文件（CDP地址、进程号、用户数据目录）
+DAEMON_STATE_FILE = os.path.join("test-results", "browser_daemon.json")
+
+# 停止请求文件，守护进程检测到后关闭浏览器并退出（Windows上SIGTERM会直接结束进程，来不及关闭浏览器）
+DAEMON_STOP_FILE = os.path.join("test-results", "browser_daemon.stop")
+
+# 默认的CDP调试端口
+DEFAULT_CDP_PORT = 9222
+
+# 健康检查间隔（秒）
+HEALTH_CHECK_INTERVAL = 10
+
+# 连续多少次健康检查失败后重启浏览器
+MAX_HEALTH_FAILURES = 3
+
+# 重启前的最长等待时间（秒），连续重启时等待时间按指数增长
+MAX_RESTART_BACKOFF = 60
+
+# 检查停止请求文件的间隔（秒）
+STOP_POLL_INTERVAL = 1
+
+# stop 命令等待守护进程退出的最长时间（秒），超时后发送SIGTERM
+STOP_TIMEOUT = 15
+
+
+def check_cdp_health(endpoint: str, timeout: float = 2.0) -> bool:
+    """
+    检查CDP地址是否可用
+
+    Args:
+        endpoint: CDP地址，例如 http://127.0.0.1:9222
+        timeout: 请求超时时间（秒）
+
+    Returns:
+        浏览器是否正常响应
+    """
+    try:
+        with urllib.request.urlopen(f"{endpoint}/json/version", timeout=timeout) as response:
+            return response.status == 200 and "webSocketDebuggerUrl" in json.load(response)
+    except Exception:
+        return False
+
+
+async def wait_any(events: List[asyncio.Event], timeout: float) -> None:
+    """等待任一事件被设置，最多等待timeout秒"""
+    waiters = [asyncio.ensure_future(event.wait()) for event in events]
+    try:
+        await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in waiters:
+            waiter.cancel()
+
+
+def remove_file(path: str) -> None:
+    """删除文件，不存在时忽略"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def read_daemon_state() -> Optional[Dict[str, Any]]:
+    """读取守护进程状态文件，不存在或损坏时返回None"""
+    try:
+        with open(DAEMON_STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def running_daemon_endpoint() -> Optional[str]:
+    """
+    获取正在运行的守护进程的CDP地址
+
+    Returns:
+        CDP地址，守护进程未运行或浏览器无响应时返回None
+    """
+    state = read_daemon_state()
+    if state and check_cdp_health(state["endpoint"]):
+        return state["endpoint"]
+    return None
+
+
+async def attach_to_daemon(playwright: Playwright) -> Optional[BrowserSession]:
+    """
+    通过CDP连接到正在运行的守护进程
+
+    Args:
+        playwright: async_playwright() 返回的 Playwright 对象
+
+    Returns:
+        连接到守护进程浏览器的会话，守护进程未运行或连接失败时返回None
+    """
+    endpoint = await asyncio.to_thread(running_daemon_endpoint)
+    if not endpoint:
+        return None
+    started = time.perf_counter()
+    try:
+        browser = await playwright.chromium.connect_over_cdp(endpoint)
+    except Exception as e:
+        print(f"⚠️  连接浏览器守护进程失败: {e}")
+        return None
+    if not browser.contexts:
+        print("⚠️  浏览器守护进程中没有可用的上下文")
+        await browser.close()
+        return None
+    print(f"🔌 已连接浏览器守护进程 {endpoint}，耗时 {time.perf_counter() - started:.2f}秒")
+    return BrowserSession(browser.contexts[0], browser=browser)
+
+
+class BrowserDaemon:
+    """保持持久化浏览器运行，并在浏览器关闭或无响应时自动重启"""
+
+    def __init__(self, user_data_dir: str, port: int = DEFAULT_CDP_PORT,
+                 health_check_interval: float = HEALTH_CHECK_INTERVAL):
+        """
+        初始化浏览器守护进程
+
+        Args:
+            user_data_dir: 浏览器用户数据目录
+            port: CDP调试端口
+            health_check_interval: 健康检查间隔（秒）
+        """
+        self.user_data_dir = user_data_dir
+        self.port = port
+        self.endpoint = f"http://127.0.0.1:{port}"
+        self.health_check_interval = health_check_interval
+        self.restarts = 0
+        self._stop: Optional[asyncio.Event] = None
+
+    async def _launch(self, playwright: Playwright) -> BrowserContext:
+        """启动开放CDP调试端口的持久化浏览器"""
+        context = await playwright.chromium.launch_persistent_context(
+            user_data_dir=self.user_data_dir,
+            args=[f"--remote-debugging-port={self.port}"],
+            **PERSISTENT_CONTEXT_OPTIONS
+        )
+        self._write_state()
+        return context
+
+    def _write_state(self) -> None:
+        """写入状态文件，供发布流程发现守护进程"""
+        os.makedirs(os.path.dirname(DAEMON_STATE_FILE), exist_ok=True)
+        state = {
+            "endpoint": self.endpoint,
+            "pid": os.getpid(),
+            "user_data_dir": os.path.abspath(self.user_data_dir),
+            "started_at": time.time(),
+            "restarts": self.restarts,
+        }
+        tmp_path = f"{DAEMON_STATE_FILE}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, DAEMON_STATE_FILE)
+
+    def _install_signal_handlers(self) -> None:
+        """收到SIGTERM（Windows上为SIGBREAK）时请求停止，由serve()关闭浏览器后退出"""
+        loop = asyncio.get_running_loop()
+        for name in ("SIGTERM", "SIGBREAK"):
+            sig = getattr(signal, name, None)
+            if sig is None:
+                continue
+            try:
+                loop.add_signal_handler(sig, self._stop.set)
+            except NotImplementedError:
+                # Windows的事件循环不支持add_signal_handler，在信号处理函数中切回事件循环线程
+                signal.signal(sig, lambda *_: loop.call_soon_threadsafe(self._stop.set))
+
+    async def _poll_stop_file(self) -> None:
+        """检测到停止请求文件时请求停止"""
+        while not self._stop.is_set():
+            if os.path.exists(DAEMON_STOP_FILE):
+                print("🛑 收到停止请求")
+                self._stop.set()
+                return
+            await asyncio.sleep(STOP_POLL_INTERVAL)
+
+    async def _watch(self, context: BrowserContext) -> None:
+        """监视浏览器，直到收到停止请求、浏览器被关闭或连续多次健康检查失败"""
+        closed = asyncio.Event()
+        context.on("close", lambda _: closed.set())
+        failures = 0
+        while True:
+            await wait_any([closed, self._stop], self.health_check_interval)
+            if self._stop.is_set():
+                return
+            if closed.is_set():
+                print("⚠️  浏览器已关闭")
+                return
+            if await asyncio.to_thread(check_cdp_health, self.endpoint):
+                failures = 0
+                continue
+            failures += 1
+            print(f"⚠️  浏览器健康检查失败（{failures}/{MAX_HEALTH_FAILURES}）")
+            if failures >= MAX_HEALTH_FAILURES:
+                try:
+                    await context.close()
+                except Exception as e:
+                    print(f"⚠️  关闭无响应的浏览器时出错: {e}")
+                return
+
+    async def serve(self) -> None:
+        """启动浏览器并持续监视，浏览器退出后自动重启，收到停止请求时关闭浏览器后返回"""
+        self._stop = asyncio.Event()
+        # 忽略上次遗留的停止请求
+        remove_file(DAEMON_STOP_FILE)
+        self._install_signal_handlers()
+        poller = asyncio.ensure_future(self._poll_stop_file())
+        try:
+            async with async_playwright() as playwright:
+                while not self._stop.is_set():
+                    started = time.monotonic()
+                    context = None
+                    try:
+                        context = await self._launch(playwright)
+                        print(f"🟢 浏览器守护进程已就绪: {self.endpoint}（用户数据目录: {self.user_data_dir}）")
+                        await self._watch(context)
+                    except Exception as e:
+                        print(f"❌ 浏览器运行出错: {e}")
+
+                    if self._stop.is_set():
+                        if context is not None:
+                            try:
+                                await context.close()
+                            except Exception as e:
+                                print(f"⚠️  关闭浏览器时出错: {e}")
+                        break
+
+                    # 正常运行一段时间后退出的浏览器立即重启，启动即失败时逐步延长等待时间
+                    if time.monotonic() - started > MAX_RESTART_BACKOFF:
+                        backoff = 0
+                    else:
+                        backoff = min(2 ** min(self.restarts, 6), MAX_RESTART_BACKOFF)
+                    self.restarts += 1
+                    print(f"🔄 {backoff}秒后重启浏览器（第 {self.restarts} 次重启）...")
+                    await wait_any([self._stop], backoff)
+        finally:
+            poller.cancel()
+            remove_file(DAEMON_STOP_FILE)
+        print("🛑 浏览器守护进程已退出")
+
+
+def remove_daemon_state() -> None:
+    """删除状态文件"""
+    remove_file(DAEMON_STATE_FILE)
+
+
+def print_status() -> int:
+    """打印守护进程状态，运行中返回0"""
+    state = read_daemon_state()
+    if not state:
+        print("⚪ 浏览器守护进程未运行")
+        return 1
+    healthy = check_cdp_health(state["endpoint"])
+    status = "🟢 运行中" if healthy else "🔴 无响应"
+    print(f"{status}: {state['endpoint']}（进程号: {state['pid']}，重启次数: {state.get('restarts', 0)}）")
+    print(f"📁 用户数据目录: {state['user_data_dir']}")
+    return 0 if healthy else 1
+
+
+def stop_daemon(timeout: float = STOP_TIMEOUT) -> int:
+    """
+    停止守护进程，成功返回0
+
+    先写入停止请求文件，等待守护进程关闭浏览器并删除状态文件；超时未退出时再发送SIGTERM。
+    """
+    state = read_daemon_state()
+    if not state:
+        print("⚪ 浏览器守护进程未运行")
+        return 1
+    with open(DAEMON_STOP_FILE, 'w', encoding='utf-8') as f:
+        f.write(str(state["pid"]))
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if read_daemon_state() is None:
+            print(f"🛑 已停止浏览器守护进程（进程号: {state['pid']}）")
+            return 0
+        time.sleep(0.5)
+
+    print(f"⚠️  守护进程 {timeout:.0f}秒内未退出，发送SIGTERM")
+    try:
+        os.kill(state["pid"], signal.SIGTERM)
+        print(f"🛑 已停止浏览器守护进程（进程号: {state['pid']}）")
+    except OSError as e:
+        print(f"⚠️  停止守护进程时出错（可能已退出）: {e}")
+    remove_daemon_state()
+    remove_file(DAEMON_STOP_FILE)
+    return 0
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="保持持久化浏览器运行，供发布流程通过CDP连接")
+    parser.add_argument("command", nargs="?", default="serve", choices=["serve", "status", "stop"],
+                        help="serve 启动守护进程，status 查看状态，stop 停止守护进程")
+    parser.add_argument("--user-data-dir",
+                        default='D:/tornadofiles/scripts_脚本/github_projects/playwright-automation/chromium-browser-data',
+                        help="浏览器用户数据目录")
+    parser.add_argument("--port", type=int, default=DEFAULT_CDP_PORT, help="CDP调试端口")
+    parser.add_argument("--health-check-interval", type=float, default=HEALTH_CHECK_INTERVAL,
+                        help="健康检查间隔（秒）")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """守护进程入口"""
+    args = parse_args(argv)
+    if args.command == "status":
+        return print_status()
+    if args.command == "stop":
+        return stop_daemon()
+
+    if running_daemon_endpoint():
+        print("⚠️  浏览器守护进程已在运行，使用 status 查看状态")
+        return 1
+    daemon = BrowserDaemon(args.user_data_dir, args.port, args.health_check_interval)
+    try:
+        asyncio.run(daemon.serve())
+    except KeyboardInterrupt:
+        print("🛑 浏览器守护进程已退出")
+    finally:
+        remove_daemon_state()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+浏览器会话模块
+封装持久化浏览器上下文，并按用途复用页面
+
+同一个会话中连续发布多篇文章时，各平台的入口页面和豆包AI页面只创建一次，
+之后每篇文章都复用同一个标签页（发布流程开始时会重新 goto 到入口地址）。
+发布过程中弹出的编辑器页面等临时页面，在每篇文章结束后统一关闭。
+
+会话既可以包装本进程启动的持久化上下文，也可以包装通过CDP连接到浏览器守护进程（browser_daemon.py）
+得到的上下文；后者关闭会话时只关闭本会话打开的页面并断开连接，守护进程中的浏览器保持运行。
+"""
+
+from typing import Dict, Optional
+
+from playwright.async_api import Browser, BrowserContext, Page
+
+# 持久化浏览器上下文的公共启动参数（地理位置、时区、语言、权限、视口）
+PERSISTENT_CONTEXT_OPTIONS = {
+    "headless": False,
+    "geolocation": {"latitude": 22.558033372050147, "longitude": 113.46251764183725},
+    "locale": "zh-CN",
+    "permissions": ["geolocation"],
+    "timezone_id": "Asia/Shanghai",
+    "viewport": {"width": 1920, "height": 1080},
+}
+
+
+class BrowserSession:
+    """持久化浏览器上下文 + 按用途复用的页面池"""
+
+    def __init__(self, context: BrowserContext, browser: Optional[Browser] = None):
+        """
+        初始化浏览器会话
+
+        Args:
+            context: 包含各平台登录状态的浏览器上下文
+            browser: 通过CDP连接到浏览器守护进程时的浏览器对象，本进程启动的上下文为None
+        """
+        self.context = context
+        self.browser = browser
+        self._pages: Dict[str, Page] = {}
+        # 会话创建前已经存在的页面（守护进程的初始标签页）不属于本会话，不会被关闭
+        self._initial_pages = {id(page) for page in context.pages}
+
+    @property
+    def attached(self) -> bool:
+        """是否连接到浏览器守护进程"""
+        return self.browser is not None
+
+    async def page(self, key: str) -> Page:
+        """
+        获取指定用途的页面，已存在且未关闭时直接复用，否则新建
+
+        同一时刻每个用途只应有一个使用者，并发执行的流程需要使用不同的 key。
+
+        Args:
+            key: 页面用途，例如 'zhihu'、'doubao_1'
+
+        Returns:
+            该用途对应的页面
+        """
+        page = self._pages.get(key)
+        if page is None or page.is_closed():
+            page = await self.context.new_page()
+            self._pages[key] = page
+        return page
+
+    async def close_transient_pages(self) -> int:
+        """
+        关闭页面池以外的所有页面（弹出的编辑器页面、下载页面等）
+
+        Returns:
+            关闭的页面数量
+        """
+        pooled = {id(page) for page in self._pages.values()}
+        closed = 0
+        for page in list(self.context.pages):
+            if id(page) in pooled or id(page) in self._initial_pages or page.is_closed():
+                continue
+            try:
+                await page.close()
+                closed += 1
+            except Exception as e:
+                print(f"⚠️  关闭临时页面时出错: {e}")
+        return closed
+
+    async def close(self) -> None:
+        """
+        关闭会话
+
+        本进程启动的上下文直接关闭（视频在关闭时保存）；
+        连接到守护进程时只关闭本会话打开的页面，然后断开连接，浏览器和登录状态保持不变。
+        """
+        if not self.attached:
+            self._pages.clear()
+            await self.context.close()
+            return
+        pooled = list(self._pages.values())
+        self._pages.clear()
+        await self.close_transient_pages()
+        for page in pooled:
+            if not page.is_closed():
+                try:
+                    await page.close()
+                except Exception as e:
+                    print(f"⚠️  关闭页面时出错: {e}")
+        await self.browser.close()
@@ -9,7 +9,7 @@ def pytest_addoption(parser):
                      help='文章标题（必填）')
     parser.addoption("--author", type=str, default='tornadoami', help='作者名称')
     parser.addoption("--summary", type=str, 
-                     help='文章摘要（可选，如不指定则使用豆包AI自动生成）')
+                     help='文章摘要（可选，如不指定则使用豆包AI自动生成；local 表示从文章内容本地抽取）')
     parser.addoption("--url", type=str, 
                      help='原文链接（可选，如不指定则从钉钉文档自动获取）')
     parser.addoption("--markdown-file", type=str, 
@@ -25,7 +25,7 @@ def pytest_addoption(parser):
     # 新增话题标签参数
     parser.addoption("--tags", type=str, 
                      default='AI,人工智能,大模型,LLM,机器学习,深度学习,开源,技术分享,自动化,agent',
-                     help='话题标签，用逗号分隔，如：AI,人工智能,大模型,LLM')
+                     help='话题标签，用逗号分隔，如：AI,人工智能,大模型,LLM；auto 表示使用AI生成，local 表示从文章内容本地提取')
     # 新增浏览器数据备份控制参数
     parser.addoption("--backup-browser-data", type=str, 
                      default='true',
@@ -33,6 +33,39 @@ def pytest_addoption(parser):
     # 新增短标题参数
     parser.addoption("--short-title", type=str, 
                      help='短标题（可选，用于图文平台，如不指定则自动生成）')
+    # 新增并发发布参数
+    parser.addoption("--max-concurrency", type=int, 
+                     default=4,
+                     help='同时发布的最大平台数量，默认为4，设为1则逐个平台发布')
+    # 新增断点续跑参数
+    parser.addoption("--resume", action="store_true", 
+                     default=False,
+                     help='从运行日志继续执行，跳过已完成的阶段和已发布成功的平台')
+    # 新增浏览器守护进程参数
+    parser.addoption("--browser-daemon", type=str, 
+                     default='auto',
+                     choices=['auto', 'require', 'off'],
+                     help='auto：浏览器守护进程运行时通过CDP连接，否则启动新浏览器；require：必须连接守护进程；off：总是启动新浏览器')
+    # 新增豆包AI生成模式参数
+    parser.addoption("--ai-mode", type=str, 
+                     default='combined',
+                     choices=['combined', 'separate'],
+                     help='combined：上传一次文件，在同一个豆包对话中生成summary、短标题、话题标签和文生图提示词；separate：每项单独打开豆包页面生成')
+    # 新增AI内容提供者参数
+    parser.addoption("--ai-provider", type=str,
+                     default='doubao',
+                     choices=['doubao', 'http', 'local'],
+                     help='doubao：豆包网页版；http：大模型HTTP接口（需要设置AI_API_KEY、AI_API_MODEL等环境变量）；local：本地离线生成')
+    # 新增AI对冲参数
+    parser.addoption("--ai-hedge", type=str,
+                     default='off',
+                     choices=['off', 'doubao', 'http', 'local'],
+                     help='主提供者超过历史耗时P90仍未返回时同时请求的备用提供者（doubao：第二个豆包页面），采用先返回且校验通过的结果；off：不对冲')
+    # 新增正文图片图床参数
+    parser.addoption("--image-host", type=str,
+                     default='off',
+                     choices=['wechat', 'off'],
+                     help='正文图片超过平台大小限制（压缩后）或为本地图片时上传的图床，各平台使用改写了图片链接的markdown副本；wechat：微信公众号图文消息图片接口（不超过1MB）；off：不预处理正文图片（默认）')
 
 def cleanup_old_backups(max_backups=3):
     """清理旧的备份目录，只保留最近的指定数量的备份"""
@@ -0,0 +1,613 @@
+# -*- coding: utf-8 -*-
+"""
+豆包AI辅助生成模块
+使用豆包AI为文章生成summary、图文消息的短标题和话题标签
+
+基于 playwright.async_api，每个函数从豆包页面池（doubao_session.py）获取一个已加载的页面并在其中开始新对话，
+多个函数可以在同一个事件循环中并发执行；连续处理多篇文章时复用已加载的页面。
+AI回复直接从页面DOM或聊天接口响应中读取（doubao_reply.py），不经过系统剪贴板；
+回复完成后立即返回，每次询问的首字耗时和总耗时记录到运行时间线。
+生成结果按Markdown正文哈希写入AI缓存（ai_metadata_cache.py），同一篇文章重新运行时不再打开豆包页面。
+
+generate_article_metadata_with_doubao 是合并生成模式：只上传一次Markdown文件，
+在同一个对话中让豆包AI以JSON格式一次性返回summary、短标题、话题标签和文生图提示词，
+校验不通过的字段在同一个对话中单独重新询问。
+"""
+
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+from ai_metadata_cache import get_ai_cache
+from doubao_reply import send_and_wait_reply
+from doubao_session import get_doubao_session
+from locator_cache import click_first
+from run_timeline import timed
+from wait_helpers import wait_enabled, wait_visible
+from word_counter_sdk import validate_and_clean_text
+
+# 豆包AI可选的模式
+DOUBAO_MODES = ('极速', '思考', '超能')
+
+# 合并生成模式支持的字段
+METADATA_FIELDS = ("summary", "short_title", "tags", "image_prompt")
+
+# 各字段的长度要求
+SUMMARY_MAX_LENGTH = 120
+SHORT_TITLE_MAX_LENGTH = 20
+TAG_COUNT = 10
+
+# 合并生成模式中各字段的要求（拼接到提示词中）
+METADATA_FIELD_RULES = {
+    "summary": f"文章总结，总字数严格限制在{SUMMARY_MAX_LENGTH}字以内",
+    "short_title": f"图文消息的标题，总字数严格限制在{SHORT_TITLE_MAX_LENGTH}字以内",
+    "tags": (f"{TAG_COUNT}个话题标签组成的数组，用于发布到微信公众号、CSDN、知乎、51CTO、博客园、小红书、快手、抖音等平台，"
+             "标签决不能包含空格，不能包含横杠，也不能包含任何特殊字符"),
+    "image_prompt": ("一条英文的文生图提示词，用作微信公众号文章的封面图：比例16:9，风格专业、简洁、美观，"
+                     "主题与文章内容一致，忽略文中的代码块和命令行示例，画面中不能包含任何文字、代码、标志或水印"),
+}
+
+
+async def select_doubao_mode(page, mode: str) -> bool:
+    """
+    选择豆包AI的模式（极速、思考、超能），多种定位方式同时尝试，上次成功的方式优先（locator_cache.py）
+
+    Args:
+        page: 豆包AI聊天页面
+        mode: 要选择的模式，可选值：'极速', '思考', '超能'
+
+    Returns:
+        bool: 是否成功选择指定模式
+    """
+    if mode not in DOUBAO_MODES:
+        print(f"❌ 无效的模式参数: {mode}")
+        print(f"有效选项: {', '.join(DOUBAO_MODES)}")
+        return False
+
+    print(f"🔄 正在选择豆包AI的'{mode}'模式...")
+    exact_text = re.compile(f"^{re.escape(mode)}$")
+    try:
+        await click_first("doubao", f"模式.{mode}", {
+            "精确文本": lambda: page.get_by_text(mode, exact=True),
+            "按钮类名": lambda: page.locator(f"span.button-mE6AaR:has-text('{mode}')"),
+            "可聚焦span": lambda: page.locator("span[tabindex='0']").filter(has_text=exact_text),
+        }, timeout_ms=5000, fallbacks={
+            # 匹配范围较宽，只在上面的方式都失败后才尝试
+            "含button类名": lambda: page.locator(f"[class*='button']:has-text('{mode}')"),
+        })
+    except Exception as e:
+        print(f"❌ 所有方法都无法找到'{mode}'模式按钮: {e}")
+        return False
+    print(f"✅ 已选择'{mode}'模式")
+    return True
+
+
+@timed("豆包AI.生成summary", none_is_failure=True)
+async def generate_summary_with_doubao(session, markdown_file):
+    """
+    使用豆包AI生成文章summary
+    
+    Args:
+        session: 浏览器会话（BrowserSession）
+        markdown_file: Markdown文件路径
+        
+    Returns:
+        str: 生成的summary文本，如果失败返回None
+    """
+    cached = get_ai_cache().get(markdown_file, "summary")
+    if cached:
+        return cached
+
+    try:
+        print("🤖 正在使用豆包AI总结文章...")
+        # 从豆包页面池获取已加载的页面，并在其中开始新对话
+        async with get_doubao_session(session).tab("生成summary") as page_doubao:
+            print("1️⃣ 已获取豆包AI页面（新对话）")
+        
+            # 点击文件上传按钮
+            print("2️⃣ 点击文件上传按钮...")
+            await page_doubao.get_by_test_id("upload_file_button").click()
+            await wait_visible(page_doubao.get_by_text("上传文件或图片"), "豆包上传菜单展开", timeout_ms=5000)
+            print("✅ 文件上传按钮点击成功")
+        
+            # 选择上传文件或图片选项并上传文件
+            print("3️⃣ 选择上传文件选项...")
+            async with page_doubao.expect_file_chooser() as page_upload_file:
+                await page_doubao.get_by_text("上传文件或图片").click()
+            page_upload_file = await page_upload_file.value
+            print("4️⃣ 上传Markdown文件...")
+            await page_upload_file.set_files(markdown_file)
+            print("✅ 上传选项选择成功")
+        
+            # 点击聊天输入框
+            print("5️⃣ 点击聊天输入框...")
+            await page_doubao.get_by_test_id("chat_input_input").click()
+            print("✅ 聊天输入框获得焦点")
+        
+            # 输入总结请求的提示词
+            print("6️⃣ 输入总结提示词...")
+            prompt_text = "请帮我总结我提供的Markdown文档，总字数严格限制在120字以内，你的回答只需包含总结内容，不要包含任何其他文字。请注意：一个英文字母、一个空格、一个标点符号都算一个字"
+            await page_doubao.get_by_test_id("chat_input_input").fill(prompt_text)
+            print("✅ 提示词输入完成")
+        
+            # 等待网络空闲，确保页面完全加载
+            print("⏳ 等待网络空闲...")
+            await page_doubao.wait_for_load_state("networkidle")
+            print("✅ 网络空闲状态确认")
+        
+            # 附件上传完成后发送按钮才可用
+            await wait_enabled(page_doubao.get_by_test_id("chat_input_send_button"),
+                               "豆包发送按钮可用（附件上传完成）", timeout_ms=60000)
+        
+            # 发送消息并等待AI回复完成（流式响应结束或回复正文不再变化时立即返回，最多等待120秒）
+            print("7️⃣ 发送消息并等待AI回复...")
+            try:
+                reply = await send_and_wait_reply(page_doubao, page_doubao.get_by_test_id("chat_input_send_button").click,
+                                                  "生成summary")
+            except Exception as e:
+                print(f"⚠️  等待AI回复超时或出错: {e}")
+                raise Exception("等待豆包AI回复超时")
+        
+            # 读取AI回复内容（不经过剪贴板，多个豆包页面可以同时读取）
+            print("8️⃣ 读取AI回复内容...")
+        
+            try:
+                summary = reply.text
+            
+                if summary:
+                    print(f"🤖 豆包AI总结内容: {summary}")
+                
+                    # 保存总结到文件（备份）
+                    summary_file = os.path.join("test-results", f"doubao_summary_{os.path.splitext(os.path.basename(markdown_file))[0]}.txt")
+                    os.makedirs("test-results", exist_ok=True)
+                    with open(summary_file, 'w', encoding='utf-8') as f:
+                        f.write(summary)
+                    print(f"📁 豆包总结已保存到: {summary_file}")
+                    get_ai_cache().put(markdown_file, {"summary": summary})
+                
+                    # 关闭豆包页面
+                    # page_doubao.close()
+                    return summary
+                else:
+                    print("⚠️  AI回复内容为空")
+                    return None
+            
+            except Exception as e:
+                print(f"⚠️  读取AI回复内容时出错: {e}")
+                return None
+
+
+    except Exception as e:
+        print(f"❌ 豆包AI操作过程中出错: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+    
+
+    
+
+@timed("豆包AI.生成短标题", none_is_failure=True)
+async def generate_newspic_title_with_doubao(session, markdown_file):
+    """
+    使用豆包AI生成图文消息的标题
+    
+    Args:
+        session: 浏览器会话（BrowserSession）
+        markdown_file: Markdown文件路径
+        
+    Returns:
+        str: 生成的图文消息的标题，如果失败返回None
+    """
+    cached = get_ai_cache().get(markdown_file, "short_title")
+    if cached:
+        return cached
+
+    try:
+        print("🤖 正在使用豆包AI生成图文消息的标题...")
+        # 从豆包页面池获取已加载的页面，并在其中开始新对话
+        async with get_doubao_session(session).tab("生成短标题") as page_doubao:
+            print("1️⃣ 已获取豆包AI页面（新对话）")
+        
+            # 选择超能模式，找不到模式按钮时使用当前模式继续
+            mode = "超能"
+            if not await select_doubao_mode(page_doubao, mode):
+                print(f"⚠️  未能选择'{mode}'模式，使用当前模式继续")
+
+            # 点击文件上传按钮
+            print("2️⃣ 点击文件上传按钮...")
+            await page_doubao.get_by_test_id("upload_file_button").click()
+            await wait_visible(page_doubao.get_by_text("上传文件或图片"), "豆包上传菜单展开", timeout_ms=5000)
+            print("✅ 文件上传按钮点击成功")
+        
+            # 选择上传文件或图片选项并上传文件
+            print("3️⃣ 选择上传文件选项...")
+            async with page_doubao.expect_file_chooser() as page_upload_file:
+                await page_doubao.get_by_text("上传文件或图片").click()
+            page_upload_file = await page_upload_file.value
+            print("4️⃣ 上传Markdown文件...")
+            await page_upload_file.set_files(markdown_file)
+            print("✅ 上传选项选择成功")
+        
+            # 点击聊天输入框
+            print("5️⃣ 点击聊天输入框...")
+            await page_doubao.get_by_test_id("chat_input_input").click()
+            print("✅ 聊天输入框获得焦点")
+        
+            # 输入图文消息的标题请求的提示词
+            print("6️⃣ 输入图文消息的标题提示词...")
+            prompt_text = "请帮我生成我提供的Markdown文档的图文消息的标题，总字数严格限制在20字以内，你的回答只需包含标题内容，不要包含任何其他文字。请注意：一个英文字母、一个空格、一个标点符号都算一个字"
+            await page_doubao.get_by_test_id("chat_input_input").fill(prompt_text)
+            print("✅ 提示词输入完成")
+        
+            # 等待网络空闲，确保页面完全加载
+            print("⏳ 等待网络空闲...")
+            await page_doubao.wait_for_load_state("networkidle")
+            print("✅ 网络空闲状态确认")
+        
+            # 附件上传完成后发送按钮才可用
+            await wait_enabled(page_doubao.get_by_test_id("chat_input_send_button"),
+                               "豆包发送按钮可用（附件上传完成）", timeout_ms=60000)
+        
+            # 发送消息并等待AI回复完成（流式响应结束或回复正文不再变化时立即返回，最多等待120秒）
+            print("7️⃣ 发送消息并等待AI回复...")
+            reply = await send_and_wait_reply(page_doubao, page_doubao.get_by_test_id("chat_input_send_button").click,
+                                              "生成短标题")
+        
+            # 读取AI回复内容（不经过剪贴板，多个豆包页面可以同时读取）
+            print("8️⃣ 读取AI回复内容...")
+            try:
+                newspic_title = reply.text
+            
+                if newspic_title:
+                    print(f"🤖 豆包AI生成的图文消息的标题: {newspic_title}")
+                
+                    # 保存图文消息的标题到文件（备份）
+                    newspic_title_file = os.path.join("test-results", f"doubao_newspic_title_{os.path.splitext(os.path.basename(markdown_file))[0]}.txt")
+                    os.makedirs("test-results", exist_ok=True)
+                    with open(newspic_title_file, 'w', encoding='utf-8') as f:
+                        f.write(newspic_title)
+                    print(f"📁 豆包AI生成图文消息的标题已保存到: {newspic_title_file}")
+                    get_ai_cache().put(markdown_file, {"short_title": newspic_title})
+                
+                    # 关闭豆包页面
+                    # page_doubao.close()
+                    return newspic_title
+                else:
+                    print("⚠️  豆包AI生成图文消息的标题回复内容为空")
+                    return None
+            
+            except Exception as e:
+                print(f"⚠️  豆包AI生成图文消息的标题读取回复内容时出错: {e}")
+                return None
+
+
+    except Exception as e:
+        print(f"❌ 豆包AI生成图文消息的标题操作过程中出错: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+    
+
+    
+
+
+@timed("豆包AI.生成话题标签")
+async def generate_tags_with_doubao(session, markdown_file):
+    """
+    使用豆包AI生成话题标签
+    
+    Args:
+        session: 浏览器会话（BrowserSession）
+        markdown_file: Markdown文件路径
+        
+    Returns:
+        list: 生成的话题标签列表，如果失败返回空列表
+    """
+    cached = get_ai_cache().get(markdown_file, "tags")
+    if cached:
+        return cached
+
+    try:
+        print("🏷️  正在使用豆包AI生成话题标签...")
+        # 从豆包页面池获取已加载的页面，并在其中开始新对话
+        async with get_doubao_session(session).tab("生成话题标签") as page_doubao:
+            print("1️⃣ 已获取豆包AI页面（新对话）")
+        
+            # 点击文件上传按钮
+            print("2️⃣ 点击文件上传按钮...")
+            await page_doubao.get_by_test_id("upload_file_button").click()
+            await wait_visible(page_doubao.get_by_text("上传文件或图片"), "豆包上传菜单展开", timeout_ms=5000)
+            print("✅ 文件上传按钮点击成功")
+        
+            # 选择上传文件或图片选项并上传文件
+            print("3️⃣ 选择上传文件选项...")
+            async with page_doubao.expect_file_chooser() as page_upload_file:
+                await page_doubao.get_by_text("上传文件或图片").click()
+            page_upload_file = await page_upload_file.value
+            print("4️⃣ 上传Markdown文件...")
+            await page_upload_file.set_files(markdown_file)
+            print("✅ 上传选项选择成功")
+        
+            # 点击聊天输入框
+            print("5️⃣ 点击聊天输入框...")
+            await page_doubao.get_by_test_id("chat_input_input").click()
+            print("✅ 聊天输入框获得焦点")
+        
+            # 输入话题标签生成请求的提示词
+            print("6️⃣ 输入话题标签生成提示词...")
+            prompt_text = "我想将这篇文章发布到各个主流的社交媒体平台，包括但不限于：微信公众号、CSDN、知乎、51CTO、博客园、小红书、快手、抖音等等，请根据文章的内容，帮我想出10个话题标签。请严格按照以下格式返回：['标签1', '标签2', '标签3', '标签4', '标签5', '标签6', '标签7', '标签8', '标签9', '标签10']，不要换行，不要添加其他文字，标签决不能包含空格，不能包含横杠，也不能包含任何特殊字符,只返回Python列表格式的字符串。"
+            await page_doubao.get_by_test_id("chat_input_input").fill(prompt_text)
+            print("✅ 提示词输入完成")
+        
+            # 等待网络空闲，确保页面完全加载
+            print("⏳ 等待网络空闲...")
+            await page_doubao.wait_for_load_state("networkidle")
+            print("✅ 网络空闲状态确认")
+        
+            # 附件上传完成后发送按钮才可用
+            await wait_enabled(page_doubao.get_by_test_id("chat_input_send_button"),
+                               "豆包发送按钮可用（附件上传完成）", timeout_ms=60000)
+        
+            # 发送消息并等待AI回复完成（流式响应结束或回复正文不再变化时立即返回，最多等待120秒）
+            print("7️⃣ 发送消息并等待AI回复...")
+            reply = await send_and_wait_reply(page_doubao, page_doubao.get_by_test_id("chat_input_send_button").click,
+                                              "生成话题标签")
+        
+            # 读取AI回复内容（不经过剪贴板，多个豆包页面可以同时读取）
+            print("8️⃣ 读取AI回复内容...")
+        
+            try:
+                tags_text = reply.text
+            
+                if tags_text:
+                    print(f"🤖 豆包AI生成的话题标签: {tags_text}")
+                
+                    # 解析标签文本为列表 - 支持多种格式
+                    tags_list = []
+                    try:
+                        # 方法1：尝试解析Python列表格式 ['标签1', '标签2', '标签3']
+                        if tags_text.strip().startswith('[') and tags_text.strip().endswith(']'):
+                            import ast
+                            tags_list = ast.literal_eval(tags_text.strip())
+                            print("✅ 使用Python列表格式解析")
+                    
+                        # 方法2：尝试解析带引号的格式 "标签1", "标签2", "标签3"
+                        elif '"' in tags_text or "'" in tags_text:
+                            # 提取引号内的内容
+                            import re
+                            quoted_tags = re.findall(r'["\']([^"\']+)["\']', tags_text)
+                            if quoted_tags:
+                                tags_list = quoted_tags
+                                print("✅ 使用引号格式解析")
+                            else:
+                                # 如果引号解析失败，按逗号分隔
+                                tags_list = [tag.strip().strip('"\'') for tag in tags_text.split(',') if tag.strip()]
+                                print("✅ 使用逗号分隔格式解析（引号清理）")
+                    
+                        # 方法3：按逗号分隔（兜底方案）
+                        else:
+                            tags_list = [tag.strip() for tag in tags_text.split(',') if tag.strip()]
+                            print("✅ 使用逗号分隔格式解析")
+                    
+                        # 清理标签：移除可能的引号、方括号等
+                        tags_list = [tag.strip().strip('"\'[]') for tag in tags_list if tag.strip()]
+                    
+                        # 移除包含横杠的标签
+                        tags_list = [tag for tag in tags_list if '-' not in tag]
+                        print("✅ 已移除包含横杠的标签")
+                    
+                        # 限制标签数量（最多10个）
+                        if len(tags_list) > 10:
+                            tags_list = tags_list[:10]
+                            print("⚠️  标签数量超过10个，已截取前10个")
+                    
+                        print(f"📝 解析后的标签列表: {tags_list}")
+                    
+                    except Exception as e:
+                        print(f"⚠️  标签解析出错: {e}")
+                        # 兜底方案：按逗号分隔
+                        tags_list = [tag.strip() for tag in tags_text.split(',') if tag.strip()]
+                        # 移除包含横杠的标签
+                        tags_list = [tag for tag in tags_list if '-' not in tag]
+                        print("✅ 使用兜底方案（逗号分隔）解析，已移除包含横杠的标签")
+                
+                    # 保存标签到文件（备份）
+                    tags_file = os.path.join("test-results", f"doubao_tags_{os.path.splitext(os.path.basename(markdown_file))[0]}.txt")
+                    os.makedirs("test-results", exist_ok=True)
+                    with open(tags_file, 'w', encoding='utf-8') as f:
+                        f.write(tags_text)
+                    print(f"📁 豆包标签已保存到: {tags_file}")
+                    get_ai_cache().put(markdown_file, {"tags": tags_list})
+                
+                    # 关闭豆包页面
+                    # page_doubao.close()
+                    return tags_list
+                else:
+                    print("⚠️  AI回复内容为空")
+                    return []
+            
+            except Exception as e:
+                print(f"⚠️  读取AI回复内容时出错: {e}")
+                return []
+            
+    except Exception as e:
+        print(f"❌ 豆包AI操作过程中出错: {e}")
+        import traceback
+        traceback.print_exc()
+        return []
+
+
+
+def _metadata_prompt(fields: Sequence[str], retry: bool = False) -> str:
+    """生成合并生成模式的提示词，retry 为 True 时只要求重新生成指定字段"""
+    rules = "\n".join(f"- {name}: {METADATA_FIELD_RULES[name]}" for name in fields)
+    example = json.dumps({name: ["标签1", "标签2"] if name == "tags" else "..." for name in fields}, ensure_ascii=False)
+    if retry:
+        head = "上一次回答中以下字段不符合要求，请根据我提供的Markdown文档重新生成这些字段："
+    else:
+        head = "请阅读我提供的Markdown文档，一次性生成以下字段："
+    return (f"{head}\n{rules}\n"
+            f"请严格按照以下JSON格式返回：{example}，只返回JSON，不要添加其他文字，不要使用代码块。"
+            "请注意：一个英文字母、一个空格、一个标点符号都算一个字")
+
+
+def parse_metadata_reply(reply_text: str) -> Dict[str, Any]:
+    """
+    解析豆包AI返回的JSON（允许回复中包含代码块标记或前后多余的文字）
+
+    Args:
+        reply_text: AI回复内容
+
+    Returns:
+        dict: 解析出的字段，无法解析时返回空字典
+    """
+    match = re.search(r"\{.*\}", reply_text or "", re.S)
+    if not match:
+        return {}
+    try:
+        data = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def clean_metadata(data: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    """
+    清理并校验合并生成模式返回的字段
+
+    summary 按 word_counter_sdk 的规则计数（清理中英文之间的空格后不超过120字），
+    short_title 不超过20字，tags 去除包含空格或横杠的标签后至少有10个（超过时取前10个）。
+
+    Args:
+        data: parse_metadata_reply 解析出的字段
+        fields: 需要校验的字段
+
+    Returns:
+        dict: 校验通过的字段（已清理），未通过的字段不包含在内
+    """
+    valid = {}
+    for name in fields:
+        value = data.get(name)
+        if name == "tags":
+            if isinstance(value, str):
+                value = re.split(r"[,，]", value)
+            if not isinstance(value, list):
+                continue
+            tags = [str(tag).strip().strip("#'\"") for tag in value]
+            tags = [tag for tag in tags if tag and '-' not in tag and ' ' not in tag]
+            if len(tags) >= TAG_COUNT:
+                valid[name] = tags[:TAG_COUNT]
+            continue
+
+        if not isinstance(value, str) or not value.strip():
+            continue
+        value = value.strip()
+        if name == "summary":
+            result = validate_and_clean_text(value, max_length=SUMMARY_MAX_LENGTH)
+            if result['success'] and result['cleaned_count'] <= SUMMARY_MAX_LENGTH:
+                valid[name] = result['cleaned_text']
+        elif name == "short_title":
+            if len(value) <= SHORT_TITLE_MAX_LENGTH:
+                valid[name] = value
+        else:
+            valid[name] = value
+    return valid
+
+
+async def _ask_doubao(page_doubao, prompt_text: str, description: str) -> Optional[str]:
+    """
+    在当前对话中发送一条消息并读取新出现的回复
+
+    Args:
+        page_doubao: 豆包AI聊天页面（附件如有需要已上传）
+        prompt_text: 提示词
+        description: 等待回复时显示的描述
+
+    Returns:
+        str: AI回复内容，失败时返回None
+    """
+    await page_doubao.get_by_test_id("chat_input_input").click()
+    await page_doubao.get_by_test_id("chat_input_input").fill(prompt_text)
+    # 附件上传完成后发送按钮才可用
+    send_button = page_doubao.get_by_test_id("chat_input_send_button")
+    await wait_enabled(send_button, "豆包发送按钮可用（附件上传完成）", timeout_ms=60000)
+    reply = await send_and_wait_reply(page_doubao, send_button.click, description)
+    return reply.text
+
+
+@timed("豆包AI.合并生成文章信息")
+async def generate_article_metadata_with_doubao(session, markdown_file, fields: Sequence[str] = METADATA_FIELDS,
+                                               max_retries: int = 2) -> Dict[str, Any]:
+    """
+    合并生成模式：上传一次Markdown文件，在同一个对话中生成summary、短标题、话题标签和文生图提示词
+
+    Args:
+        session: 浏览器会话（BrowserSession）
+        markdown_file: Markdown文件路径
+        fields: 需要生成的字段（METADATA_FIELDS 的子集）
+        max_retries: 校验不通过的字段最多重新询问的次数
+
+    Returns:
+        dict: 校验通过的字段（tags 为列表，其余为字符串，包括AI缓存中已有的字段），
+              多次询问后仍不通过或出错的字段不包含在内，调用方可以改用单独生成的函数
+    """
+    metadata: Dict[str, Any] = {}
+    for name in fields:
+        cached = get_ai_cache().get(markdown_file, name)
+        if cached:
+            metadata[name] = cached
+    fields = [name for name in METADATA_FIELDS if name in fields and name not in metadata]
+    if not fields:
+        return metadata
+
+    try:
+        print(f"🤖 正在使用豆包AI合并生成: {', '.join(fields)}...")
+        # 从豆包页面池获取已加载的页面，并在其中开始新对话
+        async with get_doubao_session(session).tab("合并生成文章信息") as page_doubao:
+            print("1️⃣ 已获取豆包AI页面（新对话）")
+
+            # 只上传一次Markdown文件，后续重新询问在同一个对话中进行
+            print("2️⃣ 上传Markdown文件...")
+            await page_doubao.get_by_test_id("upload_file_button").click()
+            await wait_visible(page_doubao.get_by_text("上传文件或图片"), "豆包上传菜单展开", timeout_ms=5000)
+            async with page_doubao.expect_file_chooser() as page_upload_file:
+                await page_doubao.get_by_text("上传文件或图片").click()
+            page_upload_file = await page_upload_file.value
+            await page_upload_file.set_files(markdown_file)
+            print("✅ Markdown文件上传成功")
+
+            replies: List[str] = []
+            pending = list(fields)
+            for attempt in range(max_retries + 1):
+                print(f"3️⃣ {'请求' if attempt == 0 else f'第{attempt}次重新请求'}字段: {', '.join(pending)}")
+                reply_text = await _ask_doubao(page_doubao, _metadata_prompt(pending, retry=attempt > 0),
+                                               "合并生成文章信息")
+                replies.append(reply_text or "")
+                print(f"🤖 豆包AI回复: {reply_text}")
+
+                metadata.update(clean_metadata(parse_metadata_reply(reply_text), pending))
+                pending = [name for name in fields if name not in metadata]
+                if not pending:
+                    break
+                print(f"⚠️  以下字段不符合要求: {', '.join(pending)}")
+
+            # 保存回复到文件（备份）
+            metadata_file = os.path.join("test-results", f"doubao_metadata_{os.path.splitext(os.path.basename(markdown_file))[0]}.json")
+            os.makedirs("test-results", exist_ok=True)
+            with open(metadata_file, 'w', encoding='utf-8') as f:
+                json.dump({"metadata": metadata, "replies": replies}, f, ensure_ascii=False, indent=2)
+            print(f"📁 豆包AI合并生成结果已保存到: {metadata_file}")
+            get_ai_cache().put(markdown_file, {name: metadata[name] for name in fields if name in metadata})
+
+            if pending:
+                print(f"⚠️  多次询问后仍不符合要求的字段: {', '.join(pending)}")
+            else:
+                print("✅ 豆包AI合并生成的字段全部符合要求")
+            return metadata
+
+    except Exception as e:
+        print(f"❌ 豆包AI合并生成过程中出错: {e}")
+        import traceback
+        traceback.print_exc()
+        return metadata
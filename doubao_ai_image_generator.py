@@ -2,13 +2,32 @@
 """
 豆包AI图片生成模块
 提供完整的豆包AI图片生成功能，包括提示词生成和图片下载
+基于 playwright.async_api，所有页面操作均为协程，可与其他页面在同一事件循环中并发执行
+
+生成的图片地址从图片生成请求对应的聊天接口响应中读取，响应结束后通过浏览器上下文的请求接口同时下载所有图片，
+最后一张图片保存后立即返回；从响应中读取不到图片地址时，回退到点击页面上的下载按钮。
 """
 
+import asyncio
 import os
 import time
-import pyperclip
 from typing import List, Optional, Tuple
-from playwright.sync_api import Page, BrowserContext
+from urllib.parse import urlparse
+from playwright.async_api import Page, BrowserContext
+from ai_metadata_cache import get_ai_cache
+from doubao_ai_helpers import select_doubao_mode
+from doubao_reply import ReplyResult, parse_chat_stream_images, send_and_wait_reply, watch_chat_stream
+from run_timeline import span, timed
+from wait_helpers import wait_download, wait_enabled, wait_hidden, wait_until, wait_visible
+
+# 等待图片生成完成（聊天接口响应结束）的超时时间（毫秒）
+IMAGE_GENERATION_TIMEOUT_MS = 120000
+
+# 单张图片下载的超时时间（毫秒）
+IMAGE_FETCH_TIMEOUT_MS = 60000
+
+# 图片响应的 Content-Type 与文件扩展名
+IMAGE_EXTENSIONS = {"image/png": ".png", "image/jpeg": ".jpg", "image/webp": ".webp"}
 
 
 class DoubaoAIImageGenerator:
@@ -24,10 +43,13 @@ class DoubaoAIImageGenerator:
         """
         self.page = page
         self.context = context
+        # 在发送消息前开始记录聊天接口响应，页面DOM读取失败时从响应中读取回复
+        watch_chat_stream(page)
         self.downloads_dir = os.path.join(os.getcwd(), "test-results", "doubao_images")
         os.makedirs(self.downloads_dir, exist_ok=True)
     
-    def generate_prompt_from_markdown(self, markdown_file: str) -> Optional[str]:
+    @timed("豆包AI.生成文生图提示词", none_is_failure=True)
+    async def generate_prompt_from_markdown(self, markdown_file: str) -> Optional[str]:
         """
         从Markdown文件生成文生图提示词
         
@@ -37,22 +59,27 @@ class DoubaoAIImageGenerator:
         Returns:
             生成的提示词，失败时返回None
         """
+        cached = get_ai_cache().get(markdown_file, "image_prompt")
+        if cached:
+            return cached
+
         try:
             print("🤖 开始生成文生图提示词...")
             
             # 上传Markdown文件
-            self._upload_markdown_file(markdown_file)
+            await self._upload_markdown_file(markdown_file)
             
-            # 发送提示词生成请求
+            # 发送提示词生成请求并等待回复完成
             prompt_text = self._get_prompt_generation_text()
-            self._send_prompt_request(prompt_text)
+            reply = await self._send_prompt_request(prompt_text)
             
             # 获取AI回复的提示词
-            prompt_result = self._get_ai_response()
+            prompt_result = await self._get_ai_response(reply)
             
             if prompt_result:
                 # 保存提示词到文件
                 self._save_prompt_to_file(prompt_result, markdown_file)
+                get_ai_cache().put(markdown_file, {"image_prompt": prompt_result})
                 print(f"✅ 提示词生成成功: {prompt_result[:100]}...")
                 return prompt_result
             else:
@@ -63,7 +90,8 @@ class DoubaoAIImageGenerator:
             print(f"❌ 生成提示词时出错: {e}")
             return None
     
-    def generate_images_with_prompt(self, prompt: str, aspect_ratio: str = "16:9") -> List[str]:
+    @timed("豆包AI.生成图片")
+    async def generate_images_with_prompt(self, prompt: str, aspect_ratio: str = "16:9") -> List[str]:
         """
         使用提示词生成图片
         
@@ -81,22 +109,25 @@ class DoubaoAIImageGenerator:
             # self.select_ai_mode("思考")
 
             # 切换到图片生成技能
-            self._switch_to_image_generation_skill()
+            await self._switch_to_image_generation_skill()
 
             # 在聊天输入框中输入提示词，不发送
-            self._fill_prompt_only(prompt)
+            await self._fill_prompt_only(prompt)
             
             # 设置图片比例
-            self._set_image_aspect_ratio(aspect_ratio)
+            await self._set_image_aspect_ratio(aspect_ratio)
 
             # 发送图片生成请求
-            self._send_image_generation_request(prompt)
+            sent_at, previous_responses = await self._send_image_generation_request(prompt)
             
-            # 等待图片生成完成
-            self._wait_for_image_generation()
+            # 从聊天接口响应中读取图片地址，并同时下载所有图片
+            image_urls = await self._wait_for_image_urls(previous_responses)
+            downloaded_files = await self._fetch_generated_images(image_urls, sent_at) if image_urls else []
             
-            # 下载生成的图片
-            downloaded_files = self._download_generated_images()
+            # 读取不到图片地址或下载失败时，等待页面上的下载按钮并点击下载
+            if not downloaded_files:
+                await self._wait_for_image_generation()
+                downloaded_files = await self._download_generated_images()
             
             if downloaded_files:
                 print(f"✅ 图片生成成功，共下载 {len(downloaded_files)} 张图片")
@@ -109,7 +140,7 @@ class DoubaoAIImageGenerator:
             print(f"❌ 生成图片时出错: {e}")
             return []
     
-    def generate_images_from_markdown(self, markdown_file: str, aspect_ratio: str = "16:9") -> Tuple[Optional[str], List[str]]:
+    async def generate_images_from_markdown(self, markdown_file: str, aspect_ratio: str = "16:9") -> Tuple[Optional[str], List[str]]:
         """
         从Markdown文件生成图片（完整流程）
         
@@ -124,15 +155,15 @@ class DoubaoAIImageGenerator:
             print("🚀 开始完整的图片生成流程...")
             
             # 选择豆包AI的模式为思考模式
-            self.select_ai_mode("思考")
+            await self.select_ai_mode("思考")
 
             # 步骤1：生成提示词
-            prompt = self.generate_prompt_from_markdown(markdown_file)
+            prompt = await self.generate_prompt_from_markdown(markdown_file)
             if not prompt:
                 return None, []
             
             # 步骤2：生成图片
-            image_files = self.generate_images_with_prompt(prompt, aspect_ratio)
+            image_files = await self.generate_images_with_prompt(prompt, aspect_ratio)
             
             return prompt, image_files
             
@@ -140,20 +171,20 @@ class DoubaoAIImageGenerator:
             print(f"❌ 完整流程执行失败: {e}")
             return None, []
     
-    def _upload_markdown_file(self, markdown_file: str) -> None:
+    @timed("豆包AI.上传Markdown文件")
+    async def _upload_markdown_file(self, markdown_file: str) -> None:
         """上传Markdown文件"""
         print("📤 上传Markdown文件...")
         
         # 点击文件上传按钮
-        self.page.get_by_test_id("upload_file_button").click()
-        self.page.wait_for_timeout(1000)
+        await self.page.get_by_test_id("upload_file_button").click()
+        await wait_visible(self.page.get_by_text("上传文件或图片"), "豆包上传菜单展开", timeout_ms=5000)
         
-        # 选择上传文件选项并上传文件
-        with self.page.expect_file_chooser() as page_upload_file:
-            self.page.get_by_text("上传文件或图片").click()
-        page_upload_file = page_upload_file.value
-        page_upload_file.set_files(markdown_file)
-        self.page.wait_for_timeout(1000)
+        # 选择上传文件选项并上传文件（上传是否完成在发送前通过发送按钮是否可用判断）
+        async with self.page.expect_file_chooser() as page_upload_file:
+            await self.page.get_by_text("上传文件或图片").click()
+        page_upload_file = await page_upload_file.value
+        await page_upload_file.set_files(markdown_file)
         
         print("✅ Markdown文件上传成功")
     
@@ -176,69 +207,44 @@ Your task:
    - the image must not include any other text, code snippets, logos, or watermarks
 6. Output only the final prompt in English. Do not include explanations. """
     
-    def _send_prompt_request(self, prompt_text: str) -> None:
-        """发送提示词生成请求"""
+    async def _send_prompt_request(self, prompt_text: str) -> ReplyResult:
+        """发送提示词生成请求，回复完成后返回"""
         print("💬 发送提示词生成请求...")
         
         # 点击聊天输入框
-        self.page.get_by_test_id("chat_input_input").click()
-        self.page.wait_for_timeout(500)
+        await self.page.get_by_test_id("chat_input_input").click()
         
         # 输入提示词
-        self.page.get_by_test_id("chat_input_input").fill(prompt_text)
-        self.page.wait_for_timeout(1000)
+        await self.page.get_by_test_id("chat_input_input").fill(prompt_text)
         
-        # 发送消息
-        self.page.get_by_test_id("chat_input_send_button").click()
-        print("✅ 提示词生成请求发送成功")
+        # 附件上传完成后发送按钮才可用
+        send_button = self.page.get_by_test_id("chat_input_send_button")
+        await wait_enabled(send_button, "豆包发送按钮可用（附件上传完成）", timeout_ms=60000)
         
-        # 等待AI回复
-        print("⏳ 等待AI回复（10秒）...")
-        self.page.wait_for_timeout(10000)
+        # 发送消息并等待回复完成（流式响应结束或回复正文不再变化时立即返回）
+        print("⏳ 发送提示词生成请求并等待AI回复...")
+        return await send_and_wait_reply(self.page, send_button.click, "生成文生图提示词")
     
-    def _fill_prompt_only(self, prompt_text: str) -> None:
+    async def _fill_prompt_only(self, prompt_text: str) -> None:
         """仅在聊天输入框中输入提示词，不发送"""
         print("💬 在聊天输入框中输入提示词...")
         
         # 点击聊天输入框
-        self.page.get_by_test_id("chat_input_input").click()
-        self.page.wait_for_timeout(500)
+        await self.page.get_by_test_id("chat_input_input").click()
         
         # 输入提示词
-        self.page.get_by_test_id("chat_input_input").fill(prompt_text)
-        self.page.wait_for_timeout(1000)
+        await self.page.get_by_test_id("chat_input_input").fill(prompt_text)
         
         print("✅ 提示词输入完成")
 
-    def _get_ai_response(self) -> Optional[str]:
-        """获取AI回复内容"""
-        try:
-            print("📋 获取AI回复内容...")
-            
-            # 点击复制按钮
-            # 等待复制按钮出现，超时时间为2分钟
-            try:
-                copy_button = self.page.get_by_test_id("message_action_copy")
-                copy_button.wait_for(timeout=120000)  # 等待2分钟
-                copy_button.click()
-                self.page.wait_for_timeout(1000)
-                
-                # 从剪贴板读取内容
-                prompt_result = pyperclip.paste().strip()
-                
-                if prompt_result:
-                    print("✅ AI回复获取成功")
-                    return prompt_result
-                else:
-                    print("⚠️  剪贴板内容为空")
-                    return None
-            except Exception as e:
-                print(f"⚠️  等待复制按钮超时或点击失败: {e}")
-                return None
-                
-        except Exception as e:
-            print(f"⚠️  获取AI回复时出错: {e}")
-            return None
+    async def _get_ai_response(self, reply: ReplyResult) -> Optional[str]:
+        """获取AI回复内容（send_and_wait_reply 已从聊天接口响应或页面读取，都失败时为None）"""
+        print("📋 获取AI回复内容...")
+        if reply.text:
+            print("✅ AI回复获取成功")
+            return reply.text
+        print("⚠️  AI回复内容为空")
+        return None
     
     def _save_prompt_to_file(self, prompt: str, markdown_file: str) -> None:
         """保存提示词到文件"""
@@ -257,66 +263,150 @@ Your task:
         except Exception as e:
             print(f"⚠️  保存提示词时出错: {e}")
     
-    def _switch_to_image_generation_skill(self) -> None:
+    async def _switch_to_image_generation_skill(self) -> None:
         """切换到图片生成技能"""
         print("🎯 切换到图片生成技能...")
         
         # 点击技能按钮
-        self.page.get_by_test_id("chat-input-all-skill-button").click()
-        self.page.wait_for_timeout(1000)
+        await self.page.get_by_test_id("chat-input-all-skill-button").click()
+        skill_button = self.page.get_by_role("dialog").get_by_test_id("skill_bar_button_3")
+        await wait_visible(skill_button, "豆包技能列表展开", timeout_ms=5000)
         
         # 选择图片生成技能
-        self.page.get_by_role("dialog").get_by_test_id("skill_bar_button_3").click()
-        self.page.wait_for_timeout(1000)
+        await skill_button.click()
+        await wait_visible(self.page.get_by_test_id("image-creation-chat-input-picture-ration-button"),
+                           "豆包图片生成技能就绪", timeout_ms=10000)
         
         print("✅ 图片生成技能切换成功")
     
-    def _set_image_aspect_ratio(self, aspect_ratio: str) -> None:
+    async def _set_image_aspect_ratio(self, aspect_ratio: str) -> None:
         """设置图片比例"""
         print(f"📐 设置图片比例为 {aspect_ratio}...")
         
         # 点击图片比例按钮
-        self.page.get_by_test_id("image-creation-chat-input-picture-ration-button").click()
-        self.page.wait_for_timeout(1000)
+        await self.page.get_by_test_id("image-creation-chat-input-picture-ration-button").click()
         
         # 选择比例
-        if aspect_ratio == "16:9":
-            self.page.get_by_text(":9 桌面壁纸，风景").click()
-        elif aspect_ratio == "1:1":
-            self.page.get_by_text(":1 社交媒体").click()
+        if aspect_ratio == "1:1":
+            ratio_option = self.page.get_by_text(":1 社交媒体")
         elif aspect_ratio == "4:3":
-            self.page.get_by_text(":3 传统照片").click()
+            ratio_option = self.page.get_by_text(":3 传统照片")
         else:
             # 默认选择16:9
-            self.page.get_by_text(":9 桌面壁纸，风景").click()
+            ratio_option = self.page.get_by_text(":9 桌面壁纸，风景")
+        await wait_visible(ratio_option, "豆包图片比例菜单展开", timeout_ms=5000)
+        await ratio_option.click()
         
-        self.page.wait_for_timeout(1000)
+        await wait_hidden(ratio_option, "豆包图片比例菜单关闭", timeout_ms=5000)
         print(f"✅ 图片比例 {aspect_ratio} 设置成功")
     
-    def _send_image_generation_request(self, prompt: str) -> None:
-        """发送图片生成请求"""
+    async def _send_image_generation_request(self, prompt: str) -> Tuple[float, int]:
+        """
+        发送图片生成请求
+
+        Returns:
+            (发送时间 time.perf_counter()，发送前已记录的聊天接口响应数量)
+        """
         print("🎨 发送图片生成请求...")
         print("正在点击发送按钮")
         # self.page.get_by_test_id("chat_input_input").locator("div").nth(1).click()
-        self.page.wait_for_timeout(500)
+        send_button = self.page.get_by_test_id("chat_input_send_button")
+        await wait_enabled(send_button, "豆包发送按钮可用", timeout_ms=10000)
         
         # 输入提示词
         # 这里也可以不用输入提示词，因为之前回答中已经包含了提示词，只需设置图片比例即可。
         # self.page.get_by_test_id("chat_input_input").fill(prompt)
         # self.page.wait_for_timeout(1000)
         
-        # 发送请求
-        self.page.get_by_test_id("chat_input_send_button").click()
+        # 发送请求（记录发送前的聊天接口响应数量，之后的第一个响应即本次图片生成的回复）
+        previous_responses = len(watch_chat_stream(self.page).responses)
+        sent_at = time.perf_counter()
+        await send_button.click()
         print("✅ 图片生成请求发送成功")
+        return sent_at, previous_responses
+    
+    async def _wait_for_image_urls(self, previous_responses: int) -> List[str]:
+        """
+        等待图片生成请求对应的聊天接口响应结束，从中读取生成图片的地址
+        
+        Args:
+            previous_responses: 发送请求前已记录的聊天接口响应数量
+            
+        Returns:
+            图片地址列表，没有捕获到响应或响应中没有图片地址时返回空列表
+        """
+        print("⏳ 等待图片生成完成（读取聊天接口响应）...")
+        recorder = watch_chat_stream(self.page)
+        if not await wait_until(lambda: len(recorder.responses) > previous_responses,
+                                "豆包图片生成响应开始", timeout_ms=30000):
+            return []
+        response = recorder.responses[previous_responses]
+        try:
+            with span("豆包AI.等待图片生成"):
+                await asyncio.wait_for(response.finished(), IMAGE_GENERATION_TIMEOUT_MS / 1000)
+            image_urls = parse_chat_stream_images(await response.text())
+        except Exception as e:
+            print(f"⚠️  读取图片生成响应失败: {e}")
+            return []
+        if image_urls:
+            print(f"🔗 从聊天接口响应中获取到 {len(image_urls)} 张图片地址")
+        else:
+            print("⚠️  聊天接口响应中没有图片地址")
+        return image_urls
     
-    def _wait_for_image_generation(self) -> None:
+    @timed("豆包AI.并发下载图片")
+    async def _fetch_generated_images(self, image_urls: List[str], sent_at: float) -> List[str]:
+        """
+        通过浏览器上下文的请求接口（共享页面的登录状态）同时下载所有生成的图片
+        
+        Args:
+            image_urls: 图片地址列表
+            sent_at: 发送图片生成请求的时间（time.perf_counter()），用于计算每张图片的耗时
+            
+        Returns:
+            下载成功的图片文件路径列表（按图片顺序）
+        """
+        print(f"📥 同时下载 {len(image_urls)} 张图片...")
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        
+        async def fetch(index: int, url: str) -> str:
+            with span(f"豆包AI.下载图片{index}") as current:
+                started = time.perf_counter()
+                response = await self.context.request.get(url, timeout=IMAGE_FETCH_TIMEOUT_MS)
+                if not response.ok:
+                    raise Exception(f"HTTP {response.status}")
+                content_type = response.headers.get("content-type", "").split(";")[0].strip()
+                ext = IMAGE_EXTENSIONS.get(content_type) or os.path.splitext(urlparse(url).path)[1] or ".png"
+                filename = f"doubao_generated_image_{index}_{timestamp}{ext}"
+                file_path = os.path.join(self.downloads_dir, filename)
+                body = await response.body()
+                with open(file_path, 'wb') as f:
+                    f.write(body)
+                latency = time.perf_counter() - sent_at
+                current.attributes.update(latency=latency, size=len(body))
+            print(f"✅ 图片 {index} 下载成功: {filename}（{len(body)} 字节，"
+                  f"下载 {time.perf_counter() - started:.1f}秒，发送请求后 {latency:.1f}秒）")
+            return file_path
+        
+        results = await asyncio.gather(*(fetch(i, url) for i, url in enumerate(image_urls, 1)), return_exceptions=True)
+        downloaded_files = []
+        for index, result in enumerate(results, 1):
+            if isinstance(result, BaseException):
+                print(f"⚠️  下载图片 {index} 时出错: {result}")
+            else:
+                downloaded_files.append(result)
+        return downloaded_files
+    
+    async def _wait_for_image_generation(self) -> None:
         """等待图片生成完成"""
         print("⏳ 等待图片生成完成...")
         print("这可能需要几十秒时间，请耐心等待...")
-        print("等待30秒")
-        self.page.wait_for_timeout(30000)  # 等待30秒
+        # 图片生成完成后消息中会出现下载按钮
+        download_button = self.page.get_by_test_id("message-list").get_by_role("button", name="下载")
+        await wait_visible(download_button, "豆包图片生成", timeout_ms=120000)
 
-    def _download_generated_images(self) -> List[str]:
+    @timed("豆包AI.下载图片")
+    async def _download_generated_images(self) -> List[str]:
         """下载生成的图片"""
         print("📥 开始下载生成的图片...")
         
@@ -324,15 +414,15 @@ Your task:
             # 查找下载按钮
             # 等待下载按钮出现，超时时间为1分钟
             print("等待下载按钮出现，超时时间为1分钟")
-            self.page.get_by_test_id("message-list").get_by_role("button", name="下载").wait_for(state="visible", timeout=60000)
+            await self.page.get_by_test_id("message-list").get_by_role("button", name="下载").wait_for(state="visible", timeout=60000)
             print("下载按钮出现")
             download_buttons = self.page.get_by_test_id("message-list").get_by_role("button", name="下载")
             
-            if download_buttons.count() == 0:
+            if await download_buttons.count() == 0:
                 print("⚠️  未找到下载按钮")
                 return []
             
-            print(f"✅ 找到 {download_buttons.count()} 个下载按钮")
+            print(f"✅ 找到 {await download_buttons.count()} 个下载按钮")
             
             # 设置下载事件监听器
             downloads = []
@@ -342,17 +432,19 @@ Your task:
                 print(f"📥 检测到下载: {download.suggested_filename}")
             
             self.page.on("download", handle_download)
-            
-            # 点击下载按钮
-            print("🖱️  点击下载按钮...")
-            download_buttons.first.click()
-            print("✅ 点击最终的下载按钮")
-            final_download_button = self.page.get_by_role("button", name="下载").nth(2)
-            final_download_button.click()
-            # 等待下载完成
-            print("⏳ 等待下载完成...")
-            self.page.wait_for_timeout(30000)  # 等待30秒
-            
+            try:
+                # 点击下载按钮
+                print("🖱️  点击下载按钮...")
+                await download_buttons.first.click()
+                print("✅ 点击最终的下载按钮")
+                final_download_button = self.page.get_by_role("button", name="下载").nth(2)
+                # 等待下载完成（监听器同时收集同一次点击触发的其他下载）
+                print("⏳ 等待下载完成...")
+                await wait_download(self.page, final_download_button.click, "豆包图片下载", timeout_ms=60000)
+            finally:
+                # 页面会被后续文章复用，无论下载是否成功都移除本次的下载监听器
+                self.page.remove_listener("download", handle_download)
+
             # 处理下载的文件
             downloaded_files = []
             if downloads:
@@ -367,7 +459,7 @@ Your task:
                         filename = f"doubao_generated_image_{i+1}_{timestamp}{ext}"
                         file_path = os.path.join(self.downloads_dir, filename)
                         
-                        download.save_as(file_path)
+                        await download.save_as(file_path)
                         file_size = os.path.getsize(file_path)
                         
                         downloaded_files.append(file_path)
@@ -385,7 +477,7 @@ Your task:
             print(f"⚠️  下载图片时出错: {e}")
             return []
 
-    def select_ai_mode(self, mode: str) -> bool:
+    async def select_ai_mode(self, mode: str) -> bool:
         """
         选择豆包AI的模式（极速、思考、超能）
         
@@ -395,99 +487,16 @@ Your task:
         Returns:
             bool: 是否成功选择指定模式
         """
-        # 验证输入参数
-        valid_modes = ['极速', '思考', '超能']
-        if mode not in valid_modes:
-            print(f"❌ 无效的模式参数: {mode}")
-            print(f"有效选项: {', '.join(valid_modes)}")
-            return False
-        
-        try:
-            print(f"🔄 正在选择豆包AI的'{mode}'模式...")
-            
-            # 方法1：通过文本内容定位指定模式按钮
-            try:
-                mode_button = self.page.get_by_text(mode, exact=True)
-                if mode_button.count() > 0:
-                    mode_button.click()
-                    self.page.wait_for_timeout(1000)
-                    print(f"✅ 通过文本定位成功选择'{mode}'模式")
-                    return True
-            except Exception as e1:
-                print(f"⚠️  方法1失败: {e1}")
-            
-            # 方法2：通过CSS类名和文本内容定位
-            try:
-                mode_button = self.page.locator(f"span.button-mE6AaR:has-text('{mode}')")
-                if mode_button.count() > 0:
-                    mode_button.click()
-                    self.page.wait_for_timeout(1000)
-                    print(f"✅ 通过CSS类名和文本内容定位成功选择'{mode}'模式")
-                    return True
-            except Exception as e2:
-                print(f"⚠️  方法2失败: {e2}")
-            
-            # 方法3：通过包含指定文本的span元素定位
-            try:
-                mode_button = self.page.locator(f"span:has-text('{mode}')")
-                if mode_button.count() > 0:
-                    # 过滤出具有button-mE6AaR类的元素
-                    for i in range(mode_button.count()):
-                        element = mode_button.nth(i)
-                        if "button-mE6AaR" in element.get_attribute("class", ""):
-                            element.click()
-                            self.page.wait_for_timeout(1000)
-                            print(f"✅ 通过span元素定位成功选择'{mode}'模式")
-                            return True
-            except Exception as e3:
-                print(f"⚠️  方法3失败: {e3}")
-            
-            # 方法4：通过tabindex属性定位（查找所有可点击的按钮）
-            try:
-                all_buttons = self.page.locator("span[tabindex='0']")
-                if all_buttons.count() > 0:
-                    for i in range(all_buttons.count()):
-                        button = all_buttons.nth(i)
-                        button_text = button.text_content()
-                        if button_text == mode:
-                            button.click()
-                            self.page.wait_for_timeout(1000)
-                            print(f"✅ 通过tabindex属性定位成功选择'{mode}'模式")
-                            return True
-            except Exception as e4:
-                print(f"⚠️  方法4失败: {e4}")
-            
-            # 方法5：兜底方案 - 查找所有包含指定文本的元素
-            try:
-                all_mode_elements = self.page.locator(f"*:has-text('{mode}')")
-                if all_mode_elements.count() > 0:
-                    # 遍历所有包含指定文本的元素，找到可点击的按钮
-                    for i in range(all_mode_elements.count()):
-                        element = all_mode_elements.nth(i)
-                        element_class = element.get_attribute("class", "")
-                        if "button-mE6AaR" in element_class or "button" in element_class:
-                            element.click()
-                            self.page.wait_for_timeout(1000)
-                            print(f"✅ 通过兜底方案成功选择'{mode}'模式")
-                            return True
-            except Exception as e5:
-                print(f"⚠️  方法5失败: {e5}")
-            
-            print(f"❌ 所有方法都无法找到'{mode}'模式按钮")
-            return False
-            
-        except Exception as e:
-            print(f"❌ 选择'{mode}'模式时出错: {e}")
-            return False
+        return await select_doubao_mode(self.page, mode)
 
-    def select_thinking_mode(self) -> bool:
+    async def select_thinking_mode(self) -> bool:
         """
         选择豆包AI的"思考"模式（向后兼容方法）
         
         Returns:
             bool: 是否成功选择思考模式
         """
-        return self.select_ai_mode("思考")
+        return await self.select_ai_mode("思考")
 
 
 def create_doubao_generator(page: Page, context: BrowserContext) -> DoubaoAIImageGenerator:
@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+"""
+豆包AI回复读取模块
+不经过系统剪贴板读取豆包AI的回复，多个豆包页面可以同时生成内容
+
+读取顺序：
+1. 页面DOM：最后一条 receive_message 消息中的正文节点（message_text_content）
+2. 网络响应：聊天接口（/samantha/chat/completion）返回的流式响应（SSE），需要在发送消息前调用 watch_chat_stream
+3. 系统剪贴板：点击复制按钮后读取剪贴板，仅在前两种方式都失败时使用（持有剪贴板锁，多个页面之间串行执行）
+
+send_and_wait_reply 发送消息后检测回复何时完成：聊天接口的流式响应结束、新回复出现复制按钮，
+或者（没有捕获到流式响应时）回复正文在一段时间内不再变化，三者任一满足即返回，不再固定等待复制按钮。
+每次调用的首字耗时（TTFT）和总耗时记录到运行时间线。
+
+图片生成的回复同样通过聊天接口返回，parse_chat_stream_images 从中提取生成图片的原图地址。
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterator, List, Optional
+from weakref import WeakKeyDictionary
+
+from playwright.async_api import Locator, Page, Response
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from run_timeline import span
+from wait_helpers import wait_until
+
+# 豆包AI回复消息和消息正文的 test-id
+RECEIVE_MESSAGE_TEST_ID = "receive_message"
+MESSAGE_TEXT_TEST_ID = "message_text_content"
+
+# 豆包聊天接口（流式响应）的URL片段
+CHAT_STREAM_URL_PART = "/samantha/chat/completion"
+
+# 图片生成回复中图片地址所在的字段，按优先级排列（原图优先，不使用缩略图）
+IMAGE_URL_KEYS = ("image_ori_raw", "image_ori", "image_raw")
+
+# 没有捕获到流式响应时，回复正文停止变化多久视为回复完成（毫秒）
+REPLY_QUIET_MS = 2000
+
+# 回复完成检测的轮询间隔（毫秒）
+REPLY_POLL_INTERVAL_MS = 100
+
+# 系统剪贴板全局只有一个，剪贴板兜底读取时"点击复制→读取剪贴板"必须串行执行
+CLIPBOARD_LOCK = asyncio.Lock()
+
+
+def _iter_texts(value: Any) -> Iterator[str]:
+    """递归查找事件中的 text 字段（豆包的事件数据中嵌套了JSON字符串）"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key == "text" and isinstance(item, str):
+                yield item
+            else:
+                yield from _iter_texts(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _iter_texts(item)
+    elif isinstance(value, str) and value[:1] in ("{", "["):
+        try:
+            yield from _iter_texts(json.loads(value))
+        except json.JSONDecodeError:
+            pass
+
+
+def parse_chat_stream(body: str) -> str:
+    """
+    从聊天接口的SSE响应中拼接回复正文
+
+    Args:
+        body: 响应内容（每个事件为一行 "data: {...}"）
+
+    Returns:
+        拼接后的回复正文（已去除首尾空白）
+    """
+    chunks: List[str] = []
+    for line in body.splitlines():
+        if not line.startswith("data:"):
+            continue
+        try:
+            event = json.loads(line[5:].strip())
+        except json.JSONDecodeError:
+            continue
+        chunks.extend(_iter_texts(event))
+    return "".join(chunks).strip()
+
+
+def _iter_image_urls(value: Any) -> Iterator[str]:
+    """递归查找事件中生成图片的地址（每张图片取 IMAGE_URL_KEYS 中优先级最高的一个）"""
+    if isinstance(value, dict):
+        for key in IMAGE_URL_KEYS:
+            image = value.get(key)
+            if isinstance(image, dict) and isinstance(image.get("url"), str):
+                yield image["url"]
+                return
+        for item in value.values():
+            yield from _iter_image_urls(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _iter_image_urls(item)
+    elif isinstance(value, str) and value[:1] in ("{", "["):
+        try:
+            yield from _iter_image_urls(json.loads(value))
+        except json.JSONDecodeError:
+            pass
+
+
+def parse_chat_stream_images(body: str) -> List[str]:
+    """
+    从聊天接口的SSE响应中提取生成图片的地址
+
+    Args:
+        body: 响应内容（每个事件为一行 "data: {...}"）
+
+    Returns:
+        图片地址列表（按出现顺序去重）
+    """
+    urls: List[str] = []
+    for line in body.splitlines():
+        if not line.startswith("data:"):
+            continue
+        try:
+            event = json.loads(line[5:].strip())
+        except json.JSONDecodeError:
+            continue
+        urls.extend(url for url in _iter_image_urls(event) if url not in urls)
+    return urls
+
+
+class ChatStreamRecorder:
+    """记录页面上豆包聊天接口的响应，用于从网络响应中读取回复"""
+
+    def __init__(self, page: Page):
+        """
+        开始监听页面的网络响应
+
+        Args:
+            page: 豆包AI聊天页面
+        """
+        self.responses: List[Response] = []
+        page.on("response", self._on_response)
+
+    def _on_response(self, response: Response) -> None:
+        if CHAT_STREAM_URL_PART in response.url:
+            self.responses.append(response)
+
+    async def last_reply(self) -> Optional[str]:
+        """读取最后一次聊天响应中的回复正文（响应结束后才返回），没有响应或解析失败时返回None"""
+        if not self.responses:
+            return None
+        try:
+            return parse_chat_stream(await self.responses[-1].text()) or None
+        except Exception as e:
+            print(f"⚠️  读取豆包聊天接口响应失败: {e}")
+            return None
+
+
+# 每个页面只注册一个监听器（连续处理多篇文章时复用同一个标签页）
+_recorders: "WeakKeyDictionary[Page, ChatStreamRecorder]" = WeakKeyDictionary()
+
+
+def watch_chat_stream(page: Page) -> ChatStreamRecorder:
+    """获取页面的聊天响应记录器，第一次调用时开始监听（应在发送消息前调用）"""
+    recorder = _recorders.get(page)
+    if recorder is None:
+        recorder = ChatStreamRecorder(page)
+        _recorders[page] = recorder
+    return recorder
+
+
+async def read_reply_from_dom(page: Page) -> Optional[str]:
+    """
+    从页面DOM读取最后一条AI回复的正文
+
+    Returns:
+        回复正文，没有回复消息时返回None
+    """
+    messages = page.get_by_test_id(RECEIVE_MESSAGE_TEST_ID)
+    if await messages.count() == 0:
+        return None
+    message = messages.last
+    content = message.get_by_test_id(MESSAGE_TEXT_TEST_ID)
+    if await content.count() > 0:
+        text = "\n".join(await content.all_inner_texts())
+    else:
+        text = await message.inner_text()
+    return text.strip() or None
+
+
+async def copy_reply_via_clipboard(page: Page, copy_button: Locator, timeout_ms: int = 1000) -> str:
+    """
+    点击复制按钮并从剪贴板读取AI回复内容（兜底方式，电脑锁屏时无法读取）
+
+    Args:
+        page: 豆包AI聊天页面
+        copy_button: 要点击的复制按钮
+        timeout_ms: 点击后等待剪贴板内容更新的最长时间（毫秒）
+
+    Returns:
+        剪贴板中的文本（已去除首尾空白）
+    """
+    import pyperclip
+
+    async with CLIPBOARD_LOCK:
+        previous = pyperclip.paste()
+        await copy_button.click()
+        await wait_until(lambda: pyperclip.paste() != previous, "剪贴板内容更新", timeout_ms=timeout_ms)
+        return pyperclip.paste().strip()
+
+
+async def read_doubao_reply(page: Page, copy_button: Optional[Locator] = None) -> Optional[str]:
+    """
+    读取最后一条豆包AI回复（调用前应等待回复完成）
+
+    Args:
+        page: 豆包AI聊天页面
+        copy_button: 剪贴板兜底读取时点击的复制按钮，为None时不使用剪贴板
+
+    Returns:
+        回复正文，全部方式都失败时返回None
+    """
+    try:
+        reply = await read_reply_from_dom(page)
+        if reply:
+            print("✅ 已从页面读取AI回复")
+            return reply
+    except Exception as e:
+        print(f"⚠️  从页面读取AI回复失败: {e}")
+
+    recorder = _recorders.get(page)
+    if recorder:
+        reply = await recorder.last_reply()
+        if reply:
+            print("✅ 已从聊天接口响应读取AI回复")
+            return reply
+
+    if copy_button is None:
+        return None
+    try:
+        print("🔄 从剪贴板读取AI回复...，注意：如果电脑锁屏了，则无法正常从剪贴板读取内容")
+        return await copy_reply_via_clipboard(page, copy_button) or None
+    except Exception as e:
+        print(f"⚠️  从剪贴板读取AI回复失败: {e}")
+        return None
+
+
+@dataclass
+class ReplyResult:
+    """一次豆包AI回复的内容和耗时"""
+    text: Optional[str]
+    ttft: Optional[float]  # 发送消息到回复正文出现的耗时（秒）
+    total: float  # 发送消息到回复完成的耗时（秒）
+    completed_by: str  # 判定回复完成的依据：stream_end / copy_button / dom_quiet
+
+
+async def send_and_wait_reply(page: Page, send: Callable[[], Awaitable[Any]], description: str,
+                              timeout_ms: float = 120000, quiet_ms: float = REPLY_QUIET_MS) -> ReplyResult:
+    """
+    发送消息并在回复完成后立即返回回复内容
+
+    回复完成的判定（任一满足即可）：
+    - 本次消息对应的聊天接口流式响应结束
+    - 新回复中出现复制按钮
+    - 没有捕获到流式响应，且回复正文已出现并在 quiet_ms 内不再变化
+
+    Args:
+        page: 豆包AI聊天页面
+        send: 发送消息的操作（例如发送按钮的 click）
+        description: 回复内容的描述，用于日志和运行时间线
+        timeout_ms: 等待回复完成的超时上限（毫秒）
+        quiet_ms: 回复正文停止变化多久视为完成（毫秒）
+
+    Returns:
+        ReplyResult，回复正文从聊天接口响应或页面读取，都读取失败时通过复制按钮从剪贴板兜底读取
+
+    Raises:
+        PlaywrightTimeoutError: 超时仍未完成时
+    """
+    recorder = watch_chat_stream(page)
+    messages = page.get_by_test_id(RECEIVE_MESSAGE_TEST_ID)
+    previous_messages = await messages.count()
+    previous_responses = len(recorder.responses)
+
+    with span(f"豆包AI回复.{description}", timeout_ms=timeout_ms) as current:
+        started = time.perf_counter()
+        await send()
+        deadline = started + timeout_ms / 1000
+        ttft: Optional[float] = None
+        stream_finished: Optional[asyncio.Task] = None
+        dom_text = ""
+        last_change = started
+        completed_by = None
+
+        while completed_by is None:
+            now = time.perf_counter()
+            if now >= deadline:
+                if stream_finished is not None:
+                    stream_finished.cancel()
+                print(f"❌ [豆包AI] {description} 回复超时（{now - started:.1f}秒）")
+                raise PlaywrightTimeoutError(f"豆包AI回复超时: {description}")
+
+            # 网络：本次消息对应的流式响应出现后等待其结束
+            if stream_finished is None and len(recorder.responses) > previous_responses:
+                stream_finished = asyncio.ensure_future(recorder.responses[-1].finished())
+
+            # 页面：新回复的正文出现时记录首字耗时，正文变化时更新最后变化时间
+            if await messages.count() > previous_messages:
+                message = messages.last
+                content = message.get_by_test_id(MESSAGE_TEXT_TEST_ID)
+                text = ("\n".join(await content.all_inner_texts()) if await content.count() > 0 else "").strip()
+                if text and ttft is None:
+                    ttft = now - started
+                if text != dom_text:
+                    dom_text, last_change = text, now
+                if await message.get_by_test_id("message_action_copy").count() > 0:
+                    completed_by = "copy_button"
+
+            if stream_finished is not None and stream_finished.done():
+                completed_by = "stream_end"
+            elif stream_finished is None and dom_text and (now - last_change) * 1000 >= quiet_ms:
+                completed_by = "dom_quiet"
+            if completed_by is None:
+                await asyncio.sleep(REPLY_POLL_INTERVAL_MS / 1000)
+
+        total = time.perf_counter() - started
+        if stream_finished is not None and not stream_finished.done():
+            stream_finished.cancel()
+        current.attributes.update(ttft=ttft, completed_by=completed_by)
+
+    # 流式响应结束时页面可能还在渲染最后一段正文，优先使用响应中的完整正文
+    text = None
+    if completed_by == "stream_end":
+        text = await recorder.last_reply()
+    if not text:
+        copy_buttons = messages.last.get_by_test_id("message_action_copy")
+        text = await read_doubao_reply(page, copy_buttons.last if await copy_buttons.count() > 0 else None)
+
+    ttft_text = f"{ttft:.1f}秒" if ttft is not None else "未检测到"
+    print(f"⏱️  [豆包AI] {description} 首字 {ttft_text}，完成 {total:.1f}秒（依据: {completed_by}）")
+    return ReplyResult(text, ttft, total, completed_by)
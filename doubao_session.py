@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+豆包AI页面池模块
+保留几个已加载好的豆包聊天页面，分配给各生成函数使用，每次使用前在页面内开始新对话，
+不再为每个问题重新打开豆包页面并等待整个单页应用加载完成。
+
+页面数量有上限（同时需要的页面超过上限时排队等待），每次开始新对话之间保持最小间隔，
+避免短时间内频繁打开页面触发豆包的人机验证。
+页面通过 BrowserSession 的页面池创建（doubao_1、doubao_2……），连续发布多篇文章时继续复用。
+
+用法：
+    async with get_doubao_session(session).tab("生成summary") as page_doubao:
+        ...
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Set
+from weakref import WeakKeyDictionary
+
+from playwright.async_api import Page
+
+from browser_session import BrowserSession
+from doubao_reply import RECEIVE_MESSAGE_TEST_ID, watch_chat_stream
+from run_timeline import span
+from wait_helpers import wait_hidden, wait_network_idle
+
+# 豆包AI聊天页面地址
+DOUBAO_CHAT_URL = "https://www.doubao.com/chat/"
+
+# 默认最多同时打开的豆包页面数量
+DEFAULT_MAX_TABS = 3
+
+# 默认两次开始新对话之间的最小间隔（秒）
+DEFAULT_MIN_INTERVAL_S = 2.0
+
+
+class DoubaoSession:
+    """已加载的豆包AI聊天页面池"""
+
+    def __init__(self, session: BrowserSession, max_tabs: int = DEFAULT_MAX_TABS,
+                 min_interval_s: float = DEFAULT_MIN_INTERVAL_S):
+        """
+        初始化页面池
+
+        Args:
+            session: 浏览器会话，豆包页面在其页面池中创建
+            max_tabs: 最多同时打开的豆包页面数量
+            min_interval_s: 两次开始新对话之间的最小间隔（秒）
+        """
+        self.session = session
+        self.max_tabs = max(1, max_tabs)
+        self.min_interval_s = min_interval_s
+        self._semaphore = asyncio.Semaphore(self.max_tabs)
+        self._idle: List[str] = []
+        self._fresh: Set[str] = set()
+        self._created = 0
+        self._rate_lock = asyncio.Lock()
+        self._last_start = 0.0
+
+    def _next_key(self) -> str:
+        """取一个空闲页面，没有时分配新页面的名称"""
+        if self._idle:
+            return self._idle.pop()
+        self._created += 1
+        return f"doubao_{self._created}"
+
+    async def _throttle(self) -> None:
+        """保证两次开始新对话之间的最小间隔"""
+        async with self._rate_lock:
+            wait_s = self._last_start + self.min_interval_s - time.monotonic()
+            if wait_s > 0:
+                print(f"⏳ 豆包AI限速，等待 {wait_s:.1f}秒后开始新对话")
+                await asyncio.sleep(wait_s)
+            self._last_start = time.monotonic()
+
+    async def _load(self, key: str, page: Page) -> None:
+        """打开豆包聊天页面并等待加载完成，加载后的页面本身就是新对话"""
+        print(f"🌐 [{key}] 打开豆包AI聊天页面...")
+        await page.goto(DOUBAO_CHAT_URL)
+        await wait_network_idle(page, "豆包AI页面加载", timeout_ms=30000)
+        self._fresh.add(key)
+
+    async def _new_conversation(self, key: str, page: Page) -> None:
+        """在已加载的页面中开始新对话，找不到新对话按钮或页面已离开豆包时重新打开页面"""
+        if key in self._fresh and page.url.startswith(DOUBAO_CHAT_URL):
+            return
+        await self._throttle()
+        if not page.url.startswith(DOUBAO_CHAT_URL):
+            await self._load(key, page)
+            return
+        new_chat = page.get_by_test_id("create_conversation_button").or_(page.get_by_role("button", name="新对话"))
+        if await new_chat.count() == 0:
+            print(f"⚠️  [{key}] 未找到新对话按钮，重新打开豆包AI页面")
+            await self._load(key, page)
+            return
+        await new_chat.first.click()
+        # 新对话中没有历史消息
+        if not await wait_hidden(page.get_by_test_id(RECEIVE_MESSAGE_TEST_ID), "豆包AI新对话", timeout_ms=5000):
+            await self._load(key, page)
+            return
+        print(f"✅ [{key}] 已在豆包AI页面中开始新对话")
+
+    async def warm_up(self, count: int = 1) -> None:
+        """
+        预先打开并加载豆包页面（例如在下载钉钉文档的同时），出错时只打印警告
+
+        Args:
+            count: 需要准备的空闲页面数量（不超过页面数量上限）
+        """
+        try:
+            count = min(count, self.max_tabs) - len(self._idle)
+            for _ in range(max(0, count)):
+                async with self._semaphore:
+                    key = self._next_key()
+                    try:
+                        page = await self.session.page(key)
+                        watch_chat_stream(page)
+                        await self._throttle()
+                        await self._load(key, page)
+                    finally:
+                        self._idle.append(key)
+        except Exception as e:
+            print(f"⚠️  预先加载豆包AI页面失败: {e}")
+
+    @asynccontextmanager
+    async def tab(self, purpose: str) -> AsyncIterator[Page]:
+        """
+        获取一个已开始新对话的豆包页面，使用结束后放回页面池
+
+        Args:
+            purpose: 页面用途，用于日志和运行时间线
+
+        Yields:
+            豆包AI聊天页面
+        """
+        async with self._semaphore:
+            key = self._next_key()
+            try:
+                with span(f"豆包AI.准备页面.{purpose}", tab=key):
+                    page = await self.session.page(key)
+                    watch_chat_stream(page)
+                    await self._new_conversation(key, page)
+                self._fresh.discard(key)
+                yield page
+            finally:
+                self._idle.append(key)
+
+
+# 每个浏览器会话一个页面池
+_doubao_sessions: "WeakKeyDictionary[BrowserSession, DoubaoSession]" = WeakKeyDictionary()
+
+
+def get_doubao_session(session: BrowserSession) -> DoubaoSession:
+    """获取浏览器会话对应的豆包页面池，第一次调用时创建"""
+    doubao = _doubao_sessions.get(session)
+    if doubao is None:
+        doubao = DoubaoSession(session)
+        _doubao_sessions[session] = doubao
+    return doubao
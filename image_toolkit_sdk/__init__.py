@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Image Toolkit SDK
+
+发布流程使用的图片处理工具包。
+
+主要功能：
+- 目标大小编码：在内存中查找放得下的最高JPEG质量和最大尺寸，只把最终结果写入磁盘
+- 不透明的图片输出JPEG，用到透明度的图片输出PNG
+- 低内存处理：JPEG按需要的尺寸缩小解码，其他格式解码后整数倍缩小，缩放尝试复用同一份缩小的工作副本，记录每张图片的内存峰值
+- 封面图评分：清晰度、对比度、色彩丰富度、文字区域和近似重复检测，向量化计算，挑选最适合的候选图
+- 各平台图片变体：按平台要求裁剪宽高比、限制尺寸和大小，进程池并行编码，按内容寻址缓存
+- Markdown正文图片预处理：同时下载/读取正文图片，压缩超过平台限制的图片并上传图床，改写各平台副本中的链接
+
+作者: tornadoami
+版本: 1.0.0
+"""
+
+from .cover_scorer import (
+    CoverScore,
+    pick_cover,
+    score_covers,
+)
+from .encoder import (
+    EncodeResult,
+    encode_image,
+    encode_to_target_size,
+    has_transparency,
+    load_reduced,
+    prepare_image,
+)
+from .markdown_images import (
+    PLATFORM_MARKDOWN_IMAGE_LIMITS,
+    ImageRef,
+    find_image_refs,
+    prepare_platform_markdown,
+)
+from .memory import (
+    PeakRSS,
+    peak_rss,
+)
+from .variants import (
+    PLATFORM_IMAGE_VARIANTS,
+    VariantSpec,
+    build_jobs,
+    build_variants,
+    variants_for_platforms,
+)
+
+__version__ = "1.0.0"
+__author__ = "tornadoami"
+
+# 导出主要函数
+__all__ = [
+    'CoverScore',
+    'pick_cover',
+    'score_covers',
+    'EncodeResult',
+    'encode_image',
+    'encode_to_target_size',
+    'has_transparency',
+    'load_reduced',
+    'prepare_image',
+    'PLATFORM_MARKDOWN_IMAGE_LIMITS',
+    'ImageRef',
+    'find_image_refs',
+    'prepare_platform_markdown',
+    'PeakRSS',
+    'peak_rss',
+    'PLATFORM_IMAGE_VARIANTS',
+    'VariantSpec',
+    'build_jobs',
+    'build_variants',
+    'variants_for_platforms',
+]
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+封面图自动挑选
+豆包AI每次生成4张候选图，按画面质量打分挑选最适合作为封面图的一张，几十毫秒即可完成。
+
+所有候选图缩小到同一尺寸后堆叠为一个NumPy数组，各项指标对所有候选图一次性向量化计算：
+- 清晰度：灰度图拉普拉斯算子响应的方差（模糊的图片方差小），只统计非文字区域，文字笔画的强边缘不计入清晰度
+- 对比度：灰度的标准差
+- 色彩丰富度：Hasler–Süsstrunk 色彩丰富度（红绿、黄蓝对立通道的标准差与均值）
+- 文字区域：把图片分成小块，边缘密度高且横竖笔画都多的块视为文字（AI生成图片中的文字常是乱码），按占比扣分
+- 近似重复：感知哈希（32x32灰度图DCT低频8x8与中位数比较得到64位），汉明距离很小的候选图视为重复，只保留得分高的一张
+
+得分 = 各指标按参考值归一化到0~1后加权求和 - min(文字区域占比 / TEXT_RATIO_REF, 1) × TEXT_PENALTY。
+扣分上限等于其他指标的满分之和，文字区域达到 TEXT_RATIO_REF 的候选图得分不会高于任何没有文字的候选图。
+
+使用方法：
+    from image_toolkit_sdk import score_covers
+    scores = score_covers(image_files)
+    cover_image = scores[0].path
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .encoder import REDUCING_GAP, load_reduced
+
+# 打分时统一缩小到的尺寸（宽, 高），均为32的倍数，便于按块计算
+SCORE_SIZE = (320, 192)
+
+# 各指标归一化的参考值（达到参考值即记满分）
+SHARPNESS_REF = 100.0
+CONTRAST_REF = 64.0
+COLORFULNESS_REF = 80.0
+
+# 各指标的权重
+SHARPNESS_WEIGHT = 0.4
+CONTRAST_WEIGHT = 0.3
+COLORFULNESS_WEIGHT = 0.3
+
+# 文字区域占比达到 TEXT_RATIO_REF 时扣除 TEXT_PENALTY（各指标权重之和），不足时按比例扣分
+TEXT_RATIO_REF = 0.05
+TEXT_PENALTY = SHARPNESS_WEIGHT + CONTRAST_WEIGHT + COLORFULNESS_WEIGHT
+
+# 文字区域检测的块大小、边缘阈值（灰度差）和块内边缘像素占比阈值
+TEXT_BLOCK = 16
+TEXT_EDGE_THRESHOLD = 20.0
+TEXT_EDGE_DENSITY = 0.15
+
+# 文字块中横向与纵向边缘数量之比的下限（文字横竖笔画都有，单向条纹不算；
+# 小字号文字缩小后主要剩下沿文字行方向的边缘，下限不能太高）
+TEXT_BALANCE = 0.2
+
+# 感知哈希汉明距离不超过该值视为近似重复（共64位）
+DUPLICATE_DISTANCE = 10
+
+_HASH_SIZE = 32
+_HASH_LOW = 8
+
+
+@dataclass
+class CoverScore:
+    """候选封面图的得分"""
+    path: str
+    score: float
+    sharpness: float
+    contrast: float
+    colorfulness: float
+    text_ratio: float
+    phash: str
+    # 与得分更高的某张候选图近似重复时为该图片的路径
+    duplicate_of: Optional[str] = None
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """n点DCT-II的正交变换矩阵"""
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+_DCT = _dct_matrix(_HASH_SIZE)
+
+
+def _load_one(path: str) -> Optional[np.ndarray]:
+    """读取一张候选图并缩小到 SCORE_SIZE，无法读取时返回None"""
+    try:
+        # JPEG直接按1/2、1/4……解码，其他格式解码后立即整数倍缩小
+        source = load_reduced(Image.open(path), (int(SCORE_SIZE[0] * REDUCING_GAP), int(SCORE_SIZE[1] * REDUCING_GAP)))
+        # 先缩小再转换色彩模式，调色板图片无法插值缩放，需要先转换
+        if source.mode not in ("RGB", "RGBA", "L"):
+            source = source.convert("RGB")
+        small = source.resize(SCORE_SIZE, Image.Resampling.BILINEAR, reducing_gap=REDUCING_GAP).convert("RGB")
+    except Exception as e:
+        print(f"⚠️  无法读取候选封面图，跳过: {path} ({e})")
+        return None
+    return np.asarray(small, dtype=np.float32)
+
+
+def _load(paths: Sequence[str]) -> Tuple[List[str], np.ndarray]:
+    """并行读取候选图（Pillow解码时释放GIL），返回 (可读取的路径, (N, 高, 宽, 3) 的float32数组)"""
+    with ThreadPoolExecutor(max_workers=max(1, len(paths))) as pool:
+        arrays = list(pool.map(_load_one, paths))
+    loaded = [path for path, array in zip(paths, arrays) if array is not None]
+    arrays = [array for array in arrays if array is not None]
+    if not arrays:
+        return loaded, np.empty((0, SCORE_SIZE[1], SCORE_SIZE[0], 3), dtype=np.float32)
+    return loaded, np.stack(arrays)
+
+
+def _perceptual_hashes(gray: np.ndarray) -> np.ndarray:
+    """感知哈希，返回 (N, 64) 的布尔数组"""
+    n, height, width = gray.shape
+    blocks = gray.reshape(n, _HASH_SIZE, height // _HASH_SIZE, _HASH_SIZE, width // _HASH_SIZE).mean(axis=(2, 4))
+    low = np.einsum("ij,njk,lk->nil", _DCT, blocks, _DCT)[:, :_HASH_LOW, :_HASH_LOW].reshape(n, -1)
+    # 直流分量只反映整体亮度，不参与中位数
+    return low > np.median(low[:, 1:], axis=1, keepdims=True)
+
+
+def _text_blocks(gray: np.ndarray) -> np.ndarray:
+    """文字块，返回 (N, 行数, 列数) 的布尔数组"""
+    n, height, width = gray.shape
+    horizontal = np.abs(np.diff(gray, axis=2))[:, :-1, :] > TEXT_EDGE_THRESHOLD
+    vertical = np.abs(np.diff(gray, axis=1))[:, :, :-1] > TEXT_EDGE_THRESHOLD
+    rows, cols = (height - 1) // TEXT_BLOCK, (width - 1) // TEXT_BLOCK
+
+    def block_counts(edges: np.ndarray) -> np.ndarray:
+        edges = edges[:, :rows * TEXT_BLOCK, :cols * TEXT_BLOCK]
+        return edges.reshape(n, rows, TEXT_BLOCK, cols, TEXT_BLOCK).sum(axis=(2, 4), dtype=np.float32)
+
+    h_count, v_count = block_counts(horizontal), block_counts(vertical)
+    density = (h_count + v_count) / (2 * TEXT_BLOCK * TEXT_BLOCK)
+    balance = np.minimum(h_count, v_count) / np.maximum(np.maximum(h_count, v_count), 1)
+    return (density > TEXT_EDGE_DENSITY) & (balance > TEXT_BALANCE)
+
+
+def _sharpness(gray: np.ndarray, text_blocks: np.ndarray) -> np.ndarray:
+    """非文字区域的拉普拉斯响应方差，全部是文字块时为0"""
+    n, rows, cols = text_blocks.shape
+    laplacian = (4 * gray[:, 1:-1, 1:-1] - gray[:, :-2, 1:-1] - gray[:, 2:, 1:-1]
+                 - gray[:, 1:-1, :-2] - gray[:, 1:-1, 2:])[:, :rows * TEXT_BLOCK, :cols * TEXT_BLOCK]
+    mask = np.repeat(np.repeat(~text_blocks, TEXT_BLOCK, axis=1), TEXT_BLOCK, axis=2)
+    count = np.maximum(mask.sum(axis=(1, 2)), 1)
+    mean = (laplacian * mask).sum(axis=(1, 2)) / count
+    return (((laplacian - mean[:, None, None]) ** 2) * mask).sum(axis=(1, 2)) / count
+
+
+def score_covers(paths: Sequence[str]) -> List[CoverScore]:
+    """
+    为候选封面图打分
+
+    Args:
+        paths: 候选图片路径
+
+    Returns:
+        可读取的候选图的得分，按得分从高到低排列；近似重复的候选图标记 duplicate_of 并排在最后
+    """
+    loaded, images = _load(paths)
+    if not loaded:
+        return []
+
+    red, green, blue = images[..., 0], images[..., 1], images[..., 2]
+    gray = 0.299 * red + 0.587 * green + 0.114 * blue
+
+    text_blocks = _text_blocks(gray)
+    text_ratio = text_blocks.mean(axis=(1, 2))
+    sharpness = _sharpness(gray, text_blocks)
+    contrast = gray.std(axis=(1, 2))
+    rg = red - green
+    yb = 0.5 * (red + green) - blue
+    colorfulness = (np.sqrt(rg.std(axis=(1, 2)) ** 2 + yb.std(axis=(1, 2)) ** 2)
+                    + 0.3 * np.sqrt(rg.mean(axis=(1, 2)) ** 2 + yb.mean(axis=(1, 2)) ** 2))
+
+    scores = (SHARPNESS_WEIGHT * np.minimum(sharpness / SHARPNESS_REF, 1)
+              + CONTRAST_WEIGHT * np.minimum(contrast / CONTRAST_REF, 1)
+              + COLORFULNESS_WEIGHT * np.minimum(colorfulness / COLORFULNESS_REF, 1)
+              - TEXT_PENALTY * np.minimum(text_ratio / TEXT_RATIO_REF, 1))
+
+    hashes = _perceptual_hashes(gray)
+    distances = (hashes[:, None, :] != hashes[None, :, :]).sum(axis=2)
+
+    order = np.argsort(-scores, kind="stable")
+    results = []
+    kept: List[int] = []
+    for index in order:
+        duplicate = next((other for other in kept if distances[index, other] <= DUPLICATE_DISTANCE), None)
+        if duplicate is None:
+            kept.append(index)
+        bits = np.packbits(hashes[index]).tobytes().hex()
+        results.append(CoverScore(path=loaded[index], score=round(float(scores[index]), 4),
+                                  sharpness=round(float(sharpness[index]), 2),
+                                  contrast=round(float(contrast[index]), 2),
+                                  colorfulness=round(float(colorfulness[index]), 2),
+                                  text_ratio=round(float(text_ratio[index]), 4), phash=bits,
+                                  duplicate_of=loaded[duplicate] if duplicate is not None else None))
+    results.sort(key=lambda item: item.duplicate_of is not None)
+    return results
+
+
+def pick_cover(paths: Sequence[str]) -> Optional[str]:
+    """挑选得分最高的候选封面图，都无法读取时返回None"""
+    scores = score_covers([path for path in paths if os.path.exists(path) and os.path.getsize(path) > 0])
+    return scores[0].path if scores else None
@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+"""
+目标大小图片编码
+把图片编码到不超过指定字节数：先查找放得下的最高JPEG质量，质量降到下限仍放不下时再查找缩放比例。
+每次尝试都编码到内存缓冲区，只有最终结果写入磁盘。
+
+输出格式：
+- 图片实际用到透明度时输出PNG（无损，只查找缩放比例）
+- 否则转换为RGB并输出JPEG，同样大小的照片类封面图比PNG小得多
+
+查找方式：
+- 在已知大小的两个端点之间按大小插值选下一次尝试的值（缩放比例按"大小与像素数成正比"插值），
+  插值结果太靠近端点时改为二分，放得下且达到限制的 FILL_RATIO 时即停止，通常两三次编码即可确定结果
+- JPEG尝试时使用不带 optimize/progressive 的快速编码，最终结果再用 optimize/progressive 编码一次
+  （只会更小，仍在限制内）
+
+内存占用：
+- 已知需要的尺寸时（例如限制了最大宽度的变体），JPEG通过 draft 直接按1/2、1/4、1/8解码，
+  其他格式解码后立即 reduce 整数倍缩小，不保留全尺寸位图
+- 色彩模式已符合要求时不复制图片
+- 某个缩放比例放不下后，之后尝试的比例都更小：用 reduce 生成一份缩小的工作副本代替全尺寸位图，
+  之后的尝试都从工作副本缩放，全尺寸位图随即释放
+- 每张图片处理期间的内存峰值记录在 EncodeResult.peak_rss 中
+
+使用方法：
+    from image_toolkit_sdk import encode_to_target_size
+    result = encode_to_target_size("cover.png", max_bytes=5 * 1024 * 1024)
+    print(result.path, result.size, result.encodes)
+"""
+
+import io
+import math
+import os
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from PIL import Image
+
+from .memory import PeakRSS
+
+# JPEG质量的查找范围
+MAX_QUALITY = 90
+MIN_QUALITY = 60
+
+# 缩放比例的查找范围
+MIN_SCALE = 0.3
+
+# 缩放比例查找的精度（区间小于该值时停止）
+SCALE_TOLERANCE = 0.02
+
+# JPEG质量查找的精度
+QUALITY_TOLERANCE = 2
+
+# 插值时瞄准的大小（限制的比例，留出余量使第一次尝试大概率放得下）
+TARGET_RATIO = 0.95
+
+# 放得下且达到限制的该比例时不再继续查找（再查找只能多保留几个百分点）
+FILL_RATIO = 0.9
+
+# PNG压缩级别（0-9，大图上9比6慢但几乎不会更小）
+PNG_COMPRESS_LEVEL = 6
+
+# 缩小时先用 reduce 整数倍缩小到目标尺寸的该倍数以上，再用LANCZOS精确缩放（与Pillow的 reducing_gap 相同，
+# 2倍以上时与直接从全尺寸缩放几乎看不出差别）
+REDUCING_GAP = 2.0
+
+# 支持 reduce 的色彩模式
+_REDUCIBLE_MODES = ("L", "LA", "RGB", "RGBA", "RGBa", "La", "CMYK", "YCbCr", "I", "F")
+
+
+@dataclass
+class EncodeResult:
+    """编码结果"""
+    path: str
+    format: str
+    size: int
+    width: int
+    height: int
+    scale: float
+    quality: Optional[int]
+    encodes: int
+    fits: bool
+    # 处理这张图片期间的进程内存峰值（字节），无法获取时为None
+    peak_rss: Optional[int] = None
+
+
+def has_transparency(img: Image.Image) -> bool:
+    """图片是否实际用到了透明度（RGBA图片的alpha通道全为255时视为不透明）"""
+    if img.mode in ("RGBA", "LA"):
+        return img.getchannel("A").getextrema()[0] < 255
+    if img.mode == "P":
+        return "transparency" in img.info
+    return False
+
+
+def load_reduced(source: Image.Image, min_size: Optional[Tuple[int, int]] = None) -> Image.Image:
+    """
+    解码已打开的图片，按需要的最小尺寸尽量少占内存
+
+    JPEG通过 draft 在解码时直接缩小（1/2、1/4、1/8），其他格式（PNG、WebP……）解码后立即 reduce 整数倍缩小；
+    结果的宽高都不小于 min_size。
+
+    Args:
+        source: Image.open 返回的图片（尚未解码）
+        min_size: 之后处理需要的最小尺寸（宽, 高），None 表示需要全尺寸
+
+    Returns:
+        已解码的图片
+    """
+    if min_size:
+        source.draft(None, min_size)
+    source.load()
+    if min_size and source.mode in _REDUCIBLE_MODES:
+        factor = min(source.width // max(1, min_size[0]), source.height // max(1, min_size[1]))
+        if factor >= 2:
+            return source.reduce(factor)
+    return source
+
+
+class _Encoder:
+    """在内存中编码，记录编码次数"""
+
+    def __init__(self, img: Image.Image, fmt: str):
+        self.img = img
+        self.fmt = fmt
+        self.encodes = 0
+        # 缩放比例相对于传入图片的尺寸计算，工作副本缩小后仍按原尺寸换算
+        self.width, self.height = img.size
+        self._resized: Optional[Tuple[float, Image.Image]] = None
+
+    def size_at(self, scale: float) -> Tuple[int, int]:
+        """缩放后的尺寸"""
+        return max(1, round(self.width * scale)), max(1, round(self.height * scale))
+
+    def shrink_to(self, max_scale: float) -> None:
+        """之后的缩放比例都不超过 max_scale：把工作副本 reduce 到够用的尺寸，释放更大的位图"""
+        factor = int(self.img.width / (self.width * max_scale * REDUCING_GAP))
+        if factor >= 2:
+            self.img = self.img.reduce(factor)
+        if self._resized and self._resized[0] > max_scale:
+            self._resized = None
+
+    def resized(self, scale: float) -> Image.Image:
+        """按比例缩放（连续以同一比例编码时只缩放一次）"""
+        if self._resized is None or self._resized[0] != scale:
+            size = self.size_at(scale)
+            img = self.img if size == self.img.size else self.img.resize(size, Image.Resampling.LANCZOS,
+                                                                          reducing_gap=REDUCING_GAP)
+            self._resized = (scale, img)
+        return self._resized[1]
+
+    def encode(self, scale: float, quality: Optional[int], final: bool = False) -> bytes:
+        """
+        编码到内存缓冲区
+
+        Args:
+            final: 最终结果，JPEG使用 optimize/progressive（更小但编码慢几倍）
+        """
+        self.encodes += 1
+        buffer = io.BytesIO()
+        img = self.resized(scale)
+        if self.fmt == "JPEG":
+            img.save(buffer, "JPEG", quality=quality, optimize=final, progressive=final)
+        else:
+            img.save(buffer, "PNG", compress_level=PNG_COMPRESS_LEVEL)
+        return buffer.getvalue()
+
+
+def _search(lo: Tuple[float, float], hi: Tuple[float, float], measure: Callable[[float], float],
+            target: float, limit: float, tolerance: float, floor: float) -> Optional[float]:
+    """
+    查找测量值不超过 limit 的最大取值（取值越小测量值越小）
+
+    Args:
+        lo: (取值, 测量值) 区间下端，放得下或是插值模型的零点
+        hi: (取值, 测量值) 区间上端，已知放不下
+        measure: 取值 → 测量值（已按插值模型变换，例如缩放比例对应大小的平方根）
+        target: 插值瞄准的测量值（略小于 limit）
+        limit: 测量值上限
+        tolerance: 区间小于该值时停止
+        floor: 最小取值，该值也放不下时停止查找
+
+    Returns:
+        放得下的最大取值，没有放得下的取值时返回None
+    """
+    best = None
+    (lo_value, lo_measure), (hi_value, hi_measure) = lo, hi
+    while hi_value - lo_value > tolerance:
+        probe = lo_value + (hi_value - lo_value) * (target - lo_measure) / max(hi_measure - lo_measure, 1e-9)
+        # 插值结果太靠近端点时改为二分，避免每次只前进一点
+        if not lo_value + tolerance / 2 <= probe <= hi_value - tolerance / 2:
+            probe = (lo_value + hi_value) / 2
+        probe = max(probe, floor)
+        value = measure(probe)
+        if value <= limit:
+            best, lo_value, lo_measure = probe, probe, value
+            if value >= FILL_RATIO * limit:
+                break
+        elif probe <= floor:
+            break
+        else:
+            hi_value, hi_measure = probe, value
+    return best
+
+
+def prepare_image(img: Image.Image, fmt: str = "auto") -> Tuple[Image.Image, str]:
+    """
+    确定输出格式并转换色彩模式
+
+    Args:
+        img: 已加载的图片
+        fmt: "auto"（用到透明度时为PNG，否则为JPEG）、"JPEG" 或 "PNG"
+
+    Returns:
+        (转换后的图片, 输出格式)；强制输出JPEG的透明图片铺在白色背景上
+    """
+    transparent = has_transparency(img)
+    if fmt == "auto":
+        fmt = "PNG" if transparent else "JPEG"
+    mode = "RGBA" if fmt == "PNG" and transparent else "RGB"
+    if img.mode == mode:
+        return img, fmt
+    if fmt == "JPEG" and transparent:
+        rgba = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background, fmt
+    return img.convert(mode), fmt
+
+
+def encode_image(img: Image.Image, fmt: str, max_bytes: int, max_quality: int = MAX_QUALITY,
+                 min_quality: int = MIN_QUALITY, min_scale: float = MIN_SCALE,
+                 full_size_hint: Optional[int] = None) -> Tuple[bytes, EncodeResult]:
+    """
+    在内存中把图片编码到不超过 max_bytes
+
+    Args:
+        img: 已按 prepare_image 转换的图片
+        fmt: 输出格式（"JPEG" 或 "PNG"）
+        max_bytes: 最大字节数
+        max_quality: JPEG的最高质量
+        min_quality: JPEG的最低质量，降到该质量仍放不下时开始缩小尺寸
+        min_scale: 最小缩放比例
+        full_size_hint: PNG原尺寸编码大小的估计值（例如原PNG文件的大小），超过限制时不必先编码一次原尺寸
+
+    Returns:
+        (编码结果, EncodeResult)；EncodeResult.path 为空字符串，写入磁盘后由调用方填写
+    """
+    return _encode(_Encoder(img, fmt), max_bytes, max_quality, min_quality, min_scale, full_size_hint)
+
+
+def _encode(encoder: _Encoder, max_bytes: int, max_quality: int, min_quality: int, min_scale: float,
+            full_size_hint: Optional[int]) -> Tuple[bytes, EncodeResult]:
+    """
+    encode_image 的实现
+
+    调用方持有的图片引用会使全尺寸位图无法释放，需要控制内存时由调用方构造 _Encoder 后不再保留图片引用。
+    """
+    fmt = encoder.fmt
+    sizes: Dict[Tuple[float, Optional[int]], int] = {}
+
+    def measure(scale: float, quality: Optional[int]) -> int:
+        if (scale, quality) not in sizes:
+            sizes[(scale, quality)] = len(encoder.encode(scale, quality))
+        return sizes[(scale, quality)]
+
+    quality = max_quality if fmt == "JPEG" else None
+    scale = 1.0
+    if fmt == "JPEG":
+        # 原尺寸下查找放得下的最高质量
+        full_size = measure(1.0, max_quality)
+        if full_size > max_bytes:
+            quality = min_quality
+            full_size = measure(1.0, min_quality)
+            if FILL_RATIO * max_bytes > full_size:
+                best = _search((min_quality, full_size), (max_quality, sizes[(1.0, max_quality)]),
+                               lambda q: measure(1.0, round(q)), TARGET_RATIO * max_bytes, max_bytes,
+                               QUALITY_TOLERANCE, min_quality)
+                if best is not None:
+                    quality = round(best)
+                    full_size = sizes[(1.0, quality)]
+    else:
+        full_size = full_size_hint or 0
+        if full_size <= max_bytes:
+            full_size = measure(1.0, None)
+    fits = full_size <= max_bytes
+
+    def measure_scale(scale: float) -> float:
+        size = measure(round(scale, 4), quality)
+        if size > max_bytes:
+            # 放不下时之后尝试的比例都更小，缩小工作副本
+            encoder.shrink_to(round(scale, 4))
+        return math.sqrt(size)
+
+    if not fits:
+        # 缩小尺寸：编码大小与像素数（缩放比例的平方）近似成正比，按大小的平方根插值
+        encoder.shrink_to(1.0)
+        best = _search((0.0, 0.0), (1.0, math.sqrt(full_size)), measure_scale,
+                       math.sqrt(TARGET_RATIO * max_bytes), math.sqrt(max_bytes), SCALE_TOLERANCE, min_scale)
+        if best is not None:
+            scale, fits = round(best, 4), True
+        else:
+            scale = round(min_scale, 4)
+
+    data = encoder.encode(scale, quality, final=True)
+    width, height = encoder.size_at(scale)
+    return data, EncodeResult(path="", format=fmt, size=len(data), width=width, height=height,
+                              scale=scale, quality=quality, encodes=encoder.encodes, fits=fits)
+
+
+def encode_to_target_size(image_path: str, max_bytes: int, output_path: Optional[str] = None,
+                          max_quality: int = MAX_QUALITY, min_quality: int = MIN_QUALITY,
+                          min_scale: float = MIN_SCALE) -> EncodeResult:
+    """
+    把图片编码到不超过 max_bytes
+
+    Args:
+        image_path: 原始图片路径
+        max_bytes: 最大字节数
+        output_path: 输出路径，默认为原文件名加 _compressed 后缀（扩展名按输出格式）
+        max_quality: JPEG的最高质量
+        min_quality: JPEG的最低质量，降到该质量仍放不下时开始缩小尺寸
+        min_scale: 最小缩放比例
+
+    Returns:
+        EncodeResult；fits 为 False 表示最小尺寸下仍超过限制，返回的是最小的结果
+    """
+    with PeakRSS() as rss:
+        source = Image.open(image_path)
+        # 原图就是PNG时原尺寸的编码大小与原文件相近
+        hint = os.path.getsize(image_path) if source.format == "PNG" else None
+        # 单帧图片解码后Pillow即关闭文件；图片只由编码器持有，工作副本缩小后全尺寸位图即可释放
+        encoder = _Encoder(*prepare_image(load_reduced(source)))
+        del source
+        if output_path is None:
+            name, _ = os.path.splitext(image_path)
+            output_path = f"{name}_compressed.{'png' if encoder.fmt == 'PNG' else 'jpg'}"
+        data, result = _encode(encoder, max_bytes, max_quality, min_quality, min_scale, hint)
+        with open(output_path, 'wb') as f:
+            f.write(data)
+    result.path = output_path
+    result.peak_rss = rss.peak
+    return result
@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown正文图片预处理
+从钉钉文档导出的Markdown中，封面图和正文图片都是阿里云OSS上的原图，导入CSDN、51CTO、博客园、知乎、mdnice时
+由平台转存；图片过大时有的平台转存失败，有的要等很久。本地编写的Markdown引用的本地图片平台则无法读取。
+
+prepare_platform_markdown 为每个平台生成一份专用副本：
+- 解析正文中的图片引用（Markdown图片语法和 <img> 标签，忽略代码块），同时下载或读取所有图片
+- 超过该平台大小限制的图片在进程池中压缩（与封面图变体共用 build_jobs）
+- 压缩后的图片和本地图片上传到图床，副本中的链接改为图床地址；其余图片保持原链接，
+  副本与原文件不在同一目录，没有改写的相对路径图片链接改为绝对路径
+- 图床有大小限制（host_max_bytes）时，上传的图片同时压缩到该限制以内
+- 下载的原图按内容的SHA-256保存，URL → 原图、图片内容哈希 → 图床地址的对应关系记录在缓存目录的 index.json 中，
+  重复运行时不再下载、压缩和上传
+
+使用方法：
+    from image_toolkit_sdk import prepare_platform_markdown
+    paths = prepare_platform_markdown({"zhihu": "article.md", "csdn": "51CTO_article.md"}, host=upload)
+    print(paths.get("zhihu", "article.md"))
+"""
+
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+import requests
+from PIL import Image
+
+from .variants import VariantSpec, build_jobs, file_sha256
+
+# 默认的缓存目录（原图、压缩后的图片、index.json）
+DEFAULT_MARKDOWN_IMAGE_CACHE_DIR = os.path.join("test-results", "markdown_images")
+
+# 各平台专用Markdown副本的保存目录（每个平台一个子目录，文件名与原文件相同）
+DEFAULT_PLATFORM_MARKDOWN_DIR = os.path.join("test-results", "platform_markdown")
+
+# 各平台正文图片的大小限制（字节，取各平台编辑器上传限制的保守值）
+PLATFORM_MARKDOWN_IMAGE_LIMITS: Dict[str, int] = {
+    'mdnice': 5 * 1024 * 1024,
+    'zhihu': 5 * 1024 * 1024,
+    'csdn': 5 * 1024 * 1024,
+    '51cto': 5 * 1024 * 1024,
+    'cnblogs': 5 * 1024 * 1024,
+}
+
+# 同时下载/上传的图片数量
+FETCH_WORKERS = 8
+
+# 下载单张图片的超时时间（秒）
+FETCH_TIMEOUT_S = 30
+
+_CODE = re.compile(r"```.*?```|~~~.*?~~~|`[^`\n]*`", re.S)
+_MARKDOWN_IMAGE = re.compile(r"!\[[^\]]*\]\(\s*(?:<([^<>\n]+)>|([^)\s<>]+))(?:\s+[\"'][^\"']*[\"'])?\s*\)")
+_SCHEME = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*:")
+_HTML_IMAGE = re.compile(r"<img\b[^>]*?\bsrc\s*=\s*[\"']([^\"']+)[\"']", re.I)
+
+
+@dataclass
+class ImageRef:
+    """正文中的一处图片引用"""
+    src: str
+    # 图片地址在正文中的起止位置（替换链接时使用）
+    start: int
+    end: int
+    # 链接写在尖括号中（Markdown图片语法，地址中可以有空格）
+    angle_brackets: bool = False
+    # <img> 标签
+    html: bool = False
+
+
+def find_image_refs(content: str) -> List[ImageRef]:
+    """
+    解析Markdown正文中的图片引用（代码块和行内代码中的除外）
+
+    Returns:
+        按出现位置排列的图片引用，data: URI 不包含在内
+    """
+    code_spans = [match.span() for match in _CODE.finditer(content)]
+    refs = []
+    for pattern in (_MARKDOWN_IMAGE, _HTML_IMAGE):
+        for match in pattern.finditer(content):
+            group = 1 if match.group(1) is not None else 2
+            start, end = match.span(group)
+            src = match.group(group)
+            if src.startswith("data:") or any(low <= start < high for low, high in code_spans):
+                continue
+            refs.append(ImageRef(src=src, start=start, end=end, angle_brackets=pattern is _MARKDOWN_IMAGE and group == 1,
+                                 html=pattern is _HTML_IMAGE))
+    refs.sort(key=lambda ref: ref.start)
+    return refs
+
+
+def _is_remote(src: str) -> bool:
+    return urlparse(src).scheme in ("http", "https")
+
+
+def _is_relative(src: str) -> bool:
+    """相对路径的本地图片（不含URL和绝对路径，Windows盘符如 D:/ 视为绝对路径）"""
+    return not _SCHEME.match(src) and not os.path.isabs(unquote(src))
+
+
+def _absolute_link(ref: ImageRef, base_dir: str) -> str:
+    """相对路径图片链接对应的绝对路径，Markdown图片语法中含空格或括号时加上尖括号"""
+    path = os.path.abspath(os.path.join(base_dir, unquote(ref.src)))
+    if not ref.html and not ref.angle_brackets and re.search(r"[\s()]", path):
+        return f"<{path}>"
+    return path
+
+
+def _compressible(path: str) -> bool:
+    """图片能否重新编码（动图和Pillow无法读取的格式如SVG保持原样）"""
+    try:
+        with Image.open(path) as img:
+            return not getattr(img, "is_animated", False)
+    except Exception:
+        return False
+
+
+class _ImageIndex:
+    """URL → 下载的原图、图片内容哈希 → 图床地址（多线程共用）"""
+
+    def __init__(self, cache_dir: str):
+        self.path = os.path.join(cache_dir, "index.json")
+        self.lock = threading.Lock()
+        self.data: Dict[str, Dict[str, str]] = {"urls": {}, "hosted": {}}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data.update(json.load(f))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️  读取正文图片缓存索引失败，重新记录: {e}")
+
+    def get(self, table: str, key: str) -> Optional[str]:
+        with self.lock:
+            return self.data[table].get(key)
+
+    def put(self, table: str, key: str, value: str) -> None:
+        with self.lock:
+            self.data[table][key] = value
+
+    def save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with self.lock, open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"⚠️  保存正文图片缓存索引失败: {e}")
+
+
+def _download(url: str, cache_dir: str, index: _ImageIndex) -> Optional[str]:
+    """下载远程图片，按内容的SHA-256保存，已下载过的URL直接使用缓存"""
+    cached = index.get("urls", url)
+    if cached and os.path.exists(cached):
+        return cached
+    try:
+        response = requests.get(url, timeout=FETCH_TIMEOUT_S)
+        response.raise_for_status()
+    except Exception as e:
+        print(f"⚠️  下载正文图片失败，保持原链接: {url} ({e})")
+        return None
+    data = response.content
+    digest = hashlib.sha256(data).hexdigest()
+    extension = os.path.splitext(urlparse(url).path)[1].lower()
+    if not extension:
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+        extension = mimetypes.guess_extension(content_type) or ""
+    path = os.path.join(cache_dir, "sources", digest[:2], f"{digest}{extension}")
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    index.put("urls", url, path)
+    return path
+
+
+def _fetch(src: str, base_dir: str, cache_dir: str, index: _ImageIndex) -> Optional[str]:
+    """获取图片的本地路径：远程图片下载到缓存目录，本地图片按Markdown文件所在目录解析相对路径"""
+    if _is_remote(src):
+        return _download(src, cache_dir, index)
+    path = unquote(src)
+    if not os.path.isabs(path):
+        path = os.path.join(base_dir, path)
+    if os.path.exists(path):
+        return path
+    print(f"⚠️  正文图片不存在，保持原链接: {src}")
+    return None
+
+
+def _host(path: str, host: Callable[[str], str], index: _ImageIndex) -> Optional[str]:
+    """上传图片到图床，内容相同的图片只上传一次"""
+    digest = file_sha256(path)
+    cached = index.get("hosted", digest)
+    if cached:
+        return cached
+    try:
+        url = host(path)
+    except Exception as e:
+        print(f"⚠️  上传正文图片到图床失败，保持原链接: {path} ({e})")
+        return None
+    index.put("hosted", digest, url)
+    return url
+
+
+def prepare_platform_markdown(markdown_files: Dict[str, str], host: Optional[Callable[[str], str]],
+                              limits: Optional[Dict[str, int]] = None, host_max_bytes: Optional[int] = None,
+                              cache_dir: str = DEFAULT_MARKDOWN_IMAGE_CACHE_DIR,
+                              output_dir: str = DEFAULT_PLATFORM_MARKDOWN_DIR) -> Dict[str, str]:
+    """
+    为各平台生成正文图片符合大小限制的Markdown副本
+
+    Args:
+        markdown_files: 平台 → 该平台使用的Markdown文件
+        host: 上传图片并返回图床地址的函数，None 时只检查不改写
+        limits: 平台 → 正文图片大小限制（字节），默认为 PLATFORM_MARKDOWN_IMAGE_LIMITS
+        host_max_bytes: 图床接受的最大图片大小（字节），None 表示不限制
+        cache_dir: 缓存目录
+        output_dir: 副本保存目录
+
+    Returns:
+        平台 → 专用副本路径，只包含有链接需要改写的平台
+    """
+    limits = limits or PLATFORM_MARKDOWN_IMAGE_LIMITS
+    index = _ImageIndex(cache_dir)
+    contents: Dict[str, str] = {}
+    refs: Dict[str, List[ImageRef]] = {}
+    for markdown_file in set(markdown_files.values()):
+        with open(markdown_file, 'r', encoding='utf-8') as f:
+            contents[markdown_file] = f.read()
+        refs[markdown_file] = find_image_refs(contents[markdown_file])
+
+    # 同时下载或读取所有图片
+    sources = {(os.path.dirname(os.path.abspath(markdown_file)), ref.src)
+               for markdown_file, file_refs in refs.items() for ref in file_refs}
+    if not sources:
+        return {}
+    print(f"🖼️  正文中共引用 {len(sources)} 张图片，开始下载/读取...")
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        fetched = dict(zip(sources, pool.map(lambda item: _fetch(item[1], item[0], cache_dir, index), sources)))
+
+    compressible: Dict[str, bool] = {}
+
+    def is_compressible(path: str) -> bool:
+        if path not in compressible:
+            compressible[path] = _compressible(path)
+        return compressible[path]
+
+    # 各平台需要处理的图片：超过大小限制的压缩，本地图片（平台无法读取）上传图床
+    # 平台 → [(图片引用, (原图路径, 压缩到的大小限制，0表示不压缩))]
+    plans: Dict[str, List[Tuple[ImageRef, Tuple[str, int]]]] = {}
+    for platform, markdown_file in markdown_files.items():
+        base_dir = os.path.dirname(os.path.abspath(markdown_file))
+        limit = limits.get(platform)
+        if limit is None:
+            continue
+        for ref in refs[markdown_file]:
+            path = fetched.get((base_dir, ref.src))
+            if not path:
+                continue
+            size = os.path.getsize(path)
+            oversized = size > limit
+            if oversized and not is_compressible(path):
+                print(f"⚠️  正文图片超过{platform}的大小限制但无法压缩（动图或矢量图），保持原样: {ref.src}")
+                oversized = False
+            if oversized or not _is_remote(ref.src):
+                # 要上传到图床的图片同时不能超过图床的限制
+                budget = min(limit, host_max_bytes) if host_max_bytes else limit
+                compress = size > budget and is_compressible(path)
+                plans.setdefault(platform, []).append((ref, (path, budget if compress else 0)))
+
+    targets = {target for plan in plans.values() for _, target in plan}
+    if not targets:
+        index.save()
+        print("✅ 正文图片都符合各平台的大小限制")
+        return {}
+    if host is None:
+        index.save()
+        print(f"⚠️  有 {len(targets)} 张正文图片超过平台限制或为本地图片，未配置图床，保持原链接")
+        return {}
+
+    # 压缩超过限制的图片（所有图片共用一个进程池），再同时上传到图床
+    jobs = sorted(target for target in targets if target[1])
+    compressed = dict(zip(jobs, build_jobs(
+        [(path, VariantSpec(f"正文图片≤{limit / (1024 * 1024):g}MB", max_bytes=limit)) for path, limit in jobs],
+        cache_dir=os.path.join(cache_dir, "compressed"))))
+    finals = {target: compressed.get(target, target[0]) for target in targets}
+    uploads = sorted(set(finals.values()))
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        hosted = dict(zip(uploads, pool.map(lambda path: _host(path, host, index), uploads)))
+    index.save()
+
+    # 改写各平台副本中的链接（从后往前替换，前面的位置不受影响）
+    outputs = {}
+    for platform, plan in plans.items():
+        markdown_file = markdown_files[platform]
+        content = contents[markdown_file]
+        hosted_links = {ref.start: hosted.get(finals[target]) for ref, target in plan}
+        hosted_links = {start: url for start, url in hosted_links.items() if url}
+        if not hosted_links:
+            continue
+        # 副本不在原文件所在目录，没有改写的相对路径链接改为绝对路径
+        base_dir = os.path.dirname(os.path.abspath(markdown_file))
+        links = []
+        for ref in refs[markdown_file]:
+            if ref.start in hosted_links:
+                links.append((ref, hosted_links[ref.start]))
+            elif _is_relative(ref.src):
+                links.append((ref, _absolute_link(ref, base_dir)))
+        for ref, link in reversed(links):
+            content = content[:ref.start] + link + content[ref.end:]
+        output_path = os.path.join(output_dir, platform, os.path.basename(markdown_file))
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        outputs[platform] = output_path
+        print(f"✅ [{platform}] 已改写 {len(hosted_links)} 处正文图片链接: {output_path}")
+    return outputs
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+进程内存峰值
+批量发布时同一个进程依次处理多张封面图，用每张图片处理期间的常驻内存峰值（peak RSS）确认内存没有随图片数量增长。
+
+- Linux：处理前向 /proc/self/clear_refs 写入 "5" 重置峰值，处理后读取 /proc/self/status 的 VmHWM，得到本次处理的峰值
+- macOS 等其他类Unix系统：resource.getrusage 的 ru_maxrss（进程启动以来的峰值，无法重置）
+- Windows：GetProcessMemoryInfo 的 PeakWorkingSetSize（进程启动以来的峰值，无法重置）
+
+使用方法：
+    with PeakRSS() as rss:
+        encode_to_target_size(...)
+    print(rss.peak, rss.since_reset)
+"""
+
+import os
+import sys
+from typing import Optional
+
+_CLEAR_REFS = "/proc/self/clear_refs"
+_STATUS = "/proc/self/status"
+
+
+def reset_peak_rss() -> bool:
+    """重置进程的内存峰值（仅Linux支持），返回是否成功"""
+    try:
+        with open(_CLEAR_REFS, 'w') as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _windows_peak_rss() -> Optional[int]:
+    """Windows 进程的峰值工作集（字节）"""
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    handle = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+        return None
+    return counters.PeakWorkingSetSize
+
+
+def peak_rss() -> Optional[int]:
+    """进程的常驻内存峰值（字节），无法获取时返回None"""
+    try:
+        if os.path.exists(_STATUS):
+            with open(_STATUS, 'r') as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) * 1024
+        if sys.platform == "win32":
+            return _windows_peak_rss()
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS 的单位是字节，其他系统是KB
+        return peak if sys.platform == "darwin" else peak * 1024
+    except Exception:
+        return None
+
+
+class PeakRSS:
+    """记录一段处理期间的内存峰值"""
+
+    def __init__(self):
+        self.peak: Optional[int] = None
+        # 峰值是否只统计了这段处理（进入时成功重置了峰值）
+        self.since_reset = False
+
+    def __enter__(self) -> "PeakRSS":
+        self.since_reset = reset_peak_rss()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.peak = peak_rss()
+
+    def describe(self) -> str:
+        """用于日志的描述，例如 "内存峰值 182.4MB" """
+        if self.peak is None:
+            return "内存峰值未知"
+        scope = "" if self.since_reset else "（进程启动以来）"
+        return f"内存峰值{scope} {self.peak / (1024 * 1024):.1f}MB"
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+各平台图片变体
+各平台对封面图的格式、大小和宽高比要求不同（微信公众号永久素材10MB，文章封面16:9，
+图文笔记3:4或1:1），build_variants 从一张原图生成所需的全部变体。
+
+- 每个变体按 VariantSpec 居中裁剪到指定宽高比、限制最大宽度，再用 encode_image 编码到不超过 max_bytes
+- 变体保存在按内容寻址的缓存目录中，键为原图内容的SHA-256与变体参数的哈希，重复运行时直接使用缓存，不再编码
+- 缓存未命中的变体超过一个时在进程池中并行编码（Pillow编码受GIL限制，线程无法并行）；
+  build_jobs 可以把多张原图的变体放进同一个进程池
+
+使用方法：
+    from image_toolkit_sdk import build_variants, variants_for_platforms
+    paths = build_variants("cover.png", variants_for_platforms(["wechat", "zhihu", "xiaohongshu_newspic"]))
+    print(paths["cover_16x9"])
+"""
+
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from .encoder import (MAX_QUALITY, MIN_QUALITY, MIN_SCALE, REDUCING_GAP, EncodeResult, _encode, _Encoder,
+                      load_reduced, prepare_image)
+from .memory import PeakRSS
+
+# 默认的变体缓存目录
+DEFAULT_VARIANT_CACHE_DIR = os.path.join("test-results", "image_variants")
+
+# 变体生成规则的版本，修改裁剪或编码方式后递增，使旧缓存失效
+VARIANT_VERSION = 2
+
+# 读取原图计算哈希时的块大小
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+_EXTENSIONS = {"JPEG": "jpg", "PNG": "png"}
+
+
+@dataclass(frozen=True)
+class VariantSpec:
+    """图片变体的要求"""
+    name: str
+    # "auto"（用到透明度时为PNG，否则为JPEG）、"JPEG" 或 "PNG"
+    format: str = "auto"
+    # (宽, 高)，居中裁剪到该宽高比，None 表示保持原图比例
+    aspect_ratio: Optional[Tuple[int, int]] = None
+    # 最大宽度（像素），None 表示不限制
+    max_width: Optional[int] = None
+    max_bytes: int = 5 * 1024 * 1024
+
+    def cache_key(self) -> str:
+        """变体参数的哈希（不含名称，参数相同的变体共用缓存）"""
+        params = asdict(self)
+        params.pop("name")
+        params["version"] = VARIANT_VERSION
+        return hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# 预置的变体
+WECHAT_MATERIAL = VariantSpec("wechat_material", max_bytes=10 * 1024 * 1024)
+COVER_16X9 = VariantSpec("cover_16x9", aspect_ratio=(16, 9), max_width=1920)
+NEWSPIC_3X4 = VariantSpec("newspic_3x4", aspect_ratio=(3, 4), max_width=1242)
+NEWSPIC_1X1 = VariantSpec("newspic_1x1", aspect_ratio=(1, 1), max_width=1080)
+
+# 各平台使用的封面图变体
+PLATFORM_IMAGE_VARIANTS: Dict[str, VariantSpec] = {
+    'wechat': WECHAT_MATERIAL,
+    'zhihu': COVER_16X9,
+    'csdn': COVER_16X9,
+    'cnblogs': COVER_16X9,
+    'bilibili_newspic': COVER_16X9,
+    'xiaohongshu_newspic': NEWSPIC_3X4,
+    'douyin_newspic': NEWSPIC_3X4,
+    'kuaishou_newspic': NEWSPIC_1X1,
+}
+
+
+def variants_for_platforms(platforms: Iterable[str]) -> List[VariantSpec]:
+    """指定平台需要的变体（去重，保持平台顺序），没有封面图的平台忽略"""
+    specs = {}
+    for platform in platforms:
+        spec = PLATFORM_IMAGE_VARIANTS.get(platform)
+        if spec:
+            specs[spec.name] = spec
+    return list(specs.values())
+
+
+def file_sha256(path: str) -> str:
+    """文件内容的SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def crop_box(size: Tuple[int, int], aspect_ratio: Tuple[int, int]) -> Tuple[int, int, int, int]:
+    """居中裁剪到指定宽高比的裁剪框"""
+    width, height = size
+    ratio_w, ratio_h = aspect_ratio
+    if width * ratio_h > height * ratio_w:
+        new_width = max(1, round(height * ratio_w / ratio_h))
+        left = (width - new_width) // 2
+        return left, 0, left + new_width, height
+    if width * ratio_h < height * ratio_w:
+        new_height = max(1, round(width * ratio_h / ratio_w))
+        top = (height - new_height) // 2
+        return 0, top, width, top + new_height
+    return 0, 0, width, height
+
+
+def center_crop(img: Image.Image, aspect_ratio: Tuple[int, int]) -> Image.Image:
+    """居中裁剪到指定宽高比（比例已相同时返回原图）"""
+    box = crop_box(img.size, aspect_ratio)
+    return img if box == (0, 0, img.width, img.height) else img.crop(box)
+
+
+def _decode_size(size: Tuple[int, int], spec: VariantSpec) -> Optional[Tuple[int, int]]:
+    """变体需要的最小解码尺寸（限制了最大宽度时按 REDUCING_GAP 留出余量），需要全尺寸时返回None"""
+    if not spec.max_width:
+        return None
+    box = crop_box(size, spec.aspect_ratio) if spec.aspect_ratio else (0, 0) + tuple(size)
+    ratio = spec.max_width * REDUCING_GAP / (box[2] - box[0])
+    if ratio >= 1:
+        return None
+    return math.ceil(size[0] * ratio), math.ceil(size[1] * ratio)
+
+
+def _build_variant(source_path: str, spec: VariantSpec, output_base: str) -> EncodeResult:
+    """
+    生成一个变体并写入 output_base + 扩展名（在进程池中执行，必须是模块级函数）
+
+    先写入临时文件再重命名，中断时缓存目录中不会留下不完整的文件。
+    JPEG原图按变体需要的尺寸直接缩小解码，裁剪和缩放一步完成，之后只由编码器持有图片。
+    """
+    with PeakRSS() as rss:
+        source = Image.open(source_path)
+        img, fmt = prepare_image(load_reduced(source, _decode_size(source.size, spec)), spec.format)
+        del source
+        box = crop_box(img.size, spec.aspect_ratio) if spec.aspect_ratio else (0, 0, img.width, img.height)
+        width, height = box[2] - box[0], box[3] - box[1]
+        if spec.max_width and width > spec.max_width:
+            # 裁剪和缩放一步完成，不生成裁剪后的全尺寸副本
+            size = (spec.max_width, max(1, round(height * spec.max_width / width)))
+            img = img.resize(size, Image.Resampling.LANCZOS, box=box, reducing_gap=REDUCING_GAP)
+        elif box != (0, 0, img.width, img.height):
+            img = img.crop(box)
+        encoder = _Encoder(img, fmt)
+        del img
+        data, result = _encode(encoder, spec.max_bytes, MAX_QUALITY, MIN_QUALITY, MIN_SCALE, None)
+        del encoder
+        output_path = f"{output_base}.{_EXTENSIONS[fmt]}"
+        tmp_path = f"{output_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, output_path)
+    result.path = output_path
+    result.peak_rss = rss.peak
+    return result
+
+
+def _cached_path(output_base: str) -> Optional[str]:
+    """缓存中已有的变体文件"""
+    for extension in _EXTENSIONS.values():
+        path = f"{output_base}.{extension}"
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def build_jobs(jobs: Sequence[Tuple[str, VariantSpec]], cache_dir: str = DEFAULT_VARIANT_CACHE_DIR,
+               max_workers: Optional[int] = None) -> List[str]:
+    """
+    生成多张原图的变体（所有缓存未命中的任务共用一个进程池）
+
+    Args:
+        jobs: [(原图路径, 变体要求)]
+        cache_dir: 变体缓存目录
+        max_workers: 进程池大小，默认为缓存未命中的任务数与CPU核数中的较小值
+
+    Returns:
+        与 jobs 顺序对应的变体文件路径
+    """
+    source_hashes: Dict[str, str] = {}
+    paths: List[Optional[str]] = []
+    # 输出路径 → (任务序号列表, 原图路径, 变体要求)，相同的任务只生成一次
+    missing: Dict[str, Tuple[List[int], str, VariantSpec]] = {}
+    for index, (source_path, spec) in enumerate(jobs):
+        if source_path not in source_hashes:
+            source_hashes[source_path] = file_sha256(source_path)
+        key = hashlib.sha256(f"{source_hashes[source_path]}:{spec.cache_key()}".encode("utf-8")).hexdigest()
+        output_base = os.path.join(cache_dir, key[:2], key)
+        cached = _cached_path(output_base)
+        paths.append(cached)
+        if cached:
+            print(f"♻️  图片变体 {spec.name} 使用缓存: {cached}")
+        elif output_base in missing:
+            missing[output_base][0].append(index)
+        else:
+            os.makedirs(os.path.dirname(output_base), exist_ok=True)
+            missing[output_base] = ([index], source_path, spec)
+
+    if len(missing) == 1:
+        (_, source_path, spec), = missing.values()
+        results = [_build_variant(source_path, spec, next(iter(missing)))]
+    elif missing:
+        workers = max_workers or min(len(missing), os.cpu_count() or 1)
+        # 使用spawn：发布流程中有其他线程在运行，fork出的子进程可能继承被占用的锁
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [pool.submit(_build_variant, source_path, spec, output_base)
+                       for output_base, (_, source_path, spec) in missing.items()]
+            results = [future.result() for future in futures]
+    else:
+        results = []
+
+    for (indexes, source_path, spec), result in zip(missing.values(), results):
+        quality_text = f"，质量: {result.quality}" if result.quality else ""
+        warning = "" if result.fits else "（最小尺寸下仍超过限制）"
+        memory_text = f"，内存峰值 {result.peak_rss / (1024 * 1024):.1f}MB" if result.peak_rss else ""
+        print(f"🖼️  图片变体 {spec.name}（{os.path.basename(source_path)}）: {result.width}x{result.height} "
+              f"{result.format}，{result.size / (1024 * 1024):.2f}MB{quality_text}{memory_text}{warning}")
+        for index in indexes:
+            paths[index] = result.path
+    return paths
+
+
+def build_variants(source_path: str, specs: Sequence[VariantSpec], cache_dir: str = DEFAULT_VARIANT_CACHE_DIR,
+                   max_workers: Optional[int] = None) -> Dict[str, str]:
+    """
+    从一张原图生成多个变体
+
+    Args:
+        source_path: 原图路径
+        specs: 变体要求
+        cache_dir: 变体缓存目录
+        max_workers: 进程池大小，默认为缓存未命中的变体数与CPU核数中的较小值
+
+    Returns:
+        变体名称 → 文件路径
+    """
+    paths = build_jobs([(source_path, spec) for spec in specs], cache_dir, max_workers)
+    return {spec.name: path for spec, path in zip(specs, paths)}
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+元素定位策略缓存模块
+页面改版后同一个元素往往需要准备多种定位方式（test-id、文本、CSS类名、aria-label……），
+逐个尝试时每个失败的方式都要等到超时才尝试下一个。
+
+resolve_locator 同时等待所有候选定位方式，有一个找到元素后再检查排在它前面的候选方式当前是否可见，
+按候选顺序采用第一个可见的方式；匹配范围较宽的兜底方式只在所有候选方式都失败后才尝试。
+上次成功的定位方式保存在 test-results/locator_cache.json 中（按站点和元素），下次先单独尝试该方式，
+通常一次查询即可定位，只有它在短时间内没有出现时才同时尝试其余方式。
+
+用法：
+    await click_first("zhihu", "写文章", {
+        "精确文本": lambda: page.get_by_text("写文章", exact=True),
+        "类名": lambda: page.locator("div.css-hv22zf"),
+    })
+"""
+
+import asyncio
+import json
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+from playwright.async_api import Locator
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from run_timeline import span
+
+# 定位策略缓存文件
+LOCATOR_CACHE_FILE = os.path.join("test-results", "locator_cache.json")
+
+# 单独尝试上次成功的定位方式的时间，超过后同时尝试其余方式（毫秒）
+CACHED_HEAD_START_MS = 1500
+
+# 默认定位超时时间（毫秒）
+DEFAULT_LOCATE_TIMEOUT_MS = 10000
+
+
+class LocatorCache:
+    """按站点和元素保存上次成功的定位方式"""
+
+    def __init__(self, path: str = LOCATOR_CACHE_FILE):
+        """
+        Args:
+            path: 缓存文件路径
+        """
+        self.path = path
+        self.strategies: Dict[str, Dict[str, str]] = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.strategies = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️  读取定位策略缓存失败，重新记录: {e}")
+
+    def get(self, site: str, element: str) -> Optional[str]:
+        """上次成功的定位方式名称，没有记录时返回None"""
+        return self.strategies.get(site, {}).get(element)
+
+    def put(self, site: str, element: str, strategy: str) -> None:
+        """记录成功的定位方式并保存（与已有记录相同时不写文件）"""
+        if self.get(site, element) == strategy:
+            return
+        self.strategies.setdefault(site, {})[element] = strategy
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.strategies, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"⚠️  保存定位策略缓存失败: {e}")
+
+
+# 各发布流程共享的缓存实例
+_default_cache: Optional[LocatorCache] = None
+
+
+def get_locator_cache() -> LocatorCache:
+    """获取共享的缓存实例"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = LocatorCache()
+    return _default_cache
+
+
+async def first_visible(names: List[str], locators: Dict[str, Locator]) -> Optional[str]:
+    """按顺序返回第一个当前可见的定位方式名称，都不可见时返回None"""
+    for name in names:
+        try:
+            if await locators[name].is_visible():
+                return name
+        except Exception:
+            continue
+    return None
+
+
+async def resolve_locator(site: str, element: str, candidates: Dict[str, Callable[[], Locator]],
+                          timeout_ms: float = DEFAULT_LOCATE_TIMEOUT_MS,
+                          fallbacks: Optional[Dict[str, Callable[[], Locator]]] = None) -> Tuple[str, Locator]:
+    """
+    从多个候选定位方式中找到可见的元素
+
+    上次成功的定位方式先单独尝试 CACHED_HEAD_START_MS，未出现时同时等待所有候选方式。
+    某个方式找到元素后，再用 is_visible() 检查排在它前面的方式，按候选顺序采用第一个可见的方式，
+    避免先出现的宽泛定位方式抢先（并被缓存）。
+
+    Args:
+        site: 站点名称（缓存的第一级键）
+        element: 元素名称（缓存的第二级键）
+        candidates: 定位方式名称 → 创建定位器的函数，按优先级排列
+        timeout_ms: 等待元素出现的超时时间（毫秒）
+        fallbacks: 匹配范围较宽的兜底定位方式，所有候选方式都失败后才尝试，优先级排在候选方式之后
+
+    Returns:
+        (定位方式名称, 定位器的第一个匹配元素)
+
+    Raises:
+        PlaywrightTimeoutError: 所有定位方式都在超时时间内没有找到可见元素时
+    """
+    cache = get_locator_cache()
+    fallbacks = {name: factory for name, factory in (fallbacks or {}).items() if name not in candidates}
+    names = list(candidates)
+    ranked = names + list(fallbacks)
+    cached = cache.get(site, element)
+    locators = {name: {**fallbacks, **candidates}[name]().first for name in ranked}
+    tasks: Dict[asyncio.Future, str] = {}
+
+    def launch(name: str, timeout: float) -> None:
+        tasks[asyncio.ensure_future(locators[name].wait_for(state="visible", timeout=timeout))] = name
+
+    async def race(group: List[str]) -> Optional[str]:
+        """同时等待一组定位方式（以及仍在等待的方式），返回找到元素的方式名称，都失败时返回None"""
+        for name in group:
+            if name not in tasks.values():
+                launch(name, timeout_ms)
+        pending = {task for task in tasks if not task.done()}
+        found = [tasks[task] for task in tasks if task.done() and not task.exception()]
+        while pending and not found:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            found = [tasks[task] for task in done if not task.exception()]
+        return min(found, key=ranked.index) if found else None
+
+    async def prefer_earlier(name: str) -> str:
+        """排在name之前的定位方式当前也能找到可见元素时，采用其中最靠前的一个"""
+        return await first_visible(ranked[:ranked.index(name)], locators) or name
+
+    with span(f"定位.{site}.{element}") as current:
+        try:
+            winner = None
+            if cached in locators:
+                launch(cached, timeout_ms)
+                done, _ = await asyncio.wait(set(tasks), timeout=CACHED_HEAD_START_MS / 1000)
+                if done and not next(iter(done)).exception():
+                    winner = await prefer_earlier(cached)
+                    if winner == cached:
+                        current.attributes.update(strategy=cached, cached=True)
+                        return cached, locators[cached]
+                    print(f"⚠️  [{site}] '{element}' 优先级更高的定位方式 '{winner}' 也找到了元素，不再使用上次的 '{cached}'")
+                else:
+                    print(f"⚠️  [{site}] '{element}' 上次成功的定位方式 '{cached}' 未找到元素，同时尝试其他定位方式")
+
+            if winner is None:
+                winner = await race(names)
+            if winner is None and fallbacks:
+                print(f"⚠️  [{site}] '{element}' 候选定位方式都未找到元素，尝试兜底定位方式")
+                winner = await race(list(fallbacks))
+            if winner is None:
+                raise PlaywrightTimeoutError(f"[{site}] 所有定位方式都未找到 '{element}': {', '.join(ranked)}")
+
+            winner = await prefer_earlier(winner)
+            cache.put(site, element, winner)
+            current.attributes.update(strategy=winner, cached=False)
+            print(f"🔎 [{site}] '{element}' 通过 '{winner}' 定位成功")
+            return winner, locators[winner]
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def click_first(site: str, element: str, candidates: Dict[str, Callable[[], Locator]],
+                      timeout_ms: float = DEFAULT_LOCATE_TIMEOUT_MS,
+                      fallbacks: Optional[Dict[str, Callable[[], Locator]]] = None) -> str:
+    """
+    用 resolve_locator 定位元素并点击
+
+    Returns:
+        成功的定位方式名称
+    """
+    strategy, locator = await resolve_locator(site, element, candidates, timeout_ms, fallbacks)
+    await locator.click()
+    return strategy
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+发布前处理的依赖图（DAG）执行器
+
+每个阶段是一个协程，声明自己的输入和输出，执行器根据输入输出推导依赖关系：
+没有依赖关系的阶段（如AI总结、话题标签、短标题、封面图）会在同一个事件循环中同时执行，
+依赖其他阶段输出的阶段（如封面图压缩、上传素材库）等上游完成后再执行。
+
+每次运行结束后会计算关键路径（决定总耗时的阶段链），
+并将各阶段耗时和关键路径保存到 test-results/pipeline_runs/ 目录。
+"""
+
+import asyncio
+import json
+import os
+import time
+import traceback
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from run_timeline import span
+
+# 运行记录保存目录
+PIPELINE_RUNS_DIR = os.path.join("test-results", "pipeline_runs")
+
+
+class PipelineDAGError(Exception):
+    """依赖图定义错误（重复输出、缺失输入、循环依赖）"""
+    pass
+
+
+@dataclass
+class Stage:
+    """
+    依赖图中的一个阶段
+
+    func 是协程函数，接收一个字典（仅包含声明的 inputs），返回一个字典（必须包含声明的 outputs）
+    """
+    name: str
+    func: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+
+
+@dataclass
+class StageRecord:
+    """单个阶段的执行记录"""
+    name: str
+    status: str = "pending"  # pending / running / success / failed / skipped
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    depends_on: List[str] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        """阶段耗时（秒），未执行的阶段为0"""
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+@dataclass
+class PipelineRunResult:
+    """一次依赖图运行的结果"""
+    values: Dict[str, Any]
+    records: Dict[str, StageRecord]
+    critical_path: List[str]
+    started_at: float
+    finished_at: float
+
+    @property
+    def failed(self) -> List[str]:
+        """执行失败的阶段名称列表"""
+        return [name for name, r in self.records.items() if r.status == "failed"]
+
+    @property
+    def skipped(self) -> List[str]:
+        """因上游失败而跳过的阶段名称列表"""
+        return [name for name, r in self.records.items() if r.status == "skipped"]
+
+
+class PipelineDAG:
+    """发布前处理的依赖图执行器"""
+
+    def __init__(self, name: str = "prepublish"):
+        """
+        初始化依赖图
+
+        Args:
+            name: 依赖图名称，用于运行记录的文件名
+        """
+        self.name = name
+        self.stages: Dict[str, Stage] = {}
+        self._producers: Dict[str, str] = {}
+
+    def add_stage(self, name: str, func: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                  inputs: Optional[List[str]] = None, outputs: Optional[List[str]] = None) -> None:
+        """
+        添加一个阶段
+
+        Args:
+            name: 阶段名称
+            func: 阶段协程函数，接收输入字典，返回输出字典
+            inputs: 该阶段需要的数据名称列表
+            outputs: 该阶段产出的数据名称列表
+        """
+        if name in self.stages:
+            raise PipelineDAGError(f"阶段名称重复: {name}")
+        stage = Stage(name, func, list(inputs or []), list(outputs or []))
+        for output in stage.outputs:
+            if output in self._producers:
+                raise PipelineDAGError(f"数据 '{output}' 同时由 {self._producers[output]} 和 {name} 产出")
+            self._producers[output] = name
+        self.stages[name] = stage
+
+    def _dependencies(self, initial: Dict[str, Any]) -> Dict[str, List[str]]:
+        """根据输入输出推导每个阶段依赖的上游阶段"""
+        deps = {}
+        for stage in self.stages.values():
+            upstream = []
+            for key in stage.inputs:
+                if key in self._producers:
+                    if self._producers[key] not in upstream:
+                        upstream.append(self._producers[key])
+                elif key not in initial:
+                    raise PipelineDAGError(f"阶段 {stage.name} 的输入 '{key}' 既没有初始值也没有上游阶段产出")
+            deps[stage.name] = upstream
+
+        # 检查循环依赖（拓扑排序）
+        remaining = {name: set(upstream) for name, upstream in deps.items()}
+        while remaining:
+            ready = [name for name, upstream in remaining.items() if not upstream]
+            if not ready:
+                raise PipelineDAGError(f"存在循环依赖: {', '.join(remaining)}")
+            for name in ready:
+                del remaining[name]
+            for upstream in remaining.values():
+                upstream.difference_update(ready)
+        return deps
+
+    async def _run_stage(self, stage: Stage, values: Dict[str, Any], record: StageRecord,
+                         semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """获取并发名额后执行单个阶段并检查输出"""
+        async with semaphore:
+            record.started_at = time.time()
+            print(f"▶️  [{stage.name}] 阶段开始")
+            try:
+                with span(f"{self.name}.{stage.name}"):
+                    outputs = await stage.func({key: values[key] for key in stage.inputs}) or {}
+                    missing = [key for key in stage.outputs if key not in outputs]
+                    if missing:
+                        raise PipelineDAGError(f"阶段 {stage.name} 未产出声明的数据: {', '.join(missing)}")
+                    return outputs
+            finally:
+                record.finished_at = time.time()
+
+    async def run(self, initial: Optional[Dict[str, Any]] = None, max_workers: int = 4,
+            save_record: bool = True) -> PipelineRunResult:
+        """
+        运行依赖图，没有依赖关系的阶段同时执行
+
+        某个阶段失败后，依赖它的下游阶段会被跳过，其余阶段照常执行。
+
+        Args:
+            initial: 初始数据（如 markdown_file）
+            max_workers: 最大并发阶段数
+            save_record: 是否将运行记录保存到 test-results/pipeline_runs/
+
+        Returns:
+            PipelineRunResult 运行结果
+        """
+        values: Dict[str, Any] = dict(initial or {})
+        deps = self._dependencies(values)
+        records = {name: StageRecord(name, depends_on=deps[name]) for name in self.stages}
+        started_at = time.time()
+
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+        running: Dict[asyncio.Task, str] = {}
+        while True:
+            # 跳过上游失败的阶段，启动所有上游已完成的阶段
+            for name, record in records.items():
+                if record.status != "pending":
+                    continue
+                upstream_status = [records[d].status for d in deps[name]]
+                if any(s in ("failed", "skipped") for s in upstream_status):
+                    record.status = "skipped"
+                    print(f"⏭️  [{name}] 上游阶段失败，跳过")
+                elif all(s == "success" for s in upstream_status):
+                    record.status = "running"
+                    task = asyncio.create_task(self._run_stage(self.stages[name], values, record, semaphore))
+                    running[task] = name
+            if not running:
+                if any(r.status == "pending" for r in records.values()):
+                    continue
+                break
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = running.pop(task)
+                record = records[name]
+                try:
+                    values.update(task.result())
+                    record.status = "success"
+                    print(f"✅ [{name}] 阶段完成，耗时 {record.duration:.1f}秒")
+                except Exception as e:
+                    record.status = "failed"
+                    record.error = str(e)
+                    print(f"❌ [{name}] 阶段失败（耗时 {record.duration:.1f}秒）: {e}")
+                    traceback.print_exception(e)
+
+        result = PipelineRunResult(
+            values=values,
+            records=records,
+            critical_path=compute_critical_path(records),
+            started_at=started_at,
+            finished_at=time.time(),
+        )
+        print_pipeline_summary(result)
+        if save_record:
+            save_pipeline_record(self.name, result)
+        return result
+
+
+def compute_critical_path(records: Dict[str, StageRecord]) -> List[str]:
+    """
+    计算关键路径：从最后结束的阶段开始，沿着最晚结束的上游阶段回溯
+
+    Args:
+        records: 各阶段的执行记录
+
+    Returns:
+        按执行顺序排列的关键路径阶段名称列表
+    """
+    executed = {name: r for name, r in records.items() if r.finished_at is not None}
+    if not executed:
+        return []
+    current = max(executed.values(), key=lambda r: r.finished_at)
+    path = [current.name]
+    while True:
+        upstream = [executed[d] for d in current.depends_on if d in executed]
+        if not upstream:
+            break
+        current = max(upstream, key=lambda r: r.finished_at)
+        path.append(current.name)
+    return list(reversed(path))
+
+
+def print_pipeline_summary(result: PipelineRunResult) -> None:
+    """打印各阶段耗时和关键路径"""
+    print("=" * 60)
+    print("📊 发布前处理各阶段耗时：")
+    print("=" * 60)
+    status_icons = {"success": "✅", "failed": "❌", "skipped": "⏭️ ", "pending": "⏸️ "}
+    for name, record in result.records.items():
+        marker = "★" if name in result.critical_path else " "
+        print(f"{status_icons.get(record.status, '  ')} {marker} {name:<20}{record.duration:>8.1f}秒")
+    print("-" * 60)
+    print(f"⏱️  总耗时: {result.finished_at - result.started_at:.1f}秒")
+    print(f"🧭 关键路径（★）: {' → '.join(result.critical_path) or '无'}")
+    print("=" * 60)
+
+
+def save_pipeline_record(name: str, result: PipelineRunResult) -> Optional[str]:
+    """
+    将运行记录保存为JSON文件
+
+    Args:
+        name: 依赖图名称
+        result: 运行结果
+
+    Returns:
+        保存的文件路径，失败时返回None
+    """
+    try:
+        os.makedirs(PIPELINE_RUNS_DIR, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        record_file = os.path.join(PIPELINE_RUNS_DIR, f"{name}_{timestamp}.json")
+        data = {
+            "name": name,
+            "started_at": result.started_at,
+            "finished_at": result.finished_at,
+            "duration": result.finished_at - result.started_at,
+            "critical_path": result.critical_path,
+            "stages": [dict(asdict(r), duration=r.duration) for r in result.records.values()],
+        }
+        with open(record_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        print(f"📁 运行记录已保存到: {record_file}")
+        return record_file
+    except Exception as e:
+        print(f"⚠️  保存运行记录时出错: {e}")
+        return None
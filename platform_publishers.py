@@ -0,0 +1,990 @@
+# -*- coding: utf-8 -*-
+"""
+各平台发布流程模块
+将 test_example 中每个平台的发布步骤拆分为独立函数，便于发布引擎并发调度
+
+每个发布函数都是协程，签名一致：async publish_xxx(session, article)
+- session: BrowserSession，各平台在同一个事件循环中使用各自的页面，连续发布多篇文章时复用同一个标签页
+- article: PublishArticle，包含标题、摘要、链接、文件路径、标签等发布所需数据
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from playwright.async_api import expect
+
+from browser_session import BrowserSession
+from image_toolkit_sdk import PLATFORM_IMAGE_VARIANTS
+from locator_cache import click_first
+from wait_helpers import wait_enabled, wait_hidden, wait_network_idle, wait_visible
+
+# 定义各平台的话题标签数量限制
+PLATFORM_TAG_LIMITS = {
+    'zhihu': 3,           # 知乎最多3个话题标签
+    'csdn': 10,           # CSDN最多10个话题标签
+    'xiaohongshu': 10,    # 小红书最多10个话题标签
+    'douyin': 5,          # 抖音最多5个话题标签
+    'kuaishou': 4,        # 快手最多4个话题标签
+    '51cto': 5,           # 51CTO最多5个话题标签
+}
+
+
+@dataclass
+class PublishArticle:
+    """待发布文章的数据"""
+    title: str
+    author: str
+    summary: str
+    url: str
+    markdown_file: str
+    cto_markdown_file: str
+    cover_image: str
+    compressed_cover_image: str
+    short_title: str
+    all_tags: List[str] = field(default_factory=list)
+    markdown_filename: Optional[str] = None
+    # 封面图变体名称 → 文件路径（按各平台的格式、宽高比和大小要求生成）
+    cover_variants: Dict[str, str] = field(default_factory=dict)
+    # 平台 → 正文图片链接已改写的专用Markdown副本（图片超过平台限制或为本地图片时生成）
+    platform_markdown: Dict[str, str] = field(default_factory=dict)
+
+    def cover_for(self, platform: str) -> str:
+        """平台使用的封面图：有对应的变体时使用变体，否则使用压缩后的封面图"""
+        spec = PLATFORM_IMAGE_VARIANTS.get(platform)
+        if spec and spec.name in self.cover_variants:
+            return self.cover_variants[spec.name]
+        return self.compressed_cover_image or self.cover_image
+
+    def markdown_for(self, platform: str) -> str:
+        """平台导入的Markdown文件：有专用副本时使用副本，CSDN和51CTO默认使用清理后的51CTO文件"""
+        if platform in self.platform_markdown:
+            return self.platform_markdown[platform]
+        return self.cto_markdown_file if platform in ('csdn', '51cto') else self.markdown_file
+
+
+def get_platform_tags(all_tags, platform, limit=None, scores=None):
+    """
+    根据平台获取合适数量的话题标签
+    
+    Args:
+        all_tags: 所有可用的话题标签列表（发布流程已按与文章的相关度从高到低排列）
+        platform: 平台名称
+        limit: 自定义限制数量（可选）
+        scores: 标签 → 相关度得分（可选，指定时先按得分从高到低排列）
+    
+    Returns:
+        适合该平台的话题标签列表
+    """
+    if limit is None:
+        limit = PLATFORM_TAG_LIMITS.get(platform, len(all_tags))
+    
+    if scores:
+        all_tags = sorted(all_tags, key=lambda tag: scores.get(tag, 0.0), reverse=True)
+    
+    # 选择得分最高的指定数量的标签
+    return all_tags[:limit]
+
+
+async def publish_wechat(session: BrowserSession, article: PublishArticle) -> None:
+    """
+    使用mdnice转换Markdown格式并发布到微信公众号（保存为草稿）
+
+    使用mdnice，将markdown文件转换为微信公众号兼容的格式。
+    这是发布到微信公众号的预处理步骤，确保格式兼容性
+
+    Args:
+        session: 浏览器会话
+        article: 待发布文章的数据
+    """
+    print("正在处理 mdnice...")
+    # 并发发布时每个平台使用独立页面，不再复用 browser_context.pages[0]；连续发布多篇文章时复用同一个页面
+    page_mdnice = await session.page("mdnice")
+    await page_mdnice.goto("https://editor.mdnice.com/")
+    await page_mdnice.wait_for_load_state("networkidle")
+    await page_mdnice.wait_for_load_state("domcontentloaded")
+
+    # 创建新文章
+    await page_mdnice.get_by_role("button", name="plus").click()
+    await page_mdnice.get_by_role("textbox", name="请输入标题").click()
+
+    # 截断标题，确保不超过64个字符
+    mdnice_title = article.title[:64] if len(article.title) > 64 else article.title
+    print(f"📝 mdnice 标题（已截断至64字符）: {mdnice_title}")
+
+    # 使用截断后的标题
+    await page_mdnice.get_by_role("textbox", name="请输入标题").fill(mdnice_title)
+    await page_mdnice.get_by_role("button", name="新 增").click()
+
+    # 导入Markdown文件
+    await page_mdnice.get_by_role("link", name="文件").click()
+    # 使用配置中的Markdown文件路径，上传markdown文件
+    await page_mdnice.get_by_text("导入 Markdown").set_input_files(article.markdown_for('mdnice'))
+
+    # 切换到微信公众号预览模式
+    await page_mdnice.locator("#nice-sidebar-wechat").click()
+
+    # 清理：删除刚刚新建的文章，使用截断后的标题进行匹配
+    try:
+        # 使用截断后的标题进行匹配
+        article_locator = page_mdnice.get_by_role("listitem").filter(
+            has_text=re.compile(f"{re.escape(mdnice_title)}.*")
+        )
+        # 等待文章列表更新
+        await wait_visible(article_locator, "mdnice文章列表更新", timeout_ms=10000)
+
+        # 检查是否找到文章
+        if await article_locator.count() > 0:
+            await article_locator.locator("svg").nth(1).click()
+            await page_mdnice.get_by_role("menuitem", name="删除文章").locator("a").click()
+            await page_mdnice.get_by_role("button", name="确 认").click()
+            print("✅ 成功删除 mdnice 测试文章")
+        else:
+            print("⚠️  未找到要删除的文章项，跳过删除步骤")
+
+    except Exception as e:
+        print(f"⚠️  删除 mdnice 文章时出错: {e}")
+        print("继续执行后续步骤...")
+
+    ## 微信公众号，发布文章。
+    ## 注意：需要先在微信公众号平台登录，脚本会自动填充内容并保存为草稿
+    print("正在发布到微信公众号...")
+    page_wechat = await session.page("wechat")
+    await page_wechat.goto("https://mp.weixin.qq.com")
+
+    # 点击"文章"按钮，会打开新窗口
+    async with page_wechat.expect_popup() as page_wechat_info:
+        await page_wechat.get_by_text("文章", exact=True).click()
+    page_wechat = await page_wechat_info.value
+    await page_wechat.wait_for_load_state("networkidle")
+    await page_wechat.wait_for_load_state("domcontentloaded")
+
+    # 粘贴从mdnice复制的HTML内容
+    await page_wechat.keyboard.press("Control+V")
+    # 等待60秒，确保编辑器中的图片正常转存到微信服务器
+    await page_wechat.wait_for_load_state("networkidle")
+    # page_wechat.wait_for_timeout(60000)
+
+    # 设置文章标题
+    await page_wechat.get_by_role("textbox", name="请在这里输入标题").click()
+    await page_wechat.get_by_role("textbox", name="请在这里输入标题").fill(article.title)
+
+    # 设置作者名称
+    await page_wechat.get_by_role("textbox", name="请输入作者").click()
+    await page_wechat.get_by_role("textbox", name="请输入作者").fill(article.author)
+
+    # 处理弹窗确认
+    page_wechat.on("dialog", lambda dialog: dialog.accept())
+    await page_wechat.locator(".js_unset_original_title").filter(has_text="未声明").click()
+    await page_wechat.wait_for_load_state("networkidle")
+    await page_wechat.get_by_role("button", name="确定").click()
+
+    # 设置赞赏功能（开启）
+    await page_wechat.locator("#js_reward_setting_area").get_by_text("不开启").click()
+    # page_wechat.wait_for_selector(".weui-desktop-dialog", state="visible", timeout=10000)
+    await page_wechat.wait_for_load_state("networkidle")
+    await wait_visible(page_wechat.get_by_role("heading", name="赞赏"), "公众号赞赏设置弹窗", timeout_ms=15000)
+    await page_wechat.get_by_role("heading", name="赞赏").locator("span").click()
+    await page_wechat.locator(".weui-desktop-dialog .weui-desktop-btn_primary").filter(has_text="确定").click()
+
+    # 设置文章合集标签
+    await page_wechat.locator("#js_article_tags_area").get_by_text("未添加").click()
+    await page_wechat.get_by_role("textbox", name="请选择合集").click()
+    await page_wechat.locator("#vue_app").get_by_text("AI", exact=True).click()
+    await page_wechat.get_by_role("button", name="确认").click()
+
+    # 设置文章封面图片
+    # 使用CSS类名定位，更精确和稳定
+    await page_wechat.locator(".js_share_type_none_image").hover()
+    await page_wechat.get_by_role("link", name="从图片库选择").click()
+    # 点击AI配图文件夹，使用正则表达式匹配"AI配图 (数字)"格式的链接
+    # 例如："AI配图 (15)" 或 "AI配图 (23)" 等，数字表示该文件夹中的图片数量
+    # page_wechat.get_by_role("link", name=re.compile(r"AI配图 \(\d+\)")).click()
+    # 点击我的图片文件夹，使用正则表达式匹配"我的图片 (数字)"格式的链接
+    # 例如："我的图片 (15)" 或 "我的图片 (23)" 等，数字表示该文件夹中的图片数量
+    await page_wechat.get_by_role("link", name=re.compile(r"我的图片 \(\d+\)")).click()
+    await page_wechat.locator(".weui-desktop-img-picker__img-thumb").first.click()
+    await page_wechat.get_by_role("button", name="下一步").click()
+    await page_wechat.get_by_role("button", name="确认").click()
+
+    # 设置文章摘要
+    print("📝 正在设置文章摘要...")
+    await page_wechat.get_by_role("textbox", name="选填，不填写则默认抓取正文开头部分文字，摘要会在转发卡片和公众号会话展示。").click()
+    # 使用配置中的摘要
+    await page_wechat.get_by_role("textbox", name="选填，不填写则默认抓取正文开头部分文字，摘要会在转发卡片和公众号会话展示。").fill(article.summary)
+    print(f"✅ 文章摘要设置完成: {article.summary}")
+
+    # 设置原文链接
+    print("🔗 正在设置原文链接...")
+    await page_wechat.locator("#js_article_url_area").get_by_text("未添加").click()
+    await page_wechat.get_by_role("textbox", name="输入或粘贴原文链接").click()
+    # 使用配置中的URL
+    await page_wechat.get_by_role("textbox", name="输入或粘贴原文链接").fill(article.url)
+    print(f"✅ 原文链接设置完成: {article.url}")
+
+    # 确认链接设置
+    print("🔄 正在确认链接设置...")
+    ok_button = page_wechat.get_by_role("link", name="确定")
+    await expect(ok_button).to_be_visible()
+    await expect(ok_button).to_be_enabled()
+    await ok_button.click()
+    print("✅ 链接设置确认完成")
+    # 等待文档加载完成
+    print("等待文档基本加载完成...")
+    await page_wechat.wait_for_load_state("domcontentloaded", timeout=60000)
+    print("文档页面基本加载完成！")
+    await page_wechat.wait_for_load_state("networkidle")
+
+    await wait_enabled(page_wechat.get_by_role("button", name="保存为草稿"), "公众号保存草稿按钮可用", timeout_ms=15000)
+    # 保存为草稿（避免意外丢失）
+    print("💾 正在保存为草稿...")
+    await page_wechat.get_by_role("button", name="保存为草稿").click()
+    # 检查是否出现"已保存"文本，如果出现则点击，否则继续执行。如果正文中有图片转存失败，则“已保存”提示不会出现。最终保存为草稿也会失败。
+    try:
+        save_success_element = page_wechat.locator("#js_save_success").get_by_text("已保存")
+        print("🔍 检查是否出现'已保存'提示...超时时间为30秒")
+        is_visible = await save_success_element.is_visible(timeout=30000)
+        if is_visible:
+            await save_success_element.click()
+            print("✅ 点击了'已保存'提示")
+        else:
+            print("ℹ️  未出现'已保存'提示，继续执行")
+            # page_wechat.pause()
+    except Exception as e:
+        print(f"ℹ️  处理'已保存'提示时出错，继续执行: {e}")
+    print("✅ 文章已保存为草稿")
+
+
+async def publish_zhihu(session: BrowserSession, article: PublishArticle) -> None:
+    """
+    发布文章到知乎
+
+    知乎，发布文章。
+    支持Markdown文件导入，自动设置标题、封面、话题标签等
+
+    Args:
+        session: 浏览器会话
+        article: 待发布文章的数据
+    """
+    print("正在发布到知乎...")
+    # 获取知乎平台的话题标签
+    # 使用固定的知乎话题标签
+    zhihu_tags = ["LLM", "AI", "大模型"]
+    # zhihu_tags = get_platform_tags(article.all_tags, 'zhihu')
+    print(f"🏷️  知乎话题标签: {zhihu_tags}")
+
+    page_zhihu = await session.page("zhihu")
+    await page_zhihu.goto("https://www.zhihu.com/")
+
+    # 点击"写文章"按钮，会打开编辑器新窗口（多种定位方式同时尝试，上次成功的方式优先）
+    async with page_zhihu.expect_popup() as page_zhihu_info:
+        await click_first("zhihu", "写文章", {
+            "精确文本": lambda: page_zhihu.get_by_text("写文章", exact=True),
+            "类名": lambda: page_zhihu.locator("div.css-hv22zf"),
+            # 包含"写文章"的元素中，去掉首尾空白后文本只有"写文章"的元素
+            "文本过滤": lambda: page_zhihu.get_by_text("写文章").filter(has_text=re.compile(r"^\s*写文章\s*$")),
+        })
+    page_zhihu_editor = await page_zhihu_info.value
+
+    # 点击工具栏中的"文档"按钮弹出导入菜单
+    print("点击'文档'按钮以弹出导入菜单")
+    await click_first("zhihu", "工具栏文档按钮", {
+        "span类名": lambda: page_zhihu_editor.locator("span.css-8atqhb:has-text('文档')"),
+        "aria-label": lambda: page_zhihu_editor.locator("button[aria-label='文档']"),
+        "ToolbarButton": lambda: page_zhihu_editor.locator("button.ToolbarButton:has-text('文档')"),
+        "role": lambda: page_zhihu_editor.get_by_role("button", name="文档"),
+    })
+
+    # 点击弹出菜单中的"文档"按钮
+    popover = page_zhihu_editor.locator("[role='tooltip'], .Popover-content, [id*='Popover']").first
+    await click_first("zhihu", "弹窗文档按钮", {
+        "弹窗内按钮": lambda: popover.get_by_role("button", name="文档"),
+        "第二个文档按钮": lambda: page_zhihu_editor.locator("button:has-text('文档')").nth(1),
+    }, fallbacks={
+        # 页面上任何含"文档"的第二个文本，只在上面的方式都失败后才尝试
+        "第二个文档文本": lambda: page_zhihu_editor.get_by_text("文档").nth(1),
+    })
+
+    # 等待文档导入模态框出现
+    await page_zhihu_editor.wait_for_selector(".Editable-docModal", state="visible", timeout=10000)
+
+    # 直接选择文件输入框并上传文件
+    await page_zhihu_editor.locator(".Editable-docModal input[type='file']").set_input_files(article.markdown_for('zhihu'))
+
+    # 等待文件上传完成和内容解析（解析完成后导入模态框关闭）
+    await wait_hidden(page_zhihu_editor.locator(".Editable-docModal"), "知乎导入文档解析", timeout_ms=60000)
+
+    # 设置文章标题
+    await page_zhihu_editor.get_by_placeholder("请输入标题（最多 100 个字）").click()
+    await page_zhihu_editor.get_by_placeholder("请输入标题（最多 100 个字）").fill(article.title)
+
+    # 设置文章目录
+    await page_zhihu_editor.get_by_role("button", name="目录").click()
+
+    # 设置文章封面图片
+    await page_zhihu_editor.get_by_text("添加文章封面").set_input_files(article.cover_for('zhihu'))
+
+    # 添加话题标签（知乎的话题标签需要从下拉框中选择，不能随便填写）
+    # 知乎最多支持添加3个话题标签
+    for tag in zhihu_tags:
+        await page_zhihu_editor.get_by_role("button", name="添加话题").click()
+        await page_zhihu_editor.get_by_role("textbox", name="搜索话题").click()
+        await page_zhihu_editor.get_by_role("textbox", name="搜索话题").fill(tag)
+        await page_zhihu_editor.get_by_role("textbox", name="搜索话题").press("Enter")
+        await page_zhihu_editor.get_by_role("button", name=tag, exact=True).click()
+        await wait_hidden(page_zhihu_editor.get_by_role("textbox", name="搜索话题"), f"知乎话题[{tag}]添加", timeout_ms=5000)
+
+    # 设置送礼物功能（开启）
+    await page_zhihu_editor.locator("label").filter(has_text="开启送礼物").get_by_role("img").click()
+    await page_zhihu_editor.get_by_role("button", name="确定").click()
+
+    # page_zhihu_editor.wait_for_timeout(5000)
+    # 知乎编辑器会自动保存草稿，无需手动保存
+    # 点击发布按钮并等待页面导航完成。注意：点击"发布"按钮后，新的网页会报错，实际上文章已经发布成功了。错误信息：{"error":{"message":"您当前请求存在异常，暂时限制本次访问。如有疑问，您可以通过手机摇一摇或登录后私信知乎小管家反馈。8131ab59c0a33a85e9efb02aaaf1b643","code":40362}}
+
+    # print("点击发布按钮...")
+    # page_zhihu_editor.wait_for_load_state("networkidle")
+    # 等待页面基本加载完成
+    print("等待文档基本加载完成...")
+    await page_zhihu_editor.wait_for_load_state("domcontentloaded", timeout=60000)
+    print("文档页面基本加载完成！")
+    await page_zhihu_editor.get_by_role("button", name="发布").click()
+
+    # # 等待页面跳转完成
+    print("等待页面跳转完成...")
+    await page_zhihu_editor.wait_for_load_state("networkidle")
+    print("页面跳转完成！")
+    print("知乎文章发布成功！")
+
+
+async def publish_csdn(session: BrowserSession, article: PublishArticle) -> None:
+    """
+    发布文章到CSDN博客
+
+    CSDN博客，发布文章。
+    支持Markdown导入，自动设置标签、分类、封面等
+
+    Args:
+        session: 浏览器会话
+        article: 待发布文章的数据
+    """
+    print("正在发布到CSDN...")
+    # 获取CSDN平台的话题标签
+    csdn_tags = get_platform_tags(article.all_tags, 'csdn')
+    print(f"🏷️  CSDN话题标签: {csdn_tags}")
+
+    page_csdn = await session.page("csdn")
+    await page_csdn.goto("https://www.csdn.net/")
+    await page_csdn.get_by_role("link", name="创作", exact=True).click()
+
+    # 使用MD编辑器
+    async with page_csdn.expect_popup() as page_csdn_editor:
+        await page_csdn.get_by_role("button", name="使用 MD 编辑器").click()
+    page_csdn_md_editor = await page_csdn_editor.value
+
+    # 导入Markdown文件
+    # page_csdn_md_editor.get_by_text("导入 导入").click()
+    print(f"📁 正在上传markdown文件（csdn的审核越来越严格，所以使用专门为csdn准备的markdown文件）: {article.markdown_for('csdn')}")
+    await page_csdn_md_editor.get_by_text("导入 导入").set_input_files(article.markdown_for('csdn'))
+    await wait_network_idle(page_csdn_md_editor, "CSDN导入Markdown（图片转存）", timeout_ms=30000)
+    print("等待文档基本加载完成...")
+    await page_csdn_md_editor.wait_for_load_state("domcontentloaded", timeout=60000)
+    print("文档页面基本加载完成！")
+    # 设置文章目录
+    await page_csdn_md_editor.get_by_role("button", name="目录").click()
+
+    # 设置文章标签（CSDN支持自定义标签）
+    await page_csdn_md_editor.get_by_role("button", name="发布文章").click()
+    await page_csdn_md_editor.get_by_role("button", name="添加文章标签").click()
+
+    # 添加多个话题标签，CSDN最多支持添加10个话题标签
+    for tag in csdn_tags:
+        await page_csdn_md_editor.get_by_role("textbox", name="请输入文字搜索，Enter键入可添加自定义标签").click()
+        await page_csdn_md_editor.get_by_role("textbox", name="请输入文字搜索，Enter键入可添加自定义标签").fill(tag)
+        await page_csdn_md_editor.get_by_role("textbox", name="请输入文字搜索，Enter键入可添加自定义标签").press("Enter")
+
+    # 关闭标签设置
+    await page_csdn_md_editor.get_by_role("button", name="关闭").nth(2).click()
+
+    # 设置文章封面图片 - 使用组合定位器确保定位到封面上传区域的文件输入框
+    # 注意：上传的图片文件不能超过5MB
+    await page_csdn_md_editor.locator(".cover-upload-box .el-upload__input").set_input_files(article.cover_for('csdn'))
+    await page_csdn_md_editor.get_by_text("确认上传").click()
+
+    # 设置文章摘要
+    await page_csdn_md_editor.get_by_role("textbox", name="本内容会在各展现列表中展示，帮助读者快速了解内容。若不填，则默认提取正文前256个字。").click()
+    await page_csdn_md_editor.get_by_role("textbox", name="本内容会在各展现列表中展示，帮助读者快速了解内容。若不填，则默认提取正文前256个字。").fill(article.summary)
+
+    # 设置文章分类
+    await page_csdn_md_editor.get_by_role("button", name="新建分类专栏").click()
+    await page_csdn_md_editor.locator("span").filter(has_text=re.compile(r"^AI$")).click()
+    # page_csdn_md_editor.locator("div:nth-child(2) > .tag__option-label > .tag__option-icon").click()
+    await page_csdn_md_editor.get_by_role("button", name="关闭").nth(2).click()
+
+    # 设置备份到GitCode
+    await page_csdn_md_editor.locator("label").filter(has_text="同时备份到GitCode").locator("span").nth(1).click()
+
+    # 保存草稿
+    # page_csdn_md_editor.get_by_label("Insert publishArticle").get_by_role("button", name="保存为草稿").click()
+    # 发布文章
+    await page_csdn_md_editor.get_by_label("Insert publishArticle").get_by_role("button", name="发布文章").click()
+    await page_csdn_md_editor.get_by_text("发布成功！正在审核中").click()
+
+
+async def publish_51cto(session: BrowserSession, article: PublishArticle) -> None:
+    """
+    发布文章到51CTO博客
+
+    51CTO博客，发布文章。
+    51CTO发布文章时，支持自动从正文中找一张合适的图片作为封面图
+
+    Args:
+        session: 浏览器会话
+        article: 待发布文章的数据
+    """
+    print("正在发布到51CTO...")
+    # 获取51CTO平台的话题标签
+    cto_tags = get_platform_tags(article.all_tags, '51cto')
+    print(f"🏷️  51CTO话题标签: {cto_tags}")
+
+    page_51cto = await session.page("51cto")
+    await page_51cto.goto("https://blog.51cto.com/")
+
+    # 检查是否存在新功能提示元素，如果存在则关闭
+    if await page_51cto.get_by_text("Hi，有新功能更新啦！").count() > 0:
+        await page_51cto.get_by_text("Hi，有新功能更新啦！").click()
+        await page_51cto.locator(".tip-close").click()
+
+    # 点击写文章按钮 - 使用CSS类名精确匹配
+    await page_51cto.locator(".want-write").click()
+
+    # 导入Markdown文件 - 先点击导入按钮
+    # 导入Markdown文件 - 使用正确的文件选择器处理方式
+    async with page_51cto.expect_file_chooser() as fc_info:
+        await page_51cto.locator("button .iconeditor.editorimport").click()
+
+    file_chooser = await fc_info.value
+    await file_chooser.set_files(article.markdown_for('51cto'))
+
+    await wait_network_idle(page_51cto, "51CTO导入Markdown（图片转存）", timeout_ms=30000)
+    print("等待文档基本加载完成...")
+    await page_51cto.wait_for_load_state("domcontentloaded", timeout=60000)
+    print("文档页面基本加载完成！")
+    # 设置文章标题
+    await page_51cto.get_by_role("textbox", name="请输入标题").click()
+    await page_51cto.get_by_role("textbox", name="请输入标题").fill(article.title)
+    await page_51cto.get_by_role("textbox", name="请输入标题").click()
+
+    # 点击发布文章按钮（会打开设置面板）
+    # 注意：这部分设置不会自动保存，如果没有点击发布按钮，则不会保存设置
+    await page_51cto.get_by_role("button", name=" 发布文章").click()
+    # 检查是否弹出确认窗口，如果有"继续发布"按钮则点击
+    try:
+        # 等待可能出现的确认窗口，或者直接打开的设置面板
+        continue_publish_button = page_51cto.get_by_role("button", name="继续发布")
+        await wait_visible(continue_publish_button.or_(page_51cto.get_by_text("文章分类")),
+                           "51CTO发布设置面板", timeout_ms=10000)
+
+        # 检查是否存在"继续发布"按钮
+        if await continue_publish_button.count() > 0:
+            await continue_publish_button.click()
+            print("✅ 点击了继续发布按钮")
+
+    except Exception as e:
+        # 如果没有找到按钮或出现其他错误，继续执行
+        print(f"ℹ️  未发现继续发布按钮或处理时出错: {e}")
+        pass
+    # 设置文章分类
+    await page_51cto.get_by_text("文章分类").click()
+    await page_51cto.get_by_text("人工智能").click()
+    await page_51cto.get_by_text("NLP").click()
+
+    # 设置个人分类
+    await page_51cto.get_by_role("textbox", name="请填写个人分类").click()
+    await page_51cto.get_by_role("listitem").filter(has_text=re.compile(r"^AI$")).click()
+
+    # 清空现有话题标签（如果有的话）
+    try:
+        # 清空标签列表容器
+        await page_51cto.evaluate("document.querySelector('.has-list.tage-list-arr').innerHTML = ''")
+
+        print("✅ 已清空现有标签")
+    except Exception as e:
+        print(f"ℹ️ 清空标签时出错（可能没有现有标签）: {e}")
+
+    # 设置文章标签
+    print("🏷️  正在设置文章标签...")
+    await page_51cto.get_by_text("标签", exact=True).click()
+    await page_51cto.get_by_role("textbox", name="请设置标签，最多可设置5个，支持，；enter间隔").click()
+
+    # 添加多个标签，51cto默认会自动填写三个话题标签，所以还可以手工填写两个(之前的代码已经清空了现有标签)。最多只能填写5个标签。
+    for tag in cto_tags:
+        await page_51cto.get_by_role("textbox", name="请设置标签，最多可设置5个，支持，；enter间隔").fill(tag)
+        await page_51cto.get_by_role("textbox", name="请设置标签，最多可设置5个，支持，；enter间隔").press("Enter")
+
+    # 设置文章摘要
+    print("🏷️  正在设置文章摘要...")
+    await page_51cto.get_by_role("textbox", name="请填写文章摘要，最多可填写500").click()
+    await page_51cto.get_by_role("textbox", name="请填写文章摘要，最多可填写500").fill(article.summary)
+
+    # 设置话题
+    print("🏷️  正在设置话题...")
+    await page_51cto.get_by_role("textbox", name="请填写话题").click()
+    await page_51cto.get_by_text("#yyds干货盘点#").click()
+
+    # 添加封面设置代码。注意：51CTO支持自动从正文中提取图片作为封面图（默认设置），如果要自己设置封面图，这里可以手动上传封面图
+    # 先选择手动上传封面模式（而不是自动设置）
+    # page_51cto.locator("input[name='imgtype'][value='1']").check()  # 选择手动上传模式
+
+    # 或者使用更精确的选择器，注意，图片不能超过1.9MB，否则会报错
+    # page_51cto.locator("input[type='file'].upload_input").set_input_files(article.cover_image)
+
+    # 发布文章
+    print("🏷️  正在发布文章...")
+    await page_51cto.get_by_role("button", name="发布", exact=True).click()
+    # 验证是否发布成功
+    try:
+        # 不一定会出现"发布成功 - 待审核"文本，因为如果文档中没有检测到敏感词，则不会出现这个文本。
+        await page_51cto.get_by_text("发布成功 - 待审核").click()
+        print("✅ 文章发布成功！")
+    except Exception as e:
+        print(f"ℹ️ 未找到'发布成功 - 待审核'文本，程序继续执行: {e}")
+
+
+async def publish_cnblogs(session: BrowserSession, article: PublishArticle) -> None:
+    """
+    发布文章到博客园
+
+    博客园，发布文章。
+    支持Markdown导入，自动提取图片，设置分类等
+
+    Args:
+        session: 浏览器会话
+        article: 待发布文章的数据
+    """
+    print("正在发布到博客园...")
+    # 获取博客园平台的话题标签
+    cnblogs_tags = get_platform_tags(article.all_tags, 'cnblogs')
+    print(f"🏷️  博客园话题标签: {cnblogs_tags}")
+
+    page_cnblogs = await session.page("cnblogs")
+    await page_cnblogs.goto("https://www.cnblogs.com/")
+    print("📝 已打开博客园首页")
+
+    await page_cnblogs.get_by_role("link", name="写随笔").click()
+    print("📝 已点击写随笔按钮")
+
+    # 切换到文章模式
+    await page_cnblogs.get_by_role("link", name="文章").click()
+    print("📝 已切换到文章模式")
+
+    # 导入文章 - 使用最稳定的定位器
+    await page_cnblogs.get_by_role("link", name="导入文章").click()
+    print("📝 已点击导入文章按钮")
+
+    # 上传Markdown文件 - 使用文件选择器处理方式
+    print("📁 正在上传Markdown文件...")
+    async with page_cnblogs.expect_file_chooser() as fc_info:
+        # 点击"选择文件"链接或拖拽区域来触发文件选择器
+        await page_cnblogs.get_by_role("link", name="选择文件").click()
+
+    file_chooser = await fc_info.value
+    await file_chooser.set_files(article.markdown_for('cnblogs'))
+    print(f"✅ 已选择文件: {article.markdown_for('cnblogs')}")
+
+    # 确认导入
+    await page_cnblogs.get_by_text("导入 1 个文件").click()
+    print("📝 已确认导入文件")
+
+    await page_cnblogs.get_by_role("button", name="开始导入").click()
+    print("🚀 正在开始导入...")
+
+    await page_cnblogs.get_by_role("button", name="完成").click()
+    print("✅ 文件导入完成")
+
+    print("等待文档基本加载完成...")
+    await page_cnblogs.wait_for_load_state("domcontentloaded", timeout=60000)
+    print("文档页面基本加载完成！")
+
+    # 编辑导入的文章
+    print("📝 正在编辑导入的文章...")
+    # 使用更灵活的匹配方式，因为title后面的时间标记是动态变化的
+    # 尝试通过title定位元素，如果失败则使用markdown_filename
+    try:
+        await page_cnblogs.get_by_role("row").filter(has_text=article.title).get_by_role("link").nth(1).click()
+        print(f"✅ 通过title定位成功: {article.title}")
+    except Exception as e:
+        print(f"⚠️  通过title定位失败: {e}")
+        if article.markdown_filename:
+            print(f"🔄 尝试使用markdown文件名定位: {article.markdown_filename}")
+            await page_cnblogs.get_by_role("row").filter(has_text=article.markdown_filename).get_by_role("link").nth(1).click()
+            print(f"✅ 通过markdown文件名定位成功: {article.markdown_filename}")
+        else:
+            print("❌ markdown_filename未定义，无法使用备用定位方式")
+            raise e
+    print("📝 已进入文章编辑页面")
+
+    # 设置文章分类
+    print("🏷️  正在设置文章分类...")
+    # page_cnblogs.locator("nz-tree-select div").click()
+    await page_cnblogs.get_by_role("checkbox", name="AI").check()
+    print("✅ 已设置文章分类为AI")
+
+    # 设置发布状态
+    print("📝 正在设置发布状态...")
+    await page_cnblogs.get_by_role("checkbox", name="发布", exact=True).check()
+    print("✅ 已设置为发布状态")
+
+    # 提取文章中的图片
+    print("🖼️  正在提取文章中的图片...")
+    await page_cnblogs.get_by_role("button", name="提取图片").click()
+
+    # 检查是否有图片需要提取
+    try:
+        # 等待提取结果的提示出现
+        no_images_element = page_cnblogs.get_by_text("没有需要提取的图片")
+        await wait_visible(no_images_element.or_(page_cnblogs.get_by_text("成功:")),
+                           "博客园图片提取结果", timeout_ms=60000)
+
+        # 检查是否出现"没有需要提取的图片"的提示
+        if await no_images_element.count() > 0:
+            print("⚠️  没有需要提取的图片")
+            await no_images_element.click()
+        else:
+            # 如果没有"没有需要提取的图片"提示，则点击"成功"
+            await page_cnblogs.get_by_text("成功:", timeout=60000).click()
+            print("✅ 图片提取成功")
+    except Exception as e:
+        print(f"⚠️  图片提取过程中出现异常: {e}")
+        # 尝试点击成功按钮
+        try:
+            await page_cnblogs.get_by_text("成功:").click()
+            print("✅ 图片提取成功")
+        except:
+            print("⚠️  无法点击成功按钮，继续执行后续步骤")
+
+    # 设置题图 - 使用文件选择器
+    print("🖼️  正在设置题图...")
+    await page_cnblogs.get_by_text("插入题图").click()
+
+    async with page_cnblogs.expect_file_chooser() as fc_info2:
+        await page_cnblogs.get_by_role("button", name="选择要上传的图片").click()
+
+    file_chooser2 = await fc_info2.value
+    await file_chooser2.set_files(article.cover_for('cnblogs'))
+    print(f"✅ 已选择题图: {article.cover_for('cnblogs')}")
+
+    await page_cnblogs.get_by_role("button", name="确定").click()
+    print("✅ 题图设置完成")
+
+    # 设置文章摘要
+    print("📝 正在设置文章摘要...")
+    await page_cnblogs.locator("#summary").click()
+    await page_cnblogs.locator("#summary").fill(article.summary)
+    print(f"✅ 已设置文章摘要: {article.summary[:50]}...")
+
+    # 保存草稿
+    # page_cnblogs.get_by_role("button", name="保存草稿").click()
+    # 注意：实际发布需要手动点击发布按钮
+    print("🚀 正在发布文章...")
+    print("点击发布草稿按钮")
+    await page_cnblogs.get_by_role("button", name="发布草稿").click()
+    print("点击保存成功按钮")
+    try:
+        save_success_elem = page_cnblogs.locator("#cdk-overlay-4").get_by_text("保存成功")
+        if await save_success_elem.count() > 0:
+            await save_success_elem.click()
+            print("✅ 检测到并点击了'保存成功'按钮")
+        else:
+            publish_success_elem = page_cnblogs.locator("#cdk-overlay-4").get_by_text("发布成功")
+            if await publish_success_elem.count() > 0:
+                await publish_success_elem.click()
+                print("✅ 检测到并点击了'发布成功'按钮")
+            else:
+                print("⚠️  未检测到'保存成功'或'发布成功'按钮，跳过点击")
+    except Exception as e:
+        print(f"⚠️  点击'保存成功'或'发布成功'按钮时出错: {e}")
+    print("✅ 博客园文章发布成功！")
+
+
+async def publish_xiaohongshu_newspic(session: BrowserSession, article: PublishArticle) -> None:
+    """
+    发布图文到小红书
+
+    小红书，发布图文（xiaohongshu_newspic）。
+    支持图片上传，设置标题、描述、地点等
+
+    Args:
+        session: 浏览器会话
+        article: 待发布文章的数据
+    """
+    print("正在发布到小红书图文消息...")
+    # 获取小红书平台的话题标签
+    xiaohongshu_tags = get_platform_tags(article.all_tags, 'xiaohongshu')
+    print(f"🏷️  小红书话题标签: {xiaohongshu_tags}")
+
+    page_xiaohongshu = await session.page("xiaohongshu")
+    await page_xiaohongshu.goto("https://creator.xiaohongshu.com/publish/publish?source=official")
+
+    # 选择图文发布模式
+    await page_xiaohongshu.get_by_text("上传图文").nth(1).click()
+
+    # 上传封面图片
+    async with page_xiaohongshu.expect_file_chooser() as fc_info_xiaohongshu:
+        await page_xiaohongshu.get_by_role("button", name="Choose File").click()
+
+    file_chooser_xiaohongshu = await fc_info_xiaohongshu.value
+    await file_chooser_xiaohongshu.set_files(article.cover_for('xiaohongshu_newspic'))
+
+    # 设置标题
+    await page_xiaohongshu.get_by_role("textbox", name="填写标题会有更多赞哦～").click()
+    await page_xiaohongshu.get_by_role("textbox", name="填写标题会有更多赞哦～").fill(article.short_title)
+
+    # 设置描述内容
+    await page_xiaohongshu.get_by_role("textbox").nth(1).click()
+    # 先填入摘要和链接
+    # 设置描述内容，使用type方法逐步输入以确保换行生效
+    await page_xiaohongshu.get_by_role("textbox").nth(1).click()
+    await page_xiaohongshu.get_by_role("textbox").nth(1).type(article.summary)
+    await page_xiaohongshu.get_by_role("textbox").nth(1).press("Enter")
+    # 若加入链接，则会被核定违规
+    # page_xiaohongshu.get_by_role("textbox").nth(1).type("详情请查阅此文章：")
+    # page_xiaohongshu.get_by_role("textbox").nth(1).type(article.url)
+    # page_xiaohongshu.get_by_role("textbox").nth(1).press("Enter")
+
+    # 模拟人工操作添加话题标签，小红书笔记最多支持添加10个话题标签
+    for tag in xiaohongshu_tags:
+        topic_container = page_xiaohongshu.locator("#creator-editor-topic-container")
+        await page_xiaohongshu.get_by_role("textbox").nth(1).type("#")
+        await wait_visible(topic_container, "小红书话题下拉框", timeout_ms=5000)
+        await page_xiaohongshu.get_by_role("textbox").nth(1).type(tag)
+        topic_option = topic_container.get_by_text(f"#{tag}", exact=True)
+        await wait_visible(topic_option, f"小红书话题[{tag}]搜索结果", timeout_ms=10000)
+        await topic_option.click()
+        await wait_hidden(topic_container, f"小红书话题[{tag}]添加", timeout_ms=5000)
+        # page_xiaohongshu.get_by_role("textbox").nth(1).press("Enter")
+
+    # 设置地点
+    await page_xiaohongshu.get_by_text("添加地点").nth(1).click()
+    await page_xiaohongshu.locator("form").filter(has_text="添加地点 添加地点").get_by_role("textbox").fill("深圳")
+    await page_xiaohongshu.get_by_text("深圳市", exact=True).click()
+
+    # 暂存离开（保存草稿）
+    # page_xiaohongshu.get_by_role("button", name="暂存离开").click()
+    # 注意：实际发布需要手动点击发布按钮
+    await page_xiaohongshu.get_by_role("button", name="发布").click()
+    # 验证是否发布成功
+    await page_xiaohongshu.get_by_text('发布成功').click(timeout=60000)
+
+
+async def publish_douyin_newspic(session: BrowserSession, article: PublishArticle) -> None:
+    """
+    发布图文到抖音
+
+    抖音，发布图文（douyin_newspic）。
+    支持图片上传，设置标题、描述、合集等
+
+    Args:
+        session: 浏览器会话
+        article: 待发布文章的数据
+    """
+    print("正在发布到抖音图文消息...")  
+    # 获取抖音平台的话题标签
+    douyin_tags = get_platform_tags(article.all_tags, 'douyin')
+    print(f"🏷️  抖音话题标签: {douyin_tags}")
+
+    page_douyin = await session.page("douyin")
+    await page_douyin.goto("https://creator.douyin.com/creator-micro/home?enter_from=dou_web", timeout=60000)
+    await page_douyin.get_by_text("发布图文").click()
+
+    # 上传图文
+    # page_douyin.get_by_role("button", name="上传图文").click()
+    async with page_douyin.expect_file_chooser() as fc_info3:
+        await page_douyin.get_by_role("button", name="上传图文").click()
+
+    file_chooser3 = await fc_info3.value
+    await file_chooser3.set_files(article.cover_for('douyin_newspic'))
+
+    # 设置作品标题
+    await page_douyin.get_by_role("textbox", name="添加作品标题").click()
+    await page_douyin.get_by_role("textbox", name="添加作品标题").fill(article.short_title)
+
+    # 设置描述内容
+    await page_douyin.locator(".ace-line > div").click()
+    await page_douyin.locator(".zone-container").fill(f"{article.summary}")
+    await page_douyin.locator(".zone-container").press("Enter")
+    await page_douyin.locator(".zone-container").type("详情请查阅此文章：")
+    await page_douyin.locator(".zone-container").type(article.url)
+    await page_douyin.locator(".zone-container").press("Enter")
+    # 模拟人工操作添加话题标签
+    # 注意：抖音最多支持添加5个话题标签，不支持横杠
+    for tag in douyin_tags:
+        # 过滤掉包含横杠的标签
+        if '-' not in tag:
+            await page_douyin.locator(".zone-container").type("#")
+            await page_douyin.locator(".zone-container").type(tag)
+            await page_douyin.locator(".zone-container").press("Enter")
+
+    # 设置合集
+    await page_douyin.locator("div").filter(has_text=re.compile(r"^添加合集合集不选择合集$")).locator("svg").nth(1).click()
+    await page_douyin.get_by_text("AI", exact=True).click()
+    # 验证是否添加了图片
+    await page_douyin.get_by_text('已添加1张图片继续添加').click()
+
+    # 发布
+    await page_douyin.get_by_role("button", name="发布", exact=True).click()
+
+    # 验证是否发布成功
+    await page_douyin.get_by_text("发布成功").click()
+
+
+async def publish_kuaishou_newspic(session: BrowserSession, article: PublishArticle) -> None:
+    """
+    发布图文到快手
+
+    快手，发布图文（kuaishou_newspic）。
+    支持图片上传，设置描述、链接等
+
+    Args:
+        session: 浏览器会话
+        article: 待发布文章的数据
+    """
+    print("正在发布到快手图文消息...")  
+    # 获取快手平台的话题标签
+    kuaishou_tags = get_platform_tags(article.all_tags, 'kuaishou')
+    print(f"🏷️  快手话题标签: {kuaishou_tags}")
+
+    page_kuaishou = await session.page("kuaishou")
+    await page_kuaishou.goto("https://cp.kuaishou.com/profile")
+
+    # 打开发布图文窗口
+    print("正在打开发布图文窗口...")
+    async with page_kuaishou.expect_popup() as page_new_newspic:
+        await page_kuaishou.get_by_text("发布图文", exact=True).click()
+    page_kuaishou_newspic = await page_new_newspic.value
+    print("✅ 发布图文窗口打开成功")
+
+    # 上传图片
+    # page_kuaishou_newspic.get_by_role("button", name="上传图片").click()
+    print("正在上传图片...")
+    async with page_kuaishou_newspic.expect_file_chooser() as fc_info4:
+        await page_kuaishou_newspic.get_by_role("button", name="上传图片").click()
+
+    file_chooser4 = await fc_info4.value
+    await file_chooser4.set_files(article.cover_for('kuaishou_newspic'))
+
+    # 验证是否上传了图片
+    await page_kuaishou_newspic.get_by_text(re.compile(r'\d+张图片上传成功')).click(timeout=120000)
+    print("✅ 图片上传成功")
+    # 快手图文没有标题
+    # 设置描述内容
+    print("正在设置描述内容...")
+    await page_kuaishou_newspic.locator("#work-description-edit").click()
+    await page_kuaishou_newspic.locator("#work-description-edit").fill(f"{article.summary}")
+    await page_kuaishou_newspic.locator("#work-description-edit").press("Enter")
+    await page_kuaishou_newspic.locator("#work-description-edit").type("详情请查阅此文章：")
+    await page_kuaishou_newspic.locator("#work-description-edit").type(article.url)
+    await page_kuaishou_newspic.locator("#work-description-edit").press("Enter")
+    print("等待网络空闲")
+    try:
+        await page_kuaishou_newspic.wait_for_load_state("networkidle", timeout=60000)
+    except Exception as e:
+        print(f"⚠️ 网络空闲等待超时，继续执行: {e}")
+    print("正在添加话题标签...")
+    # 添加话题标签，注意：快手最多支持添加4个话题标签
+    # 快手添加话题标签很简单，直接输入标签名即可，不是一定要从下拉列表中选择
+    for tag in kuaishou_tags:
+        await page_kuaishou_newspic.locator("#work-description-edit").type(f"#{tag} ")
+
+    # 等待网络空闲状态
+    try:
+        await page_kuaishou_newspic.wait_for_load_state("networkidle", timeout=60000)
+    except Exception as e:
+        print(f"⚠️ 快手图文消息等待网络空闲超时，继续执行: {e}")
+    print("✅ 话题标签添加成功")
+    # 发布
+    print("正在发布快手图文...")
+    await page_kuaishou_newspic.get_by_text("发布", exact=True).click()
+
+
+async def publish_bilibili_newspic(session: BrowserSession, article: PublishArticle) -> None:
+    """
+    发布专栏到哔哩哔哩
+
+    哔哩哔哩，发布图文（bilibili_newspic）。
+    支持专栏投稿，设置标题、内容、分类等
+
+    Args:
+        session: 浏览器会话
+        article: 待发布文章的数据
+    """
+    print("正在发布到哔哩哔哩图文消息...")  
+    page_bilibili = await session.page("bilibili")
+    await page_bilibili.goto("https://member.bilibili.com/platform/home")
+    # 点击投稿按钮
+    # 使用ID定位器精确选择投稿按钮，避免与其他"投稿"文本冲突
+    await page_bilibili.locator("#nav_upload_btn").click()
+
+    # 选择专栏投稿
+    await page_bilibili.locator("#video-up-app").get_by_text("专栏投稿").click()
+
+    # 设置标题 - 修正iframe的name属性
+    await page_bilibili.wait_for_selector("iframe[src*='/article-text/home']")
+    iframe = page_bilibili.locator("iframe[src*='/article-text/home']").content_frame
+    await iframe.get_by_role("textbox", name="请输入标题（建议30字以内）").fill(article.title)
+
+    # 设置正文内容
+    await iframe.get_by_role("paragraph").click()
+    # 既然光标已经在闪烁，直接使用页面的键盘输入
+    await page_bilibili.keyboard.type(article.summary + "\n详情请查阅此文章：" + article.url + "\n")
+
+    # 设置分类
+    await iframe.get_by_text("更多设置").click()
+    await iframe.get_by_role("button", name="科技").click()
+    await iframe.get_by_text("学习").click()
+
+    # 设置原创声明
+    await iframe.get_by_role("checkbox", name="我声明此文章为原创").click()
+    await iframe.get_by_role("button", name="确认为我原创").click()
+
+    # 设置转载权限
+    await iframe.get_by_title("他人可对专栏内容进行转载，但转载时需注明文章作者、出处、来源").locator("span").nth(1).click()
+
+    # 设置封面图 - 参考快手的文件上传方式
+    try:
+        async with page_bilibili.expect_file_chooser() as fc_info_bilibili:
+            await iframe.get_by_text("点击上传封面图（选填）").click()
+
+        file_chooser_bilibili = await fc_info_bilibili.value
+        await file_chooser_bilibili.set_files(article.cover_for('bilibili_newspic'))
+
+        # 如果有确认按钮则点击
+        try:
+            await iframe.get_by_role("button", name="确认").click()
+            print("✅ 哔哩哔哩封面图上传成功")
+        except:
+            print("ℹ️  未找到确认按钮，封面图可能已自动确认")
+
+    except Exception as e:
+        print(f"⚠️  上传封面图时出错: {e}")
+        print("跳过封面图设置，继续执行...")
+
+    await wait_network_idle(page_bilibili, "哔哩哔哩封面图上传", timeout_ms=15000)
+    # 提交文章
+    await iframe.get_by_role("button", name="提交文章").click()
+    await iframe.get_by_text("点击查看").click()
+
+
+# 平台名称到发布函数的映射，顺序即 --platforms all 时的默认发布顺序
+# 注意：mdnice 是微信公众号的预处理步骤，已包含在 publish_wechat 中
+PLATFORM_PUBLISHERS: Dict[str, Callable[[BrowserSession, PublishArticle], Awaitable[None]]] = {
+    'wechat': publish_wechat,
+    'zhihu': publish_zhihu,
+    'csdn': publish_csdn,
+    '51cto': publish_51cto,
+    'cnblogs': publish_cnblogs,
+    'xiaohongshu_newspic': publish_xiaohongshu_newspic,
+    'douyin_newspic': publish_douyin_newspic,
+    'kuaishou_newspic': publish_kuaishou_newspic,
+    'bilibili_newspic': publish_bilibili_newspic,
+}
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+并发发布引擎
+在同一个事件循环中同时执行多个平台的发布流程，每个平台使用独立的页面
+
+各平台的发布函数都是协程，等待页面加载、上传等操作时会让出事件循环，
+其他平台的页面可以同时推进；并发数量通过信号量限制。
+"""
+
+import asyncio
+import time
+import traceback
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from browser_session import BrowserSession
+from platform_publishers import PLATFORM_PUBLISHERS, PublishArticle
+from run_timeline import span
+
+# 默认的最大并发发布平台数量
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+@dataclass
+class PublishResult:
+    """单个平台的发布结果"""
+    platform: str
+    success: bool
+    started_at: float
+    finished_at: float
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        """发布耗时（秒）"""
+        return self.finished_at - self.started_at
+
+
+class PublishEngine:
+    """并发发布引擎"""
+
+    def __init__(self, session: BrowserSession, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 publishers: Optional[Dict[str, Callable[[BrowserSession, PublishArticle], Awaitable[None]]]] = None):
+        """
+        初始化并发发布引擎
+
+        Args:
+            session: 浏览器会话，各平台使用其中按用途复用的页面
+            max_concurrency: 同时发布的最大平台数量
+            publishers: 平台名称到发布函数的映射，默认使用 PLATFORM_PUBLISHERS
+        """
+        self.session = session
+        self.max_concurrency = max(1, max_concurrency)
+        self.publishers = publishers or PLATFORM_PUBLISHERS
+
+    async def _publish_one(self, platform: str, article: PublishArticle,
+                           semaphore: asyncio.Semaphore) -> PublishResult:
+        """获取并发名额后执行单个平台的发布流程"""
+        async with semaphore:
+            started_at = time.time()
+            print(f"🚀 [{platform}] 开始发布...")
+            with span(f"发布.{platform}", platform=platform) as current:
+                try:
+                    await self.publishers[platform](self.session, article)
+                    result = PublishResult(platform, True, started_at, time.time())
+                    print(f"✅ [{platform}] 发布完成，耗时 {result.duration:.1f}秒")
+                except Exception as e:
+                    result = PublishResult(platform, False, started_at, time.time(), error=str(e))
+                    current.outcome, current.error = "error", str(e)
+                    print(f"❌ [{platform}] 发布失败（耗时 {result.duration:.1f}秒）: {e}")
+                    traceback.print_exc()
+            return result
+
+    async def run(self, platforms: List[str], article: PublishArticle) -> List[PublishResult]:
+        """
+        并发发布到多个平台，单个平台失败不影响其他平台
+
+        Args:
+            platforms: 目标平台列表，未注册发布函数的平台（如 mdnice）会被跳过
+            article: 待发布文章的数据
+
+        Returns:
+            按 platforms 顺序排列的发布结果列表
+        """
+        runnable = [p for p in platforms if p in self.publishers]
+        skipped = [p for p in platforms if p not in self.publishers]
+        if skipped:
+            print(f"⏭️  以下平台没有独立的发布流程，跳过: {', '.join(skipped)}")
+        if not runnable:
+            return []
+
+        print(f"🚀 开始并发发布到 {len(runnable)} 个平台（最大并发数: {self.max_concurrency}）")
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(*(self._publish_one(p, article, semaphore) for p in runnable))
+
+        print_publish_summary(results)
+        return list(results)
+
+
+def print_publish_summary(results: List[PublishResult]) -> None:
+    """打印各平台的发布结果和耗时"""
+    if not results:
+        return
+    print("=" * 60)
+    print("📊 各平台发布结果：")
+    print("=" * 60)
+    for result in results:
+        status = "✅ 成功" if result.success else f"❌ 失败: {result.error}"
+        print(f"{result.platform:<22}{result.duration:>8.1f}秒  {status}")
+    wall_clock = max(r.finished_at for r in results) - min(r.started_at for r in results)
+    total = sum(r.duration for r in results)
+    print("-" * 60)
+    print(f"⏱️  总耗时: {wall_clock:.1f}秒（各平台耗时之和: {total:.1f}秒）")
+    print("=" * 60)
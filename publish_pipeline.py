@@ -0,0 +1,1270 @@
+# -*- coding: utf-8 -*-
+"""
+社交媒体自动发布流程
+从 test_example 中抽取的完整发布流程，基于 playwright.async_api 实现
+
+流程：获取/下载Markdown文件 → 发布前处理（AI总结、短标题、话题标签、封面图）→ 并发发布到各平台。
+所有页面运行在同一个事件循环中，等待某个页面时其他页面可以继续推进；
+钉钉、微信公众号SDK等阻塞调用通过 asyncio.to_thread 放到线程中执行。
+"""
+
+import asyncio
+import os
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from playwright.async_api import BrowserContext, Playwright, async_playwright
+
+# 导入字数统计功能
+from word_counter_sdk import validate_and_clean_text
+
+# 导入钉钉SDK
+from dingtalk_sdk import create_sdk
+
+# 导入本地话题标签提取和抽取式摘要
+from tag_extractor_sdk import extract_tags, rank_tags
+from summarizer_sdk import summarize_markdown
+
+# 导入封面图评分、各平台封面图变体生成和正文图片预处理
+from image_toolkit_sdk import (PLATFORM_MARKDOWN_IMAGE_LIMITS, build_variants, prepare_platform_markdown,
+                               score_covers, variants_for_platforms)
+
+# 导入AI内容生成提供者（豆包网页版 / HTTP接口 / 本地离线生成）
+from ai_providers import create_ai_provider
+from ai_metadata_cache import markdown_cache_key
+
+# 导入浏览器会话、各平台发布流程和并发发布引擎
+from browser_session import PERSISTENT_CONTEXT_OPTIONS, BrowserSession
+from doubao_session import get_doubao_session
+from locator_cache import click_first
+from browser_daemon import attach_to_daemon
+from platform_publishers import PublishArticle
+from publish_engine import DEFAULT_MAX_CONCURRENCY, PublishEngine, PublishResult
+
+# 导入发布前处理的依赖图执行器
+from pipeline_dag import PipelineDAG
+
+# 导入运行日志（断点续跑）
+from run_journal import RunJournal
+
+# 导入事件驱动的就绪等待
+from wait_helpers import wait_network_idle, wait_until, wait_visible
+
+# 导入运行时间线（各步骤耗时）
+from run_timeline import RunTimeline, span, timed
+
+# 获取微信公众号APP_ID和APP_SECRET
+app_id = os.getenv("WECHAT_APP_ID")
+app_secret = os.getenv("WECHAT_APP_SECRET")
+
+# 获取钉钉APP_KEY和APP_SECRET
+dingtalk_app_key = os.getenv("DINGTALK_APP_KEY")
+dingtalk_app_secret = os.getenv("DINGTALK_APP_SECRET")
+dingtalk_user_id = os.getenv("DINGTALK_USER_ID")
+
+# 所有平台，顺序即 --platforms all 时的发布顺序
+ALL_PLATFORMS = ['mdnice', 'wechat', 'zhihu', 'csdn', '51cto', 'cnblogs', 'xiaohongshu_newspic', 'douyin_newspic', 'kuaishou_newspic', 'bilibili_newspic']
+
+
+class PublishPipelineError(Exception):
+    """发布流程无法继续（参数缺失、钉钉文档获取失败、发布前处理失败等）"""
+    pass
+
+
+@dataclass
+class PublishOptions:
+    """发布流程的参数，与 pytest 命令行参数一一对应"""
+    title: Optional[str] = None
+    author: str = 'tornadoami'
+    summary: Optional[str] = None
+    url: Optional[str] = None
+    markdown_file: Optional[str] = None
+    platforms: str = 'all'
+    cover_image: Optional[str] = None
+    tags: str = 'AI,人工智能,大模型,LLM,机器学习,深度学习,开源,技术分享,自动化,agent'
+    short_title: Optional[str] = None
+    user_data_dir: str = 'D:/tornadofiles/scripts_脚本/github_projects/playwright-automation/chromium-browser-data'
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    resume: bool = False
+    browser_daemon: str = 'auto'
+    ai_mode: str = 'combined'
+    ai_provider: str = 'doubao'
+    ai_hedge: str = 'off'
+    image_host: str = 'off'
+
+
+# 各图床接受的最大图片大小（字节），上传前压缩到该大小以内
+IMAGE_HOST_MAX_BYTES = {
+    'wechat': 1024 * 1024,
+}
+
+
+def create_image_host(image_host):
+    """
+    创建正文图片使用的图床：上传图片并返回图片地址的函数
+
+    Args:
+        image_host: 'wechat' 通过微信公众号“上传图文消息内的图片”接口上传（不占用永久素材数量，
+            仅支持jpg/png、不超过1MB），'off' 不使用图床
+
+    Returns:
+        上传函数，不使用图床时返回None
+    """
+    if image_host != 'wechat':
+        return None
+    from wechat_mp_sdk import WeChatMPSDK
+
+    sdk = WeChatMPSDK(app_id=app_id, app_secret=app_secret)
+    token_lock = threading.Lock()
+
+    def upload(path):
+        # 多个线程同时上传时只获取一次access_token
+        with token_lock:
+            sdk.get_access_token()
+        return sdk.upload_article_image(path)['url']
+
+    return upload
+
+
+def journal_stage_key(**params):
+    """
+    生成运行日志判断阶段输入是否变化时使用的比较函数
+
+    Markdown文件按去掉图片引用后的正文计算（插入封面图后重新下载的文件不算变化），
+    并加入影响该阶段结果的命令行参数。
+
+    Args:
+        **params: 影响该阶段结果的参数
+
+    Returns:
+        阶段输入 → 比较值 的函数
+    """
+    def key(inputs):
+        values = dict(inputs)
+        if 'markdown_file' in values:
+            try:
+                values['markdown_file'] = markdown_cache_key(values['markdown_file'])
+            except OSError:
+                pass
+        return {'inputs': values, 'params': params}
+    return key
+
+
+@timed("压缩封面图")
+def compress_image(image_path, max_size_mb=5, quality=85):
+    """
+    压缩图片文件，确保文件大小不超过指定限制
+    
+    使用 image_toolkit_sdk 在内存中查找放得下的最高质量和最大尺寸，只把最终结果写入磁盘。
+    不透明的图片输出JPEG，用到透明度的图片输出PNG。
+    
+    Args:
+        image_path: 原始图片文件路径
+        max_size_mb: 最大文件大小（MB），默认5MB
+        quality: JPEG最高质量（1-100），默认85
+        
+    Returns:
+        str: 压缩后的图片文件路径，如果失败返回None
+    """
+    try:
+        from image_toolkit_sdk import encode_to_target_size
+        
+        print(f"🖼️ 开始压缩图片: {image_path}")
+        
+        # 检查原始文件是否存在
+        if not os.path.exists(image_path):
+            print(f"❌ 图片文件不存在: {image_path}")
+            return None
+            
+        # 获取原始文件大小
+        original_size = os.path.getsize(image_path)
+        original_size_mb = original_size / (1024 * 1024)
+        print(f"📊 原始文件大小: {original_size_mb:.2f}MB")
+        
+        # 原文件大小已符合要求时直接使用
+        if original_size_mb <= max_size_mb:
+            print(f"✅ 原文件大小已符合要求({original_size_mb:.2f}MB <= {max_size_mb}MB)")
+            return image_path
+        
+        result = encode_to_target_size(image_path, int(max_size_mb * 1024 * 1024),
+                                       max_quality=quality, min_quality=min(quality, 60))
+        compressed_size_mb = result.size / (1024 * 1024)
+        quality_text = f"，质量: {result.quality}" if result.quality else ""
+        print(f"🔄 共编码 {result.encodes} 次，缩放: {result.scale:.2f}{quality_text}")
+        print(f"📊 压缩后文件大小: {compressed_size_mb:.2f}MB")
+        if result.peak_rss:
+            print(f"🧮 压缩期间内存峰值: {result.peak_rss / (1024 * 1024):.1f}MB")
+        
+        if not result.fits:
+            print(f"⚠️ 缩小到最小尺寸仍无法将图片压缩到{max_size_mb}MB以下")
+            # 即使超过限制，也返回压缩后的图片（已经是最小的了）
+            return result.path
+        
+        print("✅ 图片压缩成功!")
+        print(f"📁 压缩后{result.format}文件路径: {result.path}")
+        print(f"📊 压缩比: {(1 - result.size/original_size)*100:.1f}%")
+        print(f"📐 最终尺寸: {result.width}x{result.height}")
+        return result.path
+            
+    except ImportError:
+        print("❌ 缺少PIL库，请安装: pip install Pillow")
+        return None
+    except Exception as e:
+        print(f"❌ 图片压缩失败: {e}")
+        return None
+
+
+async def launch_browser_context(playwright: Playwright, user_data_dir: str) -> BrowserContext:
+    """
+    启动带有各平台登录状态的持久化浏览器上下文
+
+    Args:
+        playwright: async_playwright() 返回的 Playwright 对象
+        user_data_dir: 浏览器用户数据目录
+
+    Returns:
+        持久化浏览器上下文
+    """
+    # 添加视频录制配置、视频尺寸、地理位置、时区、语言、权限、视口、用户数据目录、无头模式
+    return await playwright.chromium.launch_persistent_context(
+        user_data_dir=user_data_dir,
+        record_video_dir="test-results/videos/",  # 添加视频录制目录
+        record_video_size={"width": 1920, "height": 1080},  # 设置视频尺寸
+        traces_dir="test-results/traces/",  # 添加追踪文件目录
+        **PERSISTENT_CONTEXT_OPTIONS
+    )
+
+
+async def open_browser_session(playwright: Playwright, user_data_dir: str,
+                               browser_daemon: str = "auto") -> BrowserSession:
+    """
+    打开浏览器会话：优先连接已在运行的浏览器守护进程，否则启动新的持久化浏览器
+
+    Args:
+        playwright: async_playwright() 返回的 Playwright 对象
+        user_data_dir: 浏览器用户数据目录（仅在启动新浏览器时使用）
+        browser_daemon: 'auto' 守护进程运行时连接，否则启动新浏览器；
+                        'require' 必须连接守护进程；'off' 总是启动新浏览器
+
+    Returns:
+        浏览器会话
+
+    Raises:
+        PublishPipelineError: browser_daemon 为 'require' 但守护进程未运行时
+    """
+    if browser_daemon != "off":
+        session = await attach_to_daemon(playwright)
+        if session:
+            return session
+        if browser_daemon == "require":
+            raise PublishPipelineError("浏览器守护进程未运行，请先执行 python browser_daemon.py serve")
+        print("ℹ️  未检测到浏览器守护进程，启动新的浏览器（可运行 python browser_daemon.py serve 预热浏览器）")
+    return BrowserSession(await launch_browser_context(playwright, user_data_dir))
+
+
+async def run_publish_pipeline(session: BrowserSession, options: PublishOptions,
+                               timeline: Optional[RunTimeline] = None) -> List[PublishResult]:
+    """
+    在已启动的浏览器会话中执行完整的发布流程
+
+    各步骤的耗时记录到运行时间线，结束时（包括失败时）保存到 test-results/timelines/ 并打印最慢的步骤。
+
+    Args:
+        session: 浏览器会话，各平台和豆包AI使用其中按用途复用的页面
+        options: 发布参数
+        timeline: 记录各步骤耗时的时间线，默认新建（基准测试传入以便读取各步骤耗时）
+
+    Returns:
+        各平台的发布结果列表
+
+    Raises:
+        PublishPipelineError: 参数缺失、钉钉文档获取失败或发布前处理失败时
+    """
+    timeline = timeline or RunTimeline(options.title or "untitled")
+    try:
+        with timeline.activate():
+            return await _run_publish_pipeline(session, options)
+    finally:
+        if timeline.spans:
+            timeline.print_summary()
+            timeline.save()
+
+
+async def _run_publish_pipeline(session: BrowserSession, options: PublishOptions) -> List[PublishResult]:
+    """run_publish_pipeline 的实际流程"""
+    title = options.title
+    author = options.author
+    summary = options.summary
+    url = options.url
+    markdown_file = options.markdown_file
+    platforms = options.platforms
+    cover_image = options.cover_image
+    tags_str = options.tags
+    short_title = options.short_title
+    max_concurrency = options.max_concurrency
+    ai_mode = options.ai_mode
+    try:
+        provider = create_ai_provider(options.ai_provider, session,
+                                      hedge=None if options.ai_hedge == 'off' else options.ai_hedge)
+    except ValueError as e:
+        raise PublishPipelineError(str(e))
+
+    # 验证必需参数
+    if not title:
+        print("❌ 缺少必需参数 --title！")
+        print("请提供文章标题，例如：")
+        print("pytest -s --headed ./test_social_media_automatic_publish.py --title '文章标题'")
+        raise PublishPipelineError("缺少必需参数 --title")
+
+    # 打开运行日志，--resume 时跳过已完成的阶段和已发布成功的平台
+    journal = RunJournal.open(title, resume=options.resume)
+    
+    # 显示参数使用情况
+    print("=" * 60)
+    print("📋 参数使用情况：")
+    print("=" * 60)
+    print(f"📝 使用指定的标题: {title}")
+        
+    if summary:
+        print(f"📄 使用指定的摘要: {summary}")
+    else:
+        print("📄 摘要: 将使用豆包AI自动生成")
+        
+    if url:
+        print(f"🔗 使用指定的URL: {url}")
+    else:
+        print("🔗 URL: 将从钉钉文档自动获取")
+        
+    markdown_filename = None
+    if markdown_file:
+        print(f"📁 使用指定的Markdown文件: {markdown_file}")
+        # 提取markdown文件名（不含后缀），因为cnblogs会自动将markdown的文件名作为文章标题。如果命令行参数中title与markdown不一致会报错。
+        markdown_filename = os.path.splitext(os.path.basename(markdown_file))[0]
+        print(f"📁 Markdown文件名: {markdown_filename}")
+    else:
+        print("📁 Markdown文件: 将从钉钉文档自动下载")
+        
+    # 标记是否需要从钉钉文档下载markdown文件
+    need_download_markdown = not markdown_file
+    
+    # 标记是否需要利用dingtalk_sdk获取钉钉文档的url
+    # 只有在提供了markdown文件但没有提供url参数时，才需要获取钉钉文档的url
+    need_get_dingtalk_url = not url and markdown_file
+
+    if cover_image:
+        print(f"🖼️  使用指定的封面图: {cover_image}")
+    else:
+        print("🖼️  封面图: 将使用Gemini自动生成")
+        
+    if short_title:
+        print(f"📝 使用指定的短标题: {short_title}")
+    else:
+        print("📝 短标题: 将自动生成")
+    print("=" * 60)
+    
+    # 标记是否需要使用豆包AI自动生成summary（在markdown文件下载后执行）
+    need_ai_summary = not summary or summary.lower() in ['auto', 'doubao', '豆包', 'ai']
+    # 标记是否从文章内容本地抽取summary（不询问AI）
+    need_local_summary = bool(summary) and summary.lower() in ['local', '本地']
+
+    # 需要豆包AI时，在下载钉钉文档的同时预先加载一个豆包页面
+    doubao_warm_up = None
+    if options.ai_provider == 'doubao' and (need_ai_summary or not cover_image):
+        doubao_warm_up = asyncio.ensure_future(get_doubao_session(session).warm_up(1))
+    
+    try:
+        # 解析平台参数
+        if platforms.lower() == 'all':
+            target_platforms = list(ALL_PLATFORMS)
+        else:
+            target_platforms = [p.strip().lower() for p in platforms.split(',')]
+    
+        print(f"将发布到以下平台: {', '.join(target_platforms)}")
+        print(f"使用封面图片: {cover_image}")
+
+        # 断点续跑时优先使用运行日志中的钉钉文档URL和包含封面图的Markdown文件
+        dingtalk_url_record = journal.stage_outputs("dingtalk_url") if need_get_dingtalk_url else None
+        dingtalk_cover_record = journal.stage_outputs("dingtalk_cover", file_outputs=["markdown_file"]) if need_download_markdown else None
+
+        # 如果未指定url，则利用dingtalk_sdk搜索并获取钉钉文档的url
+        if dingtalk_url_record:
+            url = dingtalk_url_record['url']
+            print(f"♻️  使用运行日志中的钉钉文档URL: {url}")
+        elif need_get_dingtalk_url:
+            print("📁 未指定URL，正在利用dingtalk_sdk搜索钉钉文档...")
+            print(f"🔍 搜索关键词: {title}")
+        
+            try:
+                # 创建钉钉SDK实例
+                dingtalk_sdk = create_sdk(dingtalk_app_key, dingtalk_app_secret)
+            
+                # 使用title作为关键词搜索文档并获取详细信息
+                with span("钉钉SDK.搜索文档"):
+                    documents = await asyncio.to_thread(
+                        dingtalk_sdk.search_and_get_document_details_with_user_id, title, dingtalk_user_id
+                    )
+            
+                if documents:
+                    # 获取第一个搜索结果的URL
+                    url = documents[0].url
+                    print(f"✅ 找到文档: {documents[0].title}")
+                    print(f"🔗 获取到的钉钉文档URL: {url}")
+                    journal.record_stage("dingtalk_url", {'url': url})
+                else:
+                    print(f"❌ 未找到包含关键词 '{title}' 的钉钉文档")
+                    print("请检查标题是否正确，或手动指定URL参数")
+                    raise PublishPipelineError(f"未找到包含关键词 '{title}' 的钉钉文档")
+                
+            except PublishPipelineError:
+                raise
+            except Exception as e:
+                print(f"❌ 获取钉钉文档URL失败: {e}")
+                print("请检查钉钉API配置或手动指定URL参数")
+                raise PublishPipelineError(f"获取钉钉文档URL失败: {e}")
+        else:
+            print(f"🔗 使用指定的URL: {url}")
+
+        # 如果没有指定markdown文件，则从钉钉文档下载
+        if dingtalk_cover_record:
+            markdown_file = dingtalk_cover_record['markdown_file']
+            url = url or dingtalk_cover_record['url']
+            print(f"♻️  使用运行日志中包含封面图的Markdown文件: {markdown_file}")
+            print(f"♻️  使用运行日志中的钉钉文档URL: {url}")
+        elif need_download_markdown:
+            with span("钉钉文档.下载Markdown"):
+                print("📁 未指定Markdown文件，正在从钉钉文档下载...")
+        
+                # 下载钉钉文档为本地markdown文件
+                page_dingtalk_DreamAI_KB = await session.page("dingtalk")
+                await page_dingtalk_DreamAI_KB.goto("https://alidocs.dingtalk.com/i/nodes/Amq4vjg890AlRbA6Td9ZvlpDJ3kdP0wQ")
+                # 登录钉钉文档
+                # 检查是否需要登录
+                try:
+                    login_button = page_dingtalk_DreamAI_KB.locator("#wiki-doc-iframe").content_frame.get_by_role("button", name="登录钉钉文档")
+                    if await login_button.is_visible(timeout=5000):
+                        print("检测到需要登录钉钉文档，正在执行登录...")
+                        await login_button.click()
+                        await page_dingtalk_DreamAI_KB.locator(".module-qrcode-op-line > .base-comp-check-box > .base-comp-check-box-rememberme-box").first.click()
+                        await page_dingtalk_DreamAI_KB.get_by_text("邓龙").click()
+                        print("登录钉钉文档完成")
+                    else:
+                        print("已登录钉钉文档，跳过登录步骤")
+                except Exception as e:
+                    print(f"登录检查过程中出现异常: {e}")
+                    print("继续执行后续步骤...")
+                # page.goto("https://alidocs.dingtalk.com/i/nodes/Amq4vjg890AlRbA6Td9ZvlpDJ3kdP0wQ?code=1d328c3fafd03cf4bc3c319882ced3d4&authCode=1d328c3fafd03cf4bc3c319882ced3d4")
+                # page_dingtalk_DreamAI_KB.get_by_role("textbox", name="快速搜索文档标题").click()
+                # page_dingtalk_DreamAI_KB.get_by_role("textbox", name="快速搜索文档标题").fill("craXcel，一个可以移除Excel密码的开源工具")
+                await page_dingtalk_DreamAI_KB.get_by_test_id("cn-dropdown-trigger").locator("path").click()
+                await page_dingtalk_DreamAI_KB.get_by_role("textbox", name="搜索（Ctrl + J）").click()
+
+                # 使用提供的title进行搜索
+                await page_dingtalk_DreamAI_KB.get_by_role("textbox", name="搜索（Ctrl + J）").fill(title)
+        
+                # 点击搜索结果打开文档（多种定位方式同时尝试，上次成功的方式优先）
+                async with page_dingtalk_DreamAI_KB.expect_popup() as page1_info:
+                    search_results = page_dingtalk_DreamAI_KB
+                    try:
+                        await click_first("dingtalk", "搜索结果", {
+                            "带title的span": lambda: search_results.locator(f'span[title="{title}"]'),
+                            "表格容器": lambda: search_results.get_by_test_id("base-table-container").get_by_text(title),
+                            "标题链接": lambda: search_results.get_by_role("heading").filter(has_text=title).get_by_role("link"),
+                            "标题": lambda: search_results.get_by_role("heading").filter(has_text=title),
+                            "精确文本": lambda: search_results.get_by_text(title, exact=True),
+                        })
+                    except Exception as e:
+                        print(f"❌ 定位目标元素失败: {e}")
+                        raise
+                page_dingtalk_doc = await page1_info.value
+
+                # 等待页面基本加载完成
+                await page_dingtalk_doc.wait_for_load_state("domcontentloaded", timeout=30000)
+                print("✅ 钉钉文档页面基本加载完成")
+                # 等待文档iframe中的工具栏就绪
+                await wait_visible(page_dingtalk_doc.locator("#wiki-doc-iframe").content_frame.get_by_test_id("doc-header-more-button"),
+                                   "钉钉文档工具栏就绪", timeout_ms=30000)
+
+        
+                await page_dingtalk_doc.locator("#wiki-doc-iframe").content_frame.get_by_test_id("doc-header-more-button").click()
+                # 下载钉钉文档为本地markdown文件
+                await page_dingtalk_doc.locator("#wiki-doc-iframe").content_frame.get_by_text("下载到本地").first.click()
+                async with page_dingtalk_doc.expect_download() as download_info:
+                    await page_dingtalk_doc.locator("#wiki-doc-iframe").content_frame.get_by_text("Markdown(.md)").click()
+                download = await download_info.value
+                # Wait for the download process to complete and save the downloaded file somewhere
+                # 获取下载文件的建议文件名
+                suggested_filename = download.suggested_filename
+                # 构建保存路径
+                save_path = os.path.join("D:/tornadofiles/scripts_脚本/github_projects/playwright-automation/markdown_files", suggested_filename)
+                # 保存文件
+                await download.save_as(save_path)
+        
+                # 获取下载文件的绝对路径和文件名
+                downloaded_file_path = os.path.abspath(save_path)
+                downloaded_filename = os.path.basename(downloaded_file_path)
+        
+                # 更新markdown_file变量为下载的文件路径
+                markdown_file = downloaded_file_path
+        
+                print(f"📁 下载文件名: {downloaded_filename}")
+                print(f"📂 下载文件绝对路径: {downloaded_file_path}")
+        
+                # 获取当前网页的网址并赋值给url
+                if not url:
+                    try:
+                        current_url = page_dingtalk_doc.url
+                        url = current_url
+                        print(f"🔗 从钉钉文档自动获取URL: {url}")
+                    except Exception as e:
+                        print(f"⚠️  获取URL失败: {e}")
+                        print("❌ 获取URL失败，脚本暂停执行")
+                        raise PublishPipelineError(f"获取URL失败: {e}")
+        else:
+            print(f"📁 使用指定的Markdown文件: {markdown_file}")
+            # 验证文件是否存在
+            if not os.path.exists(markdown_file):
+                print(f"❌ 指定的Markdown文件不存在: {markdown_file}")
+                raise PublishPipelineError(f"指定的Markdown文件不存在: {markdown_file}")
+
+        # 获取当前网页的网址并赋值给url
+        if not url:
+            try:
+                current_url = page_dingtalk_doc.url
+                url = current_url
+                print(f"🔗 从钉钉文档自动获取URL: {url}")
+            except Exception as e:
+                print(f"⚠️  获取URL失败: {e}")
+                print("❌ 获取URL失败，脚本暂停执行")
+                raise PublishPipelineError(f"获取URL失败: {e}")
+
+        # 发布前处理：AI总结、短标题、话题标签、封面图之间互不依赖，通过依赖图同时执行。
+        # 需要浏览器的阶段在同一个事件循环中并发运行，各自打开独立的豆包页面。
+        # 合并生成模式（默认）下先在一个豆包对话中生成这些字段，各阶段只为未能生成的字段单独询问豆包AI。
+        provided_summary = summary
+        provided_short_title = short_title
+        provided_cover_image = cover_image
+        provided_tags = [tag.strip() for tag in tags_str.split(',') if tag.strip()]
+        need_ai_tags = not provided_tags or (len(provided_tags) == 1 and provided_tags[0].lower() in ['auto', 'doubao', '豆包', 'ai'])
+        need_local_tags = len(provided_tags) == 1 and provided_tags[0].lower() in ['local', '本地']
+
+        # 合并生成模式下需要AI生成的字段
+        ai_fields = []
+        if ai_mode == 'combined':
+            if need_ai_summary:
+                ai_fields.append("summary")
+            if not provided_short_title and len(title) > 20:
+                ai_fields.append("short_title")
+            if need_ai_tags:
+                ai_fields.append("tags")
+            if not provided_cover_image:
+                ai_fields.append("image_prompt")
+
+        async def ai_metadata_stage(inputs):
+            """阶段：合并生成模式下，上传一次Markdown文件，在同一个豆包对话中生成后续阶段需要的AI字段"""
+            if not ai_fields:
+                return {'ai_metadata': {}}
+
+            print("=" * 60)
+            print(f"🤖 使用{provider.label}合并生成summary、短标题、话题标签和文生图提示词...")
+            print("=" * 60)
+            # 未能生成的字段由各自的阶段单独生成
+            metadata = await provider.generate_metadata(inputs['markdown_file'], ai_fields, title=title)
+            missing = [name for name in ai_fields if name not in metadata]
+            if missing:
+                print(f"⚠️  以下字段将由各自的阶段单独生成: {', '.join(missing)}")
+            return {'ai_metadata': metadata}
+
+        async def summary_stage(inputs):
+            """阶段：生成summary（如需要）并验证文本长度"""
+            stage_summary = provided_summary
+
+            def local_summary():
+                """从文章内容本地抽取summary（几毫秒完成，保证不超过120字）"""
+                with open(inputs['markdown_file'], 'r', encoding='utf-8') as f:
+                    local = summarize_markdown(f.read(), max_length=120)
+                print(f"📝 本地抽取的summary: {local}")
+                return local
+
+            if need_local_summary:
+                stage_summary = local_summary()
+                if not stage_summary:
+                    raise Exception("Markdown文件中没有可用于summary的正文")
+
+            # 如果需要使用豆包AI自动生成summary，现在执行
+            if need_ai_summary:
+                print("=" * 60)
+                print(f"🤖 使用{provider.label}自动生成summary...")
+                print("=" * 60)
+            
+                print(f"📄 使用的Markdown文件: {inputs['markdown_file']}")
+                print(f"📁 文件大小: {os.path.getsize(inputs['markdown_file'])} 字节")
+            
+                # 使用豆包AI生成summary（合并生成模式已生成时直接使用）
+                stage_summary = inputs['ai_metadata'].get('summary')
+                if not stage_summary:
+                    stage_summary = await provider.summarize(inputs['markdown_file'])
+                if stage_summary:
+                    print(f"🤖 {provider.label}生成的summary: {stage_summary}")
+                else:
+                    print(f"⚠️  {provider.label}生成summary失败，改为从文章内容本地抽取summary")
+                    stage_summary = local_summary()
+                if not stage_summary:
+                    print(f"❌ {provider.label}生成summary失败，请手动提供summary参数")
+                    print("请手动提供summary参数，或检查网络连接和豆包AI登录状态")
+                    raise Exception(f"{provider.label}生成summary失败")
+
+            # 验证并清理summary文本长度
+            print("=" * 60)
+            print("📏 验证summary文本长度...")
+            validation_result = validate_and_clean_text(stage_summary, max_length=120)
+            print(validation_result['message'])
+        
+            # AI生成的summary过长时改用本地抽取的summary，不必中止发布
+            if not validation_result['success'] and need_ai_summary:
+                print(f"⚠️  {provider.label}生成的summary过长，改为从文章内容本地抽取summary")
+                stage_summary = local_summary()
+                validation_result = validate_and_clean_text(stage_summary, max_length=120)
+                print(validation_result['message'])
+        
+            if not validation_result['success']:
+                print("\n❌ Summary文本过长，无法继续执行脚本！")
+                print("请修改summary参数，确保字符数不超过120个。")
+                print(f"当前summary: \"{validation_result['original_text']}\"")
+                print(f"原始长度: {validation_result['original_count']}字符")
+                print(f"清理后长度: {validation_result['cleaned_count']}字符")
+                print("\n建议解决方案：")
+                print("1. 缩短summary文本内容")
+                print("2. 移除不必要的词汇和标点符号") 
+                print("3. 使用更简洁的表达方式")
+                print("4. 如果使用豆包AI，可能需要调整提示词")
+                raise Exception("Summary文本过长")
+        
+            # 如果清理后的文本更短，使用清理后的版本
+            if validation_result['cleaned_count'] < validation_result['original_count']:
+                stage_summary = validation_result['cleaned_text']
+                print(f"✅ 已自动使用清理后的summary（减少了{validation_result['original_count'] - validation_result['cleaned_count']}个字符）")
+            return {'summary': stage_summary}
+
+        async def short_title_stage(inputs):
+            """阶段：确定图文平台使用的短标题"""
+            print("=" * 60)
+            print("📏 检查标题长度...")
+            title_length = len(title)
+            print(f"📝 当前标题: {title}")
+            print(f"📊 标题长度: {title_length}字符")
+        
+            # 如果用户提供了短标题参数，直接使用
+            if provided_short_title:
+                short_title_length = len(provided_short_title)
+                print(f"✅ 使用用户指定的短标题: {provided_short_title}")
+                print(f"📊 短标题长度: {short_title_length}字符")
+            
+                # 验证用户提供的短标题长度
+                if short_title_length > 20:
+                    print(f"⚠️  用户指定的短标题过长({short_title_length}字符)，建议不超过20字符")
+                    print("将使用用户指定的短标题，但可能在某些平台显示不完整")
+                return {'short_title': provided_short_title}
+
+            if title_length <= 20:
+                print("✅ 标题长度符合要求，无需生成短标题")
+                print(f"✅ 标题长度符合要求，已将title赋值给short_title，将使用short_title: {title}")
+                return {'short_title': title}
+
+            # 如果title长度超过20字符，使用豆包AI生成短标题
+            print("⚠️  标题长度超过20字符，需要生成短标题")
+            print(f"🤖 正在使用{provider.label}生成短标题...")
+            try:
+                generated_short_title = inputs['ai_metadata'].get('short_title')
+                if generated_short_title:
+                    print("♻️  使用合并生成模式生成的短标题")
+                else:
+                    generated_short_title = await provider.shorten_title(inputs['markdown_file'], title)
+            except Exception as e:
+                print(f"❌ {provider.label}生成短标题时出错: {e}")
+                generated_short_title = None
+
+            if not generated_short_title:
+                print(f"❌ {provider.label}生成短标题失败，将使用原标题")
+                print(f"✅ 将使用原标题作为短标题: {title}")
+                return {'short_title': title}
+
+            short_title_length = len(generated_short_title)
+            print(f"✅ {provider.label}生成的短标题: {generated_short_title}")
+            print(f"📊 短标题长度: {short_title_length}字符")
+        
+            # 验证生成的短标题长度
+            if short_title_length > 20:
+                print(f"⚠️  生成的短标题仍然过长({short_title_length}字符)")
+                raise Exception(f"{provider.label}生成的短标题仍然过长")
+            print("✅ 短标题长度符合要求，将使用生成的短标题")
+            return {'short_title': generated_short_title}
+
+        async def tags_stage(inputs):
+            """阶段：解析或生成话题标签"""
+            # 解析话题标签
+            stage_tags = list(provided_tags)
+            print(f"📝 原始话题标签: {stage_tags}")
+        
+            with open(inputs['markdown_file'], 'r', encoding='utf-8') as f:
+                markdown_content = f.read()
+
+            # 本地提取话题标签（不询问AI）
+            if need_local_tags:
+                stage_tags = extract_tags(markdown_content)
+                print(f"🏷️  本地提取的话题标签: {stage_tags}")
+                if not stage_tags:
+                    print("⚠️  本地提取话题标签失败，使用默认标签")
+                    stage_tags = ['AI', 'LLM', '人工智能', '开发', '大模型']
+
+            # 检查是否需要使用豆包AI自动生成话题标签
+            if need_ai_tags:
+                print("=" * 60)
+                print(f"🏷️  使用{provider.label}自动生成话题标签...")
+                print("=" * 60)
+            
+                try:
+                    # 合并生成模式已生成时直接使用
+                    ai_generated_tags = inputs['ai_metadata'].get('tags')
+                    if not ai_generated_tags:
+                        ai_generated_tags = await provider.generate_tags(inputs['markdown_file'])
+                    if ai_generated_tags:
+                        stage_tags = ai_generated_tags
+                        print(f"🤖 {provider.label}生成的话题标签: {stage_tags}")
+                    else:
+                        print(f"⚠️  {provider.label}生成标签失败，使用默认标签")
+                        stage_tags = ['AI', 'LLM', '人工智能', '开发', '大模型']
+                    
+                except Exception as e:
+                    print(f"❌ {provider.label}生成标签失败: {e}")
+                    print("使用默认标签...")
+                    stage_tags = ['AI', 'LLM', '人工智能', '开发', '大模型']
+            
+                print("=" * 60)
+        
+            # 按与文章的相关度排列，各平台选取得分最高的标签
+            stage_tags = rank_tags(markdown_content, stage_tags)
+            print(f"📝 最终话题标签: {stage_tags}")
+            return {'all_tags': stage_tags}
+
+        async def cover_stage(inputs):
+            """阶段：使用AI内容提供者生成文章封面图（如果没有提供cover_image）"""
+            if provided_cover_image:
+                print(f"🖼️  使用指定的封面图: {provided_cover_image}")
+                return {'cover_image': provided_cover_image}
+
+            print("=" * 60)
+            print(f"🎨 正在使用{provider.label}生成文章封面图...")
+            print("=" * 60)
+            # 生成图片（豆包AI会生成4张图片），合并生成模式已生成文生图提示词时跳过提示词生成
+            image_files = await provider.generate_images(inputs['markdown_file'], inputs['ai_metadata'].get('image_prompt'),
+                                                         aspect_ratio="16:9")
+
+            if not image_files:
+                print(f"❌ {provider.label}图片生成失败，将退出脚本")
+                raise Exception(f"{provider.label}图片生成失败")
+
+            # 按清晰度、对比度、色彩丰富度和文字区域为候选图打分，选择得分最高的一张作为封面图
+            print(f"✅ {provider.label}图片生成成功，共生成 {len(image_files)} 张图片")
+            with span("封面图评分", candidates=len(image_files)) as current:
+                cover_scores = await asyncio.to_thread(score_covers, image_files)
+                current.attributes['scores'] = {os.path.basename(item.path): asdict(item) for item in cover_scores}
+            if not cover_scores:
+                print("❌ 所有生成的图片都无法读取，将退出脚本")
+                raise Exception(f"{provider.label}生成的封面图不可用")
+            for item in cover_scores:
+                duplicate = f"，与 {os.path.basename(item.duplicate_of)} 近似重复" if item.duplicate_of else ""
+                print(f"📊 {os.path.basename(item.path)}: 得分 {item.score:.3f}（清晰度 {item.sharpness:.0f}，"
+                      f"对比度 {item.contrast:.0f}，色彩 {item.colorfulness:.0f}，文字区域 {item.text_ratio:.0%}{duplicate}）")
+            stage_cover_image = cover_scores[0].path
+            print(f"🏆 选择得分最高的封面图: {os.path.basename(stage_cover_image)}")
+            print(f"📁 封面图路径: {stage_cover_image}")
+            return {'cover_image': stage_cover_image}
+
+        # 使用Gemini生成文章封面图（如果没有提供cover_image且豆包AI也失败）
+        # if not cover_image:
+        #     print("=" * 60)
+        #     print("🎨 正在使用Gemini生成文章封面图...")
+        #     print("=" * 60)
+        #     try:
+        #         # 直接调用另外一个脚本来生成封面图
+        #         import subprocess
+        #         import sys
+
+        #         # 设置生成图片的下载目录
+        #         generated_images_dir = os.path.join(os.getcwd(), "generated_images")
+        #         os.makedirs(generated_images_dir, exist_ok=True)
+        #         env = os.environ.copy()
+        #         # 构建调用命令
+        #         script_path = "test_gemini_image_generation_upload_fixed.py"
+        #         cmd = ["uv", "run", "python", script_path]
+        #         # 设置环境变量传递markdown文件路径
+        #         env['MARKDOWN_FILE_PATH'] = markdown_file
+
+        #         # 设置环境变量以确保UTF-8编码
+        #         env['PYTHONIOENCODING'] = 'utf-8'
+        #         env['PYTHONUTF8'] = '1'
+
+        #         print(f"📄 使用Markdown文件: {markdown_file}")
+        #         print(f"📁 图片保存目录: {generated_images_dir}")
+        #         print(f"🚀 执行命令: {' '.join(cmd)}")
+        #         print("⚠️  注意：请确保Chrome已启动并开启调试端口：")
+        #         print("   chrome.exe --remote-debugging-port=9222")
+        #         print("   或者使用以下命令启动Chrome：")
+        #         print("   chrome.exe --remote-debugging-port=9222 --user-data-dir=C:\\temp\\chrome-debug")
+        #         print()
+        #         print("📺 子脚本输出：")
+        #         print("-" * 40)
+
+        #         # 执行脚本并实时显示输出
+        #         process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, 
+        #                  text=True, encoding='utf-8', cwd=os.getcwd(), env=env, bufsize=1, universal_newlines=True)
+            
+        #         # 实时读取并显示输出
+        #         for line in process.stdout:
+        #             print(line.rstrip())
+            
+        #         # 等待进程完成
+        #         process.wait()
+            
+        #         print("-" * 40)
+        #         print("📺 子脚本执行完成")
+            
+        #         if process.returncode == 0:
+        #             print("✅ Gemini图片生成脚本执行成功")
+                
+        #             # 查找生成的图片文件
+        #             downloads_dir = os.path.join(os.getcwd(), "generated_images")
+        #             if os.path.exists(downloads_dir):
+        #                 image_files = [f for f in os.listdir(downloads_dir) 
+        #                              if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp'))]
+                    
+        #                 if image_files:
+        #                     # 使用最新生成的图片（按修改时间排序）
+        #                     latest_image = max(image_files, 
+        #                                      key=lambda x: os.path.getctime(os.path.join(downloads_dir, x)))
+        #                     cover_image = os.path.abspath(os.path.join(downloads_dir, latest_image))
+        #                     print(f"✅ Gemini图片生成成功，封面图: {cover_image}")
+                        
+        #                     # 验证文件是否存在且可读
+        #                     if os.path.exists(cover_image) and os.path.getsize(cover_image) > 0:
+        #                         print(f"✅ 封面图验证成功，文件大小: {os.path.getsize(cover_image)} 字节")
+        #                     else:
+        #                         print(f"❌ 封面图验证失败，文件不存在或为空")
+        #                         sys.exit(1)
+        #                 else:
+        #                     print("⚠️  未找到生成的图片，将退出脚本")
+        #                     sys.exit(1)
+        #             else:
+        #                 print("⚠️  生成图片目录不存在，将退出脚本")
+        #                 sys.exit(1)
+        #         else:
+        #             print(f"❌ Gemini图片生成脚本执行失败，将退出脚本")
+        #             print(f"返回码: {process.returncode}")
+        #             sys.exit(1)
+                
+        #     except FileNotFoundError:
+        #         print(f"⚠️  找不到Gemini生成脚本: test_gemini_image_generation_upload_fixed.py，将退出脚本")
+        #         print("请确保该文件存在于当前目录")
+        #         sys.exit(1)
+            
+        #     except Exception as e:
+        #         print(f"⚠️  调用Gemini生成图片时出错: {e}，将退出脚本")
+        #         sys.exit(1)
+        # else:
+        #     print(f"🖼️  使用指定的封面图: {cover_image}")
+        #     if not os.path.exists(cover_image):
+        #         print(f"❌ 封面图文件不存在: {cover_image}，将退出脚本")
+        #         sys.exit(1)
+
+        async def compress_cover_stage(inputs):
+            """阶段：检查封面图大小，如果超过5MB则进行压缩"""
+            stage_cover_image = inputs['cover_image']
+            print("=" * 60)
+            print("📏 检查封面图文件大小...")
+            print("=" * 60)
+        
+            cover_image_size = os.path.getsize(stage_cover_image)
+            cover_image_size_mb = cover_image_size / (1024 * 1024)
+            print(f"📊 封面图文件大小: {cover_image_size_mb:.2f}MB")
+        
+            if cover_image_size_mb <= 5:
+                print(f"✅ 封面图文件大小符合要求({cover_image_size_mb:.2f}MB <= 5MB)")
+                return {'compressed_cover_image': stage_cover_image}
+
+            print(f"⚠️  封面图文件大小({cover_image_size_mb:.2f}MB)超过5MB限制，开始压缩...")
+            compressed = await asyncio.to_thread(compress_image, stage_cover_image, max_size_mb=5, quality=85)
+        
+            if compressed and os.path.exists(compressed):
+                print("✅ 封面图压缩成功")
+                print(f"📁 压缩后文件路径: {compressed}")
+                compressed_size = os.path.getsize(compressed)
+                compressed_size_mb = compressed_size / (1024 * 1024)
+                print(f"📊 压缩后文件大小: {compressed_size_mb:.2f}MB")
+            else:
+                print("❌ 封面图压缩失败，将使用原始图片")
+                print(f"⚠️  注意：原始图片大小({cover_image_size_mb:.2f}MB)可能超过某些平台的限制")
+                compressed = stage_cover_image
+            return {'compressed_cover_image': compressed}
+
+        async def cover_variants_stage(inputs):
+            """阶段：按各平台对格式、宽高比和大小的要求生成封面图变体"""
+            specs = variants_for_platforms(target_platforms)
+            if not specs:
+                return {'cover_variants': {}}
+            print("=" * 60)
+            print(f"🖼️  生成各平台封面图变体: {', '.join(spec.name for spec in specs)}")
+            print("=" * 60)
+            try:
+                variants = await asyncio.to_thread(build_variants, inputs['cover_image'], specs)
+            except Exception as e:
+                print(f"❌ 生成封面图变体失败，各平台将使用原始封面图: {e}")
+                variants = {}
+            return {'cover_variants': variants}
+
+        async def wechat_material_stage(inputs):
+            """阶段：将文章封面图上传到微信公众号图片库"""
+            print("确定是否需要将生成的文章封面图上传到微信公众平台图片库.")
+            if 'wechat' not in target_platforms:
+                print("⏭️  未指定wechat，跳过将生成的文章封面图上传到微信公众平台图片库.")
+                return {'media_id': None}
+
+            print("=" * 60)
+            print("🎨 正在将豆包AI生成的文章封面图上传到微信公众号图片库...")
+            print("=" * 60)
+            # 在test_social_media_automatic_publish.py中使用
+            from wechat_mp_sdk import WeChatMPSDK
+
+            # 上传封面图到微信公众号素材库
+            sdk = WeChatMPSDK(app_id=app_id, app_secret=app_secret)
+            with span("微信公众号SDK.上传图片"):
+                material_image = inputs['cover_variants'].get('wechat_material', inputs['cover_image'])
+                material_result = await asyncio.to_thread(sdk.upload_image, material_image)
+            media_id = material_result['media_id']
+            print(f"✅ 上传封面图到微信公众号素材库成功，media_id: {media_id}")
+            print(f"✅ 上传封面图到微信公众号素材库成功，url: {material_result['url']}")
+            return {'media_id': media_id}
+
+        # 等待豆包页面预加载完成，避免各阶段同时再打开新的豆包页面
+        if doubao_warm_up is not None:
+            await doubao_warm_up
+    finally:
+        # 前面的步骤失败时取消尚未完成的预加载，不留下悬挂的任务
+        if doubao_warm_up is not None and not doubao_warm_up.done():
+            doubao_warm_up.cancel()
+            await asyncio.gather(doubao_warm_up, return_exceptions=True)
+
+    # 声明各阶段的输入和输出，依赖关系由执行器自动推导：
+    # markdown文件 → AI合并生成 → summary / 短标题 / 话题标签 / 封面图 → 封面图压缩 / 各平台变体 → 上传微信素材库
+    # 每个阶段完成后将产出和输入哈希写入运行日志，--resume 时已完成且输入（包括影响该阶段的命令行参数）
+    # 未变化的阶段直接使用日志中的产出，上游阶段重新执行后下游阶段也会重新执行
+    # （封面图变体不写入日志：变体缓存按内容寻址，重新执行只需计算一次哈希）
+    ai_provider = options.ai_provider
+    prepublish = PipelineDAG("prepublish")
+    prepublish.add_stage("ai_metadata", journal.checkpoint("ai_metadata", ai_metadata_stage, key=journal_stage_key(provider=ai_provider, fields=ai_fields, title=title)), inputs=["markdown_file"], outputs=["ai_metadata"])
+    prepublish.add_stage("summary", journal.checkpoint("summary", summary_stage, key=journal_stage_key(provider=ai_provider, summary=provided_summary)), inputs=["markdown_file", "ai_metadata"], outputs=["summary"])
+    prepublish.add_stage("short_title", journal.checkpoint("short_title", short_title_stage, key=journal_stage_key(provider=ai_provider, short_title=provided_short_title, title=title)), inputs=["markdown_file", "ai_metadata"], outputs=["short_title"])
+    prepublish.add_stage("tags", journal.checkpoint("tags", tags_stage, key=journal_stage_key(provider=ai_provider, tags=provided_tags)), inputs=["markdown_file", "ai_metadata"], outputs=["all_tags"])
+    prepublish.add_stage("cover", journal.checkpoint("cover", cover_stage, file_outputs=["cover_image"], key=journal_stage_key(provider=ai_provider, cover_image=provided_cover_image)), inputs=["markdown_file", "ai_metadata"], outputs=["cover_image"])
+    prepublish.add_stage("compress_cover", journal.checkpoint("compress_cover", compress_cover_stage, file_outputs=["compressed_cover_image"]), inputs=["cover_image"], outputs=["compressed_cover_image"])
+    prepublish.add_stage("cover_variants", cover_variants_stage, inputs=["cover_image"], outputs=["cover_variants"])
+    prepublish.add_stage("wechat_material", journal.checkpoint("wechat_material", wechat_material_stage, key=journal_stage_key(wechat='wechat' in target_platforms)), inputs=["cover_image", "cover_variants"], outputs=["media_id"])
+    prepublish_result = await prepublish.run({"markdown_file": markdown_file}, max_workers=max_concurrency)
+
+    if prepublish_result.failed or prepublish_result.skipped:
+        print(f"❌ 发布前处理失败的阶段: {', '.join(prepublish_result.failed)}")
+        if prepublish_result.skipped:
+            print(f"⏭️  因上游失败而跳过的阶段: {', '.join(prepublish_result.skipped)}")
+        print("将退出脚本")
+        raise PublishPipelineError(f"发布前处理失败的阶段: {', '.join(prepublish_result.failed + prepublish_result.skipped)}")
+
+    summary = prepublish_result.values['summary']
+    short_title = prepublish_result.values['short_title']
+    all_tags = prepublish_result.values['all_tags']
+    cover_image = prepublish_result.values['cover_image']
+    compressed_cover_image = prepublish_result.values['compressed_cover_image']
+    cover_variants = prepublish_result.values['cover_variants']
+    print("=" * 60)
+
+    # 将豆包AI生成的文章封面图上传到相应钉钉文档的第一行中
+    # 如果命令行中已经指定了markdown_file，则跳过执行这部分代码
+    if need_download_markdown and not dingtalk_cover_record:
+        with span("钉钉文档.插入封面图"):
+            try:
+                print("命令行中未指定markdown_file，将执行钉钉文档封面图上传步骤")
+                # 1. 直接聚焦到iframe内容区域
+                iframe_content = page_dingtalk_doc.locator("#wiki-doc-iframe").content_frame
+                print(f"✅ 获取到iframe内容: {iframe_content}")
+           
+                print("查找文档主体以找到可编辑区域")
+                try:
+                    doc_body = iframe_content.locator('body, .document-body, .editor-content')
+                    if await doc_body.count() > 0:
+                        await doc_body.first.click()
+                        print("✅ 成功聚焦到文档主体")
+                    
+                    else:
+                        print("⚠️  未找到文档主体")
+                except Exception as e:
+                    print(f"❌ 未找到文档主体: {e}")
+
+                print("✅ 已聚焦到iframe内容区域")
+
+                # 2. 尝试移动到文档开头
+                try:
+                    print("正在按下组合键（Control+Home）...")
+                    # iframe_content.press("Control+Home")
+                    # editor_area.press("Control+Home")
+                    # editor_container.press("Control+Home")
+                    await doc_body.first.press("Control+Home")
+                    print("✅ 组合键（Control+Home）按下成功，等待插入工具栏出现...")
+                    await wait_visible(iframe_content.get_by_test_id("overlay-bi-toolbar-insertMore"),
+                                       "钉钉文档插入工具栏", timeout_ms=10000)
+                    # editor_area.press("Control+Home")
+                    print("✅ 成功移动到文档开头")
+                except Exception as e:
+                    print(f"⚠️  组合键（Control+Home）失败: {e}")
+                    raise PublishPipelineError(f"组合键（Control+Home）失败: {e}")
+                # 3. 点击插入按钮
+                print("3️⃣ 点击插入按钮...")
+                await iframe_content.get_by_test_id("overlay-bi-toolbar-insertMore").get_by_text("插入").click()
+                print("✅ 插入按钮点击成功")
+            # iframe_content.get_by_text("图片上传本地图片").click()
+            
+                print("开始将豆包AI生成的文章封面图上传到钉钉文档...")
+                print(f"即将上传的图片的绝对路径: {cover_image}")
+                # 4. 使用文件选择器处理方式上传图片（参考51CTO的方法）
+                async with page_dingtalk_doc.expect_file_chooser() as fc_info_dingtalk:
+                    # 点击文件上传触发元素
+                    print("4️⃣ 点击文件上传触发元素...")
+                    await iframe_content.get_by_text("图片上传本地图片").click()          
+                    print("✅ 文件上传触发元素点击成功")
+                # 获取文件选择器并设置文件
+                images_before = await iframe_content.locator("img").count()
+                file_chooser_dingtalk = await fc_info_dingtalk.value
+                await file_chooser_dingtalk.set_files(cover_image)
+                print("✅ 图片成功上传到钉钉文档")
+                # 等待封面图插入到文档中
+                async def cover_inserted():
+                    return await iframe_content.locator("img").count() > images_before
+                await wait_until(cover_inserted, "钉钉文档插入封面图", timeout_ms=15000)
+                # 等待文档加载完成
+                print("5️⃣ 等待文档加载完成...")
+                await page_dingtalk_doc.wait_for_load_state("domcontentloaded")
+                # 等待封面图上传并保存到文档
+                await wait_network_idle(page_dingtalk_doc, "钉钉文档保存封面图", timeout_ms=15000)
+                print("✅ 图片上传结束")
+                # 下载钉钉文档为本地markdown文件（新的markdown文件包含封面图），作为markdown_file参数，上传到mdnice
+                print("=" * 60)
+                print("🎨 正在下载钉钉文档为本地markdown文件（新的markdown文件包含封面图）...")
+                print("=" * 60)
+                try:
+                    await page_dingtalk_doc.locator("#wiki-doc-iframe").content_frame.get_by_test_id("doc-header-more-button").click()
+            
+                    await page_dingtalk_doc.locator("#wiki-doc-iframe").content_frame.get_by_text("下载到本地").first.click()
+                    async with page_dingtalk_doc.expect_download() as download_info:
+                        await page_dingtalk_doc.locator("#wiki-doc-iframe").content_frame.get_by_text("Markdown(.md)").click()
+                    download = await download_info.value
+                    # Wait for the download process to complete and save the downloaded file somewhere
+                    # 获取下载文件的建议文件名
+                    suggested_filename = download.suggested_filename
+                    # 构建保存路径
+                    save_path = os.path.join("D:/tornadofiles/scripts_脚本/github_projects/playwright-automation/markdown_files", suggested_filename)
+                    # 保存文件
+                    await download.save_as(save_path)
+                
+                    # 获取下载文件的绝对路径和文件名
+                    downloaded_new_markdown_file_path = os.path.abspath(save_path)
+                    downloaded_filename = os.path.basename(downloaded_new_markdown_file_path)
+                
+                    print(f"📁 下载文件名（新的markdown文件包含封面图）: {downloaded_filename}")
+                    print(f"📂 下载文件（新的markdown文件包含封面图）绝对路径: {downloaded_new_markdown_file_path}")
+
+                    # 更新markdown_file变量为下载的文件路径
+                    print(f"✅ 更新markdown_file变量为下载的文件路径: {downloaded_new_markdown_file_path}")
+                    markdown_file = downloaded_new_markdown_file_path
+                    journal.record_stage("dingtalk_cover", {'markdown_file': markdown_file, 'url': url})
+                except Exception as e:
+                    print(f"❌ 下载钉钉文档为本地markdown文件失败: {e}，将退出脚本")
+                    raise PublishPipelineError(f"下载钉钉文档为本地markdown文件失败: {e}")
+            except PublishPipelineError:
+                raise
+            except Exception as e:
+                print(f"❌ 图片上传失败: {e}，将退出脚本")
+                raise PublishPipelineError(f"图片上传失败: {e}")
+    elif dingtalk_cover_record:
+        print("♻️  钉钉文档封面图已在之前的运行中插入，跳过")
+    else:
+        print("⏭️  已指定markdown文件，跳过钉钉文档封面图上传步骤")
+
+    print("=" * 60)
+
+    # 在发布到各个平台之前，先处理markdown文件，移除微信公众号关注行和作者信息行
+    print("=" * 60)
+    print("🧹 正在处理51CTO专用的markdown文件...")
+    print("=" * 60)
+    
+    # 初始化变量，默认使用原始文件
+    final_51cto_markdown_path = markdown_file
+    
+    try:
+        # 导入markdown清理工具（简化后的导入方式）
+        from markdown_cleaner_sdk import MarkdownCleaner
+        
+        
+        # 创建原始markdown文件的副本，专门用于51CTO
+        original_markdown_path = Path(markdown_file)
+        cto_markdown_path = original_markdown_path.parent / f"51CTO_{original_markdown_path.name}"
+        
+        print(f"📁 原始markdown文件: {original_markdown_path}")
+        print(f"📁 51CTO专用文件: {cto_markdown_path}")
+        
+        # 复制原始文件
+        import shutil
+        shutil.copy2(original_markdown_path, cto_markdown_path)
+        print("✅ 已创建51CTO专用markdown文件副本")
+        
+        # 创建markdown清理器实例，专门移除微信公众号关注行和作者信息行
+        cleaner = MarkdownCleaner(
+            keywords=["关注微信公众号", "关于作者和DreamAI", "Amq4vjg890AlRbA6Td9ZvlpDJ3kdP0wQ"],
+            mode="contains",
+            case_sensitive=False,
+            backup=False  # 不为51CTO文件创建备份
+        )
+        # 清理51CTO专用文件
+        result = cleaner.clean_file(cto_markdown_path)
+        
+        print("✅ 51CTO markdown文件清理完成!")
+        print(f"📊 原行数: {result['original_lines']}")
+        print(f"📊 删除行数: {result['removed_lines']}")
+        print(f"📊 剩余行数: {result['remaining_lines']}")
+        
+        if result['removed_content']:
+            print("🗑️  删除的内容:")
+            for item in result['removed_content']:
+                print(f"   第{item['line_number']}行: {item['content']}")
+        
+        # 更新markdown_file变量为清理后的51CTO专用文件
+        final_51cto_markdown_path = str(cto_markdown_path)
+        print(f"✅ 已更新markdown_file为51CTO专用文件: {final_51cto_markdown_path}")
+        
+    except ImportError as e:
+        print(f"❌ 无法导入markdown清理工具: {e}")
+        print("⚠️  将使用原始markdown文件，可能包含微信公众号关注信息")
+    except Exception as e:
+        print(f"❌ 处理51CTO markdown文件时出错: {e}")
+        print("⚠️  将使用原始markdown文件，可能包含微信公众号关注信息")
+    
+    print("=" * 60)
+
+    # 预处理正文图片：超过平台大小限制的图片压缩、本地图片（平台无法读取）上传图床，改写各平台专用副本中的链接
+    platform_markdown = {}
+    markdown_platforms = {platform: (final_51cto_markdown_path if platform in ('csdn', '51cto') else markdown_file)
+                          for platform in target_platforms if platform in PLATFORM_MARKDOWN_IMAGE_LIMITS}
+    if options.image_host == 'off':
+        print("⏭️  --image-host off，跳过正文图片预处理")
+    elif markdown_platforms:
+        print("🖼️  正在预处理正文图片...")
+        with span("预处理正文图片", platforms=len(markdown_platforms)) as current:
+            try:
+                platform_markdown = await asyncio.to_thread(
+                    prepare_platform_markdown, markdown_platforms, create_image_host(options.image_host),
+                    host_max_bytes=IMAGE_HOST_MAX_BYTES.get(options.image_host))
+            except Exception as e:
+                print(f"❌ 预处理正文图片失败，各平台将使用原始markdown文件: {e}")
+            current.attributes['rewritten'] = sorted(platform_markdown)
+        print("=" * 60)
+
+
+    # 组装待发布文章数据，交给并发发布引擎
+    article = PublishArticle(
+        title=title,
+        author=author,
+        summary=summary,
+        url=url,
+        markdown_file=markdown_file,
+        cto_markdown_file=final_51cto_markdown_path,
+        cover_image=cover_image,
+        compressed_cover_image=compressed_cover_image,
+        cover_variants=cover_variants,
+        platform_markdown=platform_markdown,
+        short_title=short_title,
+        all_tags=all_tags,
+        markdown_filename=markdown_filename,
+    )
+
+    ## 各平台的发布流程见 platform_publishers.py，由发布引擎并发执行，
+    ## 每个平台使用独立的页面，单个平台失败不会影响其他平台
+    ## 断点续跑时跳过已发布成功的平台，每个平台的发布状态写入运行日志
+    published_platforms = [p for p in target_platforms if journal.platform_done(p)]
+    if published_platforms:
+        print(f"♻️  以下平台已在之前的运行中发布成功，跳过: {', '.join(published_platforms)}")
+    engine = PublishEngine(session, max_concurrency=max_concurrency)
+    publish_results = await engine.run([p for p in target_platforms if p not in published_platforms], article)
+    for result in publish_results:
+        journal.record_platform(result.platform, result.success, result.error)
+
+
+    # 在测试末尾添加截图
+    # if 'mdnice' in target_platforms:
+    #     page_mdnice.screenshot(path="test-results/screenshot_mdnice.png", full_page=True)
+    # if 'wechat' in target_platforms:
+    #     page_wechat.screenshot(path="test-results/screenshot_wechat.png", full_page=True)
+    # if 'zhihu' in target_platforms:
+    #     page_zhihu_editor.screenshot(path="test-results/screenshot_zhihu.png", full_page=True)
+    # if 'csdn' in target_platforms:
+    #     page_csdn.screenshot(path="test-results/screenshot_csdn.png", full_page=True)
+    # if '51cto' in target_platforms:
+    #     page_51cto.screenshot(path="test-results/screenshot_51cto.png", full_page=True)
+    # if 'cnblogs' in target_platforms:
+    #     page_cnblogs.screenshot(path="test-results/screenshot_cnblogs.png", full_page=True)
+    # if 'xiaohongshu_newspic' in target_platforms:
+    #     page_xiaohongshu.screenshot(path="test-results/screenshot_xiaohongshu.png", full_page=True)
+    # if 'douyin_newspic' in target_platforms:
+    #     page_douyin.screenshot(path="test-results/screenshot_douyin.png", full_page=True)
+    # if 'kuaishou_newspic' in target_platforms:
+    #     page_kuaishou.screenshot(path="test-results/screenshot_kuaishou.png", full_page=True)
+    # if 'bilibili_newspic' in target_platforms:
+    #     page_bilibili.screenshot(path="test-results/screenshot_bilibili.png", full_page=True)
+
+    return publish_results
+
+
+async def publish_with_persistent_browser(options: PublishOptions) -> List[PublishResult]:
+    """
+    启动持久化浏览器并执行完整的发布流程，发布结束后等待用户确认
+
+    Args:
+        options: 发布参数
+
+    Returns:
+        各平台的发布结果列表
+    """
+    async with async_playwright() as playwright:
+        session = await open_browser_session(playwright, options.user_data_dir, options.browser_daemon)
+        try:
+            # Start tracing before creating / navigating a page.
+            await session.context.tracing.start(screenshots=True, snapshots=True, sources=True)
+            publish_results = await run_publish_pipeline(session, options)
+
+            # 等待用户确认是否继续
+            print("\n" + "=" * 80)
+            print("发布完成！")
+            print("=" * 80)
+            print("请检查各平台的发布结果，确认无误后按 Y 继续，或按其他键退出...")
+            user_input = input("是否继续？(Y/n): ").strip().upper()
+            
+            if user_input != 'Y':
+                print("用户选择退出，测试结束。")
+                if session.attached:
+                    # 守护进程中的浏览器会继续运行，丢弃本次的追踪记录
+                    await session.context.tracing.stop()
+            else:
+                print("用户确认继续，正在保存测试结果...")
+                # Stop tracing and export it into a zip archive.
+                await session.context.tracing.stop(path = "test-results/trace.zip")
+            return publish_results
+        finally:
+            # 确保浏览器上下文被关闭，这样视频才会保存（连接守护进程时只断开连接）
+            await session.close()
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+发布运行日志（断点续跑）模块
+为每篇文章在磁盘上记录已完成的阶段及其产出（summary、话题标签、短标题、封面图路径、media_id等）
+以及各平台的发布状态
+
+使用 --resume 重新运行时，已完成的阶段直接使用日志中的产出，已发布成功的平台不再重复发布，
+流程从第一个未完成的阶段继续执行。阶段产出与其输入的哈希一起记录，上游阶段重新执行或命令行参数改变后
+输入不同，该阶段也会重新执行。日志保存在 test-results/run_journals/ 目录。
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+# 运行日志保存目录
+RUN_JOURNALS_DIR = os.path.join("test-results", "run_journals")
+
+
+def journal_path_for(title: str) -> str:
+    """
+    根据文章标题生成日志文件路径
+
+    文件名由清理后的标题和标题的短哈希组成，避免不同标题清理后重名。
+    """
+    safe_title = re.sub(r'[\\/:*?"<>|\s]+', '_', title).strip('_')[:60] or "article"
+    digest = hashlib.sha1(title.encode('utf-8')).hexdigest()[:8]
+    return os.path.join(RUN_JOURNALS_DIR, f"{safe_title}_{digest}.json")
+
+
+def inputs_digest(value: Any) -> str:
+    """阶段输入的哈希（按JSON序列化，无法序列化的值使用str()）"""
+    payload = json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class RunJournal:
+    """单篇文章的发布运行日志"""
+
+    def __init__(self, title: str, path: Optional[str] = None, data: Optional[Dict[str, Any]] = None):
+        """
+        初始化运行日志
+
+        Args:
+            title: 文章标题
+            path: 日志文件路径，默认根据标题生成
+            data: 已有的日志内容，默认创建空日志
+        """
+        self.title = title
+        self.path = path or journal_path_for(title)
+        self.data = data or {"title": title, "created_at": time.time(), "stages": {}, "platforms": {}}
+
+    @classmethod
+    def open(cls, title: str, resume: bool = False) -> "RunJournal":
+        """
+        打开文章的运行日志
+
+        Args:
+            title: 文章标题
+            resume: 为True时加载已有日志继续执行，否则创建新日志（覆盖旧日志）
+
+        Returns:
+            RunJournal实例
+        """
+        path = journal_path_for(title)
+        if resume and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    journal = cls(title, path, json.load(f))
+                done = [name for name, stage in journal.data["stages"].items() if stage.get("status") == "success"]
+                published = [name for name, status in journal.data["platforms"].items() if status.get("success")]
+                print(f"♻️  从运行日志继续: {path}")
+                print(f"♻️  已完成的阶段: {', '.join(done) or '无'}")
+                print(f"♻️  已发布成功的平台: {', '.join(published) or '无'}")
+                return journal
+            except Exception as e:
+                print(f"⚠️  读取运行日志失败，将重新开始: {e}")
+        elif resume:
+            print(f"♻️  未找到运行日志，将从头开始: {path}")
+        journal = cls(title, path)
+        journal.save()
+        return journal
+
+    def save(self) -> None:
+        """保存日志（先写临时文件再替换，避免中断时留下损坏的日志）"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.data["updated_at"] = time.time()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def stage_outputs(self, name: str, file_outputs: Iterable[str] = (),
+                      inputs_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        获取已完成阶段的产出
+
+        Args:
+            name: 阶段名称
+            file_outputs: 必须仍然存在于磁盘上的文件类产出，任一文件丢失时视为未完成
+            inputs_hash: 本次运行的阶段输入哈希，与记录的哈希不同时视为未完成（None表示不检查）
+
+        Returns:
+            阶段产出字典，阶段未完成、输入已变化或文件已丢失时返回None
+        """
+        stage = self.data["stages"].get(name)
+        if not stage or stage.get("status") != "success":
+            return None
+        if inputs_hash is not None and stage.get("inputs_hash") != inputs_hash:
+            print(f"⚠️  [{name}] 输入与之前的运行不同，重新执行该阶段")
+            return None
+        outputs = stage.get("outputs", {})
+        for key in file_outputs:
+            path = outputs.get(key)
+            if path and not os.path.exists(path):
+                print(f"⚠️  [{name}] 日志中的文件已不存在，重新执行该阶段: {path}")
+                return None
+        return outputs
+
+    def record_stage(self, name: str, outputs: Dict[str, Any], inputs_hash: Optional[str] = None) -> None:
+        """记录阶段已完成及其产出（以及产生这些产出的输入哈希）"""
+        self.data["stages"][name] = {"status": "success", "finished_at": time.time(), "outputs": outputs,
+                                     "inputs_hash": inputs_hash}
+        self.save()
+
+    def checkpoint(self, name: str, func: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                   file_outputs: Iterable[str] = (),
+                   key: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]:
+        """
+        包装依赖图的阶段函数：已完成且输入未变化时直接返回日志中的产出，否则执行并记录产出
+
+        Args:
+            name: 阶段名称
+            func: 阶段协程函数
+            file_outputs: 必须仍然存在于磁盘上的文件类产出
+            key: 根据阶段输入计算用于比较的值，默认为输入本身；可以在其中加入影响阶段结果的命令行参数
+
+        Returns:
+            包装后的阶段协程函数
+        """
+        file_outputs = tuple(file_outputs)
+
+        async def run(inputs: Dict[str, Any]) -> Dict[str, Any]:
+            inputs_hash = inputs_digest(key(inputs) if key else inputs)
+            outputs = self.stage_outputs(name, file_outputs, inputs_hash)
+            if outputs is not None:
+                print(f"♻️  [{name}] 已在之前的运行中完成，使用日志中的结果")
+                return outputs
+            outputs = await func(inputs)
+            self.record_stage(name, outputs, inputs_hash)
+            return outputs
+
+        return run
+
+    def platform_done(self, platform: str) -> bool:
+        """平台是否已在之前的运行中发布成功"""
+        return bool(self.data["platforms"].get(platform, {}).get("success"))
+
+    def record_platform(self, platform: str, success: bool, error: Optional[str] = None) -> None:
+        """记录平台的发布状态"""
+        self.data["platforms"][platform] = {"success": success, "error": error, "finished_at": time.time()}
+        self.save()
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+运行时间线模块
+记录发布流程中每个步骤（钉钉、豆包AI、SDK调用、各平台发布、页面等待等）的开始时间、结束时间、
+所属平台和结果，运行结束后保存为JSON文件并打印最慢的步骤，用于找出流程中的瓶颈。
+
+用法：
+    with span("钉钉SDK.搜索文档"):
+        ...
+
+    @timed("豆包AI生成summary")
+    async def generate_summary_with_doubao(...):
+        ...
+
+当前时间线和当前步骤保存在 contextvars 中，会自动传递到 asyncio 任务和 asyncio.to_thread 的线程中，
+因此并发执行的各阶段、各平台的步骤都会记录到同一条时间线，并带上所属的父步骤和平台。
+没有激活的时间线时，span 不做任何记录。
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+# 时间线保存目录
+TIMELINES_DIR = os.path.join("test-results", "timelines")
+
+_current_timeline: contextvars.ContextVar[Optional["RunTimeline"]] = contextvars.ContextVar("current_timeline", default=None)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+@dataclass
+class Span:
+    """时间线中的一个步骤"""
+    name: str
+    start: float
+    end: Optional[float] = None
+    platform: Optional[str] = None
+    parent: Optional[str] = None
+    outcome: str = "success"
+    error: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        """耗时（秒），未结束的步骤按当前时间计算"""
+        return (self.end or time.time()) - self.start
+
+
+class RunTimeline:
+    """一次发布运行的时间线"""
+
+    def __init__(self, title: str):
+        """
+        初始化时间线
+
+        Args:
+            title: 文章标题，用于时间线文件名
+        """
+        self.title = title
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.spans: List[Span] = []
+
+    @contextmanager
+    def activate(self) -> Iterator["RunTimeline"]:
+        """在上下文范围内把本时间线设为当前时间线"""
+        token = _current_timeline.set(self)
+        try:
+            yield self
+        finally:
+            self.finished_at = time.time()
+            _current_timeline.reset(token)
+
+    def save(self) -> Optional[str]:
+        """
+        将时间线保存为JSON文件
+
+        Returns:
+            保存的文件路径，失败时返回None
+        """
+        try:
+            os.makedirs(TIMELINES_DIR, exist_ok=True)
+            safe_title = re.sub(r'[\\/:*?"<>|\s]+', '_', self.title).strip('_')[:60] or "article"
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timeline_file = os.path.join(TIMELINES_DIR, f"timeline_{safe_title}_{timestamp}.json")
+            data = {
+                "title": self.title,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "spans": [dict(asdict(s), duration=s.duration) for s in sorted(self.spans, key=lambda s: s.start)],
+            }
+            with open(timeline_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            print(f"📁 运行时间线已保存到: {timeline_file}")
+            return timeline_file
+        except Exception as e:
+            print(f"⚠️  保存运行时间线时出错: {e}")
+            return None
+
+    def print_summary(self, limit: int = 15) -> None:
+        """打印最慢的步骤"""
+        if not self.spans:
+            return
+        print("=" * 80)
+        print(f"🐢 最慢的 {min(limit, len(self.spans))} 个步骤：")
+        print("=" * 80)
+        for s in sorted(self.spans, key=lambda s: s.duration, reverse=True)[:limit]:
+            status = "✅" if s.outcome == "success" else f"❌ {s.outcome}"
+            platform = s.platform or "-"
+            print(f"{s.duration:>8.1f}秒  {status:<10}{platform:<20}{s.name}")
+        total = (self.finished_at or time.time()) - self.started_at
+        print("-" * 80)
+        print(f"⏱️  总耗时: {total:.1f}秒，共记录 {len(self.spans)} 个步骤")
+        print("=" * 80)
+
+
+def current_timeline() -> Optional[RunTimeline]:
+    """获取当前激活的时间线"""
+    return _current_timeline.get()
+
+
+@contextmanager
+def span(name: str, platform: Optional[str] = None, **attributes: Any) -> Iterator[Span]:
+    """
+    记录一个步骤的耗时和结果
+
+    步骤内抛出异常时结果记为 error 并继续抛出；也可以在步骤内修改 outcome（例如 'timeout'、'skipped'）。
+
+    Args:
+        name: 步骤名称
+        platform: 所属平台，默认继承父步骤的平台
+        **attributes: 额外记录的属性
+    """
+    parent = _current_span.get()
+    current = Span(name, time.time(), platform=platform or (parent.platform if parent else None),
+                   parent=parent.name if parent else None, attributes=attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.outcome = "error"
+        current.error = str(e) or type(e).__name__
+        raise
+    finally:
+        current.end = time.time()
+        _current_span.reset(token)
+        timeline = _current_timeline.get()
+        if timeline is not None:
+            timeline.spans.append(current)
+
+
+def timed(name: str, platform: Optional[str] = None, none_is_failure: bool = False):
+    """
+    记录函数耗时的装饰器，支持普通函数和协程函数
+
+    Args:
+        name: 步骤名称
+        platform: 所属平台，默认继承父步骤的平台
+        none_is_failure: 函数返回None时结果记为 failed（用于失败时返回None而不抛异常的函数）
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, platform) as current:
+                    result = await func(*args, **kwargs)
+                    if none_is_failure and result is None:
+                        current.outcome = "failed"
+                    return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, platform) as current:
+                result = func(*args, **kwargs)
+                if none_is_failure and result is None:
+                    current.outcome = "failed"
+                return result
+        return wrapper
+    return decorator
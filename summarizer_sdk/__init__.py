@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+Summarizer SDK
+
+本地抽取式摘要SDK，从Markdown文章中选取关键句子组成不超过字数限制的summary，不访问网络。
+
+主要功能：
+- 去掉标题、代码块、图片、表格和导航链接，按句拆分正文
+- 按关键词（tag_extractor_sdk）为句子打分，选取覆盖不同关键词的句子
+- 字数计算与 word_counter_sdk 相同，保证结果通过 validate_and_clean_text 的120字验证
+
+作者: tornadoami
+版本: 1.0.0
+"""
+
+from .summarizer import (
+    DEFAULT_MAX_LENGTH,
+    score_sentences,
+    split_sentences,
+    summarize_markdown,
+    summary_length,
+)
+
+__version__ = "1.0.0"
+__author__ = "tornadoami"
+
+# 导出主要函数
+__all__ = [
+    'DEFAULT_MAX_LENGTH',
+    'score_sentences',
+    'split_sentences',
+    'summarize_markdown',
+    'summary_length',
+]
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+本地抽取式摘要
+从Markdown文章中选取最能代表全文的句子，组成不超过字数限制的summary，不访问网络，几毫秒即可完成。
+
+生成规则：
+- 去掉标题行、代码块、图片、表格、链接地址和HTML标签，按句号、问号、感叹号（英文标点后需有空格）和换行拆分句子；
+  主要由链接组成的行（例如"阅读原文"导航）不参与摘要，没有句末标点的行（列表项、短语）降低得分
+- 句子得分 = 句中关键词（tag_extractor_sdk 的TF-IDF得分）之和 / 句子长度的平方根，开头的句子略微加分；
+  每选中一个句子，其中关键词的权重减半，后面的句子优先覆盖新的关键词
+- 按得分从高到低放入句子，总字数不超过限制（与 word_counter_sdk 的计数规则相同，中英文之间的空格不计），
+  输出时保持句子在原文中的顺序
+- 没有放得下的完整句子时截断得分最高的句子，只要文章中有文字就一定返回符合长度要求的summary
+
+使用方法：
+    from summarizer_sdk import summarize_markdown
+    summary = summarize_markdown(markdown_content, max_length=120)
+"""
+
+import heapq
+import math
+import re
+from typing import Dict, List, Tuple
+
+from tag_extractor_sdk import get_tag_extractor
+from word_counter_sdk import count_characters, remove_spaces_between_chinese_english
+
+# 默认的summary字数限制
+DEFAULT_MAX_LENGTH = 120
+
+# 参与打分的关键词数量
+KEYWORD_COUNT = 30
+
+# 少于该字数的句子不作为summary（例如"有两种方法，"）
+MIN_SENTENCE_LENGTH = 8
+
+# 开头的句子的加分比例（第一句加满，之后逐渐减小）
+LEAD_BONUS = 0.5
+
+# 选中的句子中的关键词的权重衰减比例
+REDUNDANCY_DECAY = 0.5
+
+# 链接文字占比达到该比例的行视为导航行，不参与摘要
+LINK_LINE_RATIO = 0.4
+
+# 没有句末标点的行（列表项、短语）的得分比例
+FRAGMENT_PENALTY = 0.5
+
+# 截断句子时追加的省略号
+ELLIPSIS = "…"
+
+_SENTENCE_END = "。！？!?."
+# 中文句末标点之后，或英文句号后接空白处断句（"3.11"、"craxcel.py" 中的点不断句）
+_SENTENCE_BREAK = re.compile(r"(?<=[。！？!?])|(?<=[.!?])\s+")
+_CJK_CHAR = re.compile(r"[一-鿿]")
+_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+
+
+def _body_lines(content: str) -> List[str]:
+    """去掉标题、代码块、图片、表格、导航链接行和格式符号，返回正文行"""
+    content = re.sub(r"```.*?```", "", content, flags=re.S)
+    content = re.sub(r"`([^`]*)`", r"\1", content)
+    content = re.sub(r"!\[[^\]]*\]\([^)]*\)", "", content)
+    content = re.sub(r"<[^>]+>", "", content)
+    lines = []
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or line.startswith("|"):
+            continue
+        link_length = sum(len(match.group(1)) for match in _LINK.finditer(line))
+        line = re.sub(r"https?://\S+", "", _LINK.sub(r"\1", line))
+        if link_length >= LINK_LINE_RATIO * max(len(line), 1):
+            continue
+        line = re.sub(r"^(>|[-*+]|\d+\.)\s*", "", line)
+        line = re.sub(r"[*_~]", "", line).strip()
+        if line:
+            lines.append(line)
+    return lines
+
+
+def _split_with_fragments(content: str) -> List[Tuple[str, bool]]:
+    """拆分句子，并标记没有句末标点的片段"""
+    sentences = []
+    for line in _body_lines(content):
+        for sentence in _SENTENCE_BREAK.split(line):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            fragment = sentence[-1] not in _SENTENCE_END
+            if fragment:
+                sentence = sentence.rstrip("，,；;：:、") + ("。" if _CJK_CHAR.search(sentence) else ".")
+            sentences.append((sentence, fragment))
+    return sentences
+
+
+def split_sentences(content: str) -> List[str]:
+    """
+    将Markdown正文拆分为句子
+
+    Returns:
+        句子列表（保持原文顺序，以句末标点结尾；没有句末标点的行补上句号）
+    """
+    return [sentence for sentence, _ in _split_with_fragments(content)]
+
+
+def summary_length(text: str) -> int:
+    """summary的字数（中英文之间的空格不计，与 validate_and_clean_text 清理后的计数相同）"""
+    return count_characters(remove_spaces_between_chinese_english(text))
+
+
+def score_sentences(content: str) -> List[Tuple[str, float]]:
+    """
+    计算句子得分（已考虑与前面选中句子的重复）
+
+    句子得分只会因关键词权重衰减而降低，按堆中的旧得分取出后重新计算，仍不低于堆中其他句子时即为当前最高分。
+
+    Args:
+        content: Markdown文章内容
+
+    Returns:
+        [(句子, 得分)]，按选中顺序（得分从高到低）排列
+    """
+    sentences = _split_with_fragments(content)
+    keywords: Dict[str, float] = {tag.lower(): score for tag, score in get_tag_extractor().extract(content, KEYWORD_COUNT)}
+    total = max(len(sentences), 1)
+    factors = {}
+    contains = {}
+    for index, (sentence, fragment) in enumerate(sentences):
+        length = summary_length(sentence)
+        if length < MIN_SENTENCE_LENGTH:
+            continue
+        lowered = sentence.lower()
+        contains[index] = [keyword for keyword in keywords if keyword in lowered]
+        factors[index] = ((1 + LEAD_BONUS * (1 - index / total)) / math.sqrt(length)
+                          * (FRAGMENT_PENALTY if fragment else 1.0))
+
+    def current_score(index: int) -> float:
+        return sum(keywords[keyword] for keyword in contains[index]) * factors[index]
+
+    heap = [(-current_score(index), index) for index in factors]
+    heapq.heapify(heap)
+    ranked = []
+    while heap:
+        _, index = heapq.heappop(heap)
+        score = current_score(index)
+        if heap and score < -heap[0][0]:
+            heapq.heappush(heap, (-score, index))
+            continue
+        ranked.append((sentences[index][0], round(score, 6)))
+        for keyword in contains[index]:
+            keywords[keyword] *= REDUNDANCY_DECAY
+    return ranked
+
+
+def summarize_markdown(content: str, max_length: int = DEFAULT_MAX_LENGTH) -> str:
+    """
+    生成不超过字数限制的抽取式summary
+
+    Args:
+        content: Markdown文章内容
+        max_length: 最大字数（中英文之间的空格不计）
+
+    Returns:
+        summary文本，文章中没有正文时返回空字符串
+    """
+    sentences = split_sentences(content)
+    ranked = score_sentences(content)
+    chosen = set()
+    used = 0
+    for sentence, _ in ranked:
+        # 英文句号后接下一句时需要一个空格，预先计入字数
+        length = summary_length(sentence) + (1 if sentence[-1] in ".!?" else 0)
+        if used + length <= max_length:
+            chosen.add(sentence)
+            used += length
+    if chosen:
+        parts = [sentence for sentence in dict.fromkeys(sentences) if sentence in chosen]
+        summary = "".join(part + (" " if part[-1] in ".!?" else "") for part in parts).strip()
+        return remove_spaces_between_chinese_english(summary)
+
+    # 没有放得下的完整句子：截断得分最高的句子（没有足够长的句子时使用第一个句子）
+    best = ranked[0][0] if ranked else (sentences[0] if sentences else "")
+    best = remove_spaces_between_chinese_english(best)
+    if summary_length(best) <= max_length:
+        return best
+    return best[:max(0, max_length - len(ELLIPSIS))].rstrip() + ELLIPSIS
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+Tag Extractor SDK
+
+本地话题标签提取SDK，从中英文混合的Markdown文章中提取关键词作为话题标签，不访问网络。
+
+主要功能：
+- 基于TF-IDF的关键词提取（随包附带IDF表，忽略代码块）
+- 中文无需分词：按2~6字的片段统计，合并被更长片段包含的片段
+- 为给定标签（豆包AI生成或手动指定）计算与文章的相关度并排序
+- 标签不包含空格、横杠和特殊字符
+
+作者: tornadoami
+版本: 1.0.0
+"""
+
+from .tag_extractor import (
+    DEFAULT_TOP_K,
+    IDF_FILE,
+    TagExtractor,
+    clean_tag,
+    extract_tags,
+    get_tag_extractor,
+    rank_tags,
+    score_tags,
+)
+
+__version__ = "1.0.0"
+__author__ = "tornadoami"
+
+# 导出主要函数
+__all__ = [
+    'DEFAULT_TOP_K',
+    'IDF_FILE',
+    'TagExtractor',
+    'clean_tag',
+    'extract_tags',
+    'get_tag_extractor',
+    'rank_tags',
+    'score_tags',
+]
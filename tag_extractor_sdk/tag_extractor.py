@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+本地话题标签提取
+从中英文混合的Markdown文章中提取关键词作为话题标签，不访问网络，一篇文章几毫秒即可完成。
+
+提取规则：
+- 忽略代码块、行内代码、图片、链接地址和HTML标签，标题行中的词按 HEADING_WEIGHT 倍计数
+- 英文候选词为连续的字母数字（不区分大小写合并，显示出现最多的写法）
+- 中文没有分词，候选词为连续汉字中2~6字的片段（在"的"等助词处断开），去掉以虚词或通用词开头或结尾的片段；
+  某个片段大多出现在更长的片段中时（例如"源工具"之于"开源工具"），只保留更长的片段；超过4字的片段适当降低得分
+- 得分 = 词频 × 逆文档频率（IDF），IDF来自随包附带的 idf.txt，未收录的词使用 DEFAULT_IDF
+- 标签不包含空格、横杠和特殊字符（与豆包AI生成话题标签的要求相同）
+
+使用方法：
+    from tag_extractor_sdk import extract_tags, rank_tags
+    tags = extract_tags(markdown_content, top_k=10)
+    ranked = rank_tags(markdown_content, ['Python', 'Excel', '开源'])
+"""
+
+import os
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 随包附带的IDF表（与 jieba idf.txt 格式相同）
+IDF_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "idf.txt")
+
+# IDF表中未收录的词使用的IDF值
+DEFAULT_IDF = 10.0
+
+# IDF低于该值的通用词不作为话题标签
+MIN_TAG_IDF = 3.0
+
+# 默认提取的话题标签数量
+DEFAULT_TOP_K = 10
+
+# 话题标签的最大长度
+MAX_TAG_LENGTH = 20
+
+# 标题行中的词的计数倍数
+HEADING_WEIGHT = 3
+
+# 中文片段至少出现的次数（标题行按倍数计）
+MIN_CJK_COUNT = 2
+
+# 中文片段的长度范围
+MIN_CJK_LENGTH = 2
+MAX_CJK_LENGTH = 6
+
+# 超过该长度的中文片段每多一个字，得分乘以 LONG_GRAM_DECAY（话题标签以短词为宜）
+PREFERRED_CJK_LENGTH = 4
+LONG_GRAM_DECAY = 0.8
+
+# 较短片段出现在更长片段中的次数达到该比例时，只保留更长的片段
+SUBSUME_RATIO = 0.7
+
+# 给定标签在正文中没有原样出现时，按其包含的关键词得分的该比例计分
+PARTIAL_MATCH_WEIGHT = 0.5
+
+# 不能出现在中文片段开头/结尾的虚词
+CJK_START_STOP = set("的了是在和与及或也都就而被把让从向以等这那我你他她它们很又再还并但吗呢吧啊着过得个之其每该此")
+CJK_END_STOP = set("的了是在和与及或也都就而被把让从向以等这那我你他她它很又再还并但吗呢吧啊着过得个之其一要会能可将")
+
+# 助词几乎不会出现在词语中间，中文片段在这些字处断开
+CJK_BREAKS = "的吗呢吧啊"
+
+_CJK_RUN = re.compile(r"[一-鿿]+")
+_CJK_BREAK = re.compile(f"[{CJK_BREAKS}]")
+_ENGLISH_TERM = re.compile(r"[A-Za-z][A-Za-z0-9]+")
+_TAG_INVALID_CHARS = re.compile(r"[^0-9A-Za-z一-鿿]")
+
+
+def clean_tag(tag: str) -> str:
+    """去掉标签中的空格、横杠和特殊字符，只保留中英文和数字"""
+    return _TAG_INVALID_CHARS.sub("", tag)
+
+
+def markdown_segments(content: str) -> List[Tuple[str, int]]:
+    """
+    将Markdown内容拆分为纯文本行及其计数倍数
+
+    Returns:
+        [(行文本, 倍数)]，标题行的倍数为 HEADING_WEIGHT，其他行为1
+    """
+    content = re.sub(r"```.*?```", "", content, flags=re.S)
+    content = re.sub(r"`[^`]*`", "", content)
+    content = re.sub(r"!\[[^\]]*\]\([^)]*\)", "", content)
+    content = re.sub(r"\[([^\]]*)\]\([^)]*\)", r"\1", content)
+    content = re.sub(r"https?://\S+", "", content)
+    content = re.sub(r"<[^>]+>", "", content)
+    segments = []
+    for line in content.splitlines():
+        heading = re.match(r"^\s*#+\s*", line)
+        text = line[heading.end():] if heading else line
+        if text.strip():
+            segments.append((text, HEADING_WEIGHT if heading else 1))
+    return segments
+
+
+def load_idf_table(path: str = IDF_FILE) -> Dict[str, float]:
+    """读取IDF表，文件不存在时返回空表"""
+    table = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) != 2 or line.startswith("#"):
+                    continue
+                try:
+                    table[parts[0].lower()] = float(parts[1])
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        print(f"⚠️  IDF表不存在，所有词使用默认IDF: {path}")
+    return table
+
+
+class TagExtractor:
+    """基于TF-IDF的话题标签提取器"""
+
+    def __init__(self, idf_path: str = IDF_FILE, default_idf: float = DEFAULT_IDF):
+        """
+        Args:
+            idf_path: IDF表路径
+            default_idf: IDF表中未收录的词使用的IDF值
+        """
+        self.idf_table = load_idf_table(idf_path)
+        self.default_idf = default_idf
+        # 通用词（IDF较低）用于判断中文片段是否以通用词开头或结尾
+        self.common_words = {word for word, idf in self.idf_table.items() if idf < MIN_TAG_IDF}
+
+    def idf(self, term: str) -> float:
+        """词的IDF值"""
+        return self.idf_table.get(term.lower(), self.default_idf)
+
+    def _edges_common(self, gram: str) -> bool:
+        """中文片段是否以虚词或通用词开头或结尾（例如"可以正常"）"""
+        if gram[0] in CJK_START_STOP or gram[-1] in CJK_END_STOP:
+            return True
+        for size in range(2, len(gram)):
+            if gram[:size] in self.common_words or gram[-size:] in self.common_words:
+                return True
+        return False
+
+    def _count_candidates(self, segments: Iterable[Tuple[str, int]]) -> Tuple[Counter, Dict[str, str], int]:
+        """
+        统计候选词的加权出现次数
+
+        Returns:
+            (候选词 → 次数, 英文候选词的小写形式 → 显示写法, 总词数)
+        """
+        counts: Counter = Counter()
+        spellings: Dict[str, Counter] = defaultdict(Counter)
+        total = 0
+        for text, weight in segments:
+            for term in _ENGLISH_TERM.findall(text):
+                if term.isdigit():
+                    continue
+                key = term.lower()
+                counts[key] += weight
+                spellings[key][term] += weight
+                total += weight
+            for run in _CJK_RUN.findall(text):
+                total += weight * len(run)
+                for piece in _CJK_BREAK.split(run):
+                    self._count_grams(piece, weight, counts)
+        display = {key: spelling.most_common(1)[0][0] for key, spelling in spellings.items()}
+        return counts, display, max(total, 1)
+
+    def _count_grams(self, run: str, weight: int, counts: Counter) -> None:
+        """统计一段连续汉字中的所有候选片段"""
+        for size in range(MIN_CJK_LENGTH, min(MAX_CJK_LENGTH, len(run)) + 1):
+            for start in range(len(run) - size + 1):
+                gram = run[start:start + size]
+                if not self._edges_common(gram):
+                    counts[gram] += weight
+
+    def _reduce_substrings(self, counts: Counter) -> Dict[str, int]:
+        """较短的中文片段大多出现在某个更长的片段中时，只保留更长的片段"""
+        kept: Dict[str, int] = {}
+        # 片段 → 包含它的已保留片段的最大次数
+        contained: Dict[str, int] = {}
+        grams = [gram for gram, count in counts.items() if count >= MIN_CJK_COUNT and _CJK_RUN.fullmatch(gram)]
+        for gram in sorted(grams, key=len, reverse=True):
+            count = counts[gram]
+            if contained.get(gram, 0) >= SUBSUME_RATIO * count:
+                continue
+            kept[gram] = count
+            for size in range(MIN_CJK_LENGTH, len(gram)):
+                for start in range(len(gram) - size + 1):
+                    part = gram[start:start + size]
+                    contained[part] = max(contained.get(part, 0), count)
+        return kept
+
+    def _scored_candidates(self, content: str) -> Tuple[List[Tuple[str, float]], int]:
+        """计算所有候选词的得分，按得分从高到低排列"""
+        counts, display, total = self._count_candidates(markdown_segments(content))
+        candidates = dict(self._reduce_substrings(counts))
+        candidates.update({key: counts[key] for key in display})
+        scored = []
+        for key, count in candidates.items():
+            idf = self.idf(key)
+            if idf < MIN_TAG_IDF:
+                continue
+            decay = LONG_GRAM_DECAY ** max(0, len(key) - PREFERRED_CJK_LENGTH) if key not in display else 1.0
+            scored.append((display.get(key, key), count / total * idf * decay))
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored, total
+
+    def extract(self, content: str, top_k: int = DEFAULT_TOP_K) -> List[Tuple[str, float]]:
+        """
+        提取话题标签
+
+        Args:
+            content: Markdown文章内容
+            top_k: 返回的标签数量
+
+        Returns:
+            [(标签, 得分)]，按得分从高到低排列
+        """
+        tags = []
+        seen = set()
+        scored, _ = self._scored_candidates(content)
+        for term, score in scored:
+            tag = clean_tag(term)
+            if not tag or len(tag) > MAX_TAG_LENGTH or tag.lower() in seen:
+                continue
+            seen.add(tag.lower())
+            tags.append((tag, round(score, 6)))
+            if len(tags) >= top_k:
+                break
+        return tags
+
+    def score(self, content: str, tags: Sequence[str]) -> Dict[str, float]:
+        """
+        计算给定标签（例如豆包AI生成或手动指定的标签）与文章的相关度
+
+        标签在正文中原样出现时按词频 × IDF计分，否则按其包含的关键词得分的 PARTIAL_MATCH_WEIGHT 倍计分。
+
+        Returns:
+            标签 → 得分
+        """
+        lowered = [(text.lower(), weight) for text, weight in markdown_segments(content)]
+        scored, total = self._scored_candidates(content)
+        scores = {}
+        for tag in tags:
+            key = clean_tag(tag).lower()
+            if len(key) < 2:
+                scores[tag] = 0.0
+                continue
+            # 英文标签按整词匹配（"AI" 不匹配 "email"）
+            pattern = re.compile(rf"(?<![a-z0-9]){re.escape(key)}(?![a-z0-9])" if key.isascii() else re.escape(key))
+            occurrences = sum(len(pattern.findall(text)) * weight for text, weight in lowered)
+            if occurrences:
+                scores[tag] = round(occurrences / total * self.idf(key), 6)
+            else:
+                partial = sum(score for term, score in scored if term.lower() in key)
+                scores[tag] = round(partial * PARTIAL_MATCH_WEIGHT, 6)
+        return scores
+
+
+# 共享的提取器实例（IDF表只读取一次）
+_default_extractor: Optional[TagExtractor] = None
+
+
+def get_tag_extractor() -> TagExtractor:
+    """获取共享的提取器实例"""
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = TagExtractor()
+    return _default_extractor
+
+
+def extract_tags(content: str, top_k: int = DEFAULT_TOP_K) -> List[str]:
+    """
+    从Markdown文章内容中提取话题标签
+
+    Args:
+        content: Markdown文章内容
+        top_k: 返回的标签数量
+
+    Returns:
+        按得分从高到低排列的标签列表
+    """
+    return [tag for tag, _ in get_tag_extractor().extract(content, top_k)]
+
+
+def score_tags(content: str, tags: Sequence[str]) -> Dict[str, float]:
+    """计算给定标签与文章的相关度，返回 标签 → 得分"""
+    return get_tag_extractor().score(content, tags)
+
+
+def rank_tags(content: str, tags: Sequence[str]) -> List[str]:
+    """按与文章的相关度从高到低排列给定标签（得分相同时保持原有顺序）"""
+    scores = score_tags(content, tags)
+    return sorted(tags, key=lambda tag: scores[tag], reverse=True)
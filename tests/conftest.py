@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def backup_browser_data_fixture():
+    """单元测试不启动浏览器，不备份浏览器数据目录"""
+    yield None
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+import ai_hedging
+from ai_hedging import HedgedProvider, LatencyHistory
+from ai_providers import LocalProvider
+
+
+class FakeProvider(LocalProvider):
+    """summarize 等待指定时间后返回结果或抛出异常"""
+
+    def __init__(self, label, delay, result="summary", error=None):
+        self.label = label
+        self.delay = delay
+        self.result = result
+        self.error = error
+
+    async def summarize(self, markdown_file):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+@pytest.fixture(autouse=True)
+def record_short_latencies(monkeypatch):
+    monkeypatch.setattr(ai_hedging, "MIN_RECORDED_LATENCY_S", 0.0)
+
+
+def race(primary, secondary, history, delay=0.05):
+    provider = HedgedProvider(primary, secondary, history=history, default_delay_s=delay)
+    return asyncio.run(provider.summarize("article.md"))
+
+
+def test_fast_failures_are_not_recorded(tmp_path):
+    history = LatencyHistory(str(tmp_path / "history.json"))
+
+    result = race(FakeProvider("primary", 0.0, error=RuntimeError("boom")), FakeProvider("secondary", 0.01), history)
+
+    assert result == "summary"
+    assert "primary.summarize" not in history.samples
+    assert len(history.samples["secondary.summarize"]) == 1
+
+
+def test_invalid_results_are_not_recorded(tmp_path):
+    history = LatencyHistory(str(tmp_path / "history.json"))
+
+    result = race(FakeProvider("primary", 0.0, result=""), FakeProvider("secondary", 0.01), history)
+
+    assert result == "summary"
+    assert "primary.summarize" not in history.samples
+
+
+def test_cancelled_slow_primary_is_recorded_as_lower_bound(tmp_path):
+    history = LatencyHistory(str(tmp_path / "history.json"))
+
+    result = race(FakeProvider("primary", 5.0, result="slow"), FakeProvider("secondary", 0.05, result="fast"), history)
+
+    assert result == "fast"
+    assert history.samples["primary.summarize"][0] >= 0.1
+
+
+def test_cancelled_secondary_below_p90_is_not_recorded(tmp_path):
+    history = LatencyHistory(str(tmp_path / "history.json"))
+    history.samples["secondary.summarize"] = [1.0] * 10
+
+    result = race(FakeProvider("primary", 0.1, result="primary"), FakeProvider("secondary", 5.0), history)
+
+    assert result == "primary"
+    assert history.samples["secondary.summarize"] == [1.0] * 10
+    assert len(history.samples["primary.summarize"]) == 1
@@ -0,0 +1,92 @@
+import json
+import os
+import time
+
+from ai_metadata_cache import AIMetadataCache
+
+KB = 1024
+
+
+def article(tmp_path, name):
+    path = tmp_path / f"{name}.md"
+    path.write_text(f"# {name}\n\n正文 {name}\n", encoding="utf-8")
+    return str(path)
+
+
+def cover(tmp_path, name, size):
+    path = tmp_path / f"{name}.png"
+    path.write_bytes(b"\0" * size)
+    return str(path)
+
+
+def put_with_images(cache, tmp_path, name, images, mtime):
+    markdown_file = article(tmp_path, name)
+    cache.put(markdown_file, {"image_files": images})
+    for path in cache.entries():
+        if cache._read(path)["markdown_file"] == markdown_file:
+            os.utime(path, (mtime, mtime))
+    return markdown_file
+
+
+def test_evict_by_total_size_removes_oldest_entries_and_their_images(tmp_path):
+    cache = AIMetadataCache(str(tmp_path / "cache"), max_bytes=250 * KB)
+    now = time.time()
+    old_image = cover(tmp_path, "old", 100 * KB)
+    mid_image = cover(tmp_path, "mid", 100 * KB)
+    new_image = cover(tmp_path, "new", 100 * KB)
+
+    old = put_with_images(cache, tmp_path, "old", [old_image], now - 30)
+    mid = put_with_images(cache, tmp_path, "mid", [mid_image], now - 20)
+    assert os.path.exists(old_image) and len(cache.entries()) == 2
+    new = put_with_images(cache, tmp_path, "new", [new_image], now - 10)
+
+    assert len(cache.entries()) == 2
+    assert not os.path.exists(old_image)
+    assert cache.get(old, "image_files") is None
+    assert cache.get(mid, "image_files") == [mid_image]
+    assert cache.get(new, "image_files") == [new_image]
+    assert cache.total_size() <= 250 * KB
+
+
+def test_shared_image_is_kept_while_referenced(tmp_path):
+    cache = AIMetadataCache(str(tmp_path / "cache"), max_entries=1)
+    now = time.time()
+    shared = cover(tmp_path, "shared", 10 * KB)
+
+    put_with_images(cache, tmp_path, "old", [shared], now - 20)
+    new = put_with_images(cache, tmp_path, "new", [shared], now - 10)
+
+    assert len(cache.entries()) == 1
+    assert cache.get(new, "image_files") == [shared]
+
+
+def test_expired_entry_and_image_are_removed(tmp_path):
+    cache = AIMetadataCache(str(tmp_path / "cache"), ttl_seconds=60)
+    image = cover(tmp_path, "expired", 10 * KB)
+    markdown_file = article(tmp_path, "expired")
+    cache.put(markdown_file, {"image_files": [image]})
+    path = cache.entries()[0]
+    entry = cache._read(path)
+    entry["created_at"] -= 120
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+
+    assert cache.evict() == 1
+    assert cache.entries() == [] and not os.path.exists(image)
+
+
+def test_clear_and_evict_skip_files_already_removed(tmp_path, monkeypatch):
+    cache = AIMetadataCache(str(tmp_path / "cache"), max_entries=1)
+    now = time.time()
+    shared = cover(tmp_path, "shared", 10 * KB)
+    put_with_images(cache, tmp_path, "first", [shared], now - 20)
+    # 扫描到封面图之后、删除之前，共用该封面图的条目或另一个进程已经把它删除
+    monkeypatch.setattr(cache, "_entry_files", lambda entry: [shared])
+    os.remove(shared)
+
+    new = put_with_images(cache, tmp_path, "second", [cover(tmp_path, "second", 10 * KB)], now - 10)
+
+    assert len(cache.entries()) == 1
+    assert cache._read(cache.entries()[0])["markdown_file"] == new
+    assert cache.clear() == 1
+    assert cache.entries() == []
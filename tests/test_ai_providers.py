@@ -0,0 +1,87 @@
+import asyncio
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from ai_providers import AIContentProvider, LocalProvider, create_ai_provider
+from doubao_ai_helpers import SHORT_TITLE_MAX_LENGTH, SUMMARY_MAX_LENGTH, TAG_COUNT
+from image_toolkit_sdk import encode_to_target_size
+from pipeline_dag import PipelineDAG
+
+ARTICLE = next((Path(__file__).resolve().parent.parent / "markdown_files").glob("*.md"))
+
+
+def test_provider_interface_is_abstract():
+    with pytest.raises(TypeError):
+        AIContentProvider()
+
+    class SummaryOnly(AIContentProvider):
+        async def summarize(self, markdown_file):
+            return "summary"
+
+    with pytest.raises(TypeError):
+        SummaryOnly()
+
+
+def test_prepublish_dag_runs_offline_with_local_provider(tmp_path, monkeypatch):
+    # 本地生成的封面图保存在工作目录的 test-results/ 下
+    monkeypatch.chdir(tmp_path)
+    provider = create_ai_provider("local")
+    assert isinstance(provider, LocalProvider)
+    title = "craXcel，一个可以移除Excel密码的开源工具，支持Word和PowerPoint"
+
+    async def ai_metadata_stage(inputs):
+        return {"ai_metadata": await provider.generate_metadata(inputs["markdown_file"], title=title)}
+
+    async def summary_stage(inputs):
+        return {"summary": inputs["ai_metadata"].get("summary") or await provider.summarize(inputs["markdown_file"])}
+
+    async def short_title_stage(inputs):
+        return {"short_title": inputs["ai_metadata"]["short_title"]}
+
+    async def tags_stage(inputs):
+        return {"all_tags": inputs["ai_metadata"]["tags"]}
+
+    async def cover_stage(inputs):
+        images = await provider.generate_images(inputs["markdown_file"], inputs["ai_metadata"]["image_prompt"])
+        return {"cover_image": images[0]}
+
+    async def compress_cover_stage(inputs):
+        result = await asyncio.to_thread(encode_to_target_size, inputs["cover_image"], 200 * 1024)
+        return {"compressed_cover_image": result.path}
+
+    dag = PipelineDAG("prepublish_test")
+    dag.add_stage("ai_metadata", ai_metadata_stage, inputs=["markdown_file"], outputs=["ai_metadata"])
+    dag.add_stage("summary", summary_stage, inputs=["markdown_file", "ai_metadata"], outputs=["summary"])
+    dag.add_stage("short_title", short_title_stage, inputs=["ai_metadata"], outputs=["short_title"])
+    dag.add_stage("tags", tags_stage, inputs=["ai_metadata"], outputs=["all_tags"])
+    dag.add_stage("cover", cover_stage, inputs=["markdown_file", "ai_metadata"], outputs=["cover_image"])
+    dag.add_stage("compress_cover", compress_cover_stage, inputs=["cover_image"], outputs=["compressed_cover_image"])
+
+    started = time.perf_counter()
+    result = asyncio.run(dag.run({"markdown_file": str(ARTICLE)}, save_record=False))
+    elapsed = time.perf_counter() - started
+
+    assert result.failed == [] and result.skipped == []
+    values = result.values
+    assert 0 < len(values["summary"]) <= SUMMARY_MAX_LENGTH
+    assert 0 < len(values["short_title"]) <= SHORT_TITLE_MAX_LENGTH
+    assert len(values["all_tags"]) == TAG_COUNT
+    assert all(" " not in tag and "-" not in tag for tag in values["all_tags"])
+    assert os.path.getsize(values["compressed_cover_image"]) <= 200 * 1024
+    assert result.critical_path == ["ai_metadata", "cover", "compress_cover"]
+    # 不访问网络和浏览器，整个依赖图在很短时间内完成
+    assert elapsed < 5
+
+
+def test_local_provider_is_deterministic(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    provider = LocalProvider()
+
+    first = asyncio.run(provider.generate_metadata(str(ARTICLE), title="标题"))
+    second = asyncio.run(provider.generate_metadata(str(ARTICLE), title="标题"))
+
+    assert first == second
+    assert asyncio.run(provider.generate_images(str(ARTICLE))) == asyncio.run(provider.generate_images(str(ARTICLE)))
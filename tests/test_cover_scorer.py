@@ -0,0 +1,84 @@
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+from image_toolkit_sdk import pick_cover, score_covers
+
+
+def illustration(seed):
+    """没有文字的插画：渐变背景上的几个柔和色块"""
+    rng = np.random.default_rng(seed)
+    width, height = 1280, 720
+    y, x = np.mgrid[0:height, 0:width]
+    pixels = np.stack([x / width * 255, y / height * 200 + 30, (1 - x / width) * 220], axis=-1)
+    img = Image.fromarray(pixels.astype(np.uint8))
+    draw = ImageDraw.Draw(img)
+    for _ in range(12):
+        cx, cy, r = rng.integers(0, width), rng.integers(0, height), rng.integers(40, 200)
+        draw.ellipse([cx - r, cy - r, cx + r, cy + r], fill=tuple(int(v) for v in rng.integers(0, 255, 3)))
+    return img.filter(ImageFilter.GaussianBlur(2))
+
+
+def with_text(img):
+    img = img.copy()
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=48)
+    for i in range(4):
+        draw.text((80, 100 + i * 120), "GARBLED TEXT xq7 zkw 3f9", fill="white", font=font,
+                  stroke_width=2, stroke_fill="black")
+    return img
+
+
+def text_page():
+    img = Image.new("RGB", (1280, 720), "white")
+    draw = ImageDraw.Draw(img)
+    for i in range(60):
+        draw.text((10, 10 + i * 12), "lorem ipsum dolor sit amet consectetur adipiscing elit " * 3, fill="black")
+    return img
+
+
+def save(img, path):
+    img.save(path)
+    return str(path)
+
+
+def test_text_overlay_ranks_below_same_image(tmp_path):
+    clean = illustration(0)
+    clean_path = save(clean, tmp_path / "clean.png")
+    overlay_path = save(with_text(clean), tmp_path / "overlay.png")
+
+    scores = {score.path: score for score in score_covers([overlay_path, clean_path])}
+
+    assert scores[overlay_path].text_ratio > scores[clean_path].text_ratio
+    assert scores[overlay_path].score < scores[clean_path].score
+    assert pick_cover([overlay_path, clean_path]) == clean_path
+
+
+def test_text_page_never_wins(tmp_path):
+    paths = [save(illustration(1), tmp_path / "a.png"), save(text_page(), tmp_path / "page.png"),
+             save(illustration(2), tmp_path / "b.png")]
+
+    scores = score_covers(paths)
+
+    assert scores[-1].path == paths[1]
+    assert scores[-1].score < 0
+
+
+def test_near_duplicates_are_sorted_last(tmp_path):
+    img = illustration(3)
+    original = save(img, tmp_path / "original.png")
+    copy = save(img.resize((1279, 719)), tmp_path / "copy.png")
+    other = save(illustration(4), tmp_path / "other.png")
+
+    scores = score_covers([original, copy, other])
+
+    assert [score.duplicate_of is None for score in scores] == [True, True, False]
+    assert scores[-1].duplicate_of in (original, copy)
+
+
+def test_unreadable_candidates_are_skipped(tmp_path):
+    broken = tmp_path / "broken.png"
+    broken.write_bytes(b"not an image")
+    good = save(illustration(5), tmp_path / "good.png")
+
+    assert [score.path for score in score_covers([str(broken), good])] == [good]
+    assert pick_cover([str(tmp_path / "missing.png")]) is None
@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from image_toolkit_sdk import encode_image, encode_to_target_size, has_transparency, prepare_image
+from image_toolkit_sdk.encoder import MAX_QUALITY, MIN_SCALE
+
+MB = 1024 * 1024
+
+
+def photo(width, height, seed=0):
+    """细节丰富、难以压缩的图片：平滑渐变叠加随机噪声"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([x / width * 255, y / height * 255, (x + y) / (width + height) * 255], axis=-1)
+    pixels = np.clip(base + rng.normal(0, 40, base.shape), 0, 255)
+    return Image.fromarray(pixels.astype(np.uint8))
+
+
+@pytest.fixture(scope="module")
+def large_png(tmp_path_factory):
+    path = tmp_path_factory.mktemp("encoder") / "large.png"
+    photo(2400, 1600).save(path)
+    return str(path)
+
+
+# 2MB 只需降低质量；400KB 降到最低质量仍放不下，需要缩小尺寸
+@pytest.mark.parametrize("max_bytes, max_encodes", [(2 * MB, 6), (400 * 1024, 8)])
+def test_large_png_fits_limit_in_few_encodes(large_png, tmp_path, max_bytes, max_encodes):
+    assert os.path.getsize(large_png) > 5 * MB
+
+    result = encode_to_target_size(large_png, max_bytes, output_path=str(tmp_path / "out.jpg"))
+
+    assert result.fits
+    assert result.format == "JPEG"
+    assert result.size == os.path.getsize(result.path) <= max_bytes
+    assert result.encodes <= max_encodes
+    # 查找到的结果应当接近限制，而不是远低于限制
+    assert result.size > max_bytes * 0.5
+
+
+def test_unreachable_limit_returns_smallest_result(large_png, tmp_path):
+    result = encode_to_target_size(large_png, 10 * 1024, output_path=str(tmp_path / "out.jpg"))
+
+    assert not result.fits
+    assert result.scale == pytest.approx(MIN_SCALE)
+    assert result.size == os.path.getsize(result.path)
+    assert result.encodes <= 8
+
+
+def test_small_image_needs_no_search():
+    data, result = encode_image(*prepare_image(photo(200, 150)), 5 * MB)
+
+    # 一次试编码，加上最终结果的一次优化编码
+    assert result.fits and result.encodes == 2
+    assert result.quality == MAX_QUALITY and result.scale == 1.0
+    assert len(data) == result.size
+
+
+def test_png_kept_only_for_real_transparency(tmp_path):
+    transparent = photo(400, 300).convert("RGBA")
+    alpha = np.full((300, 400), 255, dtype=np.uint8)
+    alpha[100:200, 100:300] = 0
+    transparent.putalpha(Image.fromarray(alpha))
+    opaque = photo(400, 300).convert("RGBA")
+    transparent.save(tmp_path / "transparent.png")
+    opaque.save(tmp_path / "opaque.png")
+
+    assert has_transparency(transparent) and not has_transparency(opaque)
+
+    kept = encode_to_target_size(str(tmp_path / "transparent.png"), 5 * MB)
+    converted = encode_to_target_size(str(tmp_path / "opaque.png"), 5 * MB)
+
+    assert kept.format == "PNG" and kept.path.endswith("_compressed.png")
+    assert Image.open(kept.path).mode == "RGBA"
+    assert converted.format == "JPEG" and converted.path.endswith("_compressed.jpg")
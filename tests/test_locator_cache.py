@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import pytest
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+import locator_cache
+from locator_cache import LocatorCache, resolve_locator
+
+
+class FakeLocator:
+    """
+    在 appear_after 秒后变为可见的定位器，appear_after 为None时始终不可见
+
+    wait_for 在元素可见后再过 report_delay 秒才返回，模拟各定位方式轮询时机不同
+    """
+
+    def __init__(self, appear_after=None, report_delay=0.0):
+        self.appear_after = appear_after
+        self.report_delay = report_delay
+        self.created = time.monotonic()
+
+    @property
+    def first(self):
+        return self
+
+    async def wait_for(self, state, timeout):
+        if self.appear_after is None or self.appear_after * 1000 > timeout:
+            await asyncio.sleep(timeout / 1000)
+            raise PlaywrightTimeoutError("timeout")
+        await asyncio.sleep(max(0.0, self.created + self.appear_after - time.monotonic()) + self.report_delay)
+
+    async def is_visible(self):
+        return self.appear_after is not None and time.monotonic() - self.created >= self.appear_after
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = LocatorCache(str(tmp_path / "locator_cache.json"))
+    monkeypatch.setattr(locator_cache, "_default_cache", cache)
+    return cache
+
+
+def resolve(candidates, fallbacks=None, timeout_ms=1000):
+    factories = {name: (lambda locator=locator: locator) for name, locator in candidates.items()}
+    fallback_factories = {name: (lambda locator=locator: locator) for name, locator in (fallbacks or {}).items()}
+    return asyncio.run(resolve_locator("site", "element", factories, timeout_ms, fallback_factories))[0]
+
+
+def test_earlier_candidate_wins_when_visible(cache):
+    # 两个方式同时可见，宽泛的方式先被 wait_for 报告
+    strategy = resolve({"精确": FakeLocator(0.0, report_delay=0.3), "宽泛": FakeLocator(0.0)})
+
+    assert strategy == "精确"
+    assert cache.get("site", "element") == "精确"
+
+
+def test_later_candidate_used_when_earlier_not_visible(cache):
+    assert resolve({"精确": FakeLocator(None), "宽泛": FakeLocator(0.0)}) == "宽泛"
+
+
+def test_fallbacks_only_after_candidates_fail(cache):
+    started = time.monotonic()
+
+    strategy = resolve({"精确": FakeLocator(None)}, fallbacks={"兜底": FakeLocator(0.0)}, timeout_ms=200)
+
+    assert strategy == "兜底"
+    assert time.monotonic() - started >= 0.2
+
+
+def test_cached_strategy_replaced_by_visible_earlier_candidate(cache):
+    cache.put("site", "element", "宽泛")
+
+    strategy = resolve({"精确": FakeLocator(0.0), "宽泛": FakeLocator(0.0)})
+
+    assert strategy == "精确"
+    assert cache.get("site", "element") == "精确"
+
+
+def test_all_candidates_fail(cache):
+    with pytest.raises(PlaywrightTimeoutError):
+        resolve({"精确": FakeLocator(None)}, fallbacks={"兜底": FakeLocator(None)}, timeout_ms=100)
@@ -0,0 +1,91 @@
+import os
+
+import numpy as np
+from PIL import Image
+
+from image_toolkit_sdk import find_image_refs, prepare_platform_markdown
+
+
+def test_find_image_refs_forms():
+    content = (
+        '![a](images/a.png)\n'
+        '![b](images/b.png "标题")\n'
+        '![c](<images/with space.png> "标题")\n'
+        '<img src="images/d.png" width="300">\n'
+        '![inline](data:image/png;base64,AAAA)\n'
+        '`![code](images/inline_code.png)`\n'
+        '```\n![fenced](images/fenced.png)\n```\n'
+    )
+
+    refs = find_image_refs(content)
+
+    assert [ref.src for ref in refs] == ["images/a.png", "images/b.png", "images/with space.png", "images/d.png"]
+    assert all(content[ref.start:ref.end] == ref.src for ref in refs)
+    assert [ref.angle_brackets for ref in refs] == [False, False, True, False]
+    assert [ref.html for ref in refs] == [False, False, False, True]
+
+
+def write_image(path, size=(64, 48), noise=False):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if noise:
+        pixels = np.random.default_rng(0).integers(0, 255, (size[1], size[0], 3), dtype=np.uint8)
+        Image.fromarray(pixels).save(path)
+    else:
+        Image.new("RGB", size, (200, 80, 40)).save(path)
+
+
+def test_prepare_platform_markdown_rewrites_links(tmp_path):
+    article_dir = tmp_path / "article"
+    write_image(str(article_dir / "images" / "ok.png"))
+    write_image(str(article_dir / "images" / "fails.png"), size=(32, 32))
+    write_image(str(article_dir / "images" / "big.png"), size=(600, 400), noise=True)
+    markdown_file = article_dir / "article.md"
+    markdown_file.write_text(
+        "![ok](<images/ok.png> \"标题\")\n"
+        "![fails](images/fails.png)\n"
+        "![big](images/big.png)\n"
+        "![remote](http://127.0.0.1:9/remote.png)\n"
+        "```\n![code](images/ok.png)\n```\n",
+        encoding="utf-8")
+    limit = 200 * 1024
+    uploads = []
+
+    def host(path):
+        uploads.append(os.path.getsize(path))
+        if os.path.basename(path) == "fails.png":
+            raise RuntimeError("upload failed")
+        return f"https://img.example/{len(uploads)}"
+
+    def run():
+        return prepare_platform_markdown({"zhihu": str(markdown_file)}, host, limits={"zhihu": limit},
+                                         cache_dir=str(tmp_path / "cache"), output_dir=str(tmp_path / "out"))
+
+    copies = run()
+
+    assert copies == {"zhihu": str(tmp_path / "out" / "zhihu" / "article.md")}
+    lines = (tmp_path / "out" / "zhihu" / "article.md").read_text(encoding="utf-8").splitlines()
+    hosted = [line for line in lines[:3] if "https://img.example/" in line]
+    assert len(hosted) == 2
+    assert lines[0].startswith("![ok](<https://img.example/") and lines[0].endswith('> "标题")')
+    # 上传失败的本地图片改为绝对路径，副本在其他目录中仍然可以找到
+    assert lines[1] == f"![fails]({article_dir / 'images' / 'fails.png'})"
+    assert lines[3] == "![remote](http://127.0.0.1:9/remote.png)"
+    assert lines[5] == "![code](images/ok.png)"
+    # 超过限制的图片压缩后才上传
+    assert max(uploads) <= limit
+
+    # 重复运行时使用缓存，已上传的图片不再上传
+    uploaded = len(uploads)
+    assert run() == copies
+    assert len(uploads) == uploaded + 1
+
+
+def test_prepare_platform_markdown_without_host(tmp_path):
+    write_image(str(tmp_path / "local.png"))
+    markdown_file = tmp_path / "article.md"
+    markdown_file.write_text("![local](local.png)\n", encoding="utf-8")
+
+    copies = prepare_platform_markdown({"zhihu": str(markdown_file)}, None, cache_dir=str(tmp_path / "cache"),
+                                       output_dir=str(tmp_path / "out"))
+
+    assert copies == {}
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from pipeline_dag import PipelineDAG, PipelineDAGError, StageRecord, compute_critical_path
+
+
+def stage(outputs, delay=0.0, error=None, seen=None):
+    """返回固定输出的阶段，可选延迟、抛出异常和记录收到的输入"""
+    async def func(inputs):
+        if seen is not None:
+            seen.append(inputs)
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return outputs
+    return func
+
+
+def test_duplicate_stage_and_output_are_rejected():
+    dag = PipelineDAG("test")
+    dag.add_stage("a", stage({"x": 1}), outputs=["x"])
+
+    with pytest.raises(PipelineDAGError):
+        dag.add_stage("a", stage({}))
+    with pytest.raises(PipelineDAGError):
+        dag.add_stage("b", stage({"x": 2}), outputs=["x"])
+
+
+def test_missing_input_is_rejected():
+    dag = PipelineDAG("test")
+    dag.add_stage("a", stage({"y": 1}), inputs=["x"], outputs=["y"])
+
+    with pytest.raises(PipelineDAGError, match="'x'"):
+        asyncio.run(dag.run(save_record=False))
+
+
+def test_cycle_is_rejected():
+    dag = PipelineDAG("test")
+    dag.add_stage("a", stage({"x": 1}), inputs=["z"], outputs=["x"])
+    dag.add_stage("b", stage({"y": 1}), inputs=["x"], outputs=["y"])
+    dag.add_stage("c", stage({"z": 1}), inputs=["y"], outputs=["z"])
+    dag.add_stage("d", stage({"w": 1}), inputs=["seed"], outputs=["w"])
+
+    with pytest.raises(PipelineDAGError, match="循环依赖") as excinfo:
+        asyncio.run(dag.run({"seed": 0}, save_record=False))
+    assert "d" not in str(excinfo.value).split(":", 1)[1]
+
+
+def test_independent_stages_run_concurrently_and_receive_only_inputs():
+    seen = []
+    dag = PipelineDAG("test")
+    dag.add_stage("a", stage({"a": 1}, delay=0.2), inputs=["seed"], outputs=["a"])
+    dag.add_stage("b", stage({"b": 2}, delay=0.2), inputs=["seed"], outputs=["b"])
+    dag.add_stage("c", stage({"c": 3}, seen=seen), inputs=["a", "b"], outputs=["c"])
+
+    result = asyncio.run(dag.run({"seed": 0, "unused": 1}, save_record=False))
+
+    assert result.values["c"] == 3
+    assert seen == [{"a": 1, "b": 2}]
+    assert result.finished_at - result.started_at < 0.35
+
+
+def test_failure_skips_only_downstream_stages():
+    dag = PipelineDAG("test")
+    dag.add_stage("cover", stage({}, error=RuntimeError("boom")), inputs=["seed"], outputs=["cover"])
+    dag.add_stage("compress", stage({"small": 1}), inputs=["cover"], outputs=["small"])
+    dag.add_stage("upload", stage({"media_id": 1}), inputs=["small"], outputs=["media_id"])
+    dag.add_stage("summary", stage({"summary": "ok"}), inputs=["seed"], outputs=["summary"])
+
+    result = asyncio.run(dag.run({"seed": 0}, save_record=False))
+
+    assert result.failed == ["cover"]
+    assert result.skipped == ["compress", "upload"]
+    assert result.records["summary"].status == "success"
+    assert result.records["cover"].error == "boom"
+
+
+def test_missing_declared_output_fails_stage():
+    dag = PipelineDAG("test")
+    dag.add_stage("a", stage({}), inputs=["seed"], outputs=["x"])
+
+    result = asyncio.run(dag.run({"seed": 0}, save_record=False))
+
+    assert result.failed == ["a"]
+
+
+def test_critical_path_follows_latest_upstream():
+    records = {
+        "metadata": StageRecord("metadata", "success", 0.0, 1.0),
+        "summary": StageRecord("summary", "success", 1.0, 2.0, depends_on=["metadata"]),
+        "cover": StageRecord("cover", "success", 1.0, 5.0, depends_on=["metadata"]),
+        "compress": StageRecord("compress", "success", 5.0, 6.0, depends_on=["cover"]),
+        "publish": StageRecord("publish", "success", 6.0, 9.0, depends_on=["summary", "compress"]),
+        "skipped": StageRecord("skipped", "skipped", depends_on=["cover"]),
+    }
+
+    assert compute_critical_path(records) == ["metadata", "cover", "compress", "publish"]
+    assert compute_critical_path({"a": StageRecord("a")}) == []
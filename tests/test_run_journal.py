@@ -0,0 +1,76 @@
+import asyncio
+import json
+from collections import Counter
+
+from pipeline_dag import PipelineDAG
+from run_journal import RunJournal
+
+
+def reopen(journal):
+    """模拟 --resume：从磁盘重新加载日志"""
+    with open(journal.path, encoding="utf-8") as f:
+        return RunJournal(journal.title, journal.path, json.load(f))
+
+
+def run_cover_pipeline(journal, tmp_path, calls, cover_param="auto"):
+    """封面图 → 压缩 → 上传素材库，与发布流程的阶段结构相同"""
+    async def cover_stage(inputs):
+        calls["cover"] += 1
+        path = tmp_path / f"cover_{calls['cover']}.png"
+        path.write_bytes(b"cover")
+        return {"cover_image": str(path)}
+
+    async def compress_stage(inputs):
+        calls["compress"] += 1
+        return {"compressed_cover_image": inputs["cover_image"]}
+
+    async def material_stage(inputs):
+        calls["material"] += 1
+        return {"media_id": f"media_for_{inputs['cover_image']}"}
+
+    dag = PipelineDAG("journal_test")
+    dag.add_stage("cover", journal.checkpoint("cover", cover_stage, file_outputs=["cover_image"],
+                                              key=lambda inputs: {"inputs": inputs, "cover": cover_param}),
+                  inputs=["markdown_file"], outputs=["cover_image"])
+    dag.add_stage("compress_cover", journal.checkpoint("compress_cover", compress_stage, file_outputs=["compressed_cover_image"]),
+                  inputs=["cover_image"], outputs=["compressed_cover_image"])
+    dag.add_stage("wechat_material", journal.checkpoint("wechat_material", material_stage),
+                  inputs=["cover_image"], outputs=["media_id"])
+    return asyncio.run(dag.run({"markdown_file": "article.md"}, save_record=False)).values
+
+
+def test_resume_reuses_stages_with_unchanged_inputs(tmp_path):
+    calls = Counter()
+    journal = RunJournal("标题", path=str(tmp_path / "journal.json"))
+
+    first = run_cover_pipeline(journal, tmp_path, calls)
+    second = run_cover_pipeline(reopen(journal), tmp_path, calls)
+
+    assert second == first
+    assert calls == Counter(cover=1, compress=1, material=1)
+
+
+def test_downstream_stages_rerun_when_upstream_reruns(tmp_path):
+    calls = Counter()
+    journal = RunJournal("标题", path=str(tmp_path / "journal.json"))
+    first = run_cover_pipeline(journal, tmp_path, calls)
+
+    # 封面图文件丢失，封面图阶段重新执行，压缩和上传素材库使用新的封面图
+    (tmp_path / "cover_1.png").unlink()
+    second = run_cover_pipeline(reopen(journal), tmp_path, calls)
+
+    assert second["cover_image"] != first["cover_image"]
+    assert second["compressed_cover_image"] == second["cover_image"]
+    assert second["media_id"] == f"media_for_{second['cover_image']}"
+    assert calls == Counter(cover=2, compress=2, material=2)
+
+
+def test_stage_reruns_when_parameters_change(tmp_path):
+    calls = Counter()
+    journal = RunJournal("标题", path=str(tmp_path / "journal.json"))
+    run_cover_pipeline(journal, tmp_path, calls)
+
+    values = run_cover_pipeline(reopen(journal), tmp_path, calls, cover_param="other.png")
+
+    assert calls == Counter(cover=2, compress=2, material=2)
+    assert values["media_id"] == f"media_for_{values['cover_image']}"
@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import pytest
+
+from summarizer_sdk import summarize_markdown
+from summarizer_sdk.summarizer import ELLIPSIS, split_sentences, summary_length
+from word_counter_sdk import validate_and_clean_text
+
+ARTICLE = next((Path(__file__).resolve().parent.parent / "markdown_files").glob("*.md")).read_text(encoding="utf-8")
+
+
+def assert_within_platform_limit(summary, max_length):
+    """与发布流程相同的字数校验（中英文之间的空格清理后计数）"""
+    result = validate_and_clean_text(summary, max_length)
+    assert result["success"], result["message"]
+    assert result["cleaned_count"] <= max_length
+    assert summary_length(summary) <= max_length
+
+
+@pytest.mark.parametrize("max_length", [120, 60, 30, 10])
+def test_summary_respects_budget(max_length):
+    summary = summarize_markdown(ARTICLE, max_length=max_length)
+
+    assert summary
+    assert_within_platform_limit(summary, max_length)
+
+
+def test_summary_keeps_original_sentence_order():
+    summary = summarize_markdown(ARTICLE, max_length=120)
+    sentences = [sentence for sentence in split_sentences(ARTICLE) if sentence in summary]
+
+    assert sentences
+    assert [summary.index(sentence) for sentence in sentences] == sorted(summary.index(s) for s in sentences)
+
+
+def test_long_single_sentence_is_truncated():
+    content = "这是一个非常长的句子" * 40 + "。"
+
+    summary = summarize_markdown(content, max_length=120)
+
+    assert summary.endswith(ELLIPSIS)
+    assert_within_platform_limit(summary, 120)
+
+
+def test_english_text_stays_within_budget():
+    content = " ".join(f"Sentence number {i} explains how the local summarizer keeps within budget." for i in range(30))
+
+    summary = summarize_markdown(content, max_length=120)
+
+    assert summary
+    assert_within_platform_limit(summary, 120)
+
+
+def test_code_and_headings_are_not_summarized():
+    content = "# 标题不参与摘要\n\n```python\nprint('代码不参与摘要')\n```\n\n正文只有这一句话，用来生成摘要。\n"
+
+    assert summarize_markdown(content) == "正文只有这一句话，用来生成摘要。"
+    assert summarize_markdown("# 只有标题\n\n```\ncode\n```\n") == ""
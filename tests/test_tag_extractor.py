@@ -0,0 +1,46 @@
+from tag_extractor_sdk import clean_tag, extract_tags, rank_tags, score_tags
+
+ARTICLE = """# Kubernetes 集群部署指南
+
+本文介绍如何使用 Kubernetes 部署容器集群。Kubernetes 集群由控制平面和工作节点组成。
+
+```bash
+kubectl apply -f zookeeper.yaml
+zookeeper zookeeper zookeeper zookeeper
+```
+
+部署完成后使用 `zookeeper` 检查容器集群的状态，详见 [官方文档](https://example.com/zookeeper)。
+"""
+
+
+def test_extract_tags_returns_clean_unique_tags():
+    tags = extract_tags(ARTICLE, 5)
+
+    assert len(tags) == 5
+    assert len(set(tags)) == len(tags)
+    assert all(tag == clean_tag(tag) and tag for tag in tags)
+    assert "Kubernetes" in tags and "集群" in tags
+
+
+def test_extract_tags_ignores_code_and_links():
+    tags = extract_tags(ARTICLE, 10)
+
+    assert not any("zookeeper" in tag.lower() for tag in tags)
+    assert not any("example" in tag.lower() for tag in tags)
+
+
+def test_clean_tag_removes_spaces_and_dashes():
+    assert clean_tag(" Machine-Learning 机器 学习! ") == "MachineLearning机器学习"
+
+
+def test_rank_tags_orders_by_relevance_and_keeps_ties_stable():
+    tags = ["美食", "部署", "旅游", "Kubernetes"]
+
+    ranked = rank_tags(ARTICLE, tags)
+    scores = score_tags(ARTICLE, tags)
+
+    assert sorted(ranked) == sorted(tags)
+    assert set(ranked[:2]) == {"部署", "Kubernetes"}
+    # 与文章无关的标签得分为0，保持给定的顺序
+    assert scores["美食"] == scores["旅游"] == 0
+    assert ranked[2:] == ["美食", "旅游"]
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+就绪等待模块
+用具体的页面条件（元素出现/消失、按钮可用、网络响应、下载事件）代替固定时长的 wait_for_timeout
+
+每个等待都有超时上限，条件满足后立即返回，并打印实际等待的耗时（同时记录到运行时间线），便于找出流程中真正慢的步骤。
+默认是"软等待"：超时后只打印警告并继续执行，与原来固定等待结束后继续执行的行为一致；
+required=True 时超时会抛出异常。
+"""
+
+import asyncio
+import inspect
+import time
+from typing import Any, Awaitable, Callable, Optional, Union
+
+from playwright.async_api import Download, Locator, Page, Response, expect
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from run_timeline import span
+
+# 条件轮询间隔（毫秒）
+POLL_INTERVAL_MS = 200
+
+
+async def _timed(description: str, awaitable: Awaitable[Any], timeout_ms: float, required: bool) -> bool:
+    """
+    执行等待并打印耗时
+
+    Args:
+        description: 等待内容的描述
+        awaitable: 条件满足时完成的等待对象
+        timeout_ms: 超时上限（毫秒）
+        required: 超时是否抛出异常
+
+    Returns:
+        条件是否在超时前满足
+    """
+    started = time.perf_counter()
+    with span(f"等待.{description}", timeout_ms=timeout_ms) as current:
+        try:
+            await awaitable
+        except (PlaywrightTimeoutError, asyncio.TimeoutError, AssertionError):
+            elapsed = time.perf_counter() - started
+            if required:
+                print(f"❌ [等待] {description} 超时（{elapsed:.1f}秒）")
+                raise
+            current.outcome = "timeout"
+            print(f"⚠️  [等待] {description} 超时（{elapsed:.1f}秒），继续执行")
+            return False
+    elapsed = time.perf_counter() - started
+    print(f"⏱️  [等待] {description} 用时 {elapsed:.1f}秒（上限 {timeout_ms / 1000:.0f}秒）")
+    return True
+
+
+async def wait_visible(locator: Locator, description: str, timeout_ms: float = 30000,
+                       required: bool = False) -> bool:
+    """等待元素出现（多个匹配时等待第一个）"""
+    return await _timed(description, locator.first.wait_for(state="visible", timeout=timeout_ms),
+                        timeout_ms, required)
+
+
+async def wait_hidden(locator: Locator, description: str, timeout_ms: float = 30000,
+                      required: bool = False) -> bool:
+    """等待元素消失（不存在也视为已消失）"""
+    return await _timed(description, locator.first.wait_for(state="hidden", timeout=timeout_ms),
+                        timeout_ms, required)
+
+
+async def wait_enabled(locator: Locator, description: str, timeout_ms: float = 30000,
+                       required: bool = False) -> bool:
+    """等待按钮等元素变为可用状态"""
+    return await _timed(description, expect(locator.first).to_be_enabled(timeout=timeout_ms),
+                        timeout_ms, required)
+
+
+async def wait_network_idle(page: Page, description: str, timeout_ms: float = 30000,
+                            required: bool = False) -> bool:
+    """等待页面网络空闲（至少500毫秒没有网络请求）"""
+    return await _timed(description, page.wait_for_load_state("networkidle", timeout=timeout_ms),
+                        timeout_ms, required)
+
+
+async def wait_until(predicate: Callable[[], Union[bool, Awaitable[bool]]], description: str,
+                     timeout_ms: float = 30000, required: bool = False) -> bool:
+    """
+    轮询等待自定义条件成立，用于页面事件无法直接表达的条件（例如元素数量增加、剪贴板内容更新）
+
+    Args:
+        predicate: 条件函数，可以是普通函数或协程函数，返回True表示条件成立
+        description: 等待内容的描述
+        timeout_ms: 超时上限（毫秒）
+        required: 超时是否抛出异常
+
+    Returns:
+        条件是否在超时前成立
+    """
+    async def poll() -> None:
+        deadline = time.perf_counter() + timeout_ms / 1000
+        while True:
+            result = predicate()
+            if inspect.isawaitable(result):
+                result = await result
+            if result:
+                return
+            if time.perf_counter() >= deadline:
+                raise PlaywrightTimeoutError(f"等待条件超时: {description}")
+            await asyncio.sleep(POLL_INTERVAL_MS / 1000)
+
+    return await _timed(description, poll(), timeout_ms, required)
+
+
+async def wait_response(page: Page, url_or_predicate: Union[str, Callable[[Response], bool]],
+                        trigger: Callable[[], Awaitable[Any]], description: str,
+                        timeout_ms: float = 30000, required: bool = False) -> Optional[Response]:
+    """
+    执行触发操作并等待匹配的网络响应
+
+    Args:
+        page: 页面对象
+        url_or_predicate: 响应URL（支持glob）或判断函数
+        trigger: 触发请求的操作（协程函数）
+        description: 等待内容的描述
+        timeout_ms: 超时上限（毫秒）
+        required: 超时是否抛出异常
+
+    Returns:
+        匹配的响应，软等待超时时返回None
+    """
+    holder = {}
+
+    async def run() -> None:
+        async with page.expect_response(url_or_predicate, timeout=timeout_ms) as response_info:
+            await trigger()
+        holder["response"] = await response_info.value
+
+    await _timed(description, run(), timeout_ms, required)
+    return holder.get("response")
+
+
+async def wait_download(page: Page, trigger: Callable[[], Awaitable[Any]], description: str,
+                        timeout_ms: float = 30000, required: bool = False) -> Optional[Download]:
+    """
+    执行触发操作并等待下载开始，再等待下载完成
+
+    Args:
+        page: 页面对象
+        trigger: 触发下载的操作（协程函数）
+        description: 等待内容的描述
+        timeout_ms: 超时上限（毫秒），包括下载文件写入完成的时间
+        required: 超时是否抛出异常
+
+    Returns:
+        下载对象，软等待超时时返回None
+    """
+    holder = {}
+
+    async def run() -> None:
+        async with page.expect_download(timeout=timeout_ms) as download_info:
+            await trigger()
+        download = await download_info.value
+        # path() 在下载完成后才返回
+        await asyncio.wait_for(download.path(), timeout_ms / 1000)
+        holder["download"] = download
+
+    await _timed(description, run(), timeout_ms, required)
+    return holder.get("download")
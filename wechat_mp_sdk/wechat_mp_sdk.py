@@ -5,6 +5,7 @@
 基于微信官方文档：
 - 获取接口调用凭据: https://developers.weixin.qq.com/doc/subscription/api/base/api_getaccesstoken.html
 - 上传永久素材: https://developers.weixin.qq.com/doc/subscription/api/material/permanent/api_addmaterial.html
+- 上传图文消息内的图片: https://developers.weixin.qq.com/doc/subscription/api/material/permanent/api_uploadimage.html
 """
 
 import requests
@@ -19,6 +20,9 @@ class WeChatMPSDK:
     """微信公众号API SDK"""
     
     BASE_URL = "https://api.weixin.qq.com"
+
+    # 图文消息内的图片仅支持jpg/png格式，大小不超过1MB
+    ARTICLE_IMAGE_MAX_BYTES = 1024 * 1024
     
     def __init__(self, app_id: str, app_secret: str):
         """
@@ -255,6 +259,56 @@ class WeChatMPSDK:
         """
         return self.upload_permanent_material(file_path, 'thumb')
 
+    def upload_article_image(self, file_path: str) -> Dict[str, Any]:
+        """
+        上传图文消息内的图片，获取图片URL
+        
+        参考文档: https://developers.weixin.qq.com/doc/subscription/api/material/permanent/api_uploadimage.html
+        
+        与永久素材不同，上传的图片不占用素材库的数量限制，也不会出现在素材库中。
+        仅支持jpg/png格式，大小不超过 ARTICLE_IMAGE_MAX_BYTES。
+        
+        Args:
+            file_path: 图片文件路径
+            
+        Returns:
+            包含url的字典
+            
+        Raises:
+            Exception: 上传失败时抛出异常
+        """
+        if not os.path.exists(file_path):
+            raise Exception(f"文件不存在: {file_path}")
+        if self._get_content_type(file_path) not in ('image/jpeg', 'image/png'):
+            raise Exception(f"图文消息内的图片仅支持jpg/png格式: {file_path}")
+        if os.path.getsize(file_path) > self.ARTICLE_IMAGE_MAX_BYTES:
+            raise Exception(f"图文消息内的图片不能超过1MB: {file_path}")
+        
+        access_token = self.get_access_token()
+        url = f"{self.BASE_URL}/cgi-bin/media/uploadimg"
+        params = {'access_token': access_token}
+        
+        with open(file_path, 'rb') as file:
+            files = {
+                'media': (os.path.basename(file_path), file, self._get_content_type(file_path))
+            }
+            try:
+                response = requests.post(url, params=params, files=files)
+                response.raise_for_status()
+                
+                result = response.json()
+                
+                # 检查微信API返回的错误码
+                if 'errcode' in result and result['errcode'] != 0:
+                    raise Exception(f"微信API错误: {result.get('errmsg', '未知错误')} (错误码: {result['errcode']})")
+                
+                return result
+                
+            except requests.exceptions.RequestException as e:
+                raise Exception(f"上传请求失败: {str(e)}")
+            except json.JSONDecodeError as e:
+                raise Exception(f"响应解析失败: {str(e)}")
+
 
 class WeChatMPSDKError(Exception):
     """微信公众号SDK异常类"""